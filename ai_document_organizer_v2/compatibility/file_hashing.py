@@ -0,0 +1,55 @@
+"""
+V1 File Hashing Module - File hashes for V2 components
+
+Content hashes come from the V1 hash cache (src.file_hashing) when the V1
+package is importable, so a file is only read once per version and renamed
+or copied files share cached results. Without it, files are identified by
+their path, size and modification time.
+"""
+
+import os
+import hashlib
+from typing import Optional
+
+try:
+    from src.file_hashing import content_hash as _v1_content_hash
+except ImportError:
+    _v1_content_hash = None
+
+
+def content_hash(file_path: str) -> Optional[str]:
+    """
+    Get the content digest of a file through the shared V1 hash cache.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest, or None if the V1 hashing modules are unavailable or the file is unreadable
+    """
+    if _v1_content_hash is None:
+        return None
+    return _v1_content_hash(file_path)
+
+
+def file_cache_key(file_path: str) -> str:
+    """
+    Generate a key identifying a file and its state, for result caches.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        The content hash, else a hash of the path, size and modification time
+        ("" if the file does not exist)
+    """
+    if not os.path.exists(file_path):
+        return ""
+
+    file_hash = content_hash(file_path)
+    if file_hash:
+        return file_hash
+
+    file_stat = os.stat(file_path)
+    unique_str = f"{file_path}:{file_stat.st_size}:{file_stat.st_mtime}"
+    return hashlib.md5(unique_str.encode()).hexdigest()
@@ -870,6 +870,46 @@ class AudioAnalyzerPlugin(MediaAnalyzerPlugin):
             logger.warning(f"Error generating waveform with librosa: {e}")
             return None
     
+    def compute_fingerprint(self, file_path: str) -> Dict[str, Any]:
+        """
+        Compute the landmark fingerprint used for near-duplicate audio detection.
+
+        The start of the file is decoded with librosa at a low sample rate and
+        the fingerprint is stored in the shared hash cache, where the duplicate
+        detector's audio strategy reuses it.
+
+        Args:
+            file_path: Path to the audio file
+
+        Returns:
+            Dictionary with 'success', 'landmark_count' and 'fingerprint_kind'
+        """
+        if not LIBROSA_AVAILABLE:
+            return {'success': False, 'error': "Librosa library not available"}
+
+        try:
+            from src.audio_fingerprint import AudioFingerprinter
+            from src.hash_cache import get_hash_cache
+        except ImportError as e:
+            return {'success': False, 'error': f"Audio fingerprinting not available: {e}"}
+
+        try:
+            max_duration = self.get_setting("audio_analyzer.fingerprint_duration", 60)
+            fingerprinter = AudioFingerprinter({'max_duration': max_duration}, cache=get_hash_cache())
+            fingerprint = fingerprinter.fingerprint_many([file_path])[0]
+            if fingerprint is None:
+                return {'success': False, 'error': f"Could not decode audio file: {file_path}"}
+
+            return {
+                'success': True,
+                'landmark_count': len(fingerprint[0]),
+                'fingerprint_kind': fingerprinter.kind
+            }
+
+        except Exception as e:
+            logger.warning(f"Error computing audio fingerprint: {e}")
+            return {'success': False, 'error': str(e)}
+
     def analyze_audio_features(self, file_path: str, max_duration: Optional[float] = None) -> Dict[str, Any]:
         """
         Perform advanced audio analysis using librosa.
@@ -16,6 +16,8 @@ from datetime import datetime
 from ai_document_organizer_v2.core.plugin_manager import PluginManager
 from ai_document_organizer_v2.plugins.cloud_storage.provider_base import CloudProviderPlugin, CloudStorageError
 
+from ai_document_organizer_v2.compatibility.file_hashing import content_hash
+
 logger = logging.getLogger("AIDocumentOrganizerV2.CloudStorage.Manager")
 
 
@@ -843,12 +845,18 @@ class CloudStorageManager:
                 
                 # Check if either side has been modified since last sync
                 last_sync_time = last_state.get("last_sync", 0)
+                local_changed = local_ts > last_sync_time
+                
+                # A local file that was only touched still has the content it was synced with
+                if local_changed and last_state.get("content_hash"):
+                    local_hash = content_hash(os.path.join(local_dir, file_path))
+                    local_changed = local_hash != last_state["content_hash"]
                 
-                if local_ts > last_sync_time and cloud_ts > last_sync_time:
+                if local_changed and cloud_ts > last_sync_time:
                     # Both versions modified, handle conflict
                     logger.warning(f"Conflict detected for file: {file_path}")
                     self._handle_conflict(local_file, cloud_file, provider, local_dir, bidirectional)
-                elif local_ts > last_sync_time:
+                elif local_changed:
                     # Local version is newer, upload if bidirectional
                     if bidirectional:
                         files_to_upload.append(local_file)
@@ -886,7 +894,8 @@ class CloudStorageManager:
                         "local_size": local_file["size"],
                         "cloud_id": upload_result["id"],
                         "last_sync": datetime.now().timestamp(),
-                        "cloud_path": upload_result["path"]
+                        "cloud_path": upload_result["path"],
+                        "content_hash": content_hash(abs_path)
                     }
                     
                 except Exception as e:
@@ -919,7 +928,8 @@ class CloudStorageManager:
                         "local_size": os.path.getsize(abs_path),
                         "cloud_id": file_id,
                         "last_sync": datetime.now().timestamp(),
-                        "cloud_path": cloud_file["path"]
+                        "cloud_path": cloud_file["path"],
+                        "content_hash": content_hash(abs_path)
                     }
                     
                 except Exception as e:
@@ -7,11 +7,12 @@ reducing redundant processing and improving performance.
 
 import os
 import json
-import hashlib
 import logging
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from ai_document_organizer_v2.compatibility.file_hashing import file_cache_key
+
 logger = logging.getLogger("AIDocumentOrganizerV2.TranscriptionService.Cache")
 
 class TranscriptionCache:
@@ -44,7 +45,8 @@ class TranscriptionCache:
     
     def _get_file_hash(self, file_path: str) -> str:
         """
-        Generate a unique hash for a file based on its path, size, and modification time.
+        Generate a unique hash for a file based on its content (or its path,
+        size, and modification time when content hashing is unavailable).
         
         Args:
             file_path: Path to the file
@@ -52,20 +54,7 @@ class TranscriptionCache:
         Returns:
             Hash string that uniquely identifies the file and its state
         """
-        if not os.path.exists(file_path):
-            return ""
-        
-        # Get file stats
-        file_stat = os.stat(file_path)
-        file_size = file_stat.st_size
-        mtime = file_stat.st_mtime
-        
-        # Create a unique string based on path, size and mtime
-        unique_str = f"{file_path}:{file_size}:{mtime}"
-        
-        # Generate hash
-        hash_obj = hashlib.md5(unique_str.encode())
-        return hash_obj.hexdigest()
+        return file_cache_key(file_path)
     
     def _get_cache_path(self, file_hash: str) -> str:
         """
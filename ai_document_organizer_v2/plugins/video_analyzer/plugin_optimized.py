@@ -878,6 +878,47 @@ class VideoAnalyzerPlugin(MediaAnalyzerPlugin):
         # If all methods failed
         return None
     
+    def compute_signature(self, file_path: str) -> Dict[str, Any]:
+        """
+        Compute the keyframe signature used for near-duplicate video detection.
+
+        A fixed number of frames is sampled in a single sequential decode and
+        hashed perceptually; the signature is stored in the shared hash cache,
+        where the duplicate detector's video strategy reuses it.
+
+        Args:
+            file_path: Path to the video file
+
+        Returns:
+            Dictionary with 'success', 'duration', 'frame_count' and 'signature_kind'
+        """
+        try:
+            from src.video_signature import VideoHasher
+            from src.hash_cache import get_hash_cache
+        except ImportError as e:
+            return {'success': False, 'error': f"Video signatures not available: {e}"}
+
+        if not VideoHasher.available():
+            return {'success': False, 'error': "ffmpeg-python or OpenCV library not available"}
+
+        try:
+            frames = self.get_setting("video_analyzer.signature_frames", 16)
+            hasher = VideoHasher({'frames': frames}, cache=get_hash_cache())
+            signature = hasher.signatures([file_path])[0]
+            if signature is None:
+                return {'success': False, 'error': f"Could not decode video file: {file_path}"}
+
+            return {
+                'success': True,
+                'duration': signature[0],
+                'frame_count': len(signature[1]),
+                'signature_kind': hasher.kind
+            }
+
+        except Exception as e:
+            logger.warning(f"Error computing video signature: {e}")
+            return {'success': False, 'error': str(e)}
+
     def _detect_scenes(self, file_path: str, max_duration: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Detect scene changes in a video file.
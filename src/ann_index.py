@@ -0,0 +1,334 @@
+"""
+Approximate Nearest-Neighbour Index Module for Smart File Organizer.
+Provides an inverted-file (IVF-flat) index over the rows of the embedding
+matrix kept by VectorSearch.
+
+The embedding space is partitioned by spherical k-means into n_lists cells.
+A query scores the centroids, then scores exactly only the rows assigned to the
+nprobe best cells. nprobe is the recall/latency knob: probing more cells finds
+more of the true neighbours at the cost of scoring more rows.
+
+Vectors are not copied into the index; it only stores the centroids and the
+cell assignment of each row, and reads the vectors from the (memory-mapped)
+embedding matrix at query time.
+"""
+
+import os
+import time
+import logging
+from typing import Dict, List, Optional, Tuple, Any
+
+# Handle imports with graceful fallbacks
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class IVFIndex:
+    """Inverted-file index with flat (exact) scoring inside the probed cells."""
+
+    INDEX_FILE = 'ivf_index.npz'
+
+    def __init__(self, config: Optional[Dict] = None):
+        """Initialize the index with configuration."""
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+
+        self.settings = {
+            'n_lists': None,              # Defaults to 2 * sqrt(number of vectors)
+            'nprobe': 8,                  # Cells scored per query
+            'kmeans_iterations': 10,
+            'train_points_per_list': 32,  # Training sample size per cell
+            'retrain_growth': 4.0,        # Retrain when the collection grows by this factor
+            'assign_batch_size': 8192,
+            'seed': 42,
+            'index_dir': os.path.join('src', 'cache', 'embeddings')
+        }
+        self.settings.update({k: v for k, v in self.config.items() if v is not None})
+
+        self.nprobe = self.settings['nprobe']
+        self.index_dir = self.settings['index_dir']
+
+        self.reset()
+        self.load()
+
+    def reset(self) -> None:
+        """Forget the trained cells and assignments."""
+        self.centroids = None
+        self.assignments = np.empty(0, dtype=np.int32)   # Cell per row, -1 if not indexed
+        self.trained_version = None
+        self.trained_count = 0
+
+        # Rows grouped by cell, rebuilt lazily after changes
+        self._order = None
+        self._offsets = None
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether centroids are available."""
+        return self.centroids is not None
+
+    def needs_training(self, live_count: int, model_version: int) -> bool:
+        """
+        Check whether the cells should be (re)trained.
+
+        Args:
+            live_count: Number of vectors currently in the collection
+            model_version: Version of the embedding model of the vectors
+
+        Returns:
+            True if the index is untrained, was trained on another embedding
+            model version, or the collection has grown past the retrain factor
+        """
+        if not self.is_trained or self.trained_version != model_version:
+            return True
+        return live_count >= self.trained_count * self.settings['retrain_growth']
+
+    def train(self, vectors: 'np.ndarray', rows: 'np.ndarray', model_version: int) -> None:
+        """
+        Train the cells with spherical k-means and assign the given rows.
+
+        Args:
+            vectors: Embedding matrix (rows x dim), L2-normalized
+            rows: Rows of the matrix to index
+            model_version: Version of the embedding model of the vectors
+        """
+        start_time = time.time()
+        rng = np.random.default_rng(self.settings['seed'])
+
+        n_lists = self.settings['n_lists'] or max(1, int(2 * np.sqrt(len(rows))))
+        n_lists = min(n_lists, len(rows))
+
+        sample_size = min(len(rows), n_lists * self.settings['train_points_per_list'])
+        sample_rows = np.sort(rng.choice(rows, size=sample_size, replace=False))
+        sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+        for _ in range(self.settings['kmeans_iterations']):
+            labels = self._nearest(sample, centroids)
+
+            # Sum the points of each cell with one sort and a segmented reduction
+            order = np.argsort(labels, kind='stable')
+            counts = np.bincount(labels, minlength=n_lists)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+
+            # Re-seed empty cells with random sample points
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        self.centroids = centroids
+        self.trained_version = model_version
+        self.trained_count = len(rows)
+        self.assignments = np.empty(0, dtype=np.int32)
+        self.add(rows, vectors)
+
+        self.logger.info(f"Trained IVF index with {n_lists} cells on {sample_size} vectors "
+                         f"in {time.time() - start_time:.2f}s")
+
+    def add(self, rows: 'np.ndarray', vectors: 'np.ndarray') -> None:
+        """
+        Assign rows to their nearest cell (new rows or updated vectors).
+
+        Args:
+            rows: Rows to assign
+            vectors: Embedding matrix the rows index into
+        """
+        if not self.is_trained or len(rows) == 0:
+            return
+
+        rows = np.asarray(rows, dtype=np.int64)
+        needed = int(rows.max()) + 1
+        if needed > len(self.assignments):
+            grown = np.full(max(needed, 2 * len(self.assignments)), -1, dtype=np.int32)
+            grown[:len(self.assignments)] = self.assignments
+            self.assignments = grown
+
+        batch_size = self.settings['assign_batch_size']
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            self.assignments[batch] = self._nearest(np.asarray(vectors[batch]), self.centroids)
+
+        self._order = None
+
+    def remove(self, rows: 'np.ndarray') -> None:
+        """Remove rows from their cells."""
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[rows < len(self.assignments)]
+        if len(rows):
+            self.assignments[rows] = -1
+            self._order = None
+
+    def candidates(self, query: 'np.ndarray', nprobe: Optional[int] = None) -> 'np.ndarray':
+        """
+        Find the rows in the cells nearest to the query.
+
+        Args:
+            query: L2-normalized query vector
+            nprobe: Number of cells to probe (defaults to the configured nprobe)
+
+        Returns:
+            Candidate rows in ascending order
+        """
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        centroid_scores = self.centroids @ query
+        if nprobe < len(centroid_scores):
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(len(centroid_scores))
+
+        order, offsets = self._lists()
+        rows = np.concatenate([order[offsets[cell]:offsets[cell + 1]] for cell in probe])
+
+        # Sorted rows keep reads from the memory-mapped matrix sequential
+        rows.sort()
+        return rows
+
+    def search(self, query: 'np.ndarray', vectors: 'np.ndarray',
+               nprobe: Optional[int] = None) -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Score the rows in the cells nearest to the query.
+
+        Args:
+            query: L2-normalized query vector
+            vectors: Embedding matrix the index was built on
+            nprobe: Number of cells to probe (defaults to the configured nprobe)
+
+        Returns:
+            Tuple of (candidate rows, cosine scores), in row order
+        """
+        rows = self.candidates(query, nprobe)
+        if len(rows) == 0:
+            return rows, np.empty(0, dtype=np.float32)
+        return rows, np.asarray(vectors[rows] @ query, dtype=np.float32)
+
+    def save(self) -> bool:
+        """Save the index to the index directory."""
+        try:
+            if not self.is_trained:
+                return False
+
+            path = os.path.join(self.index_dir, self.INDEX_FILE)
+            temp_path = path + '.tmp.npz'
+            np.savez(temp_path, centroids=self.centroids, assignments=self.assignments,
+                     trained_version=self.trained_version, trained_count=self.trained_count)
+            os.replace(temp_path, path)
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error saving IVF index: {e}")
+            return False
+
+    def load(self) -> bool:
+        """Load the index from the index directory."""
+        path = os.path.join(self.index_dir, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return False
+
+        try:
+            with np.load(path) as data:
+                self.centroids = data['centroids']
+                self.assignments = data['assignments']
+                self.trained_version = int(data['trained_version'])
+                self.trained_count = int(data['trained_count'])
+            self._order = None
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error loading IVF index: {e}")
+            self.reset()
+            return False
+
+    def clear(self) -> None:
+        """Reset the index and delete its file."""
+        self.reset()
+        path = os.path.join(self.index_dir, self.INDEX_FILE)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _lists(self) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Return the rows grouped by cell and the start offset of each cell."""
+        if self._order is None:
+            order = np.argsort(self.assignments, kind='stable')
+            indexed = self.assignments >= 0
+            counts = np.bincount(self.assignments[indexed], minlength=len(self.centroids))
+
+            offsets = np.empty(len(counts) + 1, dtype=np.int64)
+            offsets[0] = len(self.assignments) - int(indexed.sum())  # Unindexed rows sort first
+            np.cumsum(counts, out=offsets[1:])
+            offsets[1:] += offsets[0]
+
+            self._order, self._offsets = order, offsets
+        return self._order, self._offsets
+
+    def _nearest(self, points: 'np.ndarray', centroids: 'np.ndarray') -> 'np.ndarray':
+        """Index of the most similar centroid for each point."""
+        labels = np.empty(len(points), dtype=np.int32)
+        batch_size = self.settings['assign_batch_size']
+        for start in range(0, len(points), batch_size):
+            labels[start:start + batch_size] = np.argmax(
+                points[start:start + batch_size] @ centroids.T, axis=1)
+        return labels
+
+
+def measure_recall(index: IVFIndex, vectors: 'np.ndarray', rows: 'np.ndarray',
+                   queries: 'np.ndarray', top_k: int = 10,
+                   nprobe_values: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Benchmark an IVF index against exact search.
+
+    Args:
+        index: Trained index
+        vectors: Embedding matrix the index was built on
+        rows: Rows that exact search should consider
+        queries: Query vectors (n x dim), L2-normalized
+        top_k: Number of neighbours compared
+        nprobe_values: nprobe settings to measure
+
+    Returns:
+        One dictionary per nprobe value with the mean recall@top_k and the mean
+        query latency of the index and of exact search, in milliseconds
+    """
+    nprobe_values = nprobe_values or [1, 2, 4, 8, 16, 32]
+    rows = np.asarray(rows)
+    limit = int(rows.max()) + 1 if len(rows) else 0
+    excluded = np.ones(limit, dtype=bool)
+    excluded[rows] = False
+
+    exact = []
+    start_time = time.perf_counter()
+    for query in queries:
+        scores = np.asarray(vectors[:limit] @ query, dtype=np.float32)
+        scores[excluded] = -np.inf
+        k = min(top_k, len(rows))
+        exact.append(set(np.argpartition(-scores, k - 1)[:k].tolist()) if k else set())
+    exact_ms = (time.perf_counter() - start_time) * 1000 / max(len(queries), 1)
+
+    report = []
+    for nprobe in nprobe_values:
+        recall = 0.0
+        start_time = time.perf_counter()
+        for query, truth in zip(queries, exact):
+            candidates, scores = index.search(query, vectors, nprobe=nprobe)
+            k = min(top_k, len(scores))
+            found = set(candidates[np.argpartition(-scores, k - 1)[:k]].tolist()) if k else set()
+            recall += len(found & truth) / max(len(truth), 1)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000 / max(len(queries), 1)
+
+        report.append({
+            'nprobe': nprobe,
+            'recall': recall / max(len(queries), 1),
+            'mean_ms': elapsed_ms,
+            'exact_mean_ms': exact_ms
+        })
+
+    return report
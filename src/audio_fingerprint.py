@@ -0,0 +1,427 @@
+"""
+Audio Fingerprint Module for Smart File Organizer.
+Finds re-encoded and trimmed copies of the same recording by matching
+spectral-peak landmarks.
+
+Each file is decoded to mono at a low sample rate (only its first
+max_duration seconds are decoded). The local maxima of its log-magnitude
+spectrogram are picked as peaks, keeping the strongest peaks_per_second in
+every second. Each peak (the anchor) is paired with the next fan_out peaks in
+a target zone after it, and each pair becomes a landmark: a 24-bit hash of
+(anchor frequency, target frequency, time difference) plus the anchor's frame
+offset. Landmarks depend on where the spectral peaks are, not on the samples,
+so they survive lossy encoding, bitrate and volume changes.
+
+Two recordings match when many of their landmark hashes occur at the same
+offset difference. The number of aligned landmarks relative to the shorter
+fingerprint is their similarity; a trimmed copy just has a different, but
+still constant, offset difference.
+
+LandmarkIndex is an inverted index from hash to (item, offset), held as
+sorted NumPy arrays and searched with binary search, so a lookup costs the
+number of matching postings rather than the number of indexed files. Only
+landmarks whose hash is divisible by index_sampling are indexed: every copy
+keeps the same landmarks, so matches survive the sampling while the index
+shrinks accordingly. Candidates from the index are verified with their full
+fingerprints, which are stored per file in the shared HashCache.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+from .hash_cache import HashCache, stat_key
+
+# Handle imports with graceful fallbacks
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import librosa
+    LIBROSA_AVAILABLE = True
+except ImportError:
+    LIBROSA_AVAILABLE = False
+
+# Landmark hash layout: anchor bin (9 bits) | target bin (9 bits) | frame delta (6 bits)
+FREQ_BITS = 9
+DT_BITS = 6
+
+
+def aligned_votes(query, hashes, keys, offsets, max_postings: Optional[int] = None) -> Dict[int, int]:
+    """
+    Count the landmarks of a query that line up with each indexed item.
+
+    For every query landmark, the postings with the same hash give an offset
+    difference per item. The best-supported difference of an item (together
+    with its neighbours, to absorb frame jitter) is its vote count.
+
+    Args:
+        query: (hashes, offsets) of the query fingerprint
+        hashes: Sorted posting hashes
+        keys: Item id of each posting
+        offsets: Frame offset of each posting
+        max_postings: Ignore hashes with more postings than this (too common to be useful)
+
+    Returns:
+        Dictionary of item id -> number of aligned landmarks
+    """
+    query_hashes, query_offsets = query
+    left = np.searchsorted(hashes, query_hashes, 'left')
+    counts = np.searchsorted(hashes, query_hashes, 'right') - left
+    if max_postings:
+        counts[counts > max_postings] = 0
+    total = int(counts.sum())
+    if not total:
+        return {}
+
+    # Expand the posting ranges into (query landmark, posting) pairs
+    ends = np.cumsum(counts)
+    positions = np.arange(total) - np.repeat(ends - counts - left, counts)
+    query_index = np.repeat(np.arange(len(query_hashes)), counts)
+
+    deltas = offsets[positions].astype(np.int64) - query_offsets[query_index].astype(np.int64)
+    codes = (keys[positions].astype(np.int64) << 32) | (deltas + (1 << 31))
+    codes, votes = np.unique(codes, return_counts=True)
+
+    # Add the votes of the neighbouring offset differences of the same item
+    smoothed = votes.copy()
+    adjacent = np.nonzero(np.diff(codes) == 1)[0]
+    smoothed[adjacent] += votes[adjacent + 1]
+    smoothed[adjacent + 1] += votes[adjacent]
+
+    item_ids = codes >> 32
+    starts = np.concatenate(([0], np.nonzero(np.diff(item_ids))[0] + 1))
+    best = np.maximum.reduceat(smoothed, starts)
+    return dict(zip(item_ids[starts].tolist(), best.tolist()))
+
+
+class LandmarkIndex:
+    """Inverted index from landmark hash to (item, offset)."""
+
+    def __init__(self, sampling: int = 1, max_postings: Optional[int] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            sampling: Only index landmarks whose hash is divisible by this
+            max_postings: Ignore hashes with more postings than this when querying
+        """
+        self.sampling = max(1, sampling)
+        self.max_postings = max_postings
+        self.items = []
+        self._pending = []
+        self._hashes = self._keys = self._offsets = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample(self, fingerprint):
+        """Restrict a fingerprint to the landmarks the index keeps."""
+        hashes, offsets = fingerprint
+        if self.sampling == 1:
+            return fingerprint
+        keep = hashes % self.sampling == 0
+        return hashes[keep], offsets[keep]
+
+    def add(self, item: Any, fingerprint) -> None:
+        """Add an item's fingerprint."""
+        hashes, offsets = self.sample(fingerprint)
+        self._pending.append((np.full(len(hashes), len(self.items), dtype=np.int64), hashes, offsets))
+        self.items.append(item)
+
+    def query(self, fingerprint) -> List[Tuple[Any, int]]:
+        """
+        Find the indexed items sharing aligned landmarks with a fingerprint.
+
+        Returns:
+            (item, aligned landmark count) pairs, most votes first
+        """
+        self._build()
+        if self._hashes is None:
+            return []
+        votes = aligned_votes(self.sample(fingerprint), self._hashes, self._keys, self._offsets,
+                              self.max_postings)
+        return sorted(((self.items[key], count) for key, count in votes.items()),
+                      key=lambda match: match[1], reverse=True)
+
+    def _build(self) -> None:
+        """Merge pending fingerprints into the sorted posting arrays."""
+        if not self._pending:
+            return
+        parts = self._pending
+        if self._hashes is not None:
+            parts = [(self._keys, self._hashes, self._offsets)] + parts
+        keys = np.concatenate([part[0] for part in parts])
+        hashes = np.concatenate([part[1] for part in parts])
+        offsets = np.concatenate([part[2] for part in parts])
+
+        order = np.argsort(hashes, kind='stable')
+        self._keys, self._hashes, self._offsets = keys[order], hashes[order], offsets[order]
+        self._pending = []
+
+
+class AudioFingerprinter:
+    """Spectral-peak landmark fingerprints with per-file caching and near-duplicate grouping."""
+
+    def __init__(self, config: Optional[Dict] = None, cache: Optional[HashCache] = None):
+        """
+        Initialize the fingerprinter with configuration.
+
+        Args:
+            config: Fingerprint settings
+            cache: Optional persistent hash cache
+        """
+        self.config = config or {}
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+        self.settings = {
+            'sample_rate': 8000,        # Decode rate (Hz); peaks above 4 kHz are ignored
+            'max_duration': 60,         # Seconds decoded from the start of each file
+            'n_fft': 1024,              # FFT size (at most 2 * 2 ** FREQ_BITS)
+            'hop_length': 256,          # Samples between frames (32 ms at 8 kHz)
+            'peak_neighborhood': (5, 10),   # Peak must be the maximum within (frames, bins)
+            'min_peak_db': -60,         # Peaks quieter than this (relative to the maximum) are ignored
+            'peaks_per_second': 8,      # Strongest peaks kept per second
+            'fan_out': 4,               # Targets paired with each anchor
+            'max_dt': 63,               # Target zone: frames after the anchor (< 2 ** DT_BITS)
+            'max_df': 96,               # Target zone: bins above or below the anchor
+            'index_sampling': 4,        # Index 1 in index_sampling landmark hashes
+            'max_postings': 5000,       # Ignore hashes more common than this in an index
+            'min_votes': 3,             # Aligned sampled landmarks that make a candidate
+            'io_workers': 2             # Files decoded concurrently
+        }
+        self.settings.update({k: v for k, v in self.config.items() if v is not None})
+
+        self.kind = 'landmarks/{sample_rate}/{max_duration}/{n_fft}/{hop_length}/{peaks_per_second}/' \
+                    '{fan_out}/{max_dt}/{max_df}'.format(**self.settings)
+
+    def decode(self, file_path: str):
+        """Decode the start of an audio file to mono float samples at the fingerprint rate."""
+        if not LIBROSA_AVAILABLE:
+            raise RuntimeError("librosa is required to decode audio files")
+        samples, _ = librosa.load(file_path, sr=self.settings['sample_rate'], mono=True,
+                                  duration=self.settings['max_duration'])
+        return samples
+
+    def fingerprint(self, file_path: str):
+        """Landmark fingerprint of an audio file: (hashes, offsets) uint32 arrays."""
+        return self.landmarks(self.decode(file_path))
+
+    def landmarks(self, samples):
+        """
+        Compute the landmark fingerprint of mono samples at the fingerprint rate.
+
+        Returns:
+            (hashes, offsets) uint32 arrays, ordered by offset
+        """
+        peak_frames, peak_bins = self._peaks(self._spectrogram(np.asarray(samples, dtype=np.float64)))
+        count = len(peak_frames)
+        if count < 2:
+            return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32)
+
+        # Candidate targets: the next few peaks after each anchor
+        fan_out = self.settings['fan_out']
+        targets = np.arange(count)[:, None] + np.arange(1, 3 * fan_out + 1)[None, :]
+        in_range = targets < count
+        targets = np.minimum(targets, count - 1)
+
+        dt = peak_frames[targets] - peak_frames[:, None]
+        df = peak_bins[targets] - peak_bins[:, None]
+        valid = in_range & (dt >= 1) & (dt <= self.settings['max_dt']) & (np.abs(df) <= self.settings['max_df'])
+        valid &= np.cumsum(valid, axis=1) <= fan_out
+
+        anchors, slots = np.nonzero(valid)
+        hashes = ((peak_bins[anchors] << (FREQ_BITS + DT_BITS))
+                  | (peak_bins[targets[anchors, slots]] << DT_BITS)
+                  | dt[anchors, slots])
+        return hashes.astype(np.uint32), peak_frames[anchors].astype(np.uint32)
+
+    def fingerprint_many(self, paths: List[str]) -> List[Optional[Tuple[Any, Any]]]:
+        """
+        Get the fingerprints of many files, using the cache where possible.
+
+        Returns:
+            Fingerprints in path order (None for undecodable files)
+        """
+        keys = {}
+        cached = {}
+        if self.cache is not None:
+            keys = {path: stat_key(path) for path in paths}
+            cached = self.cache.get_signatures(paths, self.kind, keys)
+
+        fingerprints = [self.from_bytes(cached[path]) if path in cached else None for path in paths]
+        missing = [i for i, value in enumerate(fingerprints) if value is None]
+        computed = self._fingerprint_all([paths[i] for i in missing])
+        for i, value in zip(missing, computed):
+            fingerprints[i] = value
+
+        if self.cache is not None:
+            self.cache.put_signatures(
+                [(paths[i], keys[paths[i]], self.to_bytes(fingerprints[i]))
+                 for i in missing if fingerprints[i] is not None], self.kind)
+        return fingerprints
+
+    def similarity(self, a, b) -> float:
+        """Fraction of the shorter fingerprint's landmarks that line up with the other one."""
+        shorter = min(len(a[0]), len(b[0]))
+        if not shorter:
+            return 0.0
+        order = np.argsort(b[0], kind='stable')
+        votes = aligned_votes(a, b[0][order], np.zeros(len(order), dtype=np.int64), b[1][order])
+        return min(1.0, votes.get(0, 0) / shorter)
+
+    def new_index(self) -> LandmarkIndex:
+        """Empty inverted index with the configured sampling."""
+        return LandmarkIndex(self.settings['index_sampling'], self.settings['max_postings'])
+
+    def group_similar(self, items: List[Any], threshold: float,
+                      path_of: Callable[[Any], str] = lambda item: item['file_path']) -> List[List[Any]]:
+        """
+        Group recordings whose fingerprint similarity reaches a threshold.
+
+        Each fingerprint is looked up in an inverted index of the ones before
+        it; candidates with enough aligned sampled landmarks are verified with
+        the full fingerprints. Groups are the connected components of the
+        verified pairs.
+
+        Args:
+            items: File dictionaries (or other items)
+            threshold: Minimum fraction of aligned landmarks
+            path_of: Function returning the file path of an item
+
+        Returns:
+            Groups of two or more similar items, in input order
+        """
+        fingerprints = self.fingerprint_many([path_of(item) for item in items])
+
+        parent = list(range(len(items)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        index = self.new_index()
+        for i, fingerprint in enumerate(fingerprints):
+            if fingerprint is None or not len(fingerprint[0]):
+                continue
+            for j, votes in index.query(fingerprint):
+                if votes < self.settings['min_votes']:
+                    break
+                if self.similarity(fingerprint, fingerprints[j]) >= threshold:
+                    root_i, root_j = find(i), find(j)
+                    if root_i != root_j:
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+            index.add(i, fingerprint)
+
+        groups = {}
+        for i, fingerprint in enumerate(fingerprints):
+            if fingerprint is not None:
+                groups.setdefault(find(i), []).append(items[i])
+        return [group for group in groups.values() if len(group) > 1]
+
+    def find_similar(self, file_path: str, candidates: List[Any], threshold: float,
+                     path_of: Callable[[Any], str] = lambda item: item['file_path']) -> List[Tuple[Any, float]]:
+        """
+        Find the candidates that are copies of one recording.
+
+        Args:
+            file_path: Path to the audio file to check
+            candidates: File dictionaries (or other items) to compare against
+            threshold: Minimum fraction of aligned landmarks
+            path_of: Function returning the file path of an item
+
+        Returns:
+            (candidate, similarity) pairs, most similar first
+        """
+        target, *fingerprints = self.fingerprint_many([file_path] + [path_of(item) for item in candidates])
+        if target is None or not len(target[0]):
+            return []
+
+        index = self.new_index()
+        for i, fingerprint in enumerate(fingerprints):
+            if fingerprint is not None:
+                index.add(i, fingerprint)
+
+        matches = []
+        for i, votes in index.query(target):
+            if votes < self.settings['min_votes']:
+                break
+            similarity = self.similarity(target, fingerprints[i])
+            if similarity >= threshold:
+                matches.append((candidates[i], similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    @staticmethod
+    def to_bytes(fingerprint) -> bytes:
+        """Serialize a fingerprint as little-endian (hash, offset) pairs."""
+        return np.stack(fingerprint, axis=1).astype('<u4').tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes):
+        """Deserialize a fingerprint stored with to_bytes()."""
+        pairs = np.frombuffer(data, dtype='<u4').reshape(-1, 2).astype(np.uint32)
+        return pairs[:, 0].copy(), pairs[:, 1].copy()
+
+    def _spectrogram(self, samples):
+        """Log-magnitude spectrogram in dB relative to its maximum, shaped (frames, bins)."""
+        n_fft, hop = self.settings['n_fft'], self.settings['hop_length']
+        bins = min(n_fft // 2, 2 ** FREQ_BITS)
+        if len(samples) < n_fft:
+            return np.zeros((0, bins))
+
+        frame_count = 1 + (len(samples) - n_fft) // hop
+        frames = samples[np.arange(n_fft)[None, :] + hop * np.arange(frame_count)[:, None]]
+        magnitude = np.abs(np.fft.rfft(frames * np.hanning(n_fft), axis=1))[:, :bins]
+
+        peak = magnitude.max()
+        if peak <= 0:
+            return np.full(magnitude.shape, -np.inf)
+        return 20 * np.log10(magnitude / peak + 1e-10)
+
+    def _peaks(self, spectrogram):
+        """Strongest local maxima of a spectrogram as (frames, bins) int64 arrays, ordered by frame."""
+        radius_t, radius_f = self.settings['peak_neighborhood']
+        local_max = self._max_filter(self._max_filter(spectrogram, radius_t).T, radius_f).T
+        frames, bins = np.nonzero((spectrogram == local_max) & (spectrogram > self.settings['min_peak_db']))
+        if not len(frames):
+            return frames, bins
+
+        # Keep the strongest peaks_per_second peaks in every second
+        second = (frames * self.settings['hop_length']) // self.settings['sample_rate']
+        order = np.lexsort((-spectrogram[frames, bins], second))
+        frames, bins, second = frames[order], bins[order], second[order]
+        rank = np.arange(len(second)) - np.searchsorted(second, second, 'left')
+        keep = rank < self.settings['peaks_per_second']
+
+        order = np.lexsort((bins[keep], frames[keep]))
+        return frames[keep][order].astype(np.int64), bins[keep][order].astype(np.int64)
+
+    @staticmethod
+    def _max_filter(values, radius: int):
+        """Maximum over a sliding window of 2 * radius + 1 rows."""
+        result = values.copy()
+        for shift in range(1, min(radius, len(values) - 1) + 1):
+            np.maximum(result[shift:], values[:-shift], out=result[shift:])
+            np.maximum(result[:-shift], values[shift:], out=result[:-shift])
+        return result
+
+    def _fingerprint_all(self, paths: List[str]) -> List[Optional[Tuple[Any, Any]]]:
+        """Fingerprint files on a thread pool; undecodable files give None."""
+        def safe_fingerprint(path):
+            try:
+                return self.fingerprint(path)
+            except Exception as e:
+                self.logger.warning(f"Error fingerprinting audio {path}: {e}")
+                return None
+
+        if len(paths) < 2 or self.settings['io_workers'] <= 1:
+            return [safe_fingerprint(path) for path in paths]
+
+        with ThreadPoolExecutor(max_workers=self.settings['io_workers'], thread_name_prefix='audiofp') as executor:
+            return list(executor.map(safe_fingerprint, paths))
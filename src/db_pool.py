@@ -0,0 +1,193 @@
+"""
+Database Pool Module for Smart File Organizer.
+Shared SQLite access layer: each thread keeps one open connection per
+database instead of connecting, running one statement and closing again.
+
+Every pooled connection is opened once with:
+    journal_mode=WAL      readers keep working while another connection writes
+    synchronous=NORMAL    no fsync per commit in WAL mode (still crash safe)
+    cache_size, mmap_size larger page cache and memory-mapped reads
+    temp_store=MEMORY     temporary tables and indexes kept in memory
+and a large statement cache, so the SQL of repeated calls is prepared once
+per connection and reused.
+
+Writes go through transaction(), which commits on success and rolls back on
+error. Nested transaction() blocks in the same thread join the outer one,
+so a method can call other pooled methods inside its own transaction.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Any
+
+
+class ConnectionPool:
+    """Thread-local SQLite connections to one database."""
+
+    def __init__(self, db_path: str, config: Optional[Dict] = None):
+        """
+        Initialize the pool with configuration.
+
+        Args:
+            db_path: SQLite database file
+            config: Connection settings
+        """
+        self.db_path = db_path
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+
+        self.settings = {
+            'timeout': 30,                   # Seconds to wait for a lock held by another connection
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -16384,            # Page cache per connection (negative: KiB)
+            'mmap_size': 256 * 1024 * 1024,  # Bytes of the file read through mmap
+            'temp_store': 'MEMORY',
+            'cached_statements': 256         # Prepared statements kept per connection
+        }
+        self.settings.update({k: v for k, v in self.config.items() if v is not None})
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}   # Thread -> its connection, for close()
+        self._pid = os.getpid()
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Get the calling thread's connection, opening it on first use.
+
+        Returns:
+            Open connection (do not close it; use close() on the pool)
+        """
+        if self._pid != os.getpid():
+            self._forget_connections()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                # Connections of threads that have ended are not used again
+                for thread in [t for t in self._connections if not t.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block in one transaction of the calling thread's connection.
+
+        Commits when the outermost block ends and rolls back if it raises.
+
+        Yields:
+            The thread's connection
+        """
+        conn = self.connection()
+        local = self._local
+        if local.depth:
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+
+        local.depth = 1
+        try:
+            if not conn.in_transaction:
+                conn.execute('BEGIN')
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            local.depth = 0
+
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                self.logger.debug(f"Error closing connection to {self.db_path}: {e}")
+        # Threads open a new connection on their next call
+        self._local = threading.local()
+
+    def _forget_connections(self) -> None:
+        """Drop, without closing, the connections inherited from the parent of a forked process."""
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._pid = os.getpid()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of open connections."""
+        with self._lock:
+            return {'db_path': self.db_path, 'connections': len(self._connections)}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection and apply the pragmas."""
+        conn = sqlite3.connect(self.db_path, timeout=self.settings['timeout'],
+                               cached_statements=self.settings['cached_statements'],
+                               check_same_thread=False)
+        for pragma in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store'):
+            value = self.settings[pragma]
+            if value is not None:
+                conn.execute(f'PRAGMA {pragma}={value}')
+        return conn
+
+
+_shared_pools = {}
+_shared_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """
+    Get the process-wide connection pool of a database.
+
+    Args:
+        db_path: SQLite database file
+
+    Returns:
+        ConnectionPool shared by all callers using the same file
+    """
+    key = os.path.abspath(db_path)
+    with _shared_lock:
+        pool = _shared_pools.get(key)
+        # A forked process (e.g. an index build worker) never shares the parent's connections
+        if pool is None or pool._pid != os.getpid():
+            pool = _shared_pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+def close_pool(db_path: str) -> None:
+    """
+    Close the shared pool of a database and forget it.
+
+    Call this before deleting or replacing the database file; the next
+    get_pool() for the path opens a new pool.
+
+    Args:
+        db_path: SQLite database file
+    """
+    with _shared_lock:
+        pool = _shared_pools.pop(os.path.abspath(db_path), None)
+    if pool is not None:
+        pool.close()
+
+
+def close_pools() -> None:
+    """Close every shared pool (e.g. on application exit)."""
+    with _shared_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close()
@@ -7,7 +7,6 @@ Provides AI-powered duplicate detection using embeddings and perceptual hashing.
 import os
 import logging
 from typing import Dict, List, Optional, Tuple, Any
-import hashlib
 from pathlib import Path
 import json
 from collections import defaultdict
@@ -25,25 +24,16 @@ except ImportError:
     logger.warning("Pillow not available - image processing for duplicates will be limited")
     PIL_AVAILABLE = False
 
-# Mock implementation - no external dependencies
 from .ocr_service import OCRService
-
-# Mock VectorSearch class
-class VectorSearch:
-    """Mock vector search for semantic document similarity."""
-    
-    def __init__(self, config=None):
-        self.logger = logging.getLogger(__name__)
-        self.logger.warning("Using mock VectorSearch for testing")
-        
-    def index_documents(self, documents):
-        """Mock indexing documents."""
-        return True
-        
-    def find_similar_documents(self, file_path, threshold=0.8):
-        """Mock finding similar documents."""
-        return []
-
+from .file_hashing import FileHasher
+from .hash_cache import get_hash_cache
+from .perceptual_hash import ImageHasher
+from .minhash import MinHasher, NUMPY_AVAILABLE
+from .audio_fingerprint import AudioFingerprinter, LIBROSA_AVAILABLE
+from .video_signature import VideoHasher
+from .duplicate_index import DuplicateIndex
+from .file_linking import files_identical, allocated_bytes, replace_with_hardlink, replace_with_reflink
+from .file_transfer import FileTransfer
 
 class DuplicateDetector:
     """Handles advanced duplicate detection using AI and perceptual hashing."""
@@ -53,9 +43,6 @@ class DuplicateDetector:
         self.config = config or {}
         self.logger = logging.getLogger(__name__)
 
-        # Initialize vector search for content-based similarity
-        self.vector_search = VectorSearch(self.config.get('vector_search', {}))
-
         # Initialize OCR service for image-based documents
         self.ocr_service = OCRService(self.config.get('ocr_config', {}))
 
@@ -66,11 +53,21 @@ class DuplicateDetector:
             # Threshold for image similarity (0-1)
             'image_similarity_threshold': 0.90,
             'hash_size': 16,                      # Size of perceptual hash for images
+            'image_hash_method': 'phash',         # 'phash' (DCT) or 'dhash' (gradient)
             # Minimum file size to consider (bytes)
             'min_file_size': 1024,
             # Maximum content size to analyze (10MB)
             'max_content_size': 10 * 1024 * 1024,
             'batch_size': 100,                    # Number of files to process in batch
+            # Shingle signatures for the near-duplicate text pass (see minhash.py)
+            'minhash_permutations': 128,
+            'shingle_size': 3,
+            # Fraction of aligned landmarks for re-encoded / trimmed audio (see audio_fingerprint.py)
+            'audio_similarity_threshold': 0.2,
+            'audio_fingerprint_duration': 60,     # Seconds of each recording fingerprinted
+            # Median frame-hash similarity for transcoded / resized video (see video_signature.py)
+            'video_similarity_threshold': 0.85,
+            'video_frames': 16,                   # Frames sampled per video signature
             'cache_enabled': True,                # Enable caching of analysis results
             'cache_dir': os.path.join('src', 'cache', 'duplicates')
         }
@@ -80,6 +77,59 @@ class DuplicateDetector:
         if self.settings['cache_enabled']:
             os.makedirs(self.settings['cache_dir'], exist_ok=True)
 
+        # Staged size / sample / full-content hashing for exact duplicates,
+        # with digests shared through the persistent hash cache
+        hash_cache = None
+        if self.settings['cache_enabled']:
+            hash_cache = get_hash_cache(self.config.get('hash_cache', {}).get('db_path'))
+        self.hasher = FileHasher(self.config.get('file_hashing', {}), cache=hash_cache)
+
+        # Perceptual hashes for images; image_similarity_threshold maps to a Hamming radius
+        self.image_hasher = ImageHasher({'hash_size': self.settings['hash_size'],
+                                         'method': self.settings['image_hash_method']},
+                                        cache=hash_cache)
+
+        # MinHash signatures with LSH banding for near-duplicate text
+        self.minhasher = None
+        if NUMPY_AVAILABLE:
+            self.minhasher = MinHasher({'num_perm': self.settings['minhash_permutations'],
+                                        'shingle_size': self.settings['shingle_size']},
+                                       cache=hash_cache)
+        else:
+            logger.warning("NumPy not available - near-duplicate text detection disabled")
+
+        # Spectral-peak landmark fingerprints for audio
+        self.audio_fingerprinter = None
+        if NUMPY_AVAILABLE and LIBROSA_AVAILABLE:
+            self.audio_fingerprinter = AudioFingerprinter(
+                {'max_duration': self.settings['audio_fingerprint_duration']}, cache=hash_cache)
+        else:
+            logger.warning("librosa not available - near-duplicate audio detection disabled")
+
+        # Keyframe signatures (duration + frame hashes) for video
+        self.video_hasher = None
+        if VideoHasher.available():
+            self.video_hasher = VideoHasher({'frames': self.settings['video_frames']}, cache=hash_cache)
+        else:
+            logger.warning("ffmpeg-python / OpenCV not available - near-duplicate video detection disabled")
+
+        # Renames, reflinks and in-kernel copies for moving duplicates
+        self.file_transfer = FileTransfer(self.config.get('file_transfer', {}))
+
+        # Persistent fingerprint index for ingest-time checks (check_duplicate)
+        self.index = DuplicateIndex(
+            {'db_path': self.config.get('duplicate_index', {}).get('db_path'),
+             'image_similarity_threshold': self.settings['image_similarity_threshold'],
+             'content_similarity_threshold': self.settings['content_similarity_threshold'],
+             'audio_similarity_threshold': self.settings['audio_similarity_threshold'],
+             'video_similarity_threshold': self.settings['video_similarity_threshold']},
+            hasher=self.hasher,
+            image_hasher=self.image_hasher if PIL_AVAILABLE else None,
+            minhasher=self.minhasher,
+            text_of=self._get_text,
+            audio_fingerprinter=self.audio_fingerprinter,
+            video_hasher=self.video_hasher)
+
     def find_duplicates(self, files: List[Dict[str, Any]], callback=None) -> Dict[str, Any]:
         """
         Find duplicate files using multiple detection methods.
@@ -98,6 +148,7 @@ class DuplicateDetector:
 
             # Group files by size first (quick filter)
             size_groups = self._group_by_size(files)
+            self.hasher.reset_stats()
 
             # Initialize results
             duplicate_groups = []
@@ -105,10 +156,52 @@ class DuplicateDetector:
                 'total_files': total_files,
                 'duplicate_groups': 0,
                 'total_duplicates': 0,
-                'space_savings': 0
+                'space_savings': 0,
+                'total_bytes': sum(size * len(group) for size, group in size_groups.items()),
+                'bytes_read': 0
             }
 
+            # Images, audio and video are compared perceptually across sizes, since
+            # resized or re-encoded copies rarely have the same size
+            strategies = [('images', self._is_image_type, self._find_image_duplicates)]
+            if self.audio_fingerprinter is not None:
+                strategies.append(('audio files', self._is_audio_type, self._find_audio_duplicates))
+            if self.video_hasher is not None:
+                strategies.append(('videos', self._is_video_type, self._find_video_duplicates))
+
+            # Text and PDFs likewise: edited copies differ in size, so exact hashing
+            # (which still stages by size) is followed by one LSH pass over all of them
+            strategies.append(('text files', self._is_text_type, self._find_text_duplicates))
+            strategies.append(('PDFs', lambda mime: mime.endswith('pdf'), self._find_pdf_duplicates))
+
+            file_sizes = {}
+            pooled = {label: [] for label, _, _ in strategies}
+            for size, group in list(size_groups.items()):
+                for file_info in group:
+                    file_sizes[file_info['file_path']] = size
+                type_groups = self._group_by_type(group)
+                for label, is_type, _ in strategies:
+                    members = [file_info for mime, files_of_type in type_groups.items()
+                               if is_type(mime) for file_info in files_of_type]
+                    if members:
+                        pooled[label].extend(members)
+                        member_paths = {file_info['file_path'] for file_info in members}
+                        size_groups[size] = [f for f in size_groups[size] if f['file_path'] not in member_paths]
+
             processed = 0
+            for label, _, find_similar in strategies:
+                pool = pooled[label]
+                if len(pool) > 1:
+                    if callback:
+                        callback(processed, total_files, f"Comparing {len(pool)} {label}...")
+                    for dup_group in find_similar(pool):
+                        sizes = [file_sizes[file_info['file_path']] for file_info in dup_group]
+                        duplicate_groups.append(dup_group)
+                        stats['duplicate_groups'] += 1
+                        stats['total_duplicates'] += len(dup_group) - 1
+                        stats['space_savings'] += sum(sizes) - max(sizes)
+                processed += len(pool)
+
             for size, group in size_groups.items():
                 if len(group) < 2:  # Skip unique files
                     continue
@@ -131,6 +224,8 @@ class DuplicateDetector:
 
                 processed += len(group)
 
+            stats['bytes_read'] = self.hasher.bytes_read
+
             if callback:
                 callback(total_files, total_files,
                          "Duplicate detection complete")
@@ -162,6 +257,12 @@ class DuplicateDetector:
                 if self._is_image_type(file_type):
                     # Use perceptual hashing for images
                     duplicates = self._find_image_duplicates(group)
+                elif self._is_audio_type(file_type) and self.audio_fingerprinter is not None:
+                    # Use landmark fingerprints for audio
+                    duplicates = self._find_audio_duplicates(group)
+                elif self._is_video_type(file_type) and self.video_hasher is not None:
+                    # Use keyframe signatures for video
+                    duplicates = self._find_video_duplicates(group)
                 elif self._is_text_type(file_type):
                     # Use content analysis for text files
                     duplicates = self._find_text_duplicates(group)
@@ -181,102 +282,92 @@ class DuplicateDetector:
             return []
 
     def _find_image_duplicates(self, files: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
-        """Find duplicate images using perceptual hashing (mock implementation)."""
+        """Find duplicate and near-duplicate images using perceptual hashing."""
         # Check if PIL is available
         if not PIL_AVAILABLE:
             logger.warning("Cannot perform advanced image duplicate detection - Pillow not available")
             # Fall back to simple binary comparison
             return self._find_binary_duplicates(files)
-            
-        self.logger.info("Using mock image duplicate detection")
+
         try:
-            # For mock purposes, just use a simple hash of the filename
-            hash_groups = defaultdict(list)
+            radius = self.image_hasher.radius_for(self.settings['image_similarity_threshold'])
+            return self.image_hasher.group_similar(files, radius)
 
-            for file_info in files:
-                try:
-                    # Use file size and name for mock grouping
-                    file_size = os.path.getsize(file_info['file_path'])
-                    file_name = os.path.basename(file_info['file_path'])
-                    
-                    # Simple mock hash
-                    hash_key = f"{file_size % 1000}_{len(file_name)}"
-                    hash_groups[hash_key].append(file_info)
+        except Exception as e:
+            self.logger.error(f"Error finding image duplicates: {e}")
+            return []
 
-                except Exception as e:
-                    self.logger.warning(
-                        f"Error processing image {file_info['file_path']}: {e}")
-                    continue
+    def _find_audio_duplicates(self, files: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Find identical, re-encoded and trimmed copies of recordings using landmark fingerprints."""
+        if self.audio_fingerprinter is None:
+            return self._find_binary_duplicates(files)
 
-            # Convert groups to list and filter single files
-            return [group for group in hash_groups.values() if len(group) > 1]
+        try:
+            return self.audio_fingerprinter.group_similar(files, self.settings['audio_similarity_threshold'])
 
         except Exception as e:
-            self.logger.error(f"Error finding image duplicates: {e}")
+            self.logger.error(f"Error finding audio duplicates: {e}")
+            return []
+
+    def _find_video_duplicates(self, files: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Find identical, transcoded and resized copies of videos using keyframe signatures."""
+        if self.video_hasher is None:
+            return self._find_binary_duplicates(files)
+
+        try:
+            return self.video_hasher.group_similar(files, self.settings['video_similarity_threshold'])
+
+        except Exception as e:
+            self.logger.error(f"Error finding video duplicates: {e}")
             return []
 
     def _find_text_duplicates(self, files: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
         """Find duplicate text files using content analysis."""
         try:
-            # First pass: group by content hash
-            hash_groups = defaultdict(list)
+            # First pass: exact duplicates by staged hashing
+            duplicate_groups = self.hasher.group_identical(files)
 
-            for file_info in files:
-                try:
-                    with open(file_info['file_path'], 'rb') as f:
-                        content = f.read()
-                        if len(content) > self.settings['max_content_size']:
-                            content = content[:self.settings['max_content_size']]
-                        content_hash = hashlib.md5(content).hexdigest()
-                        hash_groups[content_hash].append(file_info)
-                except Exception as e:
-                    self.logger.warning(
-                        f"Error reading file {file_info['file_path']}: {e}")
-                    continue
+            # Second pass: near-duplicates of the remaining files by shingle
+            # similarity; text is only read for files without a cached signature
+            exact_paths = {file_info['file_path'] for group in duplicate_groups for file_info in group}
+            unique_files = [f for f in files if f['file_path'] not in exact_paths]
 
-            # Second pass: analyze near-duplicates using vector similarity
-            duplicate_groups = []
+            duplicate_groups.extend(self._find_near_duplicates(unique_files))
 
-            # Process exact duplicates
-            for group in hash_groups.values():
-                if len(group) > 1:
-                    duplicate_groups.append(group)
-
-            # Process potential near-duplicates
-            unique_files = [group[0]
-                            for group in hash_groups.values() if len(group) == 1]
-            if len(unique_files) > 1:
-                # Index files for similarity search
-                self.vector_search.index_documents(unique_files)
-
-                # Find similar files
-                processed = set()
-                for file_info in unique_files:
-                    if file_info['file_path'] in processed:
-                        continue
+            return duplicate_groups
 
-                    similar = self.vector_search.find_similar_documents(
-                        file_info['file_path'],
-                        threshold=self.settings['content_similarity_threshold']
-                    )
+        except Exception as e:
+            self.logger.error(f"Error finding text duplicates: {e}")
+            return []
 
-                    if similar:
-                        group = [file_info]
-                        for match in similar:
-                            if match['file_path'] not in processed:
-                                group.append(match)
-                                processed.add(match['file_path'])
+    def _find_near_duplicates(self, files: List[Dict[str, Any]],
+                              source: str = 'text') -> List[List[Dict[str, Any]]]:
+        """
+        Group files whose estimated shingle Jaccard similarity reaches the
+        content similarity threshold.
 
-                        if len(group) > 1:
-                            duplicate_groups.append(group)
+        Candidate pairs come from MinHash LSH buckets, so files are not
+        compared pairwise.
+        """
+        if len(files) < 2 or self.minhasher is None:
+            return []
 
-                    processed.add(file_info['file_path'])
+        return self.minhasher.group_similar(
+            files, self.settings['content_similarity_threshold'], self._get_text, source=source)
 
-            return duplicate_groups
+    def _get_text(self, file_info: Dict[str, Any]) -> str:
+        """Get the (truncated) text of a file: supplied content, OCR text or the file itself."""
+        text = file_info.get('content') or file_info.get('ocr_text')
+        if text:
+            return text
 
+        try:
+            with open(file_info['file_path'], 'rb') as f:
+                content = f.read(self.settings['max_content_size'])
+            return content.decode('utf-8', errors='ignore')
         except Exception as e:
-            self.logger.error(f"Error finding text duplicates: {e}")
-            return []
+            self.logger.warning(f"Error reading file {file_info['file_path']}: {e}")
+            return ''
 
     def _find_pdf_duplicates(self, files: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
         """Find duplicate PDFs using content and OCR analysis."""
@@ -315,35 +406,8 @@ class DuplicateDetector:
                         f"OCR failed for {file_info['file_path']}: {e}")
                     continue
 
-            # Find duplicates in OCR results using vector similarity
-            if len(ocr_results) > 1:
-                self.vector_search.index_documents(ocr_results)
-
-                ocr_duplicates = []
-                processed = set()
-
-                for file_info in ocr_results:
-                    if file_info['file_path'] in processed:
-                        continue
-
-                    similar = self.vector_search.find_similar_documents(
-                        file_info['file_path'],
-                        threshold=self.settings['content_similarity_threshold']
-                    )
-
-                    if similar:
-                        group = [file_info]
-                        for match in similar:
-                            if match['file_path'] not in processed:
-                                group.append(match)
-                                processed.add(match['file_path'])
-
-                        if len(group) > 1:
-                            ocr_duplicates.append(group)
-
-                    processed.add(file_info['file_path'])
-
-                text_duplicates.extend(ocr_duplicates)
+            # Find near-duplicates in the OCR text
+            text_duplicates.extend(self._find_near_duplicates(ocr_results, source='ocr'))
 
             return text_duplicates
 
@@ -352,24 +416,9 @@ class DuplicateDetector:
             return []
 
     def _find_binary_duplicates(self, files: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
-        """Find duplicate binary files using hash comparison."""
+        """Find duplicate binary files using staged size, sample and full-content hashes."""
         try:
-            # Group files by hash
-            hash_groups = defaultdict(list)
-
-            for file_info in files:
-                try:
-                    with open(file_info['file_path'], 'rb') as f:
-                        content = f.read()
-                        content_hash = hashlib.md5(content).hexdigest()
-                        hash_groups[content_hash].append(file_info)
-                except Exception as e:
-                    self.logger.warning(
-                        f"Error reading file {file_info['file_path']}: {e}")
-                    continue
-
-            # Convert groups to list and filter single files
-            return [group for group in hash_groups.values() if len(group) > 1]
+            return self.hasher.group_identical(files)
 
         except Exception as e:
             self.logger.error(f"Error finding binary duplicates: {e}")
@@ -417,8 +466,18 @@ class DuplicateDetector:
                     '.json': 'application/json',
                     '.xml': 'application/xml',
                     '.mp3': 'audio/mpeg',
+                    '.wav': 'audio/wav',
+                    '.flac': 'audio/flac',
+                    '.ogg': 'audio/ogg',
+                    '.m4a': 'audio/mp4',
+                    '.aac': 'audio/aac',
                     '.mp4': 'video/mp4',
                     '.avi': 'video/x-msvideo',
+                    '.mov': 'video/quicktime',
+                    '.mkv': 'video/x-matroska',
+                    '.webm': 'video/webm',
+                    '.wmv': 'video/x-ms-wmv',
+                    '.flv': 'video/x-flv',
                     '.py': 'application/x-python'
                 }
                 
@@ -434,6 +493,14 @@ class DuplicateDetector:
         """Check if MIME type is an image type."""
         return mime_type.startswith('image/')
 
+    def _is_audio_type(self, mime_type: str) -> bool:
+        """Check if MIME type is an audio type."""
+        return mime_type.startswith('audio/')
+
+    def _is_video_type(self, mime_type: str) -> bool:
+        """Check if MIME type is a video type."""
+        return mime_type.startswith('video/')
+
     def _is_text_type(self, mime_type: str) -> bool:
         """Check if MIME type is a text type."""
         return mime_type.startswith('text/') or mime_type in [
@@ -444,13 +511,44 @@ class DuplicateDetector:
             'application/x-yaml'
         ]
 
-    def check_duplicates(self, file_path: str, existing_files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def check_duplicate(self, file_path: str, target_dir: Optional[str] = None,
+                        include_similar: bool = False) -> Dict[str, Any]:
+        """
+        Check a file against the duplicate index, e.g. before organizing it.
+
+        Only the file itself is read; indexed files are matched by their
+        stored fingerprints. Keep the index current with self.index.add()
+        and self.index.remove() as files are placed or moved.
+
+        Args:
+            file_path: Path to the file to check
+            target_dir: Only report duplicates below this directory
+            include_similar: Also report perceptual / near-duplicate matches
+
+        Returns:
+            check_duplicates() result plus 'duplicate_path', the best match
+        """
+        try:
+            result = self.index.lookup(file_path, include_similar=include_similar, within=target_dir)
+        except Exception as e:
+            self.logger.error(f"Error checking duplicate index: {e}")
+            result = {'is_duplicate': False, 'duplicate_files': [], 'similarity_score': 0.0,
+                      'duplicate_type': 'none', 'error': str(e)}
+
+        result['duplicate_path'] = result['duplicate_files'][0]['file_path'] if result['duplicate_files'] else None
+        return result
+
+    def check_duplicates(self, file_path: str,
+                         existing_files: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Check if a file is a duplicate of any of the existing files.
 
+        Without existing_files the file is looked up in the persistent
+        duplicate index instead of comparing it with a list of files.
+
         Args:
             file_path: Path to the file to check
-            existing_files: List of existing file dictionaries
+            existing_files: List of existing file dictionaries (None to use the index)
 
         Returns:
             Dictionary with duplicate information:
@@ -471,6 +569,9 @@ class DuplicateDetector:
                     'error': 'File not found'
                 }
 
+            if existing_files is None:
+                return self.index.lookup(file_path)
+
             # Get file size and MIME type
             file_size = os.path.getsize(file_path)
             file_ext = os.path.splitext(file_path)[1].lower()
@@ -493,8 +594,18 @@ class DuplicateDetector:
                 '.json': 'application/json',
                 '.xml': 'application/xml',
                 '.mp3': 'audio/mpeg',
+                '.wav': 'audio/wav',
+                '.flac': 'audio/flac',
+                '.ogg': 'audio/ogg',
+                '.m4a': 'audio/mp4',
+                '.aac': 'audio/aac',
                 '.mp4': 'video/mp4',
                 '.avi': 'video/x-msvideo',
+                '.mov': 'video/quicktime',
+                '.mkv': 'video/x-matroska',
+                '.webm': 'video/webm',
+                '.wmv': 'video/x-ms-wmv',
+                '.flv': 'video/x-flv',
                 '.py': 'application/x-python'
             }
             file_type = mime_mapping.get(file_ext, 'application/octet-stream')
@@ -502,14 +613,6 @@ class DuplicateDetector:
             # Filter existing files by size first (quick filter)
             size_matches = [f for f in existing_files if os.path.getsize(f['file_path']) == file_size]
             
-            if not size_matches:
-                return {
-                    'is_duplicate': False,
-                    'duplicate_files': [],
-                    'similarity_score': 0.0,
-                    'duplicate_type': 'none'
-                }
-            
             # Create file info object for the target file
             file_info = {
                 'file_path': file_path,
@@ -518,27 +621,9 @@ class DuplicateDetector:
                 'file_type': file_type
             }
             
-            # Check for exact duplicates using hash
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                if len(content) > self.settings['max_content_size']:
-                    content = content[:self.settings['max_content_size']]
-                content_hash = hashlib.md5(content).hexdigest()
-            
-            exact_duplicates = []
-            for match in size_matches:
-                try:
-                    with open(match['file_path'], 'rb') as f:
-                        match_content = f.read()
-                        if len(match_content) > self.settings['max_content_size']:
-                            match_content = match_content[:self.settings['max_content_size']]
-                        match_hash = hashlib.md5(match_content).hexdigest()
-                        
-                        if match_hash == content_hash:
-                            exact_duplicates.append(match)
-                except Exception as e:
-                    self.logger.warning(f"Error reading file {match['file_path']}: {e}")
-                    continue
+            # Check for exact duplicates (sample hashes first, full hashes
+            # only for files whose samples match)
+            exact_duplicates = self.hasher.find_matches(file_path, size_matches) if size_matches else []
             
             if exact_duplicates:
                 return {
@@ -549,35 +634,48 @@ class DuplicateDetector:
                 }
             
             # If no exact duplicates, check for similar content
-            # This is a mock implementation for testing
             similar_duplicates = []
             similarity_score = 0.0
             
-            # Mock similarity check based on file type
             if self._is_image_type(file_type):
-                # Mock implementation for images
-                self.logger.info("Using mock image similarity detection")
-                for match in size_matches:
-                    if match['file_type'].startswith('image/'):
-                        # Simple mock calculation
-                        name_similarity = len(set(file_info['file_name']) & set(match['file_name'])) / \
-                                         max(len(file_info['file_name']), len(match['file_name']))
-                        if name_similarity > self.settings['image_similarity_threshold']:
-                            similar_duplicates.append(match)
-                            similarity_score = max(similarity_score, name_similarity)
+                if PIL_AVAILABLE:
+                    # Perceptual hash distance to every existing image, whatever its size
+                    images = [f for f in existing_files
+                              if (mimetypes.guess_type(f['file_path'])[0] or '').startswith('image/')]
+                    radius = self.image_hasher.radius_for(self.settings['image_similarity_threshold'])
+                    for match, distance in self.image_hasher.find_similar(file_path, images, radius):
+                        similar_duplicates.append(match)
+                        similarity_score = max(similarity_score, self.image_hasher.similarity(distance))
+            
+            elif self._is_text_type(file_type) and self.minhasher is not None:
+                # Shingle similarity to every existing text file, through LSH buckets
+                texts = [f for mime, group in self._group_by_type(existing_files).items()
+                         if self._is_text_type(mime) for f in group]
+                matches = self.minhasher.find_similar(
+                    file_info, texts, self.settings['content_similarity_threshold'], self._get_text)
+                for match, similarity in matches:
+                    similar_duplicates.append(match)
+                    similarity_score = max(similarity_score, similarity)
             
-            elif self._is_text_type(file_type):
-                # Mock implementation for text files
-                self.logger.info("Using mock text similarity detection")
-                # For testing, just use a simple hash of the filename
-                for match in size_matches:
-                    if self._is_text_type(match['file_type']):
-                        # Simple mock calculation
-                        name_similarity = len(set(file_info['file_name']) & set(match['file_name'])) / \
-                                         max(len(file_info['file_name']), len(match['file_name']))
-                        if name_similarity > self.settings['content_similarity_threshold']:
-                            similar_duplicates.append(match)
-                            similarity_score = max(similarity_score, name_similarity)
+            elif self._is_audio_type(file_type) and self.audio_fingerprinter is not None:
+                # Aligned landmarks with every existing recording, through an inverted index
+                recordings = [f for mime, group in self._group_by_type(existing_files).items()
+                              if self._is_audio_type(mime) for f in group]
+                matches = self.audio_fingerprinter.find_similar(
+                    file_path, recordings, self.settings['audio_similarity_threshold'])
+                for match, similarity in matches:
+                    similar_duplicates.append(match)
+                    similarity_score = max(similarity_score, similarity)
+            
+            elif self._is_video_type(file_type) and self.video_hasher is not None:
+                # Keyframe signatures of the existing videos with about the same duration
+                videos = [f for mime, group in self._group_by_type(existing_files).items()
+                          if self._is_video_type(mime) for f in group]
+                matches = self.video_hasher.find_similar(
+                    file_path, videos, self.settings['video_similarity_threshold'])
+                for match, similarity in matches:
+                    similar_duplicates.append(match)
+                    similarity_score = max(similarity_score, similarity)
             
             if similar_duplicates:
                 return {
@@ -607,18 +705,25 @@ class DuplicateDetector:
     def handle_duplicates(self, duplicate_groups: List[List[Dict[str, Any]]], 
                          action: str = 'report', 
                          target_dir: Optional[str] = None,
-                         keep_strategy: str = 'newest') -> Dict[str, Any]:
+                         keep_strategy: str = 'newest',
+                         dry_run: bool = False) -> Dict[str, Any]:
         """
         Handle duplicate files according to the specified action.
 
+        The 'hardlink' and 'reflink' actions replace each duplicate in place
+        with a hardlink to, or a copy-on-write clone of, the kept file. Every
+        replacement is verified byte for byte first and swapped in atomically
+        (see file_linking.py); duplicates that differ are skipped.
+
         Args:
             duplicate_groups: List of duplicate file groups
-            action: Action to take ('report', 'move', 'delete')
+            action: Action to take ('report', 'move', 'delete', 'hardlink', 'reflink')
             target_dir: Target directory for moving duplicates (required for 'move' action)
             keep_strategy: Strategy for keeping files ('newest', 'oldest', 'largest', 'smallest')
+            dry_run: Only report what would be done and the bytes it would reclaim
 
         Returns:
-            Dictionary with handling results
+            Dictionary with handling results, including 'bytes_reclaimed'
         """
         try:
             if not duplicate_groups:
@@ -626,8 +731,18 @@ class DuplicateDetector:
                     'success': True,
                     'action': action,
                     'files_affected': 0,
+                    'bytes_reclaimed': 0,
+                    'dry_run': dry_run,
                     'message': 'No duplicates to handle'
                 }
+
+            if action not in ('report', 'move', 'delete', 'hardlink', 'reflink'):
+                return {
+                    'success': False,
+                    'action': action,
+                    'files_affected': 0,
+                    'error': f'Unknown action: {action}'
+                }
             
             if action == 'move' and (not target_dir or not os.path.isdir(target_dir)):
                 return {
@@ -638,45 +753,78 @@ class DuplicateDetector:
                 }
             
             files_affected = 0
+            bytes_reclaimed = 0
             results = []
+            sort_keys = {
+                'newest': (lambda st: st.st_mtime, True),
+                'oldest': (lambda st: st.st_mtime, False),
+                'largest': (lambda st: st.st_size, True),
+                'smallest': (lambda st: st.st_size, False)
+            }
             
             for group in duplicate_groups:
                 if len(group) <= 1:
                     continue
+
+                # Stat each file once per group
+                stats = {}
+                for file_info in group:
+                    try:
+                        stats[file_info['file_path']] = os.stat(file_info['file_path'])
+                    except OSError as e:
+                        results.append({'file': file_info['file_path'], 'action': 'error', 'error': str(e)})
+                members = [f for f in group if f['file_path'] in stats]
+                if len(members) <= 1:
+                    continue
                 
                 # Determine which file to keep based on strategy
-                if keep_strategy == 'newest':
-                    group.sort(key=lambda x: os.path.getmtime(x['file_path']), reverse=True)
-                elif keep_strategy == 'oldest':
-                    group.sort(key=lambda x: os.path.getmtime(x['file_path']))
-                elif keep_strategy == 'largest':
-                    group.sort(key=lambda x: os.path.getsize(x['file_path']), reverse=True)
-                elif keep_strategy == 'smallest':
-                    group.sort(key=lambda x: os.path.getsize(x['file_path']))
+                if keep_strategy in sort_keys:
+                    key, reverse = sort_keys[keep_strategy]
+                    members.sort(key=lambda f: key(stats[f['file_path']]), reverse=reverse)
                 
                 # Keep the first file, process the rest
-                keep_file = group[0]
-                duplicates = group[1:]
+                keep_file = members[0]
+                keep_stat = stats[keep_file['file_path']]
+                duplicates = members[1:]
+
+                # An inode's blocks are only freed when all of its names are replaced
+                names_replaced = defaultdict(int)
+                for dup in duplicates:
+                    st = stats[dup['file_path']]
+                    names_replaced[(st.st_dev, st.st_ino)] += 1
+                freed_inodes = set()
                 
                 for dup in duplicates:
+                    dup_path = dup['file_path']
+                    st = stats[dup_path]
+                    inode = (st.st_dev, st.st_ino)
+                    entry = {'file': dup_path, 'keep_file': keep_file['file_path']}
+
+                    if action in ('hardlink', 'reflink') and inode == (keep_stat.st_dev, keep_stat.st_ino):
+                        results.append({**entry, 'action': 'already_linked', 'bytes': 0})
+                        continue
+
+                    reclaim = 0
+                    if action in ('delete', 'hardlink', 'reflink') and inode not in freed_inodes \
+                            and inode != (keep_stat.st_dev, keep_stat.st_ino) \
+                            and names_replaced[inode] >= st.st_nlink:
+                        reclaim = allocated_bytes(st)
+
                     try:
-                        if action == 'report':
+                        if dry_run:
+                            if action in ('hardlink', 'reflink') and \
+                                    not files_identical(keep_file['file_path'], dup_path):
+                                results.append({**entry, 'action': 'skipped', 'reason': 'content differs'})
+                                continue
+                            results.append({**entry, 'action': f'would_{action}', 'bytes': reclaim})
+
+                        elif action == 'report':
                             # Just report the duplicate
-                            results.append({
-                                'file': dup['file_path'],
-                                'keep_file': keep_file['file_path'],
-                                'action': 'reported'
-                            })
+                            results.append({**entry, 'action': 'reported'})
                         
                         elif action == 'move':
                             # Move the duplicate to target directory
-                            filename = os.path.basename(dup['file_path'])
-                            
-                            # Ensure target directory is not None
-                            if target_dir is None:
-                                self.logger.error("Target directory is required for 'move' action")
-                                continue
-                                
+                            filename = os.path.basename(dup_path)
                             target_path = os.path.join(str(target_dir), filename)
                             
                             # Handle filename conflicts
@@ -684,40 +832,40 @@ class DuplicateDetector:
                                 base, ext = os.path.splitext(filename)
                                 target_path = os.path.join(str(target_dir), f"{base}_dup_{files_affected}{ext}")
                             
-                            import shutil
-                            shutil.move(dup['file_path'], target_path)
-                            
-                            results.append({
-                                'file': dup['file_path'],
-                                'keep_file': keep_file['file_path'],
-                                'action': 'moved',
-                                'target_path': target_path
-                            })
+                            self.file_transfer.move(dup_path, target_path)
+                            results.append({**entry, 'action': 'moved', 'target_path': target_path})
                         
                         elif action == 'delete':
                             # Delete the duplicate
-                            os.remove(dup['file_path'])
-                            
-                            results.append({
-                                'file': dup['file_path'],
-                                'keep_file': keep_file['file_path'],
-                                'action': 'deleted'
-                            })
+                            os.remove(dup_path)
+                            results.append({**entry, 'action': 'deleted', 'bytes': reclaim})
+
+                        elif action == 'hardlink':
+                            replace_with_hardlink(keep_file['file_path'], dup_path)
+                            results.append({**entry, 'action': 'hardlinked', 'bytes': reclaim})
+
+                        elif action == 'reflink':
+                            replace_with_reflink(keep_file['file_path'], dup_path)
+                            results.append({**entry, 'action': 'reflinked', 'bytes': reclaim})
                         
                         files_affected += 1
+                        if reclaim:
+                            freed_inodes.add(inode)
+                            bytes_reclaimed += reclaim
                         
+                    except ValueError as e:
+                        # Verification failed: the files differ or the duplicate changed
+                        results.append({**entry, 'action': 'skipped', 'reason': str(e)})
+
                     except Exception as e:
-                        results.append({
-                            'file': dup['file_path'],
-                            'keep_file': keep_file['file_path'],
-                            'action': 'error',
-                            'error': str(e)
-                        })
+                        results.append({**entry, 'action': 'error', 'error': str(e)})
             
             return {
                 'success': True,
                 'action': action,
                 'files_affected': files_affected,
+                'bytes_reclaimed': bytes_reclaimed,
+                'dry_run': dry_run,
                 'results': results
             }
         
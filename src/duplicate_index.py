@@ -0,0 +1,636 @@
+"""
+Duplicate Index Module for Smart File Organizer.
+Persistent index of file fingerprints for constant-time duplicate checks at
+ingest time.
+
+For every indexed file the index stores:
+    size + quick hash   exact-duplicate candidates (indexed by size, quick hash)
+    full hash           computed lazily, the first time a candidate needs it
+    image hash          perceptual hash of images (see perceptual_hash.py)
+    text signature      MinHash signature of text files (see minhash.py), with
+                        its LSH band buckets in a separate indexed table
+    audio landmarks     sampled landmark hashes of audio files (see
+                        audio_fingerprint.py) in an inverted hash -> path table
+    video signature     duration and frame hashes of videos (see
+                        video_signature.py), indexed by duration
+
+A lookup reads only the new file: its size selects the exact candidates, a
+sample hash and (if needed) a full hash confirm them, its perceptual hash is
+searched in a BK-tree loaded from the index, and its MinHash bands select the
+near-duplicate text candidates. Audio landmark hashes select the indexed
+recordings with aligned landmarks, which are verified with their full
+fingerprints from the hash cache. Videos are compared with the stored
+signatures of the indexed videos of about the same duration. Indexed files are only read when a candidate
+first needs its full hash; a stat of each matched file checks that its entry
+is still current.
+
+The index records the hashing schemes it was built with and starts over when
+they change.
+"""
+
+import os
+import json
+import sqlite3
+import mimetypes
+import logging
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+from .file_hashing import FileHasher
+from .hash_cache import stat_key
+from .perceptual_hash import ImageHasher, BKTree, hamming_distance
+from .minhash import MinHasher, MinHashLSH
+from .audio_fingerprint import AudioFingerprinter, LandmarkIndex
+from .video_signature import VideoHasher
+
+# Handle imports with graceful fallbacks
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Text types that get MinHash signatures, besides text/*
+TEXT_MIME_TYPES = {'application/json', 'application/xml', 'application/javascript',
+                   'application/x-python', 'application/x-yaml'}
+
+# SQLite host parameters per IN (...) query
+QUERY_CHUNK_SIZE = 500
+
+# Per-path fingerprint tables besides indexed_files
+FINGERPRINT_TABLES = ('lsh_buckets', 'audio_landmarks', 'video_signatures')
+
+
+class DuplicateIndex:
+    """SQLite-backed index of file fingerprints with add/remove maintenance."""
+
+    def __init__(self, config: Optional[Dict] = None,
+                 hasher: Optional[FileHasher] = None,
+                 image_hasher: Optional[ImageHasher] = None,
+                 minhasher: Optional[MinHasher] = None,
+                 text_of: Optional[Callable[[Dict[str, Any]], str]] = None,
+                 audio_fingerprinter: Optional[AudioFingerprinter] = None,
+                 video_hasher: Optional[VideoHasher] = None):
+        """
+        Initialize the index.
+
+        Args:
+            config: Index settings (db_path, similarity thresholds)
+            hasher: Exact-content hasher
+            image_hasher: Perceptual image hasher (None disables image matching)
+            minhasher: MinHash signer (None disables text matching)
+            text_of: Function returning the text of a file dictionary
+            audio_fingerprinter: Landmark fingerprinter (None disables audio matching)
+            video_hasher: Video signer (None disables video matching)
+        """
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+
+        self.settings = {
+            'db_path': None,
+            'image_similarity_threshold': 0.90,
+            'content_similarity_threshold': 0.85,
+            'audio_similarity_threshold': 0.2,
+            'video_similarity_threshold': 0.85
+        }
+        self.settings.update({k: v for k, v in self.config.items() if v is not None})
+
+        if not self.settings['db_path']:
+            if os.name == 'nt':  # Windows
+                db_dir = os.path.join(os.path.expanduser("~"), "AppData", "Local", "AIDocumentOrganizer")
+            else:  # macOS/Linux
+                db_dir = os.path.join(os.path.expanduser("~"), ".config", "AIDocumentOrganizer")
+            self.settings['db_path'] = os.path.join(db_dir, "duplicate_index.db")
+        self.db_path = self.settings['db_path']
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self.hasher = hasher or FileHasher()
+        self.image_hasher = image_hasher
+        self.minhasher = minhasher
+        self.text_of = text_of or self._read_text
+        self.audio_fingerprinter = audio_fingerprinter
+        self.video_hasher = video_hasher
+
+        self.lsh = None
+        if self.minhasher is not None:
+            self.lsh = MinHashLSH(self.settings['content_similarity_threshold'], self.minhasher.num_perm)
+
+        self._image_tree = None   # Loaded on the first image lookup
+        self._initialize_database()
+
+    def _initialize_database(self) -> None:
+        """Create the index tables, clearing them if the hashing schemes changed."""
+        schemes = json.dumps({
+            'exact': self.hasher.scheme,
+            'image': self.image_hasher.kind if self.image_hasher else None,
+            'text': self.minhasher.kind if self.minhasher else None,
+            'bands': [self.lsh.bands, self.lsh.rows] if self.lsh else None,
+            'audio': [self.audio_fingerprinter.kind, self.audio_fingerprinter.settings['index_sampling']]
+                     if self.audio_fingerprinter else None,
+            'video': self.video_hasher.kind if self.video_hasher else None
+        }, sort_keys=True)
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS indexed_files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    quick_hash TEXT,
+                    full_hash TEXT,
+                    image_hash TEXT,
+                    text_signature BLOB
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_indexed_files_size ON indexed_files (size, quick_hash)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS lsh_buckets (
+                    band INTEGER,
+                    bucket BLOB,
+                    path TEXT,
+                    PRIMARY KEY (band, bucket, path)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_lsh_buckets_path ON lsh_buckets (path)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS audio_landmarks (
+                    hash INTEGER,
+                    path TEXT,
+                    offset INTEGER
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_audio_landmarks_hash ON audio_landmarks (hash)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_audio_landmarks_path ON audio_landmarks (path)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS video_signatures (
+                    path TEXT PRIMARY KEY,
+                    duration REAL,
+                    signature BLOB
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_video_signatures_duration ON video_signatures (duration)')
+            conn.execute('CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT)')
+
+            row = conn.execute("SELECT value FROM index_meta WHERE key = 'schemes'").fetchone()
+            if row and row[0] != schemes:
+                self.logger.info("Duplicate index hashing settings changed - rebuilding index")
+                for table in ('indexed_files',) + FINGERPRINT_TABLES:
+                    conn.execute(f'DELETE FROM {table}')
+            conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('schemes', ?)", (schemes,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def add(self, file_info: Any) -> bool:
+        """
+        Add or refresh one file.
+
+        Args:
+            file_info: File dictionary or path
+
+        Returns:
+            True if the file was indexed
+        """
+        return self.add_many([file_info]) == 1
+
+    def add_many(self, files: List[Any]) -> int:
+        """
+        Add or refresh many files; files whose entry is current are skipped.
+
+        Args:
+            files: File dictionaries or paths
+
+        Returns:
+            Number of files indexed or refreshed
+        """
+        files = [{'file_path': f} if isinstance(f, str) else f for f in files]
+        keys = {f['file_path']: stat_key(f['file_path']) for f in files}
+        files = [f for f in files if keys[f['file_path']] is not None]
+        if not files:
+            return 0
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            current = {}
+            paths = [f['file_path'] for f in files]
+            for start in range(0, len(paths), QUERY_CHUNK_SIZE):
+                chunk = paths[start:start + QUERY_CHUNK_SIZE]
+                rows = conn.execute(
+                    f"SELECT path, size, mtime_ns FROM indexed_files WHERE path IN ({', '.join('?' * len(chunk))})",
+                    chunk).fetchall()
+                current.update({path: (size, mtime_ns) for path, size, mtime_ns in rows})
+
+            stale = [f for f in files if current.get(f['file_path']) != keys[f['file_path']][2:]]
+            if not stale:
+                return 0
+
+            paths = [f['file_path'] for f in stale]
+            quick_hashes = self.hasher.sample_hashes(paths)
+
+            images = [f for f in stale if self.image_hasher and self._is_image(f['file_path'])]
+            image_hashes = dict(zip([f['file_path'] for f in images],
+                                    self.image_hasher.hash_many([f['file_path'] for f in images])
+                                    if images else []))
+
+            texts = [f for f in stale if self.minhasher and self._is_text(f['file_path'])]
+            signatures = dict(zip([f['file_path'] for f in texts],
+                                  self.minhasher.signatures(texts, self.text_of) if texts else []))
+
+            audio = [f['file_path'] for f in stale if self.audio_fingerprinter and self._is_audio(f['file_path'])]
+            fingerprints = dict(zip(audio, self.audio_fingerprinter.fingerprint_many(audio) if audio else []))
+
+            videos = [f['file_path'] for f in stale if self.video_hasher and self._is_video(f['file_path'])]
+            video_signatures = dict(zip(videos, self.video_hasher.signatures(videos) if videos else []))
+
+            self._delete_fingerprints(conn, paths)
+            rows = []
+            buckets = []
+            landmarks = []
+            video_rows = []
+            for path, quick in zip(paths, quick_hashes):
+                if quick is None:
+                    continue
+                image_hash = image_hashes.get(path)
+                signature = signatures.get(path)
+                rows.append((path, keys[path][2], keys[path][3], quick,
+                             format(image_hash, 'x') if image_hash is not None else None,
+                             signature.tobytes() if signature is not None else None))
+                if signature is not None:
+                    buckets.extend((band, bucket, path)
+                                   for band, bucket in enumerate(self.lsh.band_keys(signature)))
+                if fingerprints.get(path) is not None:
+                    hashes, offsets = self._landmark_index().sample(fingerprints[path])
+                    landmarks.extend(zip(hashes.tolist(), [path] * len(hashes), offsets.tolist()))
+                if video_signatures.get(path) is not None:
+                    video_rows.append((path, video_signatures[path][0],
+                                       self.video_hasher.to_bytes(video_signatures[path])))
+
+            conn.executemany('''
+                INSERT OR REPLACE INTO indexed_files
+                    (path, size, mtime_ns, quick_hash, full_hash, image_hash, text_signature)
+                VALUES (?, ?, ?, ?, NULL, ?, ?)
+            ''', rows)
+            conn.executemany('INSERT OR IGNORE INTO lsh_buckets (band, bucket, path) VALUES (?, ?, ?)', buckets)
+            conn.executemany('INSERT INTO audio_landmarks (hash, path, offset) VALUES (?, ?, ?)', landmarks)
+            conn.executemany('INSERT INTO video_signatures (path, duration, signature) VALUES (?, ?, ?)',
+                             video_rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+        if self._image_tree is not None:
+            for row in rows:
+                if row[4] is not None:
+                    self._image_tree.add(int(row[4], 16), row[0])
+        return len(rows)
+
+    def add_directory(self, directory: str) -> int:
+        """
+        Index every file below a directory.
+
+        Returns:
+            Number of files indexed or refreshed
+        """
+        paths = [os.path.join(root, name)
+                 for root, _, names in os.walk(directory) for name in names]
+        return self.add_many(paths)
+
+    def remove(self, paths: List[str]) -> int:
+        """
+        Remove files from the index.
+
+        Returns:
+            Number of entries removed
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            cursor = conn.executemany('DELETE FROM indexed_files WHERE path = ?', [(p,) for p in paths])
+            removed = cursor.rowcount
+            self._delete_fingerprints(conn, paths)
+            conn.commit()
+        finally:
+            conn.close()
+        # Removed images stay in the BK-tree; lookups check matches against the table
+        return removed
+
+    def relocate(self, moves: List[Tuple[str, str]], copy: bool = False) -> int:
+        """
+        Carry index entries over to files that were moved or copied.
+
+        The new paths get the stored fingerprints of their sources, so
+        placed files are not read again. Sources without an entry (or whose
+        entry does not match the new file's size) are indexed from scratch.
+
+        Args:
+            moves: (old path, new path) pairs
+            copy: Keep the entries of the old paths (the files were copied)
+
+        Returns:
+            Number of entries carried over or indexed
+        """
+        keys = {new: stat_key(new) for _, new in moves}
+        moves = [(old, new) for old, new in moves if keys[new] is not None]
+        if not moves:
+            return 0
+
+        moved = []
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            sizes = {}
+            olds = [old for old, _ in moves]
+            for start in range(0, len(olds), QUERY_CHUNK_SIZE):
+                chunk = olds[start:start + QUERY_CHUNK_SIZE]
+                sizes.update(conn.execute(
+                    f"SELECT path, size FROM indexed_files WHERE path IN ({', '.join('?' * len(chunk))})",
+                    chunk).fetchall())
+            moved = [(old, new) for old, new in moves if old != new and sizes.get(old) == keys[new][2]]
+
+            news = [new for _, new in moved]
+            conn.executemany('DELETE FROM indexed_files WHERE path = ?', [(new,) for new in news])
+            self._delete_fingerprints(conn, news)
+            for old, new in moved:
+                conn.execute('''
+                    INSERT INTO indexed_files
+                        (path, size, mtime_ns, quick_hash, full_hash, image_hash, text_signature)
+                    SELECT ?, ?, ?, quick_hash, full_hash, image_hash, text_signature
+                    FROM indexed_files WHERE path = ?
+                ''', (new, keys[new][2], keys[new][3], old))
+                conn.execute('INSERT INTO lsh_buckets (band, bucket, path) '
+                             'SELECT band, bucket, ? FROM lsh_buckets WHERE path = ?', (new, old))
+                conn.execute('INSERT INTO audio_landmarks (hash, path, offset) '
+                             'SELECT hash, ?, offset FROM audio_landmarks WHERE path = ?', (new, old))
+                conn.execute('INSERT INTO video_signatures (path, duration, signature) '
+                             'SELECT ?, duration, signature FROM video_signatures WHERE path = ?', (new, old))
+            if not copy:
+                olds = [old for old, _ in moved]
+                conn.executemany('DELETE FROM indexed_files WHERE path = ?', [(old,) for old in olds])
+                self._delete_fingerprints(conn, olds)
+            conn.commit()
+        finally:
+            conn.close()
+
+        # Paths changed under the BK-tree; reload it on the next image lookup
+        self._image_tree = None
+
+        carried = {new for _, new in moved}
+        return len(moved) + self.add_many([new for _, new in moves if new not in carried])
+
+    def lookup(self, file_path: str, include_similar: bool = True,
+               within: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Find indexed duplicates of a file.
+
+        Args:
+            file_path: Path to the file to check (it does not need to be indexed)
+            include_similar: Also look for perceptual, MinHash, audio and video near-duplicates
+            within: Only report indexed files below this directory
+
+        Returns:
+            Dictionary with 'is_duplicate', 'duplicate_files' (file dictionaries
+            with 'file_path' and 'similarity'), 'similarity_score' and
+            'duplicate_type' ('exact', 'similar' or 'none')
+        """
+        prefix = os.path.join(os.path.abspath(within), '') if within else None
+
+        def accept(path):
+            return path != file_path and (prefix is None or os.path.abspath(path).startswith(prefix))
+
+        key = stat_key(file_path)
+        if key is None:
+            return self._result([], 'none')
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            exact = self._exact_matches(conn, file_path, key[2], accept)
+            if exact:
+                return self._result([(path, 1.0) for path in exact], 'exact')
+
+            similar = []
+            if include_similar and self.image_hasher and self._is_image(file_path):
+                similar = self._image_matches(conn, file_path, accept)
+            elif include_similar and self.minhasher and self._is_text(file_path):
+                similar = self._text_matches(conn, file_path, accept)
+            elif include_similar and self.audio_fingerprinter and self._is_audio(file_path):
+                similar = self._audio_matches(conn, file_path, accept)
+            elif include_similar and self.video_hasher and self._is_video(file_path):
+                similar = self._video_matches(conn, file_path, accept)
+            return self._result(similar, 'similar' if similar else 'none')
+        finally:
+            conn.close()
+
+    def count(self) -> int:
+        """Number of indexed files."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute('SELECT COUNT(*) FROM indexed_files').fetchone()[0]
+        finally:
+            conn.close()
+
+    def clear(self) -> bool:
+        """Remove all entries."""
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                for table in ('indexed_files',) + FINGERPRINT_TABLES:
+                    conn.execute(f'DELETE FROM {table}')
+                conn.commit()
+            finally:
+                conn.close()
+            self._image_tree = None
+            return True
+        except Exception as e:
+            self.logger.error(f"Error clearing duplicate index: {e}")
+            return False
+
+    def _exact_matches(self, conn, file_path: str, size: int, accept: Callable[[str], bool]) -> List[str]:
+        """Indexed files with the same content, confirmed by sample and full hashes."""
+        rows = [row for row in conn.execute(
+            'SELECT path, mtime_ns, quick_hash, full_hash FROM indexed_files WHERE size = ?', (size,))
+            if accept(row[0])]
+        if not rows:
+            return []
+
+        quick = self.hasher.sample_hashes([file_path])[0]
+        rows = [row for row in rows if row[2] == quick and self._current(conn, row[0], size, row[1])]
+        if not rows or size <= 2 * self.hasher.sample_size:
+            return [row[0] for row in rows]
+
+        target = self.hasher.content_hash(file_path)
+        missing = [row[0] for row in rows if row[3] is None]
+        computed = dict(zip(missing, self.hasher.full_hashes(missing)))
+        conn.executemany('UPDATE indexed_files SET full_hash = ? WHERE path = ?',
+                         [(digest, path) for path, digest in computed.items() if digest])
+        conn.commit()
+        return [row[0] for row in rows if (row[3] or computed.get(row[0])) == target]
+
+    def _image_matches(self, conn, file_path: str, accept: Callable[[str], bool]) -> List:
+        """Indexed images within the Hamming radius of the image threshold."""
+        target = self.image_hasher.hash_many([file_path])[0]
+        if target is None:
+            return []
+
+        if self._image_tree is None:
+            self._image_tree = BKTree()
+            for path, value in conn.execute('SELECT path, image_hash FROM indexed_files WHERE image_hash IS NOT NULL'):
+                self._image_tree.add(int(value, 16), path)
+
+        radius = self.image_hasher.radius_for(self.settings['image_similarity_threshold'])
+        found = {path: distance for distance, path in self._image_tree.search(target, radius) if accept(path)}
+
+        # The tree may hold removed or re-hashed entries; the table is authoritative
+        matches = []
+        for path in found:
+            row = conn.execute('SELECT size, mtime_ns, image_hash FROM indexed_files WHERE path = ?',
+                               (path,)).fetchone()
+            if not row or not row[2] or not self._current(conn, path, row[0], row[1]):
+                continue
+            distance = hamming_distance(int(row[2], 16), target)
+            if distance <= radius:
+                matches.append((path, self.image_hasher.similarity(distance)))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def _text_matches(self, conn, file_path: str, accept: Callable[[str], bool]) -> List:
+        """Indexed text files whose MinHash estimate reaches the content threshold."""
+        signature = self.minhasher.signatures([{'file_path': file_path}], self.text_of)[0]
+        if signature is None:
+            return []
+
+        candidates = set()
+        for band, bucket in enumerate(self.lsh.band_keys(signature)):
+            candidates.update(path for (path,) in conn.execute(
+                'SELECT path FROM lsh_buckets WHERE band = ? AND bucket = ?', (band, bucket)))
+
+        matches = []
+        for path in candidates:
+            if not accept(path):
+                continue
+            row = conn.execute('SELECT size, mtime_ns, text_signature FROM indexed_files WHERE path = ?',
+                               (path,)).fetchone()
+            if not row or not row[2] or not self._current(conn, path, row[0], row[1]):
+                continue
+            similarity = self.minhasher.jaccard(signature, np.frombuffer(row[2], dtype=np.uint32))
+            if similarity >= self.settings['content_similarity_threshold']:
+                matches.append((path, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def _audio_matches(self, conn, file_path: str, accept: Callable[[str], bool]) -> List:
+        """Indexed recordings whose aligned landmarks reach the audio threshold."""
+        target = self.audio_fingerprinter.fingerprint_many([file_path])[0]
+        if target is None or not len(target[0]):
+            return []
+
+        # Postings of the target's sampled hashes, as partial fingerprints per path
+        index = self._landmark_index()
+        hashes = sorted(set(index.sample(target)[0].tolist()))
+        postings = {}
+        for start in range(0, len(hashes), QUERY_CHUNK_SIZE):
+            chunk = hashes[start:start + QUERY_CHUNK_SIZE]
+            for value, path, offset in conn.execute(
+                    f"SELECT hash, path, offset FROM audio_landmarks WHERE hash IN ({', '.join('?' * len(chunk))})",
+                    chunk):
+                if accept(path):
+                    postings.setdefault(path, []).append((value, offset))
+        for path, pairs in postings.items():
+            pairs = np.array(pairs, dtype=np.uint32)
+            index.add(path, (pairs[:, 0], pairs[:, 1]))
+
+        min_votes = self.audio_fingerprinter.settings['min_votes']
+        candidates = [path for path, votes in index.query(target) if votes >= min_votes]
+        matches = []
+        for path, fingerprint in zip(candidates, self.audio_fingerprinter.fingerprint_many(candidates)):
+            row = conn.execute('SELECT size, mtime_ns FROM indexed_files WHERE path = ?', (path,)).fetchone()
+            if fingerprint is None or not row or not self._current(conn, path, row[0], row[1]):
+                continue
+            similarity = self.audio_fingerprinter.similarity(target, fingerprint)
+            if similarity >= self.settings['audio_similarity_threshold']:
+                matches.append((path, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def _video_matches(self, conn, file_path: str, accept: Callable[[str], bool]) -> List:
+        """Indexed videos of about the same duration whose signatures reach the video threshold."""
+        target = self.video_hasher.signatures([file_path])[0]
+        if target is None or not len(target[1]):
+            return []
+
+        low, high = self.video_hasher.duration_window(target[0])
+        rows = conn.execute('SELECT path, signature FROM video_signatures WHERE duration BETWEEN ? AND ?',
+                            (low, high)).fetchall()
+
+        matches = []
+        for path, data in rows:
+            if not accept(path):
+                continue
+            similarity = self.video_hasher.similarity(target, self.video_hasher.from_bytes(data))
+            if similarity < self.settings['video_similarity_threshold']:
+                continue
+            row = conn.execute('SELECT size, mtime_ns FROM indexed_files WHERE path = ?', (path,)).fetchone()
+            if row and self._current(conn, path, row[0], row[1]):
+                matches.append((path, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def _landmark_index(self) -> LandmarkIndex:
+        """Empty landmark index with the sampling used for the audio_landmarks table."""
+        index = self.audio_fingerprinter.new_index()
+        index.max_postings = None   # Postings were already restricted to the query's hashes
+        return index
+
+    def _current(self, conn, path: str, size: int, mtime_ns: int) -> bool:
+        """Check that an indexed file is unchanged; drop its entry if it was modified or removed."""
+        key = stat_key(path)
+        if key is not None and key[2:] == (size, mtime_ns):
+            return True
+        conn.execute('DELETE FROM indexed_files WHERE path = ?', (path,))
+        self._delete_fingerprints(conn, [path])
+        conn.commit()
+        return False
+
+    @staticmethod
+    def _delete_fingerprints(conn, paths: List[str]) -> None:
+        """Delete the rows of files from the fingerprint tables (without committing)."""
+        for table in FINGERPRINT_TABLES:
+            conn.executemany(f'DELETE FROM {table} WHERE path = ?', [(path,) for path in paths])
+
+    @staticmethod
+    def _is_image(file_path: str) -> bool:
+        """Check if a file is an image by its extension."""
+        return (mimetypes.guess_type(file_path)[0] or '').startswith('image/')
+
+    @staticmethod
+    def _is_text(file_path: str) -> bool:
+        """Check if a file is a text file by its extension."""
+        mime = mimetypes.guess_type(file_path)[0] or ''
+        return mime.startswith('text/') or mime in TEXT_MIME_TYPES
+
+    @staticmethod
+    def _is_audio(file_path: str) -> bool:
+        """Check if a file is an audio file by its extension."""
+        return (mimetypes.guess_type(file_path)[0] or '').startswith('audio/')
+
+    @staticmethod
+    def _is_video(file_path: str) -> bool:
+        """Check if a file is a video by its extension."""
+        return (mimetypes.guess_type(file_path)[0] or '').startswith('video/')
+
+    def _read_text(self, file_info: Dict[str, Any]) -> str:
+        """Read the text of a file (up to 10MB)."""
+        try:
+            with open(file_info['file_path'], 'rb') as f:
+                return f.read(10 * 1024 * 1024).decode('utf-8', errors='ignore')
+        except OSError as e:
+            self.logger.warning(f"Error reading file {file_info['file_path']}: {e}")
+            return ''
+
+    @staticmethod
+    def _result(matches: List, duplicate_type: str) -> Dict[str, Any]:
+        """Build a lookup result from (path, similarity) pairs."""
+        return {
+            'is_duplicate': bool(matches),
+            'duplicate_files': [{'file_path': path, 'file_name': os.path.basename(path), 'similarity': score}
+                                for path, score in matches],
+            'similarity_score': max((score for _, score in matches), default=0.0),
+            'duplicate_type': duplicate_type
+        }
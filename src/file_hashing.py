@@ -0,0 +1,319 @@
+"""
+File Hashing Module for Smart File Organizer.
+Finds byte-identical files while reading as little data as possible.
+
+Files are compared in stages, and each stage only looks at the files that
+still collide after the previous one:
+    1. size         one stat() per file, no data read
+    2. sample hash  the first and last sample_size bytes of each file
+    3. full hash    a streaming digest of the whole file, read in fixed-size
+                    chunks into a reused buffer (bounded memory)
+
+Files no larger than two samples are read completely by the sample stage, so
+they never need the full stage. Hashing runs on an I/O thread pool; hashlib
+releases the GIL while digesting, so reads and hashing of different files
+overlap.
+
+With a HashCache, digests are looked up before any file is read and stored
+after hashing, so unchanged files are never hashed twice.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any
+
+from .hash_cache import HashCache, get_hash_cache, stat_key
+
+# Handle imports with graceful fallbacks
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+class FileHasher:
+    """Staged size / sample / full-content hashing for exact duplicate detection."""
+
+    def __init__(self, config: Optional[Dict] = None, cache: Optional[HashCache] = None):
+        """
+        Initialize the hasher with configuration.
+
+        Args:
+            config: Hashing settings
+            cache: Optional persistent digest cache
+        """
+        self.config = config or {}
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+        self.settings = {
+            'sample_size': 16 * 1024,      # Bytes hashed from each end of a file
+            'chunk_size': 1024 * 1024,     # Read size of the streaming full hash
+            'io_workers': 8,               # Files hashed concurrently
+            'algorithm': 'blake2b'         # 'blake2b' or 'xxh3' (needs the xxhash package)
+        }
+        self.settings.update({k: v for k, v in self.config.items() if v is not None})
+
+        if self.settings['algorithm'] == 'xxh3' and not XXHASH_AVAILABLE:
+            self.logger.warning("xxhash not available - using blake2b for file hashes")
+            self.settings['algorithm'] = 'blake2b'
+
+        self.sample_size = self.settings['sample_size']
+        self.chunk_size = self.settings['chunk_size']
+
+        # Digests from other algorithms or sample sizes are not comparable
+        self.scheme = f"{self.settings['algorithm']}/{self.sample_size}"
+
+        # Bytes read from disk since the last reset_stats()
+        self._lock = threading.Lock()
+        self.bytes_read = 0
+
+    def reset_stats(self) -> None:
+        """Reset the read counter."""
+        with self._lock:
+            self.bytes_read = 0
+
+    def sample_hash(self, file_path: str, size: Optional[int] = None) -> str:
+        """
+        Hash the size, head and tail of a file.
+
+        Args:
+            file_path: Path to the file
+            size: File size, if already known
+
+        Returns:
+            Hex digest; for files up to two samples long it covers the whole file
+        """
+        if size is None:
+            size = os.path.getsize(file_path)
+
+        digest = self._new_digest()
+        digest.update(size.to_bytes(8, 'little'))
+
+        with open(file_path, 'rb', buffering=0) as f:
+            if size <= 2 * self.sample_size:
+                data = f.read()
+                digest.update(data)
+                read = len(data)
+            else:
+                head = f.read(self.sample_size)
+                f.seek(-self.sample_size, os.SEEK_END)
+                tail = f.read(self.sample_size)
+                digest.update(head)
+                digest.update(tail)
+                read = len(head) + len(tail)
+
+        self._count(read)
+        return digest.hexdigest()
+
+    def full_hash(self, file_path: str) -> str:
+        """
+        Hash the whole content of a file with a streaming digest.
+
+        The file is read sequentially in chunk_size pieces into one reused
+        buffer, with a sequential-access hint to the kernel where supported.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Hex digest of the content
+        """
+        digest = self._new_digest()
+        buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        read = 0
+
+        with open(file_path, 'rb', buffering=0) as f:
+            if hasattr(os, 'posix_fadvise'):
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                except OSError:
+                    pass
+
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                digest.update(view[:n])
+                read += n
+
+        self._count(read)
+        return digest.hexdigest()
+
+    def sample_hashes(self, paths: List[str]) -> List[Optional[str]]:
+        """
+        Get the sample hashes of many files, using the cache where possible.
+
+        Returns:
+            Digests in path order (None for unreadable files)
+        """
+        return self._digests(paths, 'quick', self.sample_hash)
+
+    def full_hashes(self, paths: List[str]) -> List[Optional[str]]:
+        """
+        Get the full content hashes of many files, using the cache where possible.
+
+        Returns:
+            Digests in path order (None for unreadable files)
+        """
+        return self._digests(paths, 'full', self.full_hash)
+
+    def content_hash(self, file_path: str) -> Optional[str]:
+        """Get the full content hash of one file, using the cache where possible."""
+        return self.full_hashes([file_path])[0]
+
+    def group_identical(self, items: List[Any],
+                        path_of: Callable[[Any], str] = lambda item: item['file_path']) -> List[List[Any]]:
+        """
+        Group byte-identical files.
+
+        Args:
+            items: File dictionaries (or other items)
+            path_of: Function returning the file path of an item
+
+        Returns:
+            Groups of two or more identical items
+        """
+        # Stage 1: size
+        by_size = defaultdict(list)
+        for item in items:
+            try:
+                by_size[os.path.getsize(path_of(item))].append(item)
+            except OSError as e:
+                self.logger.warning(f"Error getting size for {path_of(item)}: {e}")
+
+        candidates = [(size, item) for size, group in by_size.items() if len(group) > 1 for item in group]
+
+        # Stage 2: head + tail sample
+        sample_hashes = self.sample_hashes([path_of(item) for _, item in candidates])
+        by_sample = defaultdict(list)
+        for (size, item), digest in zip(candidates, sample_hashes):
+            if digest is not None:
+                by_sample[(size, digest)].append(item)
+
+        groups = []
+        survivors = []
+        for (size, _), group in by_sample.items():
+            if len(group) < 2:
+                continue
+            if size <= 2 * self.sample_size:
+                groups.append(group)   # The sample covered the whole file
+            else:
+                survivors.extend(group)
+
+        # Stage 3: full content
+        full_hashes = self.full_hashes([path_of(item) for item in survivors])
+        by_content = defaultdict(list)
+        for item, digest in zip(survivors, full_hashes):
+            if digest is not None:
+                by_content[digest].append(item)
+
+        groups.extend(group for group in by_content.values() if len(group) > 1)
+        return groups
+
+    def find_matches(self, file_path: str, candidates: List[Any],
+                     path_of: Callable[[Any], str] = lambda item: item['file_path']) -> List[Any]:
+        """
+        Find the candidates that are byte-identical to one file.
+
+        Args:
+            file_path: Path to the file to check
+            candidates: File dictionaries (or other items) to compare against
+            path_of: Function returning the file path of an item
+
+        Returns:
+            Matching candidates
+        """
+        size = os.path.getsize(file_path)
+        same_size = []
+        for item in candidates:
+            try:
+                if os.path.getsize(path_of(item)) == size:
+                    same_size.append(item)
+            except OSError as e:
+                self.logger.warning(f"Error getting size for {path_of(item)}: {e}")
+
+        if not same_size:
+            return []
+
+        target, *sample_hashes = self.sample_hashes([file_path] + [path_of(item) for item in same_size])
+        matches = [item for item, digest in zip(same_size, sample_hashes) if digest == target]
+        if not matches or size <= 2 * self.sample_size:
+            return matches
+
+        target, *full_hashes = self.full_hashes([file_path] + [path_of(item) for item in matches])
+        return [item for item, digest in zip(matches, full_hashes) if digest == target]
+
+    def _digests(self, paths: List[str], kind: str, hash_func: Callable[[str], str]) -> List[Optional[str]]:
+        """Look up digests in the cache, hash the misses and store them."""
+        if self.cache is None:
+            return self._hash_all(paths, hash_func)
+
+        # Stat before reading, so a file changing while it is hashed is not cached as current
+        keys = {path: stat_key(path) for path in paths}
+        cached = self.cache.get_many(paths, self.scheme, keys)
+        digests = [cached.get(path, {}).get(kind) for path in paths]
+
+        missing = [i for i, digest in enumerate(digests) if digest is None]
+        computed = self._hash_all([paths[i] for i in missing], hash_func)
+        for i, digest in zip(missing, computed):
+            digests[i] = digest
+
+        self.cache.put_many([(paths[i], keys[paths[i]], kind, digests[i]) for i in missing], self.scheme)
+        return digests
+
+    def _hash_all(self, entries: List[Any], hash_func: Callable[[Any], str]) -> List[Optional[str]]:
+        """Hash entries on the I/O thread pool; unreadable files hash to None."""
+        def safe_hash(entry):
+            try:
+                return hash_func(entry)
+            except OSError as e:
+                self.logger.warning(f"Error hashing file: {e}")
+                return None
+
+        if len(entries) < 2 or self.settings['io_workers'] <= 1:
+            return [safe_hash(entry) for entry in entries]
+
+        with ThreadPoolExecutor(max_workers=self.settings['io_workers'], thread_name_prefix='hash') as executor:
+            return list(executor.map(safe_hash, entries))
+
+    def _new_digest(self):
+        """Create a digest object for the configured algorithm."""
+        if self.settings['algorithm'] == 'xxh3':
+            return xxhash.xxh3_128()
+        return hashlib.blake2b(digest_size=20)
+
+    def _count(self, n: int) -> None:
+        """Add to the read counter."""
+        with self._lock:
+            self.bytes_read += n
+
+
+_shared_hasher = None
+_shared_hasher_lock = threading.Lock()
+
+
+def content_hash(file_path: str) -> Optional[str]:
+    """
+    Get the full content hash of a file through the shared hash cache.
+
+    Used by components that only need one digest per file (e.g. the result
+    caches of the media plugins), so they share one hasher and its cache.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest, or None if the file is unreadable
+    """
+    global _shared_hasher
+    with _shared_hasher_lock:
+        if _shared_hasher is None:
+            _shared_hasher = FileHasher(cache=get_hash_cache())
+    return _shared_hasher.content_hash(file_path)
@@ -0,0 +1,154 @@
+"""
+File Linking Module for Smart File Organizer.
+Replaces duplicate files in place with hardlinks or copy-on-write clones
+(reflinks), so the space is reclaimed while every path keeps working.
+
+Each replacement is verified and atomic:
+    1. the duplicate is compared byte for byte with the kept file
+    2. the link or clone is created under a temporary name in the
+       duplicate's directory
+    3. the duplicate is checked to be unchanged since the comparison
+    4. os.replace() swaps the temporary name over the duplicate
+
+Readers therefore always see either the old file or the new link, never a
+missing or partial file. Reflinks use the Linux FICLONE ioctl, supported by
+btrfs, XFS (with reflink=1) and other copy-on-write file systems; the clone
+keeps the duplicate's own permissions and timestamps.
+"""
+
+import os
+import uuid
+import shutil
+
+# Handle imports with graceful fallbacks
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows
+    FCNTL_AVAILABLE = False
+
+# _IOW(0x94, 9, int): clone all extents of the source fd into the target fd
+FICLONE = 0x40049409
+
+COMPARE_CHUNK_SIZE = 1024 * 1024
+
+
+def files_identical(path_a: str, path_b: str, chunk_size: int = COMPARE_CHUNK_SIZE) -> bool:
+    """
+    Compare two files byte for byte.
+
+    Args:
+        path_a: First file
+        path_b: Second file
+        chunk_size: Bytes compared per read
+
+    Returns:
+        True if both files have the same content
+    """
+    if os.path.getsize(path_a) != os.path.getsize(path_b):
+        return False
+
+    with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+        while True:
+            chunk_a = a.read(chunk_size)
+            if chunk_a != b.read(chunk_size):
+                return False
+            if not chunk_a:
+                return True
+
+
+def allocated_bytes(st: os.stat_result) -> int:
+    """Disk space used by a file (allocated blocks where the platform reports them)."""
+    blocks = getattr(st, 'st_blocks', None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+def replace_with_hardlink(source: str, target: str, verify: bool = True) -> None:
+    """
+    Atomically replace a file with a hardlink to an identical file.
+
+    Args:
+        source: File to keep
+        target: Duplicate to replace
+        verify: Compare the files byte for byte first
+
+    Raises:
+        ValueError: If the files differ or the target changed during verification
+        OSError: If the link cannot be created (e.g. across file systems)
+    """
+    before = _verify(source, target, verify)
+    temp_path = _temp_path(target)
+    os.link(source, temp_path)
+    _swap(temp_path, target, before)
+
+
+def replace_with_reflink(source: str, target: str, verify: bool = True) -> None:
+    """
+    Atomically replace a file with a copy-on-write clone of an identical file.
+
+    The clone keeps the target's permissions, timestamps and (where allowed)
+    ownership.
+
+    Args:
+        source: File to keep
+        target: Duplicate to replace
+        verify: Compare the files byte for byte first
+
+    Raises:
+        ValueError: If the files differ or the target changed during verification
+        OSError: If the file system does not support cloning
+    """
+    if not FCNTL_AVAILABLE:
+        raise OSError("Reflinks are not supported on this platform")
+
+    before = _verify(source, target, verify)
+    temp_path = _temp_path(target)
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, before.st_mode & 0o7777)
+    try:
+        with open(source, 'rb') as src:
+            fcntl.ioctl(fd, FICLONE, src.fileno())
+    except OSError:
+        os.close(fd)
+        os.unlink(temp_path)
+        raise
+    os.close(fd)
+
+    try:
+        shutil.copystat(target, temp_path)
+        if hasattr(os, 'chown'):
+            try:
+                os.chown(temp_path, before.st_uid, before.st_gid)
+            except PermissionError:
+                pass
+    except OSError:
+        os.unlink(temp_path)
+        raise
+    _swap(temp_path, target, before)
+
+
+def _verify(source: str, target: str, verify: bool) -> os.stat_result:
+    """Stat the target and optionally check that it matches the source."""
+    before = os.stat(target)
+    if verify and not files_identical(source, target):
+        raise ValueError(f"{target} differs from {source}")
+    return before
+
+
+def _swap(temp_path: str, target: str, before: os.stat_result) -> None:
+    """Move a temporary file over the target unless the target changed."""
+    try:
+        after = os.stat(target)
+        if (after.st_size, after.st_mtime_ns, after.st_ino) != \
+                (before.st_size, before.st_mtime_ns, before.st_ino):
+            raise ValueError(f"{target} changed during verification")
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.lexists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def _temp_path(target: str) -> str:
+    """Unused temporary name next to a file (same directory, so os.replace is atomic)."""
+    directory, name = os.path.split(os.path.abspath(target))
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex[:12]}.tmp")
@@ -1,14 +1,16 @@
 import os
 import re
-import shutil
 import time
 from pathlib import Path
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .utils import sanitize_filename
 from .ai_analyzer import AIAnalyzer
 from .duplicate_detector import DuplicateDetector
+from .file_transfer import FileTransfer
+from .organize_journal import OrganizeJournal
 from .tag_manager import TagManager
 from .organization_rules import OrganizationRuleManager, OrganizationRule
 from .image_analyzer import ImageAnalyzer
@@ -26,12 +28,17 @@ class FileOrganizer:
         self.tag_manager = TagManager()
         self.image_analyzer = ImageAnalyzer()
         self.rule_manager = OrganizationRuleManager()
+        self.file_transfer = FileTransfer()
 
         # Default rules directory
         self.rules_dir = os.path.join(os.path.expanduser(
             "~"), ".ai_document_organizer", "rules")
         os.makedirs(self.rules_dir, exist_ok=True)
 
+        # Operation journals of organize runs (resume and undo)
+        self.journal_dir = os.path.join(os.path.expanduser(
+            "~"), ".ai_document_organizer", "journals")
+
         # Default rules file
         self.rules_file = os.path.join(
             self.rules_dir, "organization_rules.json")
@@ -46,6 +53,18 @@ class FileOrganizer:
         """
         Organize files based on their AI analysis
 
+        Runs in two phases. The plan phase decides everything in memory: rule
+        matching, target paths, duplicate handling, name collisions, the set of
+        directories to create and the sidecar and tag contents. The apply phase
+        creates the directories once, then copies or moves the files (writing
+        each file's sidecars right after it) on a bounded I/O thread pool, and
+        finally writes all tags in one transaction. Seconds spent per phase are
+        reported in results["timings"].
+
+        Before the apply phase the plan is written to an operation journal
+        (results["journal_path"]), which resume_organization() and
+        undo_organization() work from.
+
         Args:
             analyzed_files: List of file information dictionaries with AI analysis
             target_dir: Target directory for organized files
@@ -62,10 +81,14 @@ class FileOrganizer:
                 - suggest_tags: Whether to suggest tags based on content (default: False)
                 - use_custom_rules: Whether to use custom organization rules (default: False)
                 - rules_file: Path to custom rules file (default: None)
+                - io_workers: Number of file operations run concurrently (default: 8)
+                - journal: Whether to write an operation journal for resume and undo (default: True)
 
         Returns:
             Dictionary with organization results
         """
+        started = time.perf_counter()
+
         # Default options
         default_options = {
             "create_category_folders": True,
@@ -78,14 +101,16 @@ class FileOrganizer:
             "apply_tags": False,
             "suggest_tags": False,
             "use_custom_rules": False,
-            "rules_file": None
+            "rules_file": None,
+            "io_workers": 8,
+            "journal": True
         }
 
         # Merge provided options with defaults
         if options:
             for key, value in options.items():
                 default_options[key] = value
-            options = default_options
+        options = default_options
 
         # Load custom rules if specified
         if options["use_custom_rules"] and options["rules_file"] and os.path.exists(options["rules_file"]):
@@ -94,6 +119,11 @@ class FileOrganizer:
         # Create target directory if it doesn't exist
         os.makedirs(target_dir, exist_ok=True)
 
+        # Bring the duplicate index up to date with the target directory once;
+        # each file is then checked with index lookups only
+        if options["detect_duplicates"]:
+            self.duplicate_detector.index.add_directory(target_dir)
+
         # Initialize results
         results = {
             "organized_files": 0,
@@ -104,16 +134,117 @@ class FileOrganizer:
             "skipped_file_paths": [],
             "duplicate_file_paths": [],
             "error_file_paths": [],
-            "rules_applied": {}
+            "rules_applied": {},
+            "timings": {}
         }
 
-        # Process each file
+        # Phase one: compute the complete plan
+        phase_started = time.perf_counter()
+        plan = self._plan_organization(analyzed_files, target_dir, options, results, callback)
+        results["timings"]["plan"] = time.perf_counter() - phase_started
+
+        # Journal the plan before touching any file
+        journal = None
+        if options["journal"] and plan["operations"]:
+            try:
+                journal = OrganizeJournal.create(
+                    self.journal_dir, plan["operations"], target_dir,
+                    move=not options["copy_instead_of_move"],
+                    detect_duplicates=options["detect_duplicates"],
+                    indexed_sources=plan["indexed_sources"])
+                results["journal_path"] = journal.path
+            except OSError as e:
+                self.logger.error(f"Error writing organize journal: {str(e)}")
+
+        # Phase two: run it
+        phase_started = time.perf_counter()
+        completed = []
+        try:
+            completed = self._apply_plan(plan, options, results, callback, journal)
+        finally:
+            if journal:
+                journal.close()
+        results["timings"]["apply"] = time.perf_counter() - phase_started
+
+        # Rule usage and statistics count only the files that were organized
+        if options["use_custom_rules"]:
+            rule_hits = [(operation["rule_hits"], operation["file_info"]) for operation in completed
+                         if operation.get("rule_hits") is not None]
+            for (_, applied_rule), file_info in rule_hits:
+                if applied_rule:
+                    rule_id = applied_rule.rule_id
+                    if rule_id not in results["rules_applied"]:
+                        results["rules_applied"][rule_id] = {
+                            "name": applied_rule.name,
+                            "count": 0,
+                            "files": []
+                        }
+                    results["rules_applied"][rule_id]["count"] += 1
+                    results["rules_applied"][rule_id]["files"].append(
+                        file_info["file_name"])
+
+            self.rule_manager.record_stats([hits for hits, _ in rule_hits])
+            self.rule_manager.save_rules(
+                options["rules_file"] or self.rules_file)
+
+        results["timings"]["total"] = time.perf_counter() - started
+
+        # Final progress update
+        total_files = len(analyzed_files)
+        if callback:
+            callback(total_files, total_files,
+                     f"Organized {results['organized_files']} files")
+
+        return results
+
+    def _plan_organization(self, analyzed_files, target_dir, options, results, callback=None):
+        """
+        Compute the organization plan without touching the files
+
+        Missing files are recorded as skipped and reported duplicates as
+        duplicates; everything else becomes an operation:
+            organize    copy/move the file to its target path (with sidecars and tags)
+            duplicate   copy/move a duplicate into the _Duplicates folder
+            replace     overwrite an older indexed duplicate (duplicate_action 'keep_newest')
+
+        Two files planned for the same path get distinct names. With duplicate
+        detection, each planned file is indexed, so later files in the run are
+        checked against it as well as against the target directory.
+
+        Args:
+            analyzed_files: List of file information dictionaries
+            target_dir: Target directory for organized files
+            options: Organization options
+            results: Results dictionary to update
+            callback: Optional progress callback
+
+        Returns:
+            Plan dictionary with 'operations', 'directories' and 'indexed_sources'
+        """
+        plan = {
+            "operations": [],
+            "directories": set(),
+            "indexed_sources": set()   # Planned files added to the duplicate index
+        }
+        claimed = set()   # Target paths already used by the plan
+        planned = {}      # Source path -> its organize operation
+
+        # Evaluate custom rules for the whole batch; rule statistics are only
+        # updated for the files actually organized (see organize_files)
+        rule_targets = {}   # id(file_info) -> ((target_path, rule), rule hits)
+        if options["use_custom_rules"]:
+            present = [file_info for file_info in analyzed_files
+                       if file_info.get("file_path") and os.path.exists(file_info["file_path"])]
+            rule_plan = self.rule_manager.plan(present, target_dir, update_stats=False)
+            rule_targets = {id(file_info): target
+                            for file_info, target in zip(present, zip(rule_plan["targets"], rule_plan["hits"]))}
+
         total_files = len(analyzed_files)
         for index, file_info in enumerate(analyzed_files):
             try:
                 # Update progress
                 if callback:
-                    status = f"Organizing file {index + 1}/{total_files}: {file_info['file_name']}"
+                    status = f"Planning file {index + 1}/{total_files}: {file_info['file_name']}"
                     callback(index, total_files, status)
 
                 # Check if file exists
@@ -126,155 +257,522 @@ class FileOrganizer:
 
                 # Determine target path
                 target_path = None
-                applied_rule = None
+                rule_hits = None
 
                 # Use custom rules if enabled
                 if options["use_custom_rules"]:
-                    target_path, applied_rule = self.rule_manager.apply_rules(
-                        file_info, target_dir)
-
-                    # Track rule usage
-                    if applied_rule:
-                        rule_id = applied_rule.rule_id
-                        if rule_id not in results["rules_applied"]:
-                            results["rules_applied"][rule_id] = {
-                                "name": applied_rule.name,
-                                "count": 0,
-                                "files": []
-                            }
-                        results["rules_applied"][rule_id]["count"] += 1
-                        results["rules_applied"][rule_id]["files"].append(
-                            file_info["file_name"])
+                    (target_path, _), rule_hits = rule_targets.get(
+                        id(file_info), ((None, None), None))
 
                 # If no rule matched or custom rules are disabled, use default organization
                 if not target_path:
                     target_path = self._get_default_target_path(
                         file_info, target_dir, options)
 
-                # Ensure target directory exists
-                target_dir_path = os.path.dirname(target_path)
-                os.makedirs(target_dir_path, exist_ok=True)
-
                 # Check for duplicates if enabled
-                is_duplicate = False
                 if options["detect_duplicates"]:
-                    duplicate_info = self.duplicate_detector.check_duplicate(
-                        file_path, target_dir)
-                    if duplicate_info["is_duplicate"]:
-                        is_duplicate = True
-                        duplicate_path = duplicate_info["duplicate_path"]
-
-                        # Handle duplicate based on options
-                        if options["duplicate_action"] == "report":
-                            self.logger.info(
-                                f"Duplicate found: {file_path} matches {duplicate_path}")
-                            results["duplicate_files"] += 1
-                            results["duplicate_file_paths"].append(file_path)
-                            continue
-
-                        elif options["duplicate_action"] == "move":
-                            # Move to duplicates folder
-                            duplicates_dir = os.path.join(
-                                target_dir, "_Duplicates")
-                            os.makedirs(duplicates_dir, exist_ok=True)
-                            duplicate_target = os.path.join(
-                                duplicates_dir, os.path.basename(file_path))
-
-                            # Ensure unique filename
-                            if os.path.exists(duplicate_target):
-                                base_name, ext = os.path.splitext(
-                                    os.path.basename(file_path))
-                                duplicate_target = os.path.join(
-                                    duplicates_dir, f"{base_name}_dup_{int(time.time())}{ext}")
-
-                            # Copy or move the file
-                            if options["copy_instead_of_move"]:
-                                shutil.copy2(file_path, duplicate_target)
-                            else:
-                                shutil.move(file_path, duplicate_target)
-
-                            results["duplicate_files"] += 1
-                            results["duplicate_file_paths"].append(file_path)
-                            continue
-
-                        elif options["duplicate_action"] == "delete":
-                            # Skip the file (don't copy/move)
-                            results["duplicate_files"] += 1
-                            results["duplicate_file_paths"].append(file_path)
-                            continue
-
-                        elif options["duplicate_action"] == "keep_newest":
-                            # Compare modification times
-                            current_mtime = os.path.getmtime(file_path)
-                            existing_mtime = os.path.getmtime(duplicate_path)
-
-                            if current_mtime <= existing_mtime:
-                                # Skip if current file is older
-                                results["duplicate_files"] += 1
-                                results["duplicate_file_paths"].append(
-                                    file_path)
-                                continue
-                            else:
-                                # Replace existing file
-                                if options["copy_instead_of_move"]:
-                                    shutil.copy2(file_path, duplicate_path)
-                                else:
-                                    shutil.move(file_path, duplicate_path)
-
-                                results["organized_files"] += 1
-                                results["organized_file_paths"].append(
-                                    target_path)
-                                continue
-
-                # Copy or move the file
+                    duplicate_path = self._find_duplicate(file_path, target_dir, planned)
+                    if duplicate_path:
+                        self._plan_duplicate(file_info, duplicate_path, target_dir, options,
+                                             plan, planned, claimed, results)
+                        continue
+
+                    if self.duplicate_detector.index.add(file_path):
+                        plan["indexed_sources"].add(file_path)
+
+                target_path = self._claim_target(target_path, claimed)
+                operation = {
+                    "kind": "organize",
+                    "source": file_path,
+                    "target": target_path,
+                    "file_info": file_info,
+                    "rule_hits": rule_hits
+                }
+                plan["operations"].append(operation)
+                plan["directories"].add(os.path.dirname(target_path))
+                planned[file_path] = operation
+
+            except Exception as e:
+                self.logger.error(
+                    f"Error processing file {file_info.get('file_path', 'Unknown')}: {str(e)}")
+                results["error_files"] += 1
+                results["error_file_paths"].append(
+                    file_info.get("file_path", "Unknown"))
+
+        # Render sidecars and tags once the final source of every operation is known
+        for operation in plan["operations"]:
+            operation["sidecars"] = []
+            operation["tags"] = []
+            if operation["kind"] != "organize":
+                continue
+
+            file_info, target_path = operation["file_info"], operation["target"]
+            if options["generate_summaries"]:
+                summary = self._render_summary(file_info, target_path)
+                if summary is not None:
+                    operation["sidecars"].append(
+                        (os.path.splitext(target_path)[0] + "_summary.md", summary))
+            if options["include_metadata"]:
+                operation["sidecars"].append(
+                    (os.path.splitext(target_path)[0] + "_metadata.json",
+                     json.dumps(self._render_metadata(file_info, target_path), indent=2)))
+            if options["apply_tags"]:
                 try:
-                    if options["copy_instead_of_move"]:
-                        shutil.copy2(file_path, target_path)
-                    else:
-                        shutil.move(file_path, target_path)
+                    operation["tags"] = self._get_tags(file_info, options["suggest_tags"])
+                except Exception as e:
+                    self.logger.error(f"Error collecting tags for {operation['source']}: {str(e)}")
 
-                    # Generate summary file if enabled
-                    if options["generate_summaries"]:
-                        self._generate_summary_file(
-                            file_info, target_path, options)
+        return plan
 
-                    # Generate metadata file if enabled
-                    if options["include_metadata"]:
-                        self._generate_metadata_file(file_info, target_path)
+    def _find_duplicate(self, file_path, target_dir, planned):
+        """
+        Find an indexed duplicate of a file in the target directory or among
+        the files already planned in this run
 
-                    # Apply tags if enabled
-                    if options["apply_tags"]:
-                        self._apply_tags(file_info, target_path,
-                                         options["suggest_tags"])
+        Returns:
+            Path of the duplicate, or None
+        """
+        duplicate_info = self.duplicate_detector.check_duplicate(file_path)
+        prefix = os.path.join(os.path.abspath(target_dir), "")
+        for match in duplicate_info["duplicate_files"]:
+            path = match["file_path"]
+            if path in planned or os.path.abspath(path).startswith(prefix):
+                return path
+        return None
+
+    def _plan_duplicate(self, file_info, duplicate_path, target_dir, options, plan, planned, claimed, results):
+        """
+        Plan the handling of a file that duplicates an indexed or planned file
 
-                    results["organized_files"] += 1
-                    results["organized_file_paths"].append(target_path)
+        Args:
+            file_info: Dictionary with file information
+            duplicate_path: Path of the existing or planned duplicate
+            target_dir: Target directory for organized files
+            options: Organization options
+            plan: Plan being built
+            planned: Source path -> organize operation of the files planned so far
+            claimed: Target paths already used by the plan
+            results: Results dictionary to update
+        """
+        file_path = file_info["file_path"]
+        action = options["duplicate_action"]
+
+        if action == "move":
+            # Move to duplicates folder
+            duplicates_dir = os.path.join(target_dir, "_Duplicates")
+            duplicate_target = self._claim_target(
+                os.path.join(duplicates_dir, os.path.basename(file_path)), claimed, check_disk=True)
+            plan["operations"].append({
+                "kind": "duplicate",
+                "source": file_path,
+                "target": duplicate_target,
+                "file_info": file_info
+            })
+            plan["directories"].add(duplicates_dir)
+            return
 
-                except Exception as e:
-                    self.logger.error(
-                        f"Error organizing file {file_path}: {str(e)}")
-                    results["error_files"] += 1
-                    results["error_file_paths"].append(file_path)
+        if action == "keep_newest" and os.path.getmtime(file_path) > os.path.getmtime(duplicate_path):
+            earlier = planned.pop(duplicate_path, None)
+            if earlier is not None:
+                # The duplicate is planned in this run: organize this file in its place
+                earlier["source"] = file_path
+                earlier["file_info"] = file_info
+                planned[file_path] = earlier
+                if self.duplicate_detector.index.add(file_path):
+                    plan["indexed_sources"].add(file_path)
+                file_path = duplicate_path
+            else:
+                # Replace the existing file
+                claimed.add(duplicate_path)
+                plan["operations"].append({
+                    "kind": "replace",
+                    "source": file_path,
+                    "target": duplicate_path,
+                    "file_info": file_info
+                })
+                return
+
+        # Report, delete (skip the file) or keep the newer existing file
+        if action == "report":
+            self.logger.info(
+                f"Duplicate found: {file_path} matches {duplicate_path}")
+        results["duplicate_files"] += 1
+        results["duplicate_file_paths"].append(file_path)
+
+    def _claim_target(self, target_path, claimed, check_disk=False):
+        """
+        Reserve a target path for the plan, numbering it if it is already taken
+
+        Args:
+            target_path: Preferred target path
+            claimed: Target paths already used by the plan (updated)
+            check_disk: Also avoid paths that exist on disk
+
+        Returns:
+            Unique target path
+        """
+        base_name, ext = os.path.splitext(target_path)
+        candidate = target_path
+        counter = 1
+        while candidate in claimed or (check_disk and os.path.exists(candidate)):
+            candidate = f"{base_name}_{counter}{ext}"
+            counter += 1
+        claimed.add(candidate)
+        return candidate
+
+    def _apply_plan(self, plan, options, results, callback=None, journal=None):
+        """
+        Run an organization plan
+
+        Directories are created once up front; file operations (each followed
+        by its sidecar writes) run on a pool of options["io_workers"] threads,
+        using the cheapest transfer method available (see file_transfer.py);
+        tags of all organized files are written in one transaction and the
+        duplicate index is updated in bulk. Results are recorded in plan order.
+
+        Args:
+            plan: Plan from _plan_organization; a resumed plan also has
+                'completed', the operations finished before
+            options: Organization options
+            results: Results dictionary to update
+            callback: Optional progress callback
+            journal: Optional OrganizeJournal recording the progress
+
+        Returns:
+            The operations of the plan that succeeded
+        """
+        timings = results["timings"]
+        operations = plan["operations"]
+        move = not options["copy_instead_of_move"]
+
+        phase_started = time.perf_counter()
+        created = []
+        for directory in sorted(plan["directories"]):
+            missing = directory
+            while missing and not os.path.isdir(missing):
+                created.append(missing)
+                missing = os.path.dirname(missing)
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                self.logger.error(f"Error creating directory {directory}: {str(e)}")
+        if journal and created:
+            journal.mark_directories(sorted(set(created)))
+        timings["directories"] = time.perf_counter() - phase_started
+
+        phase_started = time.perf_counter()
+        self.file_transfer.reset_stats()
+        errors = {}
+        if operations:
+            workers = max(1, min(options["io_workers"], len(operations)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="organize") as executor:
+                futures = {executor.submit(self._run_operation, operation, move): index
+                           for index, operation in enumerate(operations)}
+                for done, future in enumerate(as_completed(futures), 1):
+                    index = futures[future]
+                    operation = operations[index]
+                    try:
+                        method = future.result()
+                        if journal:
+                            journal.mark_done(operation.get("op", index), method)
+                    except Exception as e:
+                        self.logger.error(
+                            f"Error organizing file {operation['source']}: {str(e)}")
+                        errors[index] = e
+                        if journal:
+                            journal.mark_failed(operation.get("op", index), str(e))
+                    if callback:
+                        callback(done, len(operations),
+                                 f"Organized {done}/{len(operations)}: {os.path.basename(operation['source'])}")
+        timings["transfer"] = time.perf_counter() - phase_started
+        results["transfer_stats"] = self.file_transfer.stats()
+
+        for index, operation in enumerate(operations):
+            self._count_operation(results, operation, failed=index in errors)
+        completed = [operation for index, operation in enumerate(operations) if index not in errors]
+
+        # Operations finished before a resume still need the bulk updates
+        # that the interrupted run did not get to
+        earlier = plan.get("completed", [])
+        tagged = completed + (earlier if not (journal and journal.tags_done) else [])
+        indexed = completed + (earlier if not (journal and journal.index_done) else [])
+
+        # Tags of all organized files in one transaction
+        phase_started = time.perf_counter()
+        tag_entries = [(operation["target"], tag, confidence)
+                       for operation in tagged for tag, confidence in operation["tags"]]
+        if tag_entries:
+            self.tag_manager.add_tags_to_files(tag_entries)
+        if journal:
+            journal.mark_tags()
+        timings["tags"] = time.perf_counter() - phase_started
+
+        # Later runs are checked against the placed files; their index entries
+        # are carried over from the sources, so nothing is read again. Sources
+        # indexed only for this run are dropped again.
+        if options["detect_duplicates"]:
+            phase_started = time.perf_counter()
+            index = self.duplicate_detector.index
+            index.relocate([(operation["source"], operation["target"]) for operation in indexed
+                            if operation["kind"] in ("organize", "replace")], copy=not move)
+            index.remove(sorted(plan["indexed_sources"]))
+            if journal:
+                journal.mark_index()
+            timings["index"] = time.perf_counter() - phase_started
+
+        # Runs with failed operations stay open for resume_organization()
+        if journal and not errors:
+            journal.mark_complete()
+
+        return completed
+
+    def _count_operation(self, results, operation, failed=False):
+        """
+        Record the outcome of an operation in the results
+
+        Args:
+            results: Results dictionary to update
+            operation: Operation from the plan
+            failed: Whether the operation failed
+        """
+        if failed:
+            results["error_files"] += 1
+            results["error_file_paths"].append(operation["source"])
+        elif operation["kind"] == "duplicate":
+            results["duplicate_files"] += 1
+            results["duplicate_file_paths"].append(operation["source"])
+        else:
+            results["organized_files"] += 1
+            results["organized_file_paths"].append(operation["target"])
+
+    def _run_operation(self, operation, move):
+        """
+        Copy or move one file, then write its sidecar files
+
+        Args:
+            operation: Operation from the plan
+            move: Move instead of copy
+
+        Returns:
+            Transfer method used
+        """
+        if move:
+            method = self.file_transfer.move(operation["source"], operation["target"])
+        else:
+            method = self.file_transfer.copy(operation["source"], operation["target"])
+
+        self._write_sidecars(operation)
+        return method
+
+    def _write_sidecars(self, operation):
+        """
+        Write the sidecar files (summary, metadata) of an operation
 
+        Args:
+            operation: Operation from the plan
+        """
+        for sidecar_path, content in operation["sidecars"]:
+            try:
+                with open(sidecar_path, "w", encoding="utf-8") as f:
+                    f.write(content)
             except Exception as e:
-                self.logger.error(
-                    f"Error processing file {file_info.get('file_path', 'Unknown')}: {str(e)}")
-                results["error_files"] += 1
-                results["error_file_paths"].append(
-                    file_info.get("file_path", "Unknown"))
+                self.logger.error(f"Error creating sidecar file {sidecar_path}: {str(e)}")
 
-        # Save updated rule statistics if custom rules were used
-        if options["use_custom_rules"]:
-            self.rule_manager.save_rules(
-                options["rules_file"] or self.rules_file)
+    def resume_organization(self, journal_path, callback=None, io_workers=8):
+        """
+        Continue an interrupted organize run from its journal
 
-        # Final progress update
-        if callback:
-            callback(total_files, total_files,
-                     f"Organized {results['organized_files']} files")
+        Only the operations the journal does not record as finished are run;
+        a move that finished without being journaled (source gone, target
+        present) is recognized and not repeated. Tags and duplicate index
+        updates that did not happen are then done for all finished operations.
 
+        Args:
+            journal_path: Journal of the run (results["journal_path"])
+            callback: Optional callback function for progress updates, takes (current, total, filename)
+            io_workers: Number of file operations run concurrently
+
+        Returns:
+            Dictionary with organization results for the resumed operations
+        """
+        started = time.perf_counter()
+        journal = OrganizeJournal.load(journal_path)
+        move = journal.header["move"]
+
+        results = {
+            "organized_files": 0,
+            "skipped_files": 0,
+            "duplicate_files": 0,
+            "error_files": 0,
+            "organized_file_paths": [],
+            "skipped_file_paths": [],
+            "duplicate_file_paths": [],
+            "error_file_paths": [],
+            "rules_applied": {},
+            "timings": {},
+            "journal_path": journal_path
+        }
+        if journal.complete or journal.undone:
+            self.logger.info(f"Nothing to resume in {journal_path}")
+            return results
+
+        completed = [journal.operations[index] for index in journal.completed()]
+        operations = []
+        try:
+            for index in journal.pending():
+                operation = dict(journal.operations[index], op=index)
+                if move and not os.path.exists(operation["source"]) and os.path.exists(operation["target"]):
+                    self._write_sidecars(operation)
+                    journal.mark_done(index, "recovered")
+                    self._count_operation(results, operation)
+                    completed.append(operation)
+                else:
+                    operations.append(operation)
+
+            plan = {
+                "operations": operations,
+                "completed": completed,
+                "directories": {os.path.dirname(operation["target"]) for operation in operations},
+                "indexed_sources": set(journal.header["indexed_sources"])
+            }
+            options = {
+                "copy_instead_of_move": not move,
+                "detect_duplicates": journal.header["detect_duplicates"],
+                "io_workers": io_workers
+            }
+            self._apply_plan(plan, options, results, callback, journal)
+        finally:
+            journal.close()
+
+        results["timings"]["total"] = time.perf_counter() - started
         return results
 
+    def undo_organization(self, journal_path, callback=None, io_workers=8):
+        """
+        Reverse an organize run from its journal
+
+        Finished operations are reversed on a pool of io_workers threads:
+        moved files are moved back, copies and sidecar files are deleted.
+        Tags and duplicate index entries of the placed files are then
+        removed in bulk, and directories the run created are removed when
+        empty. A copy that replaced an older duplicate cannot be reversed
+        and is skipped.
+
+        Args:
+            journal_path: Journal of the run (results["journal_path"])
+            callback: Optional callback function for progress updates, takes (current, total, filename)
+            io_workers: Number of file operations run concurrently
+
+        Returns:
+            Dictionary with 'undone_files', 'skipped_files', 'error_files',
+            their '*_file_paths' lists and 'timings'
+        """
+        started = time.perf_counter()
+        journal = OrganizeJournal.load(journal_path)
+        move = journal.header["move"]
+
+        results = {
+            "undone_files": 0,
+            "skipped_files": 0,
+            "error_files": 0,
+            "undone_file_paths": [],
+            "skipped_file_paths": [],
+            "error_file_paths": [],
+            "timings": {}
+        }
+        if journal.undone:
+            self.logger.info(f"{journal_path} was already undone")
+            return results
+
+        operations = [journal.operations[index] for index in journal.completed()]
+        outcomes = [None] * len(operations)
+        try:
+            if operations:
+                workers = max(1, min(io_workers, len(operations)))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="undo") as executor:
+                    futures = {executor.submit(self._undo_operation, operation, move): index
+                               for index, operation in enumerate(operations)}
+                    for done, future in enumerate(as_completed(futures), 1):
+                        index = futures[future]
+                        try:
+                            outcomes[index] = future.result()
+                        except Exception as e:
+                            self.logger.error(
+                                f"Error undoing {operations[index]['target']}: {str(e)}")
+                            outcomes[index] = "error"
+                        if callback:
+                            callback(done, len(operations),
+                                     f"Undone {done}/{len(operations)}: {os.path.basename(operations[index]['target'])}")
+            results["timings"]["transfer"] = time.perf_counter() - started
+
+            undone = [operation for operation, outcome in zip(operations, outcomes) if outcome == "undone"]
+            for operation, outcome in zip(operations, outcomes):
+                if outcome == "undone":
+                    results["undone_files"] += 1
+                    results["undone_file_paths"].append(operation["source"])
+                elif outcome == "error":
+                    results["error_files"] += 1
+                    results["error_file_paths"].append(operation["target"])
+                else:
+                    results["skipped_files"] += 1
+                    results["skipped_file_paths"].append(operation["target"])
+
+            phase_started = time.perf_counter()
+            self.tag_manager.clear_file_tags(
+                [operation["target"] for operation in undone if operation["tags"]])
+            if journal.header["detect_duplicates"]:
+                self.duplicate_detector.index.remove(
+                    [operation["target"] for operation in undone if operation["kind"] != "duplicate"])
+            results["timings"]["tags"] = time.perf_counter() - phase_started
+
+            # Deepest first, so emptied parents can go too
+            for directory in sorted(journal.directories, key=len, reverse=True):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    pass
+
+            if not results["error_files"]:
+                journal.mark_undone()
+        finally:
+            journal.close()
+
+        results["timings"]["total"] = time.perf_counter() - started
+        return results
+
+    def _undo_operation(self, operation, move):
+        """
+        Reverse one finished operation
+
+        Args:
+            operation: Journaled operation
+            move: The run moved files instead of copying them
+
+        Returns:
+            'undone', 'missing' (the placed file is gone) or 'irreversible'
+
+        Raises:
+            FileExistsError: If a moved file's original path is taken again
+        """
+        if not move and operation["kind"] == "replace":
+            return "irreversible"
+        if not os.path.exists(operation["target"]):
+            return "missing"
+
+        if move and os.path.exists(operation["source"]):
+            raise FileExistsError(f"{operation['source']} exists again")
+
+        for sidecar_path, _ in operation["sidecars"]:
+            if os.path.exists(sidecar_path):
+                os.unlink(sidecar_path)
+
+        if move:
+            os.makedirs(os.path.dirname(operation["source"]), exist_ok=True)
+            self.file_transfer.move(operation["target"], operation["source"])
+        else:
+            os.unlink(operation["target"])
+        return "undone"
+
     def _get_default_target_path(self, file_info, target_dir, options):
         """
         Get the default target path for a file based on its analysis
@@ -372,25 +870,27 @@ class FileOrganizer:
         # Default to file type organization
         return os.path.join(images_dir, "Other", file_name)
 
-    def _generate_summary_file(self, file_info, target_path, options):
+    def _render_summary(self, file_info, target_path):
         """
-        Generate a summary file for the organized file
+        Render the content of a file's summary file
 
         Args:
             file_info: Dictionary with file information and analysis
-            target_path: Path where the file was organized to
-            options: Organization options
+            target_path: Path where the file is organized to
+
+        Returns:
+            Markdown summary, or None if the file gets no summary
         """
         # Skip for image files unless they have text content
         if file_info.get("is_image", False) and not file_info.get("image_analysis", {}).get("text", ""):
-            return
+            return None
 
         # Get AI analysis
         ai_analysis = file_info.get("ai_analysis", {})
 
         # Skip if no analysis available
         if not ai_analysis:
-            return
+            return None
 
         # Create summary content
         summary_content = f"# Summary for {os.path.basename(target_path)}\n\n"
@@ -424,21 +924,18 @@ class FileOrganizer:
         if "sentiment" in ai_analysis:
             summary_content += f"## Sentiment\n\n{ai_analysis['sentiment']}\n\n"
 
-        # Write summary file
-        summary_path = os.path.splitext(target_path)[0] + "_summary.md"
-        try:
-            with open(summary_path, "w", encoding="utf-8") as f:
-                f.write(summary_content)
-        except Exception as e:
-            self.logger.error(f"Error creating summary file: {str(e)}")
+        return summary_content
 
-    def _generate_metadata_file(self, file_info, target_path):
+    def _render_metadata(self, file_info, target_path):
         """
-        Generate a metadata file for the organized file
+        Build the content of a file's metadata file
 
         Args:
             file_info: Dictionary with file information and analysis
-            target_path: Path where the file was organized to
+            target_path: Path where the file is organized to
+
+        Returns:
+            Metadata dictionary
         """
         # Create metadata content
         metadata = {
@@ -480,22 +977,18 @@ class FileOrganizer:
                 "text": image_analysis.get("text", "")
             }
 
-        # Write metadata file
-        metadata_path = os.path.splitext(target_path)[0] + "_metadata.json"
-        try:
-            with open(metadata_path, "w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"Error creating metadata file: {str(e)}")
+        return metadata
 
-    def _apply_tags(self, file_info, target_path, suggest_tags=False):
+    def _get_tags(self, file_info, suggest_tags=False):
         """
-        Apply tags to the organized file
+        Collect the tags for an organized file
 
         Args:
             file_info: Dictionary with file information and analysis
-            target_path: Path where the file was organized to
             suggest_tags: Whether to suggest tags based on content
+
+        Returns:
+            List of (tag name, confidence) tuples
         """
         tags = []
 
@@ -524,26 +1017,27 @@ class FileOrganizer:
                 for label in file_info["image_analysis"]["labels"][:5]:
                     tags.append(label)
 
+        tags = [(tag, 1.0) for tag in tags]
+
         # Suggest additional tags if enabled
         if suggest_tags:
             if "ai_analysis" in file_info:
-                # Extract keywords from summary
+                # Match existing tags against the summary
                 if "summary" in file_info["ai_analysis"]:
                     summary = file_info["ai_analysis"]["summary"]
-                    suggested_tags = self.tag_manager.extract_tags_from_text(
-                        summary)
-                    tags.extend(suggested_tags)
+                    suggestions = self.tag_manager.get_tag_suggestions(
+                        {"summary": summary})
+                    tags.extend((suggestion["name"], suggestion["confidence"])
+                                for suggestion in suggestions)
 
                 # Add entities as tags
                 if "entities" in file_info["ai_analysis"]:
                     for entity_type, entities in file_info["ai_analysis"]["entities"].items():
                         # Add top 3 entities of each type
                         for entity in entities[:3]:
-                            tags.append(f"{entity_type}:{entity}")
+                            tags.append((f"{entity_type}:{entity}", 1.0))
 
-        # Apply tags to the file
-        if tags:
-            self.tag_manager.tag_file(target_path, tags)
+        return tags
 
     def _create_default_rules(self):
         """
@@ -0,0 +1,252 @@
+"""
+File Transfer Module for Smart File Organizer.
+Copies and moves files with the cheapest method the platform and file
+systems allow, falling back step by step:
+
+    move    os.replace() when source and target are on the same device
+            (no data is copied); otherwise a copy followed by unlinking
+            the source
+    copy    1. reflink          copy-on-write clone (Linux FICLONE; btrfs,
+                                XFS with reflink=1, ...), no data copied
+            2. copy_file_range  in-kernel copy, which NFS and some other
+                                file systems turn into a server-side copy
+            3. sendfile         in-kernel copy between two files (Linux)
+            4. buffered         read/write through one reused buffer
+
+A method that fails because the file systems do not support it is not
+tried again for the same pair of devices. Copies keep the source's
+permissions and timestamps (like shutil.copy2) and the size of every copy
+is checked. Counters of files, bytes, seconds and methods used are kept
+for throughput reporting.
+"""
+
+import os
+import sys
+import errno
+import shutil
+import logging
+import threading
+import time
+from typing import Dict, Optional, Any
+
+from .file_linking import FICLONE
+
+# Handle imports with graceful fallbacks
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows
+    FCNTL_AVAILABLE = False
+
+COPY_FILE_RANGE_AVAILABLE = hasattr(os, 'copy_file_range')
+
+# sendfile() only accepts a regular file as output on Linux
+SENDFILE_AVAILABLE = hasattr(os, 'sendfile') and sys.platform.startswith('linux')
+
+# Errors meaning "not supported here" rather than a failed copy
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTTY,
+                      errno.EOPNOTSUPP, getattr(errno, 'ENOTSUP', errno.EOPNOTSUPP)}
+
+# Largest request passed to one copy_file_range() / sendfile() call
+MAX_KERNEL_CHUNK = 1 << 30
+
+METHODS = ('rename', 'reflink', 'copy_file_range', 'sendfile', 'buffered')
+
+
+class FileTransfer:
+    """Copies and moves files with zero-copy fast paths and throughput counters."""
+
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        Initialize the transfer with configuration.
+
+        Args:
+            config: Transfer settings
+        """
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+
+        self.settings = {
+            'block_size': 1024 * 1024,     # Buffer size of the buffered copy
+            'reflink': True,               # Try copy-on-write clones
+            'copy_file_range': True,       # Try the in-kernel copy_file_range()
+            'sendfile': True,              # Try the in-kernel sendfile()
+            'verify_size': True            # Check the size of every copy
+        }
+        self.settings.update({k: v for k, v in self.config.items() if v is not None})
+
+        # (method, source device, target device) that reported "not supported"
+        self._unsupported = set()
+
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reset the transfer counters."""
+        with self._lock:
+            self.files = 0
+            self.bytes = 0           # Bytes placed at the targets
+            self.bytes_copied = 0    # Bytes actually copied (not renamed or cloned)
+            self.seconds = 0.0       # Time spent in transfers, summed over threads
+            self.methods = dict.fromkeys(METHODS, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the transfer counters.
+
+        Returns:
+            Dictionary with 'files', 'bytes', 'bytes_copied', 'seconds',
+            'bytes_per_second' and 'methods' (files per method)
+        """
+        with self._lock:
+            return {
+                'files': self.files,
+                'bytes': self.bytes,
+                'bytes_copied': self.bytes_copied,
+                'seconds': self.seconds,
+                'bytes_per_second': self.bytes / self.seconds if self.seconds else 0.0,
+                'methods': dict(self.methods)
+            }
+
+    def copy(self, source: str, target: str) -> str:
+        """
+        Copy a file with its permissions and timestamps (like shutil.copy2).
+
+        Args:
+            source: File to copy
+            target: Path of the copy (overwritten if it exists)
+
+        Returns:
+            Method used ('reflink', 'copy_file_range', 'sendfile' or 'buffered')
+
+        Raises:
+            OSError: If the copy fails or its size does not match the source
+        """
+        started = time.perf_counter()
+        size, method = self._copy(source, target)
+        self._record(method, size, started)
+        return method
+
+    def move(self, source: str, target: str) -> str:
+        """
+        Move a file, renaming it when possible (like shutil.move).
+
+        Args:
+            source: File to move
+            target: New path (overwritten if it exists)
+
+        Returns:
+            Method used ('rename' or the copy method)
+        """
+        started = time.perf_counter()
+        if os.path.isdir(source) or os.path.islink(source):
+            shutil.move(source, target, copy_function=self.copy)
+            return 'rename'
+
+        try:
+            size = os.stat(source).st_size
+            os.replace(source, target)
+            method = 'rename'
+        except OSError:
+            # Different devices (or a rename the platform refuses): copy, then unlink
+            size, method = self._copy(source, target)
+            os.unlink(source)
+
+        self._record(method, size, started)
+        return method
+
+    def _copy(self, source: str, target: str):
+        """Copy data and metadata; returns (size, method)."""
+        with open(source, 'rb', buffering=0) as src, open(target, 'wb', buffering=0) as dst:
+            st = os.fstat(src.fileno())
+            devices = (st.st_dev, os.fstat(dst.fileno()).st_dev)
+            try:
+                method = self._copy_data(src, dst, st.st_size, devices)
+                copied = os.fstat(dst.fileno()).st_size
+            except BaseException:
+                dst.close()
+                os.unlink(target)
+                raise
+
+        if self.settings['verify_size'] and copied != st.st_size:
+            os.unlink(target)
+            raise OSError(errno.EIO, f"Copy of {source} has {copied} of {st.st_size} bytes", target)
+
+        shutil.copystat(source, target)
+        return st.st_size, method
+
+    def _copy_data(self, src, dst, size: int, devices) -> str:
+        """Copy the content with the first supported method."""
+        if self.settings['reflink'] and FCNTL_AVAILABLE and self._supported('reflink', devices):
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return 'reflink'
+            except OSError as e:
+                self._unsupported_or_raise('reflink', devices, e)
+
+        if self.settings['copy_file_range'] and COPY_FILE_RANGE_AVAILABLE \
+                and self._supported('copy_file_range', devices):
+            try:
+                self._kernel_copy(src, dst, size, lambda count, offset: os.copy_file_range(
+                    src.fileno(), dst.fileno(), count, offset, offset))
+                return 'copy_file_range'
+            except OSError as e:
+                self._unsupported_or_raise('copy_file_range', devices, e)
+                self._rewind(src, dst)
+
+        if self.settings['sendfile'] and SENDFILE_AVAILABLE and self._supported('sendfile', devices):
+            try:
+                self._kernel_copy(src, dst, size, lambda count, offset: os.sendfile(
+                    dst.fileno(), src.fileno(), offset, count))
+                return 'sendfile'
+            except OSError as e:
+                self._unsupported_or_raise('sendfile', devices, e)
+                self._rewind(src, dst)
+
+        buffer = bytearray(self.settings['block_size'])
+        view = memoryview(buffer)
+        while True:
+            n = src.readinto(buffer)
+            if not n:
+                return 'buffered'
+            written = 0
+            while written < n:
+                written += dst.write(view[written:n])
+
+    @staticmethod
+    def _kernel_copy(src, dst, size: int, copy_chunk) -> None:
+        """Call copy_chunk(count, source offset) until size bytes are copied."""
+        offset = 0
+        while offset < size:
+            n = copy_chunk(min(size - offset, MAX_KERNEL_CHUNK), offset)
+            if n == 0:   # Source shrank; the size check reports it
+                break
+            offset += n
+
+    @staticmethod
+    def _rewind(src, dst) -> None:
+        """Start over after a method failed part way."""
+        src.seek(0)
+        dst.seek(0)
+        dst.truncate()
+
+    def _supported(self, method: str, devices) -> bool:
+        return (method,) + devices not in self._unsupported
+
+    def _unsupported_or_raise(self, method: str, devices, error: OSError) -> None:
+        """Remember that a method is not supported between two devices, or re-raise a real error."""
+        if error.errno not in UNSUPPORTED_ERRNOS:
+            raise error
+        self.logger.debug(f"{method} not supported between devices {devices}: {error}")
+        with self._lock:
+            self._unsupported.add((method,) + devices)
+
+    def _record(self, method: str, size: int, started: float) -> None:
+        """Update the counters after a transfer."""
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            if method not in ('rename', 'reflink'):
+                self.bytes_copied += size
+            self.seconds += time.perf_counter() - started
+            self.methods[method] += 1
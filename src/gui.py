@@ -426,7 +426,7 @@ class DocumentOrganizerApp:
         self.dup_action_label = ttk.Label(
             self.dup_options_frame, text="Action:")
         self.dup_action_combo = ttk.Combobox(self.dup_options_frame, textvariable=self.duplicate_action_var,
-                                             values=["report", "move", "delete"], width=10)
+                                             values=["report", "move", "delete", "hardlink", "reflink"], width=10)
         self.dup_action_combo.current(0)  # Default to "report"
 
         # Duplicate strategy
@@ -520,8 +520,9 @@ class DocumentOrganizerApp:
         self.adv_search_label = ttk.Label(
             self.search_options_frame, text="Search query:")
         self.adv_search_var = tk.StringVar()
-        self.adv_search_entry = ttk.Entry(
+        self.adv_search_entry = ttk.Combobox(
             self.search_options_frame, textvariable=self.adv_search_var, width=40)
+        self.adv_search_entry.bind("<KeyRelease>", self.update_search_suggestions)
 
         # File type filter
         self.file_type_label = ttk.Label(
@@ -591,7 +592,7 @@ class DocumentOrganizerApp:
         # Add scrollbars to search treeview
         self.search_tree_yscroll = ttk.Scrollbar(self.search_results_frame, orient="vertical",
                                                  command=self.search_tree.yview)
-        self.search_tree.configure(yscrollcommand=self.search_tree_yscroll.set)
+        self.search_tree.configure(yscrollcommand=self.on_search_tree_scroll)
 
         # Bind search treeview selection
         self.search_tree.bind("<<TreeviewSelect>>",
@@ -1075,6 +1076,12 @@ class DocumentOrganizerApp:
                 elif message_type == "update_files":
                     self.update_file_list(message)
 
+                elif message_type == "search_page":
+                    self.add_search_page(*message)
+
+                elif message_type == "search_suggestions":
+                    self.show_search_suggestions(*message)
+
                 elif message_type == "error":
                     messagebox.showerror("Error", message)
                     self.running = False
@@ -2241,6 +2248,10 @@ class DocumentOrganizerApp:
         if action == "delete":
             if not messagebox.askyesno("Confirm", "Are you sure you want to delete duplicate files? This cannot be undone."):
                 return
+        elif action in ("hardlink", "reflink"):
+            if not messagebox.askyesno("Confirm", f"Replace verified duplicates with {action}s to the kept file? "
+                                                  "Every path stays in place, but the copies will share one file."):
+                return
 
         # Update status
         self.status_var.set(f"Handling duplicates ({action})...")
@@ -2279,6 +2290,39 @@ class DocumentOrganizerApp:
             self.queue.put(("complete", None))
 
     # Advanced search methods
+    def update_search_suggestions(self, event=None):
+        """Offer matching file names as the search query is typed"""
+        if event is not None and event.keysym in ("Return", "Escape", "Up", "Down"):
+            return
+
+        # Look up suggestions once typing pauses, not on every key
+        pending = getattr(self, "suggestion_after_id", None)
+        if pending:
+            self.root.after_cancel(pending)
+        self.suggestion_after_id = self.root.after(200, self.start_suggestion_lookup)
+
+    def start_suggestion_lookup(self):
+        """Start looking up suggestions for the current query"""
+        self.suggestion_after_id = None
+        suggestion_thread = threading.Thread(
+            target=self.suggestion_thread, args=(self.adv_search_var.get(),))
+        suggestion_thread.daemon = True
+        suggestion_thread.start()
+
+    def suggestion_thread(self, query):
+        """Thread for looking up search suggestions"""
+        try:
+            suggestions = self.search_engine.suggest(query, limit=10)
+            self.queue.put(("search_suggestions", (query, suggestions)))
+        except Exception as e:
+            logger.error(f"Error getting search suggestions: {str(e)}")
+
+    def show_search_suggestions(self, query, suggestions):
+        """Show suggestions unless the query has changed since they were requested"""
+        if query != self.adv_search_var.get():
+            return
+        self.adv_search_entry["values"] = [s["file_name"] for s in suggestions]
+
     def perform_advanced_search(self):
         """Perform advanced search with filters"""
         query = self.adv_search_var.get()
@@ -2323,6 +2367,12 @@ class DocumentOrganizerApp:
         # Clear existing items
         for item in self.search_tree.get_children():
             self.search_tree.delete(item)
+        self.search_results = {"results": []}
+        self.search_query = (query, filters)
+        self.search_next_cursor = None
+        self.search_loading = True
+        # Pages still in flight for an earlier query are dropped when they arrive
+        self.search_generation = getattr(self, "search_generation", 0) + 1
 
         # Update status
         self.status_var.set("Searching...")
@@ -2333,34 +2383,76 @@ class DocumentOrganizerApp:
         self.cancel_requested = False
 
         search_thread = threading.Thread(
-            target=self.search_thread, args=(query, filters))
+            target=self.search_thread, args=(query, filters, self.search_generation))
         search_thread.daemon = True
         search_thread.start()
 
-    def search_thread(self, query, filters):
-        """Thread for performing search"""
+    def search_thread(self, query, filters, generation, cursor=None):
+        """Thread for fetching one page of search results"""
+        delivered = False
         try:
-            # Perform search
-            results = self.search_engine.search(query, filters=filters)
+            # Fetch a single page; more pages are requested when the user scrolls
+            page = self.search_engine.search_page(
+                query, filters=filters, page_size=50, cursor=cursor)
 
             if self.cancel_requested:
                 self.queue.put(("cancelled", None))
             else:
-                self.queue.put(("search_results", results))
+                self.queue.put(("search_page", (generation, page)))
+                delivered = True   # add_search_page clears search_loading
         except Exception as e:
             logger.error(f"Error searching: {str(e)}")
             self.queue.put(("error", str(e)))
         finally:
+            # A cancelled or failed fetch must not block loading further pages,
+            # unless a newer search has started its own fetch meanwhile
+            if not delivered and generation == self.search_generation:
+                self.search_loading = False
             self.queue.put(("complete", None))
 
+    def on_search_tree_scroll(self, first, last):
+        """Update the scrollbar and fetch the next page near the end of the results"""
+        self.search_tree_yscroll.set(first, last)
+
+        if (float(last) >= 0.95 and getattr(self, "search_next_cursor", None)
+                and not getattr(self, "search_loading", False)):
+            self.search_loading = True
+            query, filters = self.search_query
+            search_thread = threading.Thread(
+                target=self.search_thread,
+                args=(query, filters, self.search_generation, self.search_next_cursor))
+            search_thread.daemon = True
+            search_thread.start()
+
+    def add_search_page(self, generation, page):
+        """Append a page of search results to the results tree"""
+        if generation != self.search_generation:
+            return
+
+        for result in page["results"]:
+            if self.search_tree.exists(str(result["id"])):
+                continue
+            self.search_results["results"].append(result)
+            self.search_tree.insert("", tk.END, iid=str(result["id"]), values=(
+                result["file_name"],
+                result.get("category") or "",
+                result.get("extension") or "",
+                get_readable_size(result.get("size") or 0)
+            ))
+
+        self.search_next_cursor = page["next_cursor"]
+        self.search_loading = False
+
+        if "total" in page:
+            self.status_var.set(f"Found {page['total']} matching files")
+
     def show_search_result_details(self, event=None):
         """Show details of the selected search result"""
         selection = self.search_tree.selection()
         if not selection:
             return
 
-        item = selection[0]
-        file_id = self.search_tree.item(item, "values")[0]
+        file_id = selection[0]
 
         # Get search result
         search_results = getattr(self, "search_results", {})
@@ -2377,12 +2469,12 @@ class DocumentOrganizerApp:
             return
 
         # Show details
-        details = f"File: {result['filename']}\n"
+        details = f"File: {result['file_name']}\n"
         details += "=" * 40 + "\n\n"
-        details += f"Path: {result['path']}\n"
+        details += f"Path: {result['file_path']}\n"
         details += f"Category: {result['category']}\n"
         details += f"Type: {result['extension']}\n"
-        details += f"Size: {result['size_formatted']}\n"
+        details += f"Size: {get_readable_size(result.get('size') or 0)}\n"
         details += f"Created: {result.get('created_time_formatted', 'Unknown')}\n"
         details += f"Modified: {result.get('modified_time_formatted', 'Unknown')}\n\n"
 
@@ -3805,20 +3897,23 @@ class DocumentOrganizerApp:
                 "Test Rule", f"Error creating test rule: {str(e)}")
             return
 
-        # Test rule against analyzed files
-        matching_files = []
-        for file_info in self.analyzed_files:
-            if temp_rule.matches(file_info):
-                matching_files.append(file_info)
+        # Test rule against analyzed files in one batch (statistics untouched)
+        preview_manager = OrganizationRuleManager()
+        preview_manager.add_rule(temp_rule)
+        preview = preview_manager.plan(
+            self.analyzed_files, self.target_dir.get(), update_stats=False)
+        matches = [(file_info, target_path)
+                   for file_info, (target_path, rule) in zip(self.analyzed_files, preview["targets"])
+                   if rule is not None]
 
         # Show results
-        if matching_files:
-            result_text = f"Rule matches {len(matching_files)} files:\n\n"
-            for file_info in matching_files[:10]:  # Show first 10 matches
-                result_text += f"- {file_info['file_name']}\n"
+        if matches:
+            result_text = f"Rule matches {len(matches)} files:\n\n"
+            for file_info, target_path in matches[:10]:  # Show first 10 matches
+                result_text += f"- {file_info['file_name']} -> {target_path}\n"
 
-            if len(matching_files) > 10:
-                result_text += f"\n... and {len(matching_files) - 10} more files"
+            if len(matches) > 10:
+                result_text += f"\n... and {len(matches) - 10} more files"
 
             messagebox.showinfo("Test Rule Results", result_text)
         else:
@@ -0,0 +1,397 @@
+"""
+Hash Cache Module for Smart File Organizer.
+Persists file content digests in SQLite so every feature that needs a
+file's content identity (duplicate detection, the search index, media
+analysis caches, cloud sync) computes it at most once.
+
+Entries are keyed by (device, inode) and stored with the size and the
+nanosecond modification time the digest was computed for. A lookup stats the
+file and only returns digests whose size and mtime still match, so entries
+invalidate themselves when a file changes; a renamed file keeps its entry.
+
+Two digests are kept per file: the quick sample hash and the full content
+hash computed by FileHasher. The scheme (algorithm and sample size) is stored
+with each entry, and entries from another scheme are treated as missing.
+
+Other per-file signatures (perceptual image hashes and the like) are kept in a
+second table under a kind name that includes their parameters, with the same
+stat validation.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple, Any
+
+# Stat fields identifying one version of a file
+StatKey = Tuple[int, int, int, int]   # (device, inode, size, mtime_ns)
+
+DIGEST_KINDS = ('quick', 'full')
+
+# Row-value lookups per statement (SQLite's default variable limit is 32766)
+LOOKUP_CHUNK_SIZE = 2000
+
+
+def stat_key(file_path: str) -> Optional[StatKey]:
+    """
+    Get the cache key of a file's current version.
+
+    Returns:
+        (device, inode, size, mtime_ns), or None if the file cannot be stat'ed
+        or the file system does not provide inode numbers
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    if not st.st_ino:
+        return None
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class HashCache:
+    """SQLite-backed cache of file digests, validated by stat information."""
+
+    def __init__(self, config: Optional[Dict] = None):
+        """Initialize the cache with configuration."""
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+
+        if os.name == 'nt':  # Windows
+            db_dir = os.path.join(os.path.expanduser("~"), "AppData", "Local", "AIDocumentOrganizer")
+        else:  # macOS/Linux
+            db_dir = os.path.join(os.path.expanduser("~"), ".config", "AIDocumentOrganizer")
+
+        self.db_path = self.config.get('db_path') or os.path.join(db_dir, "file_hashes.db")
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._initialize_database()
+
+    def _initialize_database(self) -> None:
+        """Create the digest table."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # WAL lets readers in other features and processes work during writes
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    device INTEGER,
+                    inode INTEGER,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    scheme TEXT,
+                    quick_hash TEXT,
+                    full_hash TEXT,
+                    path TEXT,
+                    updated REAL,
+                    PRIMARY KEY (device, inode)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS file_signatures (
+                    device INTEGER,
+                    inode INTEGER,
+                    kind TEXT,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    value BLOB,
+                    path TEXT,
+                    PRIMARY KEY (device, inode, kind)
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_many(self, paths: List[str], scheme: str,
+                 keys: Optional[Dict[str, StatKey]] = None) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Look up the digests of many files.
+
+        Args:
+            paths: File paths
+            scheme: Digest scheme the entries must have been computed with
+            keys: Stat keys already taken for (some of) the paths
+
+        Returns:
+            Dictionary mapping each path with a valid entry to its 'quick' and
+            'full' digests (either may be None if it was never computed)
+        """
+        keys = dict(keys or {})
+        for path in paths:
+            if path not in keys:
+                keys[path] = stat_key(path)
+
+        by_inode = {}
+        for path in paths:
+            key = keys[path]
+            if key is not None:
+                by_inode.setdefault((key[0], key[1]), []).append(path)
+
+        found = {}
+        inodes = list(by_inode)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for start in range(0, len(inodes), LOOKUP_CHUNK_SIZE):
+                chunk = inodes[start:start + LOOKUP_CHUNK_SIZE]
+                values = ', '.join('(?, ?)' for _ in chunk)
+                params = [value for inode in chunk for value in inode]
+                rows = conn.execute(f'''
+                    SELECT device, inode, size, mtime_ns, scheme, quick_hash, full_hash
+                    FROM file_hashes WHERE (device, inode) IN (VALUES {values})
+                ''', params).fetchall()
+
+                for device, inode, size, mtime_ns, row_scheme, quick, full in rows:
+                    for path in by_inode[(device, inode)]:
+                        if keys[path][2:] == (size, mtime_ns) and row_scheme == scheme:
+                            found[path] = {'quick': quick, 'full': full}
+        finally:
+            conn.close()
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(paths) - len(found)
+        return found
+
+    def get(self, file_path: str, scheme: str, kind: str = 'full') -> Optional[str]:
+        """
+        Look up one digest of a file.
+
+        Args:
+            file_path: Path to the file
+            scheme: Digest scheme the entry must have been computed with
+            kind: 'quick' or 'full'
+
+        Returns:
+            The digest, or None if it is not cached for the file's current version
+        """
+        return self.get_many([file_path], scheme).get(file_path, {}).get(kind)
+
+    def put_many(self, entries: List[Tuple[str, StatKey, str, str]], scheme: str) -> int:
+        """
+        Store digests of many files.
+
+        The stat key should be taken before the file is read, so a file that
+        changes while it is hashed gets an entry that no longer validates.
+
+        Args:
+            entries: (path, stat key, kind, digest) tuples, kind being 'quick' or 'full'
+            scheme: Digest scheme the digests were computed with
+
+        Returns:
+            Number of entries stored
+        """
+        rows = []
+        now = time.time()
+        for path, key, kind, digest in entries:
+            if key is None or digest is None:
+                continue
+            if kind not in DIGEST_KINDS:
+                raise ValueError(f"Unknown digest kind: {kind}")
+            rows.append((kind, key[0], key[1], key[2], key[3], scheme, path, now, digest))
+
+        if not rows:
+            return 0
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            for kind in DIGEST_KINDS:
+                column = f'{kind}_hash'
+                other = 'full_hash' if kind == 'quick' else 'quick_hash'
+                # A new file version (size or mtime changed) drops the other digest
+                conn.executemany(f'''
+                    INSERT INTO file_hashes (device, inode, size, mtime_ns, scheme, path, updated, {column})
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(device, inode) DO UPDATE SET
+                        {other} = CASE WHEN size = excluded.size AND mtime_ns = excluded.mtime_ns
+                                        AND scheme = excluded.scheme
+                                       THEN {other} END,
+                        size = excluded.size,
+                        mtime_ns = excluded.mtime_ns,
+                        scheme = excluded.scheme,
+                        path = excluded.path,
+                        updated = excluded.updated,
+                        {column} = excluded.{column}
+                ''', [row[1:] for row in rows if row[0] == kind])
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+    def get_signatures(self, paths: List[str], kind: str,
+                       keys: Optional[Dict[str, StatKey]] = None) -> Dict[str, Any]:
+        """
+        Look up a derived signature of many files.
+
+        Args:
+            paths: File paths
+            kind: Signature kind, including its parameters (e.g. 'phash/16')
+            keys: Stat keys already taken for (some of) the paths
+
+        Returns:
+            Dictionary mapping each path with a valid entry to its signature
+        """
+        keys = dict(keys or {})
+        by_inode = {}
+        for path in paths:
+            key = keys[path] if path in keys else stat_key(path)
+            keys[path] = key
+            if key is not None:
+                by_inode.setdefault((key[0], key[1]), []).append(path)
+
+        found = {}
+        inodes = list(by_inode)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for start in range(0, len(inodes), LOOKUP_CHUNK_SIZE):
+                chunk = inodes[start:start + LOOKUP_CHUNK_SIZE]
+                values = ', '.join('(?, ?)' for _ in chunk)
+                params = [value for inode in chunk for value in inode]
+                rows = conn.execute(f'''
+                    SELECT device, inode, size, mtime_ns, value FROM file_signatures
+                    WHERE kind = ? AND (device, inode) IN (VALUES {values})
+                ''', [kind] + params).fetchall()
+
+                for device, inode, size, mtime_ns, value in rows:
+                    for path in by_inode[(device, inode)]:
+                        if keys[path][2:] == (size, mtime_ns):
+                            found[path] = value
+        finally:
+            conn.close()
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(paths) - len(found)
+        return found
+
+    def put_signatures(self, entries: List[Tuple[str, StatKey, Any]], kind: str) -> int:
+        """
+        Store a derived signature of many files.
+
+        Args:
+            entries: (path, stat key taken before reading, signature) tuples
+            kind: Signature kind, including its parameters
+
+        Returns:
+            Number of entries stored
+        """
+        rows = [(key[0], key[1], kind, key[2], key[3], value, path)
+                for path, key, value in entries if key is not None and value is not None]
+        if not rows:
+            return 0
+
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.executemany('''
+                INSERT OR REPLACE INTO file_signatures (device, inode, kind, size, mtime_ns, value, path)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+    def invalidate(self, paths: List[str]) -> int:
+        """
+        Drop the entries of files (for example before rewriting them in place).
+
+        Returns:
+            Number of entries removed
+        """
+        keys = [key for key in (stat_key(path) for path in paths) if key is not None]
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            cursor = conn.executemany('DELETE FROM file_hashes WHERE device = ? AND inode = ?',
+                                      [key[:2] for key in keys])
+            removed = cursor.rowcount
+            conn.executemany('DELETE FROM file_signatures WHERE device = ? AND inode = ?',
+                             [key[:2] for key in keys])
+            conn.commit()
+            return removed
+        finally:
+            conn.close()
+
+    def prune(self) -> int:
+        """
+        Remove entries whose file no longer exists or has changed.
+
+        Returns:
+            Number of entries removed
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            rows = conn.execute('SELECT device, inode, size, mtime_ns, path FROM file_hashes').fetchall()
+            stale = [(device, inode) for device, inode, size, mtime_ns, path in rows
+                     if stat_key(path) != (device, inode, size, mtime_ns)]
+            conn.executemany('DELETE FROM file_hashes WHERE device = ? AND inode = ?', stale)
+
+            rows = conn.execute(
+                'SELECT device, inode, kind, size, mtime_ns, path FROM file_signatures').fetchall()
+            stale_signatures = [(device, inode, kind) for device, inode, kind, size, mtime_ns, path in rows
+                                if stat_key(path) != (device, inode, size, mtime_ns)]
+            conn.executemany('DELETE FROM file_signatures WHERE device = ? AND inode = ? AND kind = ?',
+                             stale_signatures)
+            conn.commit()
+            return len(stale) + len(stale_signatures)
+        finally:
+            conn.close()
+
+    def clear(self) -> bool:
+        """Remove all entries."""
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                conn.execute('DELETE FROM file_hashes')
+                conn.execute('DELETE FROM file_signatures')
+                conn.commit()
+            finally:
+                conn.close()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error clearing hash cache: {e}")
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the number of entries and the hit/miss counters of this instance."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            entries, full = conn.execute(
+                'SELECT COUNT(*), COUNT(full_hash) FROM file_hashes').fetchone()
+            signatures = conn.execute('SELECT COUNT(*) FROM file_signatures').fetchone()[0]
+        finally:
+            conn.close()
+
+        total = self.hits + self.misses
+        return {
+            'entries': entries,
+            'full_hashes': full,
+            'signatures': signatures,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+
+def get_hash_cache(db_path: Optional[str] = None) -> HashCache:
+    """
+    Get the process-wide hash cache for a database path.
+
+    Args:
+        db_path: Database path (defaults to the shared per-user database)
+
+    Returns:
+        HashCache instance shared by all callers using the same path
+    """
+    with _shared_lock:
+        if db_path not in _shared_caches:
+            _shared_caches[db_path] = HashCache({'db_path': db_path})
+        return _shared_caches[db_path]
@@ -0,0 +1,353 @@
+"""
+Local Embedder Module for Smart File Organizer.
+Provides an offline, dependency-light text embedding backend for semantic
+search: feature-hashed TF-IDF vectors reduced with a randomized truncated SVD.
+
+The model is fitted incrementally. Document frequencies and a reservoir sample
+of hashed documents are updated on every partial_fit() call, and the SVD basis
+is refitted whenever the corpus has grown enough. Until enough documents have
+been seen, a fixed seeded random projection is used instead, which keeps the
+cosine similarity of the hashed term vectors.
+
+Each fitted basis is a model version. Versions are saved as .npz artifacts in
+the model directory, and embeddings are only comparable within one version.
+"""
+
+import os
+import re
+import zlib
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Handle imports with graceful fallbacks
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+TOKEN_PATTERN = re.compile(r'\w\w+')
+
+
+class LocalEmbedder:
+    """Embeds text with hashed TF-IDF features and a truncated SVD projection."""
+
+    MODEL_NAME = 'local-tfidf-svd'
+    STATE_FILE = 'state.npz'
+
+    def __init__(self, config: Optional[Dict] = None):
+        """Initialize the embedder with configuration."""
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+
+        self.settings = {
+            'n_features': 2 ** 14,
+            'embedding_dim': 384,
+            'sample_size': 1024,          # Documents kept for fitting the SVD
+            'min_fit_documents': None,    # Defaults to twice the embedding dimension
+            'refit_growth': 2.0,          # Refit when the corpus grows by this factor
+            'power_iterations': 2,
+            'oversampling': 10,
+            'token_cache_size': 200000,
+            'seed': 42,
+            'model_dir': os.path.join('src', 'cache', 'embeddings', 'embedder')
+        }
+        self.settings.update({k: v for k, v in self.config.items() if v is not None})
+
+        self.n_features = self.settings['n_features']
+        self.embedding_dim = self.settings['embedding_dim']
+        self.min_fit_documents = self.settings['min_fit_documents'] or 2 * self.embedding_dim
+        self.model_dir = self.settings['model_dir']
+
+        # Token -> feature and sign cache
+        self._token_cache = {}
+
+        self.reset()
+        self.load()
+
+    @property
+    def model_id(self) -> str:
+        """Identifier of the current model version."""
+        return f"{self.MODEL_NAME}-v{self.version}"
+
+    def reset(self) -> None:
+        """Forget all fitted state."""
+        self.version = 0
+        self.doc_count = 0
+        self.docs_at_fit = 0
+        self._df = np.zeros(self.n_features, dtype=np.float64)
+        self._sample = []
+        self._rng = np.random.default_rng(self.settings['seed'])
+
+        # Transform parameters of the current version
+        self._idf = None
+        self._components = None
+        self._projection = None
+        self._random_projection = None
+
+    def partial_fit(self, texts: List[str]) -> bool:
+        """
+        Update corpus statistics with new documents, refitting the model if due.
+
+        Args:
+            texts: Document texts
+
+        Returns:
+            True if a new model version was fitted
+        """
+        sample_size = self.settings['sample_size']
+
+        for cols, vals in self._hash_texts(texts):
+            self._df[cols] += 1
+            self.doc_count += 1
+
+            # Reservoir sampling keeps a uniform sample of all documents seen
+            if len(self._sample) < sample_size:
+                self._sample.append((cols, vals))
+            else:
+                j = int(self._rng.integers(0, self.doc_count))
+                if j < sample_size:
+                    self._sample[j] = (cols, vals)
+
+        if self._refit_due():
+            self.fit()
+            return True
+        return False
+
+    def fit(self) -> None:
+        """Fit a new SVD basis on the current sample."""
+        doc_count = max(self.doc_count, 1)
+        idf = (np.log((1.0 + doc_count) / (1.0 + self._df)) + 1.0).astype(np.float32)
+
+        matrix = self._dense(self._sample)
+        matrix *= idf
+        self._normalize(matrix)
+
+        self._idf = idf
+        self._projection = None
+        self._components = self._randomized_svd(matrix, min(self.embedding_dim, len(self._sample)))
+        self.version += 1
+        self.docs_at_fit = self.doc_count
+
+        self.logger.info(f"Fitted embedding model {self.model_id} on {len(self._sample)} documents")
+        self.save()
+
+    def transform(self, texts: List[str]) -> 'np.ndarray':
+        """
+        Embed texts with the current model version.
+
+        Documents are projected directly from their sparse hashed vectors, so
+        the cost grows with the number of distinct terms rather than with
+        n_features.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            L2-normalized float32 matrix (len(texts) x embedding_dim)
+        """
+        embeddings = np.zeros((len(texts), self.embedding_dim), dtype=np.float32)
+        if self._components is not None:
+            projection = self._get_projection()
+            width = self._components.shape[0]
+        else:
+            projection = self._get_random_projection()
+            width = self.embedding_dim
+
+        for i, (cols, vals) in enumerate(self._hash_texts(texts)):
+            if len(cols) == 0:
+                continue
+            if self._idf is not None:
+                vals = vals * self._idf[cols]
+            embeddings[i, :width] = vals @ projection[cols]
+
+        self._normalize(embeddings)
+        return embeddings
+
+    def save(self) -> bool:
+        """Save corpus statistics and the current model version to the model directory."""
+        try:
+            os.makedirs(self.model_dir, exist_ok=True)
+
+            offsets = np.cumsum([0] + [len(cols) for cols, _ in self._sample])
+            cols = np.concatenate([c for c, _ in self._sample]) if self._sample else np.empty(0, np.int32)
+            vals = np.concatenate([v for _, v in self._sample]) if self._sample else np.empty(0, np.float32)
+
+            self._save_npz(self.STATE_FILE,
+                           n_features=self.n_features, embedding_dim=self.embedding_dim,
+                           version=self.version, doc_count=self.doc_count, docs_at_fit=self.docs_at_fit,
+                           df=self._df, sample_cols=cols, sample_vals=vals, sample_offsets=offsets)
+
+            if self._components is not None:
+                model_file = self._model_file(self.version)
+                if not os.path.exists(os.path.join(self.model_dir, model_file)):
+                    self._save_npz(model_file, version=self.version,
+                                   idf=self._idf, components=self._components)
+                self._remove_old_models()
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error saving embedding model: {e}")
+            return False
+
+    def load(self) -> bool:
+        """Load corpus statistics and the current model version from the model directory."""
+        state_path = os.path.join(self.model_dir, self.STATE_FILE)
+        if not os.path.exists(state_path):
+            return False
+
+        try:
+            with np.load(state_path) as state:
+                if int(state['n_features']) != self.n_features or \
+                        int(state['embedding_dim']) != self.embedding_dim:
+                    self.logger.warning("Embedding model settings changed - starting a new model")
+                    return False
+
+                version = int(state['version'])
+                idf = components = None
+                if version > 0:
+                    with np.load(os.path.join(self.model_dir, self._model_file(version))) as model:
+                        idf = model['idf']
+                        components = model['components']
+
+                offsets = state['sample_offsets']
+                cols, vals = state['sample_cols'], state['sample_vals']
+
+                self.version = version
+                self.doc_count = int(state['doc_count'])
+                self.docs_at_fit = int(state['docs_at_fit'])
+                self._df = state['df']
+                self._sample = [(cols[offsets[i]:offsets[i + 1]], vals[offsets[i]:offsets[i + 1]])
+                                for i in range(len(offsets) - 1)]
+                self._idf = idf
+                self._components = components
+                self._projection = None
+                self._rng = np.random.default_rng(self.settings['seed'] + self.doc_count)
+
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error loading embedding model: {e}")
+            self.reset()
+            return False
+
+    def clear(self) -> None:
+        """Reset the model and delete its artifacts."""
+        self.reset()
+        if os.path.isdir(self.model_dir):
+            for file in os.listdir(self.model_dir):
+                if file.endswith('.npz'):
+                    os.remove(os.path.join(self.model_dir, file))
+
+    def _refit_due(self) -> bool:
+        """Check whether the corpus has grown enough to fit a new basis."""
+        if len(self._sample) < self.min_fit_documents:
+            return False
+        if self._components is None:
+            return True
+        return self.doc_count >= self.docs_at_fit * self.settings['refit_growth']
+
+    def _hash_texts(self, texts: List[str]) -> List[Tuple['np.ndarray', 'np.ndarray']]:
+        """
+        Hash texts into sparse signed sublinear term-frequency vectors.
+
+        Returns:
+            List of (feature indices, values) per text
+        """
+        rows = []
+
+        for text in texts:
+            counts = Counter(TOKEN_PATTERN.findall(text.lower()))
+            if not counts:
+                rows.append((np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)))
+                continue
+
+            codes = list(map(self._token_cache.get, counts))
+            if None in codes:
+                codes = [self._hash_token(token) if code is None else code
+                         for token, code in zip(counts, codes)]
+            codes = np.array(codes, dtype=np.int64)
+            tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            values = (1.0 + np.log(tf)) * np.where(codes & 1, 1.0, -1.0).astype(np.float32)
+
+            # Sum the values of tokens that collide on the same feature
+            features, inverse = np.unique(codes >> 1, return_inverse=True)
+            rows.append((features.astype(np.int32),
+                         np.bincount(inverse, weights=values).astype(np.float32)))
+
+        return rows
+
+    def _hash_token(self, token: str) -> int:
+        """Map a token to its feature index (high bits) and sign (low bit), and cache it."""
+        if len(self._token_cache) >= self.settings['token_cache_size']:
+            self._token_cache.clear()
+        token_hash = zlib.crc32(token.encode('utf-8'))
+        code = ((token_hash % self.n_features) << 1) | (token_hash >> 31)
+        self._token_cache[token] = code
+        return code
+
+    def _dense(self, rows: List[Tuple['np.ndarray', 'np.ndarray']]) -> 'np.ndarray':
+        """Expand sparse rows into a dense float32 matrix."""
+        matrix = np.zeros((len(rows), self.n_features), dtype=np.float32)
+        for i, (cols, vals) in enumerate(rows):
+            matrix[i, cols] = vals
+        return matrix
+
+    @staticmethod
+    def _normalize(matrix: 'np.ndarray') -> None:
+        """L2-normalize the rows of a matrix in place."""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+
+    def _randomized_svd(self, matrix: 'np.ndarray', rank: int) -> 'np.ndarray':
+        """
+        Compute the top right singular vectors of a matrix (Halko et al.).
+
+        Returns:
+            float32 matrix (rank x n_features)
+        """
+        rng = np.random.default_rng(self.settings['seed'] + self.version)
+        n_components = min(rank + self.settings['oversampling'], min(matrix.shape))
+
+        omega = rng.standard_normal((matrix.shape[1], n_components)).astype(np.float32)
+        basis, _ = np.linalg.qr(matrix @ omega)
+        for _ in range(self.settings['power_iterations']):
+            basis, _ = np.linalg.qr(matrix.T @ basis)
+            basis, _ = np.linalg.qr(matrix @ basis)
+
+        _, _, vt = np.linalg.svd(basis.T @ matrix, full_matrices=False)
+        return np.ascontiguousarray(vt[:rank], dtype=np.float32)
+
+    def _get_projection(self) -> 'np.ndarray':
+        """SVD components laid out feature-major for row gathers."""
+        if self._projection is None:
+            self._projection = np.ascontiguousarray(self._components.T)
+        return self._projection
+
+    def _get_random_projection(self) -> 'np.ndarray':
+        """Seeded Gaussian projection used before the first fit."""
+        if self._random_projection is None:
+            rng = np.random.default_rng(self.settings['seed'])
+            self._random_projection = (rng.standard_normal((self.n_features, self.embedding_dim))
+                                       / np.sqrt(self.embedding_dim)).astype(np.float32)
+        return self._random_projection
+
+    def _model_file(self, version: int) -> str:
+        """File name of a model version artifact."""
+        return f"model_v{version}.npz"
+
+    def _save_npz(self, file_name: str, **arrays) -> None:
+        """Write an .npz file atomically."""
+        path = os.path.join(self.model_dir, file_name)
+        temp_path = path + '.tmp.npz'
+        np.savez(temp_path, **arrays)
+        os.replace(temp_path, path)
+
+    def _remove_old_models(self) -> None:
+        """Delete artifacts of model versions older than the previous one."""
+        for file in os.listdir(self.model_dir):
+            match = re.fullmatch(r'model_v(\d+)\.npz', file)
+            if match and int(match.group(1)) < self.version - 1:
+                os.remove(os.path.join(self.model_dir, file))
@@ -0,0 +1,311 @@
+"""
+MinHash Module for Smart File Organizer.
+Finds near-duplicate documents by the Jaccard similarity of their word shingles.
+
+Each text is reduced to its set of shingles (runs of shingle_size words),
+hashed to 32 bits. A MinHash signature keeps, for each of num_perm random
+hash functions, the minimum hash over the set; the fraction of positions in
+which two signatures agree estimates the Jaccard similarity of the sets.
+Signatures are computed with NumPy over all shingles at once (in column
+chunks to bound memory) and stored per file in the shared HashCache.
+
+Locality-sensitive hashing splits signatures into bands of rows. Documents
+sharing any band land in the same bucket and become a candidate pair, so
+candidates are found in near-linear time; the number of bands and rows is
+chosen so that pairs around the similarity threshold are likely to collide.
+Candidates are then verified against the threshold with the signature
+estimate.
+"""
+
+import re
+import zlib
+import logging
+from functools import lru_cache
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set, Tuple, Any
+
+from .hash_cache import HashCache, stat_key
+
+# Handle imports with graceful fallbacks
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Odd 64-bit multiplier used to combine word hashes into shingle hashes
+SHINGLE_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+@lru_cache(maxsize=32)
+def optimal_bands(threshold: float, num_perm: int,
+                  false_negative_weight: float = 0.95) -> Tuple[int, int]:
+    """
+    Choose the LSH banding for a similarity threshold.
+
+    Picks the (bands, rows) with bands * rows <= num_perm that minimizes the
+    weighted probability mass of false positives below the threshold and
+    false negatives above it. Candidates are verified afterwards, so false
+    negatives (missed duplicates) are weighted much more heavily by default.
+
+    Args:
+        threshold: Jaccard similarity that should produce candidates
+        num_perm: Signature length
+        false_negative_weight: Weight of false negatives (false positives get the rest)
+
+    Returns:
+        (bands, rows)
+    """
+    below = np.linspace(0.0, threshold, 101)
+    above = np.linspace(threshold, 1.0, 101)
+
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positive = (1 - (1 - below ** rows) ** bands).mean() * threshold
+            false_negative = ((1 - above ** rows) ** bands).mean() * (1 - threshold)
+            error = (1 - false_negative_weight) * false_positive + false_negative_weight * false_negative
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashLSH:
+    """Banded LSH index over MinHash signatures."""
+
+    def __init__(self, threshold: float, num_perm: int):
+        """
+        Initialize an empty index.
+
+        Args:
+            threshold: Jaccard similarity that should produce candidates
+            num_perm: Signature length
+        """
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self.buckets = [defaultdict(list) for _ in range(self.bands)]
+
+    def band_keys(self, signature) -> List[bytes]:
+        """Split a signature into the bucket keys of its bands."""
+        return [signature[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def insert(self, key: Any, signature) -> None:
+        """Add a signature under a key."""
+        for bucket, band_key in zip(self.buckets, self.band_keys(signature)):
+            bucket[band_key].append(key)
+
+    def query(self, signature) -> Set[Any]:
+        """Get the keys sharing at least one band with a signature."""
+        candidates = set()
+        for bucket, band_key in zip(self.buckets, self.band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+        return candidates
+
+    def candidate_pairs(self) -> Set[Tuple[Any, Any]]:
+        """Get all pairs of keys sharing at least one band."""
+        pairs = set()
+        for bucket in self.buckets:
+            for keys in bucket.values():
+                for i in range(len(keys)):
+                    for j in range(i + 1, len(keys)):
+                        pairs.add((keys[i], keys[j]))
+        return pairs
+
+
+class MinHasher:
+    """Shingling and MinHash signatures with per-file caching."""
+
+    def __init__(self, config: Optional[Dict] = None, cache: Optional[HashCache] = None):
+        """
+        Initialize the hasher with configuration.
+
+        Args:
+            config: MinHash settings
+            cache: Optional persistent hash cache
+        """
+        self.config = config or {}
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+        self.settings = {
+            'num_perm': 128,        # Signature length
+            'shingle_size': 3,      # Words per shingle
+            'seed': 1,              # Seed of the hash functions
+            'chunk_size': 4096      # Shingles processed per vectorized step
+        }
+        self.settings.update({k: v for k, v in self.config.items() if v is not None})
+
+        self.num_perm = self.settings['num_perm']
+        self.kind = f"minhash/{self.settings['shingle_size']}/{self.num_perm}/{self.settings['seed']}"
+
+        # Multiply-shift hash functions: h(x) = (a * x + b) mod 2^64 >> 32, with a odd
+        rng = np.random.default_rng(self.settings['seed'])
+        self._a = rng.integers(0, 2 ** 63, self.num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, self.num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str):
+        """
+        Get the distinct 32-bit shingle hashes of a text.
+
+        Returns:
+            Sorted uint64 array of shingle hashes (empty for texts without words)
+        """
+        words = WORD_PATTERN.findall(text.lower())
+        if not words:
+            return np.zeros(0, dtype=np.uint64)
+
+        word_ids = {word: zlib.crc32(word.encode('utf-8')) for word in set(words)}
+        hashes = np.fromiter((word_ids[word] for word in words), dtype=np.uint64, count=len(words))
+
+        k = min(self.settings['shingle_size'], len(hashes))
+        shingles = hashes[:len(hashes) - k + 1].copy()
+        multiplier = np.uint64(SHINGLE_MULTIPLIER)
+        for offset in range(1, k):
+            shingles = shingles * multiplier + hashes[offset:len(hashes) - k + 1 + offset]
+
+        shingles = (shingles ^ (shingles >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+        return np.unique(shingles)
+
+    def signature(self, text: str):
+        """
+        Compute the MinHash signature of a text.
+
+        Returns:
+            uint32 array of num_perm minimums, or None for texts without words
+        """
+        shingles = self.shingles(text)
+        if not len(shingles):
+            return None
+
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        a, b = self._a[:, None], self._b[:, None]
+        chunk_size = self.settings['chunk_size']
+        for start in range(0, len(shingles), chunk_size):
+            chunk = shingles[None, start:start + chunk_size]
+            values = (a * chunk + b) >> np.uint64(32)
+            np.minimum(signature, values.min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+    def signatures(self, items: List[Any], text_of: Callable[[Any], str],
+                   path_of: Callable[[Any], str] = lambda item: item['file_path'],
+                   source: str = 'text') -> List[Any]:
+        """
+        Get the signatures of many files, using the cache where possible.
+
+        Args:
+            items: File dictionaries (or other items)
+            text_of: Function returning the text of an item; only called on cache misses
+            path_of: Function returning the file path of an item
+            source: Name of the text source (e.g. 'text' or 'ocr'), part of the cache kind
+
+        Returns:
+            Signatures in item order (None for items without text)
+        """
+        paths = [path_of(item) for item in items]
+        kind = f"{self.kind}/{source}"
+        keys = {}
+        cached = {}
+        if self.cache is not None:
+            keys = {path: stat_key(path) for path in paths}
+            cached = self.cache.get_signatures(paths, kind, keys)
+
+        signatures = []
+        computed = []
+        for item, path in zip(items, paths):
+            if path in cached:
+                signatures.append(np.frombuffer(cached[path], dtype=np.uint32))
+                continue
+            try:
+                signature = self.signature(text_of(item) or '')
+            except Exception as e:
+                self.logger.warning(f"Error computing MinHash for {path}: {e}")
+                signature = None
+            signatures.append(signature)
+            if signature is not None:
+                computed.append((path, keys.get(path), signature.tobytes()))
+
+        if self.cache is not None:
+            self.cache.put_signatures(computed, kind)
+        return signatures
+
+    @staticmethod
+    def jaccard(a, b) -> float:
+        """Estimate the Jaccard similarity of two signatures."""
+        return float(np.count_nonzero(a == b)) / len(a)
+
+    def group_similar(self, items: List[Any], threshold: float, text_of: Callable[[Any], str],
+                      path_of: Callable[[Any], str] = lambda item: item['file_path'],
+                      source: str = 'text') -> List[List[Any]]:
+        """
+        Group items whose estimated Jaccard similarity reaches a threshold.
+
+        Groups are the connected components of the verified candidate pairs.
+
+        Args:
+            items: File dictionaries (or other items)
+            threshold: Minimum estimated Jaccard similarity
+            text_of: Function returning the text of an item
+            path_of: Function returning the file path of an item
+            source: Name of the text source, part of the cache kind
+
+        Returns:
+            Groups of two or more similar items, in input order
+        """
+        signatures = self.signatures(items, text_of, path_of, source)
+
+        lsh = MinHashLSH(threshold, self.num_perm)
+        for i, signature in enumerate(signatures):
+            if signature is not None:
+                lsh.insert(i, signature)
+
+        parent = list(range(len(items)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in lsh.candidate_pairs():
+            if self.jaccard(signatures[i], signatures[j]) >= threshold:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        groups = {}
+        for i, signature in enumerate(signatures):
+            if signature is not None:
+                groups.setdefault(find(i), []).append(items[i])
+        return [group for group in groups.values() if len(group) > 1]
+
+    def find_similar(self, item: Any, candidates: List[Any], threshold: float,
+                     text_of: Callable[[Any], str],
+                     path_of: Callable[[Any], str] = lambda item: item['file_path'],
+                     source: str = 'text') -> List[Tuple[Any, float]]:
+        """
+        Find the candidates similar to one item.
+
+        Args:
+            item: File dictionary (or other item) to check
+            candidates: Items to compare against
+            threshold: Minimum estimated Jaccard similarity
+            text_of: Function returning the text of an item
+            path_of: Function returning the file path of an item
+            source: Name of the text source, part of the cache kind
+
+        Returns:
+            (candidate, similarity) pairs, most similar first
+        """
+        target, *signatures = self.signatures([item] + list(candidates), text_of, path_of, source)
+        if target is None:
+            return []
+
+        lsh = MinHashLSH(threshold, self.num_perm)
+        for i, signature in enumerate(signatures):
+            if signature is not None:
+                lsh.insert(i, signature)
+
+        matches = [(candidates[i], self.jaccard(target, signatures[i])) for i in lsh.query(target)]
+        return sorted((match for match in matches if match[1] >= threshold),
+                      key=lambda match: match[1], reverse=True)
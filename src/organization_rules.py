@@ -2,12 +2,21 @@ import os
 import re
 import json
 import datetime
+import time
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Union, Callable, Pattern
 import logging
 
 logger = logging.getLogger("AIDocumentOrganizer")
 
+# Attributes that decide which files a rule matches and where they go;
+# setting one invalidates compiled rule sets
+RULE_DEFINITION_ATTRIBUTES = frozenset(
+    ["enabled", "priority", "rule_type", "condition", "target_path_template"])
+
+TEMPLATE_PLACEHOLDER = re.compile(r'\{([^}]+)\}')
+UNSAFE_PATH_CHARS = re.compile(r'[<>:"/\\|?*]')
+
 
 class OrganizationRule:
     """
@@ -33,6 +42,9 @@ class OrganizationRule:
     OP_BETWEEN = "between"
     OP_EXISTS = "exists"           # Field exists
 
+    # Incremented whenever a rule definition changes (see __setattr__)
+    revision = 0
+
     def __init__(self, rule_id=None, name=None, description=None, enabled=True):
         """
         Initialize a new organization rule
@@ -66,6 +78,14 @@ class OrganizationRule:
         self.application_count = 0  # How many times the rule has been applied
         self.success_count = 0  # How many successful applications
 
+        # Compiled target path template (template string, render function)
+        self._template = None
+
+    def __setattr__(self, name, value):
+        if name in RULE_DEFINITION_ATTRIBUTES:
+            OrganizationRule.revision += 1
+        object.__setattr__(self, name, value)
+
     def _generate_id(self):
         """
         Generate a unique rule ID
@@ -368,74 +388,11 @@ class OrganizationRule:
             return None
 
         try:
-            # Start with the template
-            path = self.target_path_template
-
-            # Replace placeholders with values from file_info
-            placeholders = re.findall(r'\{([^}]+)\}', path)
-
-            for placeholder in placeholders:
-                # Handle special placeholders
-                if placeholder == "year":
-                    # Use modified_time to get year
-                    modified_time = file_info.get("modified_time", 0)
-                    year = datetime.datetime.fromtimestamp(modified_time).year
-                    path = path.replace(f"{{{placeholder}}}", str(year))
-
-                elif placeholder == "month":
-                    # Use modified_time to get month
-                    modified_time = file_info.get("modified_time", 0)
-                    month = datetime.datetime.fromtimestamp(
-                        modified_time).month
-                    path = path.replace(f"{{{placeholder}}}", f"{month:02d}")
-
-                elif placeholder == "day":
-                    # Use modified_time to get day
-                    modified_time = file_info.get("modified_time", 0)
-                    day = datetime.datetime.fromtimestamp(modified_time).day
-                    path = path.replace(f"{{{placeholder}}}", f"{day:02d}")
-
-                elif placeholder == "file_type":
-                    # Use file_type directly
-                    file_type = file_info.get("file_type", "Unknown")
-                    path = path.replace(f"{{{placeholder}}}", file_type)
-
-                elif placeholder == "category":
-                    # Try to get category from AI analysis
-                    category = self._get_nested_field(
-                        file_info, "ai_analysis.category")
-                    if category:
-                        path = path.replace(f"{{{placeholder}}}", category)
-                    else:
-                        path = path.replace(
-                            f"{{{placeholder}}}", "Uncategorized")
-
-                elif placeholder == "camera_make":
-                    # Try to get camera make from image metadata
-                    camera_make = self._get_nested_field(
-                        file_info, "metadata.camera_make")
-                    if camera_make:
-                        path = path.replace(f"{{{placeholder}}}", camera_make)
-                    else:
-                        path = path.replace(f"{{{placeholder}}}", "Unknown")
-
-                else:
-                    # Try to get the value from file_info
-                    value = self._get_nested_field(file_info, placeholder)
-                    if value is not None:
-                        if isinstance(value, (int, float, bool)):
-                            value = str(value)
-                        if isinstance(value, str):
-                            # Sanitize the value for use in a path
-                            value = re.sub(r'[<>:"/\\|?*]', '_', value)
-                            path = path.replace(f"{{{placeholder}}}", value)
-                        else:
-                            # For non-string values, use a default
-                            path = path.replace(
-                                f"{{{placeholder}}}", "Unknown")
-                    else:
-                        # If the value is not found, use a default
-                        path = path.replace(f"{{{placeholder}}}", "Unknown")
+            # Templates are parsed once and re-parsed only when they change
+            if self._template is None or self._template[0] != self.target_path_template:
+                self._template = (self.target_path_template,
+                                  compile_path_template(self.target_path_template))
+            path = self._template[1](file_info)
 
             # Combine with base directory
             full_path = os.path.join(base_dir, path)
@@ -508,6 +465,302 @@ class OrganizationRule:
         return rule
 
 
+def field_getter(field_path):
+    """
+    Build an accessor for a dot-separated field path
+
+    Equivalent to OrganizationRule._get_nested_field with the path split
+    once up front.
+
+    Args:
+        field_path: Dot-separated path to the field
+
+    Returns:
+        Function taking a dictionary and returning the field value or None
+    """
+    if not field_path:
+        return lambda data: None
+
+    parts = tuple(field_path.split("."))
+    if len(parts) == 1:
+        key = parts[0]
+        return lambda data: data.get(key) if isinstance(data, dict) else None
+
+    def get(data):
+        value = data
+        for part in parts:
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                return None
+        return value
+
+    return get
+
+
+def compile_path_template(template):
+    """
+    Parse a target path template into a render function
+
+    Placeholders are substituted as in OrganizationRule.generate_target_path:
+    {year}, {month} and {day} from modified_time, {file_type}, {category}
+    (default "Uncategorized"), {camera_make} (default "Unknown") and any
+    other dot-separated field (sanitized for use in a path, default
+    "Unknown").
+
+    Args:
+        template: Template string for the target path
+
+    Returns:
+        Function taking a file information dictionary and returning the
+        relative target path
+    """
+    parts = []
+    needs_date = False
+    position = 0
+    for match in TEMPLATE_PLACEHOLDER.finditer(template):
+        parts.append(template[position:match.start()])
+        placeholder = match.group(1)
+        needs_date = needs_date or placeholder in ("year", "month", "day")
+        parts.append(_placeholder_renderer(placeholder))
+        position = match.end()
+    parts.append(template[position:])
+    parts = [part for part in parts if part != ""]
+
+    def render(file_info):
+        date = None
+        if needs_date:
+            date = datetime.datetime.fromtimestamp(file_info.get("modified_time", 0))
+        return "".join(part if isinstance(part, str) else part(file_info, date)
+                       for part in parts)
+
+    return render
+
+
+def _placeholder_renderer(placeholder):
+    """Render function (file_info, modified date) for one template placeholder."""
+    if placeholder == "year":
+        return lambda file_info, date: str(date.year)
+    if placeholder == "month":
+        return lambda file_info, date: f"{date.month:02d}"
+    if placeholder == "day":
+        return lambda file_info, date: f"{date.day:02d}"
+    if placeholder == "file_type":
+        return lambda file_info, date: file_info.get("file_type", "Unknown")
+    if placeholder == "category":
+        get_category = field_getter("ai_analysis.category")
+        return lambda file_info, date: get_category(file_info) or "Uncategorized"
+    if placeholder == "camera_make":
+        get_camera_make = field_getter("metadata.camera_make")
+        return lambda file_info, date: get_camera_make(file_info) or "Unknown"
+
+    get_value = field_getter(placeholder)
+
+    def render(file_info, date):
+        value = get_value(file_info)
+        if isinstance(value, (int, float, bool)):
+            value = str(value)
+        if isinstance(value, str):
+            # Sanitize the value for use in a path
+            return UNSAFE_PATH_CHARS.sub('_', value)
+        return "Unknown"
+
+    return render
+
+
+class CompiledRuleSet:
+    """
+    Enabled rules compiled for fast matching
+
+    Conditions are compiled once: field paths into accessors, regular
+    expressions into pattern objects, substring needles lowercased. Each
+    field is read once per file however many rules test it. Equality and
+    existence conditions are answered by hash-map lookups per field; the
+    remaining conditions are evaluated in priority order, only until the
+    caller has the match it needs.
+
+    iter_matches() yields the same rules, in the same priority order, as
+    calling OrganizationRule.matches on every rule from get_sorted_rules().
+    """
+
+    # Kinds of evaluated conditions
+    _CONTAINS = 0           # Substring (or list membership), case sensitive
+    _CONTAINS_NOCASE = 1    # Substring against the lowercased value
+    _TEST = 2               # Any other precompiled test function
+
+    def __init__(self, rules):
+        """
+        Compile rules
+
+        Args:
+            rules: OrganizationRule instances in priority order
+        """
+        self.rules = []
+        self.getters = []       # Field accessor per field index
+        self.exists = []        # (field index, [ranks]) of OP_EXISTS rules
+        self.equals = []        # (field index, {value: [ranks]}) of OP_EQUALS rules
+        self.evaluated = []     # (rank, field index, kind, payload) in rank order
+
+        fields = {}
+        exists = {}
+        equals = {}
+        for rule in rules:
+            if not rule.enabled or not rule.condition:
+                continue
+            field_path = rule.condition.get("field", "")
+            if field_path not in fields:
+                fields[field_path] = len(self.getters)
+                self.getters.append(field_getter(field_path))
+            field = fields[field_path]
+
+            compiled = self._compile_condition(rule)
+            if compiled is None:
+                continue
+            rank = len(self.rules)
+            self.rules.append(rule)
+
+            kind, payload = compiled
+            if kind == "exists":
+                exists.setdefault(field, []).append(rank)
+            elif kind == "equals":
+                equals.setdefault(field, {}).setdefault(payload, []).append(rank)
+            else:
+                self.evaluated.append((rank, field, kind, payload))
+
+        self.exists = list(exists.items())
+        self.equals = list(equals.items())
+
+    def _compile_condition(self, rule):
+        """
+        Compile a rule's condition
+
+        Returns:
+            ("exists", None), ("equals", value) or (kind, payload) for an
+            evaluated condition; None if the rule can never match
+        """
+        condition = rule.condition
+        operator = condition.get("operator", "")
+        value = condition.get("value")
+
+        if operator == OrganizationRule.OP_EXISTS:
+            return ("exists", None)
+
+        if operator == OrganizationRule.OP_EQUALS:
+            try:
+                hash(value)
+                return ("equals", value)
+            except TypeError:
+                return (self._TEST, lambda field_value: field_value == value)
+
+        if operator == OrganizationRule.OP_CONTAINS:
+            if isinstance(value, str):
+                if condition.get("case_sensitive", False):
+                    return (self._CONTAINS, (value, value))
+                return (self._CONTAINS_NOCASE, (value, value.lower()))
+            return (self._TEST, lambda field_value: isinstance(field_value, list) and value in field_value)
+
+        if operator == OrganizationRule.OP_REGEX:
+            flags = 0 if condition.get("case_sensitive", False) else re.IGNORECASE
+            try:
+                search = re.compile(condition.get("pattern", ""), flags).search
+            except re.error as e:
+                logger.error(f"Error matching rule {rule.rule_id}: {str(e)}")
+                return None
+            return (self._TEST, lambda field_value: isinstance(field_value, str)
+                    and search(field_value) is not None)
+
+        if operator in (OrganizationRule.OP_GREATER, OrganizationRule.OP_LESS):
+            if not isinstance(value, (int, float)):
+                return None
+            if operator == OrganizationRule.OP_GREATER:
+                return (self._TEST, lambda field_value: isinstance(field_value, (int, float))
+                        and field_value > value)
+            return (self._TEST, lambda field_value: isinstance(field_value, (int, float))
+                    and field_value < value)
+
+        if operator == OrganizationRule.OP_BETWEEN:
+            start = condition.get("start_date") or condition.get("start_value", float("-inf"))
+            end = condition.get("end_date") or condition.get("end_value", float("inf"))
+            return (self._TEST, lambda field_value: isinstance(field_value, (int, float))
+                    and start <= field_value <= end)
+
+        # Unknown operator
+        return None
+
+    def iter_matches(self, file_info):
+        """
+        Yield the rules matching a file, in priority order
+
+        Conditions are evaluated lazily: stopping after the first rule skips
+        every evaluated condition of lower priority.
+
+        Args:
+            file_info: Dictionary with file information
+
+        Yields:
+            Matching OrganizationRule instances
+        """
+        rules = self.rules
+        # A missing field (None) matches no condition, not even OP_EXISTS
+        values = [get(file_info) for get in self.getters]
+
+        found = []
+        for field, ranks in self.exists:
+            if values[field] is not None:
+                found.extend(ranks)
+        for field, buckets in self.equals:
+            value = values[field]
+            if value is not None:
+                try:
+                    found.extend(buckets.get(value, ()))
+                except TypeError:   # Unhashable field value
+                    pass
+        found.sort()
+
+        lowered = {}
+        next_found = 0
+        for rank, field, kind, payload in self.evaluated:
+            while next_found < len(found) and found[next_found] < rank:
+                yield rules[found[next_found]]
+                next_found += 1
+
+            value = values[field]
+            if value is None:
+                continue
+            try:
+                if kind == self._TEST:
+                    matched = payload(value)
+                elif isinstance(value, str):
+                    if kind == self._CONTAINS_NOCASE:
+                        if field not in lowered:
+                            lowered[field] = value.lower()
+                        matched = payload[1] in lowered[field]
+                    else:
+                        matched = payload[1] in value
+                else:
+                    matched = isinstance(value, list) and payload[0] in value
+            except Exception as e:
+                logger.error(f"Error matching rule {rules[rank].rule_id}: {str(e)}")
+                continue
+            if matched:
+                yield rules[rank]
+
+        for rank in found[next_found:]:
+            yield rules[rank]
+
+    def match(self, file_info):
+        """
+        Find all rules matching a file
+
+        Args:
+            file_info: Dictionary with file information
+
+        Returns:
+            Matching OrganizationRule instances in priority order
+        """
+        return list(self.iter_matches(file_info))
+
+
 class OrganizationRuleManager:
     """
     Class for managing organization rules
@@ -523,6 +776,10 @@ class OrganizationRuleManager:
         self.rules = []
         self.rules_file = rules_file
 
+        # Compiled enabled rules; rebuilt when rules are added, removed or changed
+        self._compiled = None
+        self._compiled_key = None
+
         # Load rules from file if provided
         if rules_file and os.path.exists(rules_file):
             self.load_rules(rules_file)
@@ -538,6 +795,7 @@ class OrganizationRuleManager:
             Added rule
         """
         self.rules.append(rule)
+        self.invalidate()
         return rule
 
     def get_rule(self, rule_id):
@@ -568,6 +826,7 @@ class OrganizationRuleManager:
         for i, existing_rule in enumerate(self.rules):
             if existing_rule.rule_id == rule.rule_id:
                 self.rules[i] = rule
+                self.invalidate()
                 return True
         return False
 
@@ -584,6 +843,7 @@ class OrganizationRuleManager:
         for i, rule in enumerate(self.rules):
             if rule.rule_id == rule_id:
                 del self.rules[i]
+                self.invalidate()
                 return True
         return False
 
@@ -614,6 +874,28 @@ class OrganizationRuleManager:
         rules = self.get_all_rules(enabled_only)
         return sorted(rules, key=lambda r: r.priority)
 
+    def compile_rules(self):
+        """
+        Get the enabled rules compiled for matching
+
+        The compiled set is cached and rebuilt after rules are added, updated,
+        deleted or loaded, or after any rule's condition, target path,
+        priority or enabled flag is set. Call invalidate() after changing a
+        condition dictionary in place.
+
+        Returns:
+            CompiledRuleSet instance
+        """
+        key = (OrganizationRule.revision, id(self.rules), len(self.rules))
+        if self._compiled is None or self._compiled_key != key:
+            self._compiled = CompiledRuleSet(self.get_sorted_rules(enabled_only=True))
+            self._compiled_key = key
+        return self._compiled
+
+    def invalidate(self):
+        """Drop the compiled rule set; the next apply_rules() recompiles it."""
+        self._compiled = None
+
     def save_rules(self, file_path=None):
         """
         Save rules to a JSON file
@@ -657,6 +939,7 @@ class OrganizationRuleManager:
 
             self.rules = [OrganizationRule.from_dict(
                 data) for data in rules_data]
+            self.invalidate()
             return True
         except Exception as e:
             logger.error(f"Error loading rules: {str(e)}")
@@ -728,23 +1011,154 @@ class OrganizationRuleManager:
         Returns:
             Tuple of (target_path, matching_rule) or (None, None) if no rule matches
         """
-        # Get sorted rules (by priority)
-        sorted_rules = self.get_sorted_rules(enabled_only=True)
+        # Matching rules in priority order
+        for rule in self.compile_rules().iter_matches(file_info):
+            # Update rule statistics
+            rule.application_count += 1
+            rule.last_applied = datetime.datetime.now().isoformat()
 
-        for rule in sorted_rules:
-            if rule.matches(file_info):
-                # Update rule statistics
-                rule.application_count += 1
-                rule.last_applied = datetime.datetime.now().isoformat()
+            # Generate target path
+            target_path = rule.generate_target_path(file_info, base_dir)
 
-                # Generate target path
-                target_path = rule.generate_target_path(file_info, base_dir)
+            if target_path:
+                rule.success_count += 1
+                return (target_path, rule)
+
+        return (None, None)
+
+    def plan(self, files, base_dir, update_stats=True):
+        """
+        Apply rules to a batch of files and determine their target paths
+
+        Each file gets the same target path and rule as apply_rules() would
+        give it. The rules are compiled once for the batch and rule
+        statistics are collected per batch (see record_stats()), after which
+        the rules file (if set) is saved once. Callers that may not apply
+        every target pass update_stats=False and record the hits of the
+        files they did organize.
 
+        Args:
+            files: List of file information dictionaries
+            base_dir: Base directory for the target paths
+            update_stats: Whether to add the hits to the rule statistics
+
+        Returns:
+            Dictionary with 'targets' (a (target_path, rule) tuple per file,
+            (None, None) if no rule matches), 'hits' (a (matched rules,
+            applied rule) tuple per file, for record_stats()), 'stats'
+            (rule ID -> {'name', 'matched', 'applied'}), 'matched_files',
+            'unmatched_files' and 'seconds'
+        """
+        started = time.perf_counter()
+        iter_matches = self.compile_rules().iter_matches
+
+        targets = []
+        hits = []
+        for file_info in files:
+            target = (None, None)
+            file_matches = []
+            for rule in iter_matches(file_info):
+                file_matches.append(rule)
+                target_path = rule.generate_target_path(file_info, base_dir)
                 if target_path:
-                    rule.success_count += 1
-                    return (target_path, rule)
+                    target = (target_path, rule)
+                    break
+            targets.append(target)
+            hits.append((tuple(file_matches), target[1]))
 
-        return (None, None)
+        matched, applied = self._count_hits(hits)
+        stats = {rule.rule_id: {"name": rule.name, "matched": count, "applied": applied.get(rule, 0)}
+                 for rule, count in matched.items()}
+
+        if update_stats and matched:
+            self.record_stats(hits)
+            if self.rules_file:
+                self.save_rules()
+
+        unmatched = sum(1 for target_path, rule in targets if rule is None)
+        return {
+            "targets": targets,
+            "hits": hits,
+            "stats": stats,
+            "matched_files": len(targets) - unmatched,
+            "unmatched_files": unmatched,
+            "seconds": time.perf_counter() - started
+        }
+
+    def record_stats(self, hits):
+        """
+        Add rule hits to the rule statistics
+
+        Every rule is updated once, with a single timestamp. The rules file
+        is not saved.
+
+        Args:
+            hits: (matched rules, applied rule or None) per file, as in the
+                'hits' of plan()
+        """
+        matched, applied = self._count_hits(hits)
+        now = datetime.datetime.now().isoformat()
+        for rule, count in matched.items():
+            rule.application_count += count
+            rule.success_count += applied.get(rule, 0)
+            rule.last_applied = now
+
+    @staticmethod
+    def _count_hits(hits):
+        """Count the files each rule matched and organized."""
+        matched = {}    # Rule -> files the rule matched
+        applied = {}    # Rule -> files organized by the rule
+        for file_matches, applied_rule in hits:
+            for rule in file_matches:
+                matched[rule] = matched.get(rule, 0) + 1
+            if applied_rule is not None:
+                applied[applied_rule] = applied.get(applied_rule, 0) + 1
+        return matched, applied
+
+    def benchmark(self, files, repeat=3):
+        """
+        Measure rule evaluation throughput of the compiled rule set against
+        calling OrganizationRule.matches on every sorted rule
+
+        Rule statistics are not updated.
+
+        Args:
+            files: List of file information dictionaries
+            repeat: Number of timed passes over the files (the best is kept)
+
+        Returns:
+            Dictionary with 'files', 'rules', 'compiled_files_per_second',
+            'reference_files_per_second', 'speedup' and 'agree' (both paths
+            chose the same first rule for every file)
+        """
+        def reference(file_info):
+            for rule in self.get_sorted_rules(enabled_only=True):
+                if rule.matches(file_info):
+                    return rule
+            return None
+
+        def compiled(file_info):
+            return next(self.compile_rules().iter_matches(file_info), None)
+
+        self.compile_rules()
+        rates = {}
+        chosen = {}
+        for name, first_match in (("reference", reference), ("compiled", compiled)):
+            best = float("inf")
+            for _ in range(max(1, repeat)):
+                started = time.perf_counter()
+                chosen[name] = [first_match(file_info) for file_info in files]
+                best = min(best, time.perf_counter() - started)
+            rates[name] = len(files) / best if best > 0 else float("inf")
+
+        return {
+            "files": len(files),
+            "rules": len(self.compile_rules().rules),
+            "compiled_files_per_second": rates["compiled"],
+            "reference_files_per_second": rates["reference"],
+            "speedup": rates["compiled"] / rates["reference"] if rates["reference"] else 0.0,
+            "agree": chosen["compiled"] == chosen["reference"]
+        }
 
     def create_rule_from_example(self, file_info, target_path, base_dir):
         """
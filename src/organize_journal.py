@@ -0,0 +1,267 @@
+"""
+Organize Journal Module for Smart File Organizer.
+Records every organize run as a compact operation journal, so a crashed or
+cancelled run can be resumed and a finished run can be undone.
+
+A journal is a JSON-lines file. It is written in full (header plus one
+line per planned operation) before any file is touched:
+
+    {"journal": 1, "target_dir": ..., "move": ..., "operations": N, ...}
+    {"op": 0, "kind": "organize", "source": ..., "target": ...,
+     "sidecars": [[path, content], ...], "tags": [[name, confidence], ...]}
+    ...
+
+Progress is appended as the run goes:
+
+    {"directories": [...]}          directories the run created
+    {"done": 0, "method": "rename"} operation finished (transfer method)
+    {"failed": 3, "error": ...}     operation failed
+    {"tags": true} / {"index": true} bulk tag and index updates finished
+    {"complete": true}              run finished
+    {"undone": true}                run was undone
+
+Appended lines are flushed one by one, so after a crash the journal names
+exactly the operations that still have to run.
+"""
+
+import os
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Any
+
+JOURNAL_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class OrganizeJournal:
+    """Operation journal of one organize run."""
+
+    def __init__(self, path: str, header: Dict[str, Any], operations: List[Dict[str, Any]]):
+        """
+        Initialize a journal; use create() or load() instead.
+
+        Args:
+            path: Journal file
+            header: Run settings
+            operations: Planned operations in plan order
+        """
+        self.path = path
+        self.header = header
+        self.operations = operations
+        self.directories = []
+        self.done = {}        # Operation index -> transfer method
+        self.failed = {}      # Operation index -> error message
+        self.tags_done = False
+        self.index_done = False
+        self.complete = False
+        self.undone = False
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def create(cls, directory: str, operations: List[Dict[str, Any]], target_dir: str,
+               move: bool, detect_duplicates: bool = False,
+               indexed_sources: Optional[List[str]] = None) -> 'OrganizeJournal':
+        """
+        Write the journal of a planned run before it starts.
+
+        Args:
+            directory: Directory holding the journals
+            operations: Planned operations ('kind', 'source', 'target',
+                'sidecars' and 'tags'; other keys are not journaled)
+            target_dir: Target directory of the run
+            move: Files are moved instead of copied
+            detect_duplicates: The run updates the duplicate index
+            indexed_sources: Sources indexed only for this run
+
+        Returns:
+            The journal
+        """
+        os.makedirs(directory, exist_ok=True)
+        created = time.time()
+        name = time.strftime('%Y%m%d-%H%M%S', time.localtime(created)) + f'-{uuid.uuid4().hex[:8]}.jsonl'
+        header = {
+            'journal': JOURNAL_VERSION,
+            'created': created,
+            'target_dir': target_dir,
+            'move': move,
+            'detect_duplicates': detect_duplicates,
+            'indexed_sources': sorted(indexed_sources or []),
+            'operations': len(operations)
+        }
+        operations = [{'kind': op['kind'], 'source': op['source'], 'target': op['target'],
+                       'sidecars': [list(sidecar) for sidecar in op.get('sidecars', [])],
+                       'tags': [list(tag) for tag in op.get('tags', [])]}
+                      for op in operations]
+
+        journal = cls(os.path.join(directory, name), header, operations)
+        temp_path = journal.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header) + '\n')
+            for index, op in enumerate(operations):
+                f.write(json.dumps({'op': index, **op}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, journal.path)
+        return journal
+
+    @classmethod
+    def load(cls, path: str) -> 'OrganizeJournal':
+        """
+        Read a journal, including the progress of its run.
+
+        A truncated last line (crash while appending) is ignored.
+
+        Args:
+            path: Journal file
+
+        Returns:
+            The journal
+
+        Raises:
+            ValueError: If the file is not an organize journal
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            header = {}
+        if header.get('journal') != JOURNAL_VERSION:
+            raise ValueError(f"{path} is not an organize journal")
+
+        journal = cls(path, header, [None] * header['operations'])
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Ignoring damaged journal line in {path}")
+                continue
+            if 'op' in record:
+                journal.operations[record.pop('op')] = record
+            elif 'done' in record:
+                journal.done[record['done']] = record['method']
+                journal.failed.pop(record['done'], None)
+            elif 'failed' in record:
+                journal.failed[record['failed']] = record['error']
+            elif 'directories' in record:
+                journal.directories.extend(record['directories'])
+            else:
+                journal.tags_done = journal.tags_done or record.get('tags', False)
+                journal.index_done = journal.index_done or record.get('index', False)
+                journal.complete = journal.complete or record.get('complete', False)
+                journal.undone = journal.undone or record.get('undone', False)
+
+        if any(op is None for op in journal.operations):
+            raise ValueError(f"{path} is missing planned operations")
+        return journal
+
+    @staticmethod
+    def list_journals(directory: str, unfinished_only: bool = False) -> List[str]:
+        """
+        Journals in a directory, newest first.
+
+        Args:
+            directory: Directory holding the journals
+            unfinished_only: Only journals of runs that did not complete
+
+        Returns:
+            Journal paths
+        """
+        if not os.path.isdir(directory):
+            return []
+
+        paths = sorted((os.path.join(directory, name) for name in os.listdir(directory)
+                        if name.endswith('.jsonl')), reverse=True)
+        if not unfinished_only:
+            return paths
+
+        unfinished = []
+        for path in paths:
+            try:
+                journal = OrganizeJournal.load(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable journal {path}: {e}")
+                continue
+            if not journal.complete and not journal.undone:
+                unfinished.append(path)
+        return unfinished
+
+    def pending(self) -> List[int]:
+        """Indexes of the operations that have not finished."""
+        return [index for index in range(len(self.operations)) if index not in self.done]
+
+    def completed(self) -> List[int]:
+        """Indexes of the finished operations, in plan order."""
+        return sorted(self.done)
+
+    def mark_directories(self, directories: List[str]) -> None:
+        """Record directories created by the run."""
+        self.directories.extend(directories)
+        self._append({'directories': directories})
+
+    def mark_done(self, index: int, method: str) -> None:
+        """Record a finished operation and its transfer method."""
+        self.done[index] = method
+        self.failed.pop(index, None)
+        self._append({'done': index, 'method': method})
+
+    def mark_failed(self, index: int, error: str) -> None:
+        """Record a failed operation."""
+        self.failed[index] = error
+        self._append({'failed': index, 'error': error})
+
+    def mark_tags(self) -> None:
+        """Record that the tags of the finished operations were written."""
+        self.tags_done = True
+        self._append({'tags': True})
+
+    def mark_index(self) -> None:
+        """Record that the duplicate index was updated."""
+        self.index_done = True
+        self._append({'index': True})
+
+    def mark_complete(self) -> None:
+        """Record the end of the run."""
+        self.complete = True
+        self._append({'complete': True}, sync=True)
+
+    def mark_undone(self) -> None:
+        """Record that the run was undone."""
+        self.undone = True
+        self._append({'undone': True}, sync=True)
+
+    def close(self) -> None:
+        """Close the journal file (it is reopened by the next record)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _append(self, record: Dict[str, Any], sync: bool = False) -> None:
+        """Append a progress record and flush it to the file system."""
+        with self._lock:
+            if self._file is None:
+                torn = self._has_torn_tail()
+                self._file = open(self.path, 'a', encoding='utf-8')
+                if torn:
+                    # Start after the partial line of a crashed run, which load() skips
+                    self._file.write('\n')
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def _has_torn_tail(self) -> bool:
+        """Check whether the file ends in a partial line."""
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b'\n'
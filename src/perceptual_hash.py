@@ -0,0 +1,311 @@
+"""
+Perceptual Hash Module for Smart File Organizer.
+Finds visually similar images by comparing perceptual hashes.
+
+Each image is reduced to a hash_size x hash_size bit fingerprint:
+    dhash   sign of the horizontal gradient of a (hash_size + 1) x hash_size
+            grayscale thumbnail
+    phash   sign (against the median) of the lowest hash_size x hash_size DCT
+            coefficients of a 4 * hash_size square grayscale thumbnail
+
+JPEGs are decoded in draft mode, which lets the decoder downscale by up to 8x
+while decoding instead of producing the full-resolution image first. Hashes
+are stored per file in the shared HashCache.
+
+Similar images have hashes a small Hamming distance apart. Near-duplicate
+lookups use a BK-tree, a metric tree that prunes every subtree whose distance
+to the query cannot be within the search radius, so grouping a library does
+not compare every pair of images.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+from .hash_cache import HashCache, stat_key
+
+# Handle imports with graceful fallbacks
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    _popcount = int.bit_count   # Python 3.10+
+except AttributeError:
+    def _popcount(value: int) -> int:
+        return bin(value).count('1')
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return _popcount(a ^ b)
+
+
+class BKTree:
+    """Burkhard-Keller tree of integer hashes under the Hamming distance."""
+
+    def __init__(self, distance: Callable[[int, int], int] = hamming_distance):
+        """
+        Initialize an empty tree.
+
+        Args:
+            distance: Metric between two keys
+        """
+        self.distance = distance
+        self.root = None   # (key, items, {distance: child node})
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, key: int, item: Any) -> None:
+        """Add an item under a hash."""
+        self.size += 1
+        if self.root is None:
+            self.root = (key, [item], {})
+            return
+
+        node = self.root
+        while True:
+            d = self.distance(key, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = (key, [item], {})
+                return
+            node = child
+
+    def search(self, key: int, radius: int) -> List[Tuple[int, Any]]:
+        """
+        Find all items within a distance of a hash.
+
+        Args:
+            key: Query hash
+            radius: Maximum distance (inclusive)
+
+        Returns:
+            (distance, item) pairs, in no particular order
+        """
+        results = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            d = self.distance(key, node[0])
+            if d <= radius:
+                results.extend((d, item) for item in node[1])
+
+            # Triangle inequality: matches below a child at distance c satisfy |c - d| <= radius
+            low, high = d - radius, d + radius
+            stack.extend(child for c, child in node[2].items() if low <= c <= high)
+        return results
+
+
+class ImageHasher:
+    """Perceptual image hashing with per-file caching and near-duplicate grouping."""
+
+    def __init__(self, config: Optional[Dict] = None, cache: Optional[HashCache] = None):
+        """
+        Initialize the hasher with configuration.
+
+        Args:
+            config: Hashing settings
+            cache: Optional persistent hash cache
+        """
+        self.config = config or {}
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+        self.settings = {
+            'hash_size': 16,        # Hash is hash_size x hash_size bits
+            'method': 'phash',      # 'phash' (DCT) or 'dhash' (gradient)
+            'io_workers': 4         # Images decoded concurrently
+        }
+        self.settings.update({k: v for k, v in self.config.items() if v is not None})
+
+        if self.settings['method'] == 'phash' and not NUMPY_AVAILABLE:
+            self.logger.warning("NumPy not available - using dhash for image hashes")
+            self.settings['method'] = 'dhash'
+
+        self.hash_size = self.settings['hash_size']
+        self.bits = self.hash_size * self.hash_size
+        self.kind = f"{self.settings['method']}/{self.hash_size}"
+        self._dct_matrix = None
+
+    def radius_for(self, similarity_threshold: float) -> int:
+        """
+        Convert a similarity threshold (0-1) to a Hamming radius.
+
+        Args:
+            similarity_threshold: Minimum fraction of matching hash bits
+
+        Returns:
+            Maximum number of differing bits
+        """
+        return max(0, int(round((1.0 - similarity_threshold) * self.bits)))
+
+    def similarity(self, distance: int) -> float:
+        """Convert a Hamming distance to a similarity score (0-1)."""
+        return 1.0 - distance / self.bits
+
+    def dhash(self, file_path: str) -> int:
+        """Difference hash of an image."""
+        width = self.hash_size + 1
+        pixels = self._thumbnail(file_path, width, self.hash_size).tobytes()
+        bits = [pixels[y * width + x + 1] > pixels[y * width + x]
+                for y in range(self.hash_size) for x in range(self.hash_size)]
+        return self._to_int(bits)
+
+    def phash(self, file_path: str) -> int:
+        """DCT-based perceptual hash of an image."""
+        size = 4 * self.hash_size
+        return self.phash_pixels(np.asarray(self._thumbnail(file_path, size, size)))
+
+    def phash_pixels(self, pixels) -> int:
+        """DCT-based perceptual hash of a 4 * hash_size square grayscale pixel array."""
+        pixels = np.asarray(pixels, dtype=np.float64)
+        dct = self._dct(pixels.shape[0])
+        low = (dct @ pixels @ dct.T)[:self.hash_size, :self.hash_size]
+        return self._to_int((low > np.median(low)).ravel().tolist())
+
+    def image_hash(self, file_path: str) -> int:
+        """Perceptual hash of an image with the configured method."""
+        if self.settings['method'] == 'dhash':
+            return self.dhash(file_path)
+        return self.phash(file_path)
+
+    def hash_many(self, paths: List[str]) -> List[Optional[int]]:
+        """
+        Get the perceptual hashes of many images, using the cache where possible.
+
+        Returns:
+            Hashes in path order (None for unreadable images)
+        """
+        keys = {}
+        cached = {}
+        if self.cache is not None:
+            keys = {path: stat_key(path) for path in paths}
+            cached = self.cache.get_signatures(paths, self.kind, keys)
+
+        hashes = [int(cached[path], 16) if path in cached else None for path in paths]
+        missing = [i for i, value in enumerate(hashes) if value is None]
+        computed = self._hash_all([paths[i] for i in missing])
+        for i, value in zip(missing, computed):
+            hashes[i] = value
+
+        if self.cache is not None:
+            self.cache.put_signatures(
+                [(paths[i], keys[paths[i]], format(hashes[i], 'x'))
+                 for i in missing if hashes[i] is not None], self.kind)
+        return hashes
+
+    def group_similar(self, items: List[Any], radius: int,
+                      path_of: Callable[[Any], str] = lambda item: item['file_path']) -> List[List[Any]]:
+        """
+        Group images whose hashes are within a Hamming radius of each other.
+
+        Groups are the connected components of the "within radius" relation.
+
+        Args:
+            items: File dictionaries (or other items)
+            radius: Maximum number of differing bits
+            path_of: Function returning the file path of an item
+
+        Returns:
+            Groups of two or more similar items, in input order
+        """
+        hashes = self.hash_many([path_of(item) for item in items])
+
+        parent = list(range(len(items)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        tree = BKTree()
+        for i, value in enumerate(hashes):
+            if value is None:
+                continue
+            for _, j in tree.search(value, radius):
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+            tree.add(value, i)
+
+        groups = {}
+        for i, value in enumerate(hashes):
+            if value is not None:
+                groups.setdefault(find(i), []).append(items[i])
+        return [group for group in groups.values() if len(group) > 1]
+
+    def find_similar(self, file_path: str, candidates: List[Any], radius: int,
+                     path_of: Callable[[Any], str] = lambda item: item['file_path']) -> List[Tuple[Any, int]]:
+        """
+        Find the candidates within a Hamming radius of one image.
+
+        Args:
+            file_path: Path to the image to check
+            candidates: File dictionaries (or other items) to compare against
+            radius: Maximum number of differing bits
+            path_of: Function returning the file path of an item
+
+        Returns:
+            (candidate, distance) pairs, closest first
+        """
+        target, *hashes = self.hash_many([file_path] + [path_of(item) for item in candidates])
+        if target is None:
+            return []
+
+        matches = [(item, hamming_distance(target, value))
+                   for item, value in zip(candidates, hashes) if value is not None]
+        return sorted((match for match in matches if match[1] <= radius), key=lambda match: match[1])
+
+    def _thumbnail(self, file_path: str, width: int, height: int):
+        """Decode an image as a width x height grayscale thumbnail."""
+        with Image.open(file_path) as img:
+            # JPEG only: decode at the smallest scale that is still >= the target size
+            img.draft('L', (width, height))
+            return img.convert('L').resize((width, height), Image.LANCZOS)
+
+    def _dct(self, size: int):
+        """Orthonormal DCT-II matrix (cached)."""
+        if self._dct_matrix is None or self._dct_matrix.shape[0] != size:
+            n = np.arange(size)
+            matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size)) * np.sqrt(2.0 / size)
+            matrix[0] /= np.sqrt(2.0)
+            self._dct_matrix = matrix
+        return self._dct_matrix
+
+    def _hash_all(self, paths: List[str]) -> List[Optional[int]]:
+        """Hash images on a thread pool; unreadable images hash to None."""
+        def safe_hash(path):
+            try:
+                return self.image_hash(path)
+            except Exception as e:
+                self.logger.warning(f"Error hashing image {path}: {e}")
+                return None
+
+        if len(paths) < 2 or self.settings['io_workers'] <= 1:
+            return [safe_hash(path) for path in paths]
+
+        with ThreadPoolExecutor(max_workers=self.settings['io_workers'], thread_name_prefix='phash') as executor:
+            return list(executor.map(safe_hash, paths))
+
+    @staticmethod
+    def _to_int(bits: List[bool]) -> int:
+        """Pack bits (most significant first) into an integer."""
+        value = 0
+        for bit in bits:
+            value = (value << 1) | int(bit)
+        return value
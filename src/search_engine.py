@@ -2,13 +2,21 @@ import os
 import re
 import sqlite3
 import time
+import base64
+import hashlib
 from datetime import datetime
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Iterator
 import json
+from collections import Counter, OrderedDict
+from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor
 
 from .vector_search import VectorSearch
+from .file_hashing import FileHasher
+from .hash_cache import get_hash_cache
+from .db_pool import get_pool, close_pool
 
 logger = logging.getLogger("AIDocumentOrganizer")
 
@@ -37,8 +45,16 @@ class SearchEngine:
             'semantic_weight': 0.6,  # Weight for semantic search vs keyword search
             'min_similarity': 0.3,   # Minimum similarity score for semantic results
             'max_results': 100,      # Maximum number of results to return
-            # How to combine semantic and keyword scores
-            'combine_method': 'weighted_average'
+            # How to combine semantic and keyword results: 'rrf' (reciprocal-rank
+            # fusion), 'normalized', 'weighted_average', 'max' or 'average'
+            'combine_method': 'rrf',
+            'rrf_k': 60,             # Rank offset for reciprocal-rank fusion
+            'candidate_pool': 50,    # Candidates taken from each retriever
+            'rerank_top_n': 0,       # Re-score the top N fused results with both retrievers
+            'suggest_candidates': 200,       # Rows fetched per suggestion lookup
+            'suggest_min_similarity': 0.5,   # Bigram overlap needed for fuzzy suggestions
+            'suggest_cache_size': 32,        # Recent suggestion lookups kept for narrowing
+            'store_content_hash': True       # Fill files.content_hash for files on disk
         }
         self.settings = {**self.default_settings,
                          **self.config.get('search', {})}
@@ -49,14 +65,22 @@ class SearchEngine:
             db_dir = os.path.join(os.path.expanduser("~"), "AppData", "Local", "AIDocumentOrganizer")
         else:  # macOS/Linux
             db_dir = os.path.join(os.path.expanduser("~"), ".config", "AIDocumentOrganizer")
-            
+
+        # Set database path (can be overridden through the config)
+        self.db_path = self.config.get('db_path') or os.path.join(db_dir, "document_index.db")
+
         # Create database directory if it doesn't exist
-        os.makedirs(db_dir, exist_ok=True)
-        
-        # Set database path
-        self.db_path = os.path.join(db_dir, "document_index.db")
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.pool = get_pool(self.db_path)
         
+        # Content digests come from the hash cache shared with duplicate detection
+        self.hasher = FileHasher(self.config.get('file_hashing', {}),
+                                 cache=get_hash_cache(self.config.get('hash_cache', {}).get('db_path')))
+
         self.progress_callback = None
+        self._executor = None
+        self._trigram_index = False
+        self._suggest_cache = OrderedDict()
         self._initialize_database()
 
     def _initialize_database(self):
@@ -64,74 +88,143 @@ class SearchEngine:
         Initialize the SQLite database schema
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Create files table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS files (
-                    id INTEGER PRIMARY KEY,
-                    path TEXT UNIQUE,
-                    filename TEXT,
-                    extension TEXT,
-                    size INTEGER,
-                    created_time REAL,
-                    modified_time REAL,
-                    indexed_time REAL,
-                    category TEXT,
-                    content_hash TEXT
-                )
-            ''')
+            with self.pool.transaction() as conn:
+                cursor = conn.cursor()
+
+                # Create files table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS files (
+                        id INTEGER PRIMARY KEY,
+                        path TEXT UNIQUE,
+                        filename TEXT,
+                        extension TEXT,
+                        size INTEGER,
+                        created_time REAL,
+                        modified_time REAL,
+                        indexed_time REAL,
+                        category TEXT,
+                        content_hash TEXT,
+                        file_type TEXT
+                    )
+                ''')
+
+                # Older databases were created without the file_type column
+                cursor.execute('PRAGMA table_info(files)')
+                columns = {row[1] for row in cursor.fetchall()}
+                if 'file_type' not in columns:
+                    cursor.execute('ALTER TABLE files ADD COLUMN file_type TEXT')
+
+                # Create terms table (inverted keyword index, clustered by term)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS terms (
+                        term TEXT,
+                        file_id INTEGER,
+                        PRIMARY KEY (term, file_id)
+                    ) WITHOUT ROWID
+                ''')
+
+                # Create content table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS content (
+                        file_id INTEGER,
+                        content TEXT,
+                        FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE
+                    )
+                ''')
+
+                # Create metadata table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS metadata (
+                        file_id INTEGER,
+                        key TEXT,
+                        value TEXT,
+                        FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE
+                    )
+                ''')
+
+                # Create tags table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS tags (
+                        file_id INTEGER,
+                        tag TEXT,
+                        FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE
+                    )
+                ''')
+
+                # Create indexes for faster searching
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_files_path ON files (path)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_files_filename ON files (filename)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_files_extension ON files (extension)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_files_category ON files (category)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_files_modified_time ON files (modified_time)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_files_size ON files (size)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_terms_file_id ON terms (file_id)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_content_file_id ON content (file_id)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_metadata_file_id ON metadata (file_id)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_tags_file_id ON tags (file_id)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_metadata_key ON metadata (key)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_metadata_value ON metadata (value)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags (tag)')
+
+                # Case-insensitive filename index for prefix suggestions
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_files_filename_nocase ON files (filename COLLATE NOCASE)')
+
+                self._initialize_trigram_index(cursor)
+        except Exception as e:
+            logger.error(f"Error initializing database: {str(e)}")
+            raise
 
-            # Create content table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS content (
-                    file_id INTEGER,
-                    content TEXT,
-                    FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE
-                )
-            ''')
+    def _initialize_trigram_index(self, cursor) -> None:
+        """
+        Create the trigram index over file paths used by suggest().
 
-            # Create metadata table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS metadata (
-                    file_id INTEGER,
-                    key TEXT,
-                    value TEXT,
-                    FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE
-                )
-            ''')
+        file_paths is an FTS5 table with the trigram tokenizer (rowid = files.id),
+        so substring lookups read posting lists instead of scanning the files
+        table. path_trigrams keeps the document frequency of each trigram, which
+        lets a lookup probe only its rarest trigrams. SQLite builds without the
+        trigram tokenizer (before 3.34) fall back to LIKE scans.
+        """
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'file_paths'")
+        exists = cursor.fetchone() is not None
 
-            # Create tags table
+        try:
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tags (
-                    file_id INTEGER,
-                    tag TEXT,
-                    FOREIGN KEY (file_id) REFERENCES files (id) ON DELETE CASCADE
-                )
+                CREATE VIRTUAL TABLE IF NOT EXISTS file_paths
+                USING fts5(path, tokenize = 'trigram', detail = 'none')
             ''')
-
-            # Create indexes for faster searching
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_files_path ON files (path)')
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_files_filename ON files (filename)')
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_files_extension ON files (extension)')
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_files_category ON files (category)')
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_metadata_key ON metadata (key)')
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_metadata_value ON metadata (value)')
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags (tag)')
-
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            logger.error(f"Error initializing database: {str(e)}")
-            raise
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"Trigram index unavailable, suggestions will scan the index: {e}")
+            self._trigram_index = False
+            return
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS path_trigrams (
+                trigram TEXT PRIMARY KEY,
+                doc_count INTEGER
+            ) WITHOUT ROWID
+        ''')
+        self._trigram_index = True
+
+        # Databases created before the trigram index need a backfill
+        if not exists:
+            cursor.execute('SELECT id, path FROM files')
+            rows = cursor.fetchall()
+            if rows:
+                self._add_trigram_rows(cursor, rows)
 
     def index_files(self, files: List[Dict[str, Any]], callback=None) -> Dict[str, Any]:
         """
@@ -164,6 +257,10 @@ class SearchEngine:
 
             self._build_keyword_index(files)
 
+            # Re-embed documents left stale by an updated embedding model
+            if self.settings['use_semantic_search']:
+                self._refresh_stale_embeddings()
+
             if callback:
                 callback(total_files, total_files, "Indexing complete")
 
@@ -185,95 +282,499 @@ class SearchEngine:
         Perform hybrid search combining keyword and semantic search.
 
         Args:
-            query: Search query text
+            query: Search query text (may contain type:, size:, date: and tag: operators)
             filters: Optional filters for results
             top_k: Maximum number of results to return
 
         Returns:
             List of search results with scores
         """
+        return self.advanced_search(query, filters=filters, top_k=top_k)['results']
+
+    def advanced_search(self, query: str, filters: Optional[Dict] = None, top_k: int = 10) -> Dict[str, Any]:
+        """
+        Perform hybrid search and return the results together with facet counts.
+
+        The query operators and the explicit filters are compiled into a single
+        SQL statement, so filtering happens before ranking and the facet counts
+        (by file type, category and month) come from the same query.
+
+        The keyword and semantic retrievers run concurrently, each limited to a
+        candidate pool, and their result lists are fused (reciprocal-rank fusion
+        by default). If rerank_top_n is set, the best fused results are
+        re-scored with both retrievers.
+
+        Args:
+            query: Search query text (may contain type:, size:, date: and tag: operators)
+            filters: Optional filters ('file_type', 'category', 'date_range')
+            top_k: Maximum number of results to return
+
+        Returns:
+            Dictionary with 'results', 'facets', 'total' (number of keyword/filter
+            matches) and 'timings' (milliseconds per stage)
+        """
         try:
-            results = []
+            start_time = time.perf_counter()
+            parsed = self._parse_query(query)
+            where, params = self._compile_filters(parsed, filters)
+            query_terms = self._query_terms(parsed)
+            pool_size = max(self.settings['candidate_pool'], top_k * 2)
 
-            # Perform semantic search if enabled
-            if self.settings['use_semantic_search']:
-                semantic_results = self.vector_search.search(
-                    query,
-                    top_k=top_k * 2,  # Get more results for combining
-                    threshold=self.settings['min_similarity']
-                )
-
-                # Convert semantic results to common format
-                for result in semantic_results:
-                    results.append({
+            # Run the keyword search (filters are applied inside the SQL plan) in
+            # the background while the semantic search runs in this thread
+            keyword_future = self._get_executor().submit(
+                self._timed, self._keyword_search, query_terms, where, params, pool_size)
+
+            semantic_query = ' '.join(parsed['terms'] + parsed['exact_phrases'])
+            semantic_results, semantic_ms = [], 0.0
+            if self.settings['use_semantic_search'] and semantic_query:
+                semantic_results, semantic_ms = self._timed(
+                    self._semantic_search, semantic_query, where, params, pool_size)
+
+            keyword, keyword_ms = keyword_future.result()
+
+            results = self._fuse_results(semantic_results, keyword['results'])
+            if self.settings['rerank_top_n'] and results:
+                results = self._rerank(results, semantic_query, query_terms)
+
+            results = results[:top_k]
+            for i, result in enumerate(results):
+                result['rank'] = i + 1
+
+            return {
+                'results': results,
+                'facets': keyword['facets'],
+                'total': keyword['total'],
+                'timings': {
+                    'keyword_ms': keyword_ms,
+                    'semantic_ms': semantic_ms,
+                    'total_ms': (time.perf_counter() - start_time) * 1000
+                }
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error performing search: {e}")
+            return {
+                'results': [],
+                'facets': self._empty_facets(),
+                'total': 0,
+                'error': str(e)
+            }
+
+    def _semantic_search(self, semantic_query: str, where: List[str], params: List[Any],
+                         pool_size: int) -> List[Dict[str, Any]]:
+        """Run the vector retriever, restricted to files passing the filters."""
+        candidate_paths = self._filtered_paths(where, params) if where else None
+        return self.vector_search.search(
+            semantic_query,
+            top_k=pool_size,
+            threshold=self.settings['min_similarity'],
+            candidate_paths=candidate_paths
+        )
+
+    def _fuse_results(self, semantic_results: List[Dict[str, Any]],
+                      keyword_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge the semantic and keyword result lists into one ranking.
+
+        Args:
+            semantic_results: Vector retriever results, best first
+            keyword_results: Keyword retriever results, best first
+
+        Returns:
+            Fused results sorted by combined score
+        """
+        results_by_path = {}
+        for retriever, retrieved in (('semantic', semantic_results), ('keyword', keyword_results)):
+            for rank, result in enumerate(retrieved, start=1):
+                entry = results_by_path.get(result['file_path'])
+                if entry is None:
+                    entry = results_by_path[result['file_path']] = {
                         'file_path': result['file_path'],
                         'file_name': result['file_name'],
                         'file_type': result['file_type'],
                         'metadata': result['metadata'],
-                        'semantic_score': result['similarity'],
-                        'keyword_score': 0.0,
-                        'rank': result['rank']
-                    })
-
-            # Perform keyword search
-            keyword_results = self._keyword_search(query, top_k * 2)
-
-            # Add keyword results or update scores for existing results
-            for kr in keyword_results:
-                existing = next(
-                    (r for r in results if r['file_path'] == kr['file_path']), None)
-                if existing:
-                    existing['keyword_score'] = kr['score']
-                else:
-                    results.append({
-                        'file_path': kr['file_path'],
-                        'file_name': kr['file_name'],
-                        'file_type': kr['file_type'],
-                        'metadata': kr['metadata'],
                         'semantic_score': 0.0,
-                        'keyword_score': kr['score'],
-                        'rank': len(results) + 1
-                    })
+                        'keyword_score': 0.0,
+                        'semantic_rank': None,
+                        'keyword_rank': None
+                    }
+                entry[f'{retriever}_score'] = result['similarity'] if retriever == 'semantic' else result['score']
+                entry[f'{retriever}_rank'] = rank
+
+        results = list(results_by_path.values())
+        method = self.settings['combine_method']
+        semantic_weight = self.settings['semantic_weight']
+        keyword_weight = 1 - semantic_weight
+
+        if method == 'rrf':
+            rrf_k = self.settings['rrf_k']
+            for result in results:
+                result['score'] = sum(1.0 / (rrf_k + result[f'{retriever}_rank'])
+                                      for retriever in ('semantic', 'keyword')
+                                      if result[f'{retriever}_rank'] is not None)
+        elif method == 'normalized':
+            # Min-max normalize each retriever's scores before weighting them
+            normalized = {}
+            for retriever in ('semantic', 'keyword'):
+                scores = [r[f'{retriever}_score'] for r in results if r[f'{retriever}_rank'] is not None]
+                low, high = (min(scores), max(scores)) if scores else (0.0, 0.0)
+                for r in results:
+                    if r[f'{retriever}_rank'] is None:
+                        value = 0.0
+                    elif high > low:
+                        value = (r[f'{retriever}_score'] - low) / (high - low)
+                    else:
+                        value = 1.0
+                    normalized[(r['file_path'], retriever)] = value
+            for result in results:
+                result['score'] = (normalized[(result['file_path'], 'semantic')] * semantic_weight +
+                                   normalized[(result['file_path'], 'keyword')] * keyword_weight)
+        elif method == 'weighted_average':
+            for result in results:
+                result['score'] = (result['semantic_score'] * semantic_weight +
+                                   result['keyword_score'] * keyword_weight)
+        elif method == 'max':
+            for result in results:
+                result['score'] = max(result['semantic_score'], result['keyword_score'])
+        else:  # Default to average
+            for result in results:
+                result['score'] = (result['semantic_score'] + result['keyword_score']) / 2
+
+        results.sort(key=lambda r: (-r['score'], r['file_path']))
+        return results
+
+    def merge_results(self, result_lists: List[List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Merge the results of one search run on several disjoint indexes (shards).
+
+        Fused scores of different indexes are not comparable (with reciprocal-
+        rank fusion they depend only on ranks within one index), so the
+        retriever lists are merged and fused again. Keyword scores (the share
+        of query terms matched) mean the same in every index and are merged by
+        score. Similarities come from each index's own embedding model, so the
+        semantic lists are interleaved by their ranks instead. Score-based
+        combine methods use the similarities as they are; re-ranking
+        (rerank_top_n) has already happened within each index.
+
+        Args:
+            result_lists: Fused result lists of the indexes, best first
+            top_k: Maximum number of results to return
 
-            # Combine scores
+        Returns:
+            Merged results with new 'score' and 'rank'; other keys are kept
+        """
+        originals = {}
+        semantic_lists = []
+        keyword_hits = []
+        for results in result_lists:
+            semantic_hits = []
             for result in results:
-                if self.settings['combine_method'] == 'weighted_average':
-                    semantic_weight = self.settings['semantic_weight']
-                    keyword_weight = 1 - semantic_weight
-                    result['score'] = (
-                        result['semantic_score'] * semantic_weight +
-                        result['keyword_score'] * keyword_weight
-                    )
-                elif self.settings['combine_method'] == 'max':
-                    result['score'] = max(
-                        result['semantic_score'],
-                        result['keyword_score']
-                    )
-                else:  # Default to average
-                    result['score'] = (
-                        result['semantic_score'] +
-                        result['keyword_score']
-                    ) / 2
+                originals[result['file_path']] = result
+                if result.get('semantic_rank') is not None:
+                    semantic_hits.append(result)
+                if result.get('keyword_rank') is not None:
+                    keyword_hits.append(result)
+            semantic_lists.append(sorted(semantic_hits, key=lambda r: r['semantic_rank']))
+
+        semantic = [r for level in zip_longest(*semantic_lists) for r in level if r is not None]
+        keyword = sorted(keyword_hits, key=lambda r: (-r['keyword_score'], r['keyword_rank'], r['file_path']))
+        semantic, keyword = (
+            [{'file_path': r['file_path'], 'file_name': r['file_name'], 'file_type': r['file_type'],
+              'metadata': r['metadata'], 'similarity': r['semantic_score'], 'score': r['keyword_score']}
+             for r in retrieved]
+            for retrieved in (semantic, keyword))
+        results = self._fuse_results(semantic, keyword)
+
+        results = results[:top_k]
+        for i, result in enumerate(results):
+            for key, value in originals[result['file_path']].items():
+                result.setdefault(key, value)
+            result['rank'] = i + 1
+        return results
+
+    def _rerank(self, results: List[Dict[str, Any]], semantic_query: str,
+                query_terms: List[str]) -> List[Dict[str, Any]]:
+        """
+        Re-score the top fused results with both retrievers.
 
-            # Sort by combined score
-            results.sort(key=lambda x: x['score'], reverse=True)
+        Results found by only one retriever get the missing score computed
+        directly, and the top N are re-ordered by the weighted average of the
+        two scores. Results below the top N keep their fused order.
+        """
+        top_n = results[:self.settings['rerank_top_n']]
+
+        missing_semantic = [r['file_path'] for r in top_n if r['semantic_rank'] is None]
+        if missing_semantic and semantic_query and self.settings['use_semantic_search']:
+            similarities = self.vector_search.score_documents(semantic_query, missing_semantic)
+            for result in top_n:
+                if result['file_path'] in similarities:
+                    result['semantic_score'] = similarities[result['file_path']]
+
+        missing_keyword = [r['file_path'] for r in top_n if r['keyword_rank'] is None]
+        if missing_keyword and query_terms:
+            hits = self._term_hits(query_terms, missing_keyword)
+            for result in top_n:
+                if result['keyword_rank'] is None:
+                    result['keyword_score'] = hits.get(result['file_path'], 0) / len(query_terms)
+
+        semantic_weight = self.settings['semantic_weight']
+        for result in top_n:
+            result['score'] = (result['semantic_score'] * semantic_weight +
+                               result['keyword_score'] * (1 - semantic_weight))
+        top_n.sort(key=lambda r: (-r['score'], r['file_path']))
+
+        return top_n + results[len(top_n):]
+
+    def _term_hits(self, query_terms: List[str], paths: List[str]) -> Dict[str, int]:
+        """Count the query terms indexed for each of the given files."""
+        term_placeholders = ', '.join('?' * len(query_terms))
+        path_placeholders = ', '.join('?' * len(paths))
+        cursor = self.pool.connection().cursor()
+        cursor.execute(f'''
+            SELECT f.path, COUNT(*) FROM terms t JOIN files f ON f.id = t.file_id
+            WHERE t.term IN ({term_placeholders}) AND f.path IN ({path_placeholders})
+            GROUP BY f.path
+        ''', query_terms + paths)
+        return dict(cursor.fetchall())
+
+    def _timed(self, func, *args) -> Tuple[Any, float]:
+        """Call a function and return its result with the elapsed milliseconds."""
+        start_time = time.perf_counter()
+        result = func(*args)
+        return result, (time.perf_counter() - start_time) * 1000
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Thread pool used to run the retrievers concurrently."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='search')
+        return self._executor
+
+    def close(self) -> None:
+        """Stop the retriever thread pool and close the database connections."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        close_pool(self.db_path)
+
+    def search_page(self, query: str, filters: Optional[Dict] = None, page_size: int = 50,
+                    cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return one page of search results with a keyset cursor for the next.
+
+        The first page is the hybrid ranking of advanced_search(), so semantic
+        hits appear as they do in search(). Later pages continue with the
+        remaining keyword/filter matches in the order of the SQL plan (match
+        count, then file id), skipping the files shown on the first page. The
+        cursor keeps those pages stable when the index changes in between, and
+        only page_size + 1 result records are loaded per call. The match count
+        is an aggregate, so each call still groups and sorts every hit of the
+        query in SQL; the seek only skips the rows before the cursor, it does
+        not avoid ranking them.
 
-            # Apply filters
-            if filters:
-                results = self._apply_filters(results, filters)
+        Args:
+            query: Search query text (may contain type:, size:, date: and tag: operators)
+            filters: Optional filters ('file_type', 'category', 'date_range')
+            page_size: Number of results per page
+            cursor: Cursor returned as 'next_cursor' by the previous page, or None for the first page
 
-            # Limit results
-            results = results[:top_k]
+        Returns:
+            Dictionary with 'results', 'next_cursor' (None on the last page), and on
+            the first page also 'facets' and 'total' (number of keyword/filter matches)
+        """
+        fingerprint = self._query_fingerprint(query, filters)
+        if not cursor:
+            return self._first_search_page(query, filters, page_size, fingerprint)
+
+        after, offset, shown_ids = self._decode_cursor(cursor, fingerprint)
+        parsed = self._parse_query(query)
+        where, params = self._compile_filters(parsed, filters)
+        query_terms = self._query_terms(parsed)
+        if not query_terms and not where:
+            return {'results': [], 'next_cursor': None}
+
+        if shown_ids:
+            where = where + [f"f.id NOT IN ({', '.join('?' * len(shown_ids))})"]
+            params = list(params) + list(shown_ids)
+
+        keyword = self._keyword_search(query_terms, where, params, page_size + 1,
+                                       after=after, with_facets=False)
+        results = keyword['results'][:page_size]
+        has_more = len(keyword['results']) > page_size
+
+        for i, result in enumerate(results):
+            result['rank'] = offset + i + 1
+
+        next_cursor = None
+        if has_more and results:
+            next_cursor = self._encode_cursor(
+                fingerprint, results[-1]['sort_key'], offset + len(results), shown_ids)
+
+        for result in results:
+            del result['sort_key']
+
+        return {'results': results, 'next_cursor': next_cursor}
+
+    def _first_search_page(self, query: str, filters: Optional[Dict], page_size: int,
+                           fingerprint: str) -> Dict[str, Any]:
+        """First page of search_page: the hybrid ranking, completed with the file records."""
+        response = self.advanced_search(query, filters=filters, top_k=page_size)
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+
+        cursor = self.pool.connection().cursor()
+        paths = [result['file_path'] for result in response['results']]
+        records = {}
+        if paths:
+            cursor.execute(f"SELECT id FROM files WHERE path IN ({', '.join('?' * len(paths))})", paths)
+            records = {record['file_path']: record for record in
+                       self._fetch_file_records(cursor, [row[0] for row in cursor.fetchall()]).values()}
+
+        # Semantic hits of files no longer in the keyword index are dropped
+        results = [dict(records[result['file_path']], **result)
+                   for result in response['results'] if result['file_path'] in records]
+        for i, result in enumerate(results):
+            result['rank'] = i + 1
+
+        # The keyword matches not shown here follow on the next pages
+        keyword_shown = sum(1 for result in results if result['keyword_rank'] is not None)
+        next_cursor = None
+        if response['total'] > keyword_shown:
+            next_cursor = self._encode_cursor(fingerprint, None, len(results),
+                                              [result['id'] for result in results])
+
+        return {'results': results, 'next_cursor': next_cursor,
+                'facets': response['facets'], 'total': response['total']}
+
+    def iter_search(self, query: str, filters: Optional[Dict] = None,
+                    page_size: int = 50) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Lazily yield pages of search results.
 
-            # Update ranks
-            for i, result in enumerate(results):
-                result['rank'] = i + 1
+        Each page is fetched with search_page only when the consumer asks for
+        it, so the first results are available immediately and memory stays
+        bounded by the page size.
 
-            return results
+        Args:
+            query: Search query text
+            filters: Optional filters
+            page_size: Number of results per page
+
+        Yields:
+            Lists of search results
+        """
+        cursor = None
+        while True:
+            page = self.search_page(query, filters=filters, page_size=page_size, cursor=cursor)
+            if page['results']:
+                yield page['results']
+            cursor = page['next_cursor']
+            if not cursor:
+                return
+
+    def _query_fingerprint(self, query: str, filters: Optional[Dict]) -> str:
+        """Fingerprint a query so cursors cannot be reused with a different query."""
+        payload = json.dumps([query, filters or {}], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+    def _encode_cursor(self, fingerprint: str, sort_key: Optional[Tuple[float, int]], offset: int,
+                       shown_ids: List[int]) -> str:
+        """Encode a keyset position (and the files of the first page) as an opaque cursor string."""
+        payload = json.dumps({'q': fingerprint, 'k': list(sort_key) if sort_key else None,
+                              'o': offset, 'x': list(shown_ids)})
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, cursor: str, fingerprint: str) -> Tuple[Optional[Tuple[float, int]], int, List[int]]:
+        """
+        Decode a cursor created by _encode_cursor.
+
+        Returns:
+            Tuple of (last (rank value, file id) or None, offset, ids of the first page)
+
+        Raises:
+            ValueError: If the cursor is malformed or belongs to another query
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            after = tuple(payload['k']) if payload['k'] is not None else None
+            if after is not None and len(after) != 2:
+                raise ValueError
+            offset = int(payload['o'])
+            shown_ids = [int(file_id) for file_id in payload['x']]
+        except Exception:
+            raise ValueError("Invalid search cursor")
+
+        if payload.get('q') != fingerprint:
+            raise ValueError("Search cursor does not match the query")
+
+        return after, offset, shown_ids
+
+    def search_batch(self, queries: List[str], filters: Optional[Dict] = None,
+                     top_k: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Run several hybrid searches at once.
+
+        Queries without filters are embedded and scored against the vector
+        index in one batched pass; filtered queries fall back to a restricted
+        per-query semantic search. Keyword searches run on the thread pool.
+
+        Args:
+            queries: Search query texts
+            filters: Optional filters applied to every query
+            top_k: Maximum number of results per query
+
+        Returns:
+            One result list per query, in query order
+        """
+        try:
+            pool_size = max(self.settings['candidate_pool'], top_k * 2)
+            plans = []
+            for query in queries:
+                parsed = self._parse_query(query)
+                where, params = self._compile_filters(parsed, filters)
+                plans.append({
+                    'where': where,
+                    'params': params,
+                    'terms': self._query_terms(parsed),
+                    'semantic_query': ' '.join(parsed['terms'] + parsed['exact_phrases'])
+                })
+
+            keyword_futures = [
+                self._get_executor().submit(self._keyword_search, plan['terms'],
+                                            plan['where'], plan['params'], pool_size)
+                for plan in plans
+            ]
+
+            semantic = [[] for _ in plans]
+            if self.settings['use_semantic_search']:
+                batched = [i for i, plan in enumerate(plans) if plan['semantic_query'] and not plan['where']]
+                if batched:
+                    batch_results = self.vector_search.search_batch(
+                        [plans[i]['semantic_query'] for i in batched],
+                        top_k=pool_size, threshold=self.settings['min_similarity'])
+                    for i, results in zip(batched, batch_results):
+                        semantic[i] = results
+                for i, plan in enumerate(plans):
+                    if plan['semantic_query'] and plan['where']:
+                        semantic[i] = self._semantic_search(plan['semantic_query'], plan['where'],
+                                                            plan['params'], pool_size)
+
+            all_results = []
+            for plan, semantic_results, future in zip(plans, semantic, keyword_futures):
+                results = self._fuse_results(semantic_results, future.result()['results'])
+                if self.settings['rerank_top_n'] and results:
+                    results = self._rerank(results, plan['semantic_query'], plan['terms'])
+
+                results = results[:top_k]
+                for i, result in enumerate(results):
+                    result['rank'] = i + 1
+                all_results.append(results)
+
+            return all_results
 
         except Exception as e:
-            self.logger.error(f"Error performing search: {e}")
-            return []
+            self.logger.error(f"Error performing batch search: {e}")
+            return [[] for _ in queries]
 
     def find_similar(self, file_path: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -296,53 +797,525 @@ class SearchEngine:
             self.logger.error(f"Error finding similar documents: {e}")
             return []
 
-    def _build_keyword_index(self, files: List[Dict[str, Any]]) -> None:
-        """Build keyword search index."""
-        self.keyword_index = {}
+    def find_similar_batch(self, file_paths: List[str], top_k: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find similar documents for several documents at once.
 
-        for file_info in files:
-            terms = self._extract_search_terms(file_info)
+        Args:
+            file_paths: Paths of the documents to compare against
+            top_k: Number of similar documents per document
+
+        Returns:
+            Dictionary mapping each path to its list of similar documents
+        """
+        try:
+            if not self.settings['use_semantic_search']:
+                raise ValueError("Semantic search is disabled")
+
+            return self.vector_search.find_similar_batch(file_paths, top_k)
+
+        except Exception as e:
+            self.logger.error(f"Error finding similar documents: {e}")
+            return {path: [] for path in file_paths}
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Suggest indexed files whose name or path matches typed text.
+
+        Meant to be called on every keystroke. Matches are ranked by where the
+        text occurs: at the start of the file name, at the start of a word in
+        the name, elsewhere in the name, then in the directory. If there are
+        fewer than limit matches, files sharing most of the text's trigrams are
+        added as typo-tolerant matches.
+
+        Lookups are cached, and when a lookup found every match, longer text
+        that contains it is answered by filtering the cached rows.
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of suggestions with 'id', 'file_path', 'file_name', 'score'
+            (1.0 for exact matches, bigram overlap for fuzzy ones) and 'match'
+            ('prefix', 'word', 'name', 'path' or 'fuzzy')
+        """
+        try:
+            text = prefix.strip().lower()
+            if not text:
+                return []
 
-            for term in terms:
-                if term not in self.keyword_index:
-                    self.keyword_index[term] = []
-                self.keyword_index[term].append(file_info)
+            cursor = self.pool.connection().cursor()
+            rows = self._suggest_rows(cursor, text)
+            suggestions = self._rank_suggestions(text, rows)[:limit]
 
-    def _keyword_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
-        """Perform keyword-based search."""
-        if not hasattr(self, 'keyword_index'):
+            if len(suggestions) < limit and len(text) >= 4 and self._trigram_index:
+                seen = {suggestion['id'] for suggestion in suggestions}
+                suggestions.extend(self._fuzzy_suggestions(cursor, text, seen)[:limit - len(suggestions)])
+
+            return suggestions
+
+        except Exception as e:
+            self.logger.error(f"Error suggesting files: {e}")
             return []
 
-        # Extract search terms from query
-        query_terms = self._extract_search_terms({'content': query})
-
-        # Find matching documents
-        matches = {}
-        for term in query_terms:
-            if term in self.keyword_index:
-                for doc in self.keyword_index[term]:
-                    if doc['file_path'] not in matches:
-                        matches[doc['file_path']] = {
-                            'doc': doc,
-                            'matches': 0
-                        }
-                    matches[doc['file_path']]['matches'] += 1
-
-        # Calculate scores
+    def _suggest_rows(self, cursor, text: str) -> List[Tuple[int, str]]:
+        """Find (id, path) rows matching the text, narrowing cached lookups where possible."""
+        cached = self._suggest_cache.get(text)
+        if cached is not None:
+            self._suggest_cache.move_to_end(text)
+            return cached[0]
+
+        # A complete lookup for a substring of the text already holds every match
+        for previous, (rows, complete) in reversed(self._suggest_cache.items()):
+            if complete and previous in text:
+                rows = [row for row in rows if text in row[1].lower()]
+                self._cache_suggest_rows(text, rows, True)
+                return rows
+
+        limit = self.settings['suggest_candidates']
+        pattern = self._escape_like(text)
+
+        # File name prefix matches come from the NOCASE index and rank first
+        cursor.execute("SELECT id, path FROM files WHERE filename LIKE ? ESCAPE '\\' LIMIT ?",
+                       (pattern + '%', limit))
+        rows = cursor.fetchall()
+        complete = False
+
+        if len(text) >= 3:
+            if self._trigram_index:
+                substring_rows = self._trigram_substring_rows(cursor, text, pattern, limit)
+            else:
+                cursor.execute("SELECT id, path FROM files WHERE path LIKE ? ESCAPE '\\' LIMIT ?",
+                               ('%' + pattern + '%', limit))
+                substring_rows = cursor.fetchall()
+
+            complete = len(substring_rows) < limit
+            seen = {row[0] for row in rows}
+            rows.extend(row for row in substring_rows if row[0] not in seen)
+
+        self._cache_suggest_rows(text, rows, complete)
+        return rows
+
+    def _trigram_substring_rows(self, cursor, text: str, pattern: str, limit: int) -> List[Tuple[int, str]]:
+        """
+        Find rows whose path contains the text using the trigram index.
+
+        Only the two rarest trigrams of the text are matched in the index; the
+        LIKE then checks the full text on those rows. This avoids intersecting
+        the long posting lists of common trigrams.
+        """
+        frequencies = self._trigram_frequencies(cursor, self._ngrams(text))
+        if not frequencies or min(frequencies.values()) <= 0:
+            return []   # Some trigram occurs in no path
+
+        rarest = sorted(frequencies, key=frequencies.get)[:2]
+        match = ' AND '.join('"{}"'.format(trigram.replace('"', '""')) for trigram in rarest)
+        cursor.execute("SELECT rowid, path FROM file_paths WHERE file_paths MATCH ? "
+                       "AND path LIKE ? ESCAPE '\\' LIMIT ?", (match, '%' + pattern + '%', limit))
+        return cursor.fetchall()
+
+    def _trigram_frequencies(self, cursor, trigrams: set) -> Dict[str, int]:
+        """Document frequency of each trigram (missing trigrams count 0)."""
+        trigrams = list(trigrams)
+        placeholders = ', '.join('?' * len(trigrams))
+        cursor.execute(f'SELECT trigram, doc_count FROM path_trigrams WHERE trigram IN ({placeholders})',
+                       trigrams)
+        frequencies = dict.fromkeys(trigrams, 0)
+        frequencies.update(cursor.fetchall())
+        return frequencies
+
+    def _fuzzy_suggestions(self, cursor, text: str, seen: set) -> List[Dict[str, Any]]:
+        """
+        Find files whose names share most character bigrams with the text.
+
+        Candidates are the files containing one of the three rarest trigrams
+        of the text that occur in the index at all; a typo breaks the trigrams
+        around it, but usually leaves some of the rare ones intact. Candidates
+        are scored on bigrams, which survive short typos such as swapped letters.
+        """
+        frequencies = self._trigram_frequencies(cursor, self._ngrams(text))
+        present = sorted((trigram for trigram, count in frequencies.items() if count > 0),
+                         key=frequencies.get)[:3]
+
+        candidates = {}
+        for trigram in present:
+            cursor.execute('SELECT rowid, path FROM file_paths WHERE file_paths MATCH ? LIMIT ?',
+                           ('"{}"'.format(trigram.replace('"', '""')), self.settings['suggest_candidates']))
+            candidates.update(cursor.fetchall())
+
+        text_bigrams = self._ngrams(text, 2)
+        suggestions = []
+        for file_id, path in candidates.items():
+            if file_id in seen:
+                continue
+            name = self._path_name(path)
+            score = len(text_bigrams & self._ngrams(name.lower(), 2)) / len(text_bigrams)
+            if score >= self.settings['suggest_min_similarity']:
+                suggestions.append({'id': file_id, 'file_path': path, 'file_name': name,
+                                    'score': score, 'match': 'fuzzy'})
+
+        suggestions.sort(key=lambda s: (-s['score'], len(s['file_name']), s['file_name']))
+        return suggestions
+
+    def _rank_suggestions(self, text: str, rows: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+        """Order exact matches by where the text occurs in the path."""
+        word_start = re.compile(r'(?:^|[^a-z0-9])' + re.escape(text))
+        suggestions = []
+
+        for file_id, path in rows:
+            name = self._path_name(path)
+            lower_name = name.lower()
+            if lower_name.startswith(text):
+                tier, match = 0, 'prefix'
+            elif word_start.search(lower_name):
+                tier, match = 1, 'word'
+            elif text in lower_name:
+                tier, match = 2, 'name'
+            else:
+                tier, match = 3, 'path'
+            suggestions.append((tier, len(name), name, {
+                'id': file_id, 'file_path': path, 'file_name': name, 'score': 1.0, 'match': match}))
+
+        suggestions.sort(key=lambda s: s[:3])
+        return [suggestion for *_, suggestion in suggestions]
+
+    def _cache_suggest_rows(self, text: str, rows: List[Tuple[int, str]], complete: bool) -> None:
+        """Remember the rows of a suggestion lookup, evicting the oldest lookups."""
+        self._suggest_cache[text] = (rows, complete)
+        while len(self._suggest_cache) > self.settings['suggest_cache_size']:
+            self._suggest_cache.popitem(last=False)
+
+    @staticmethod
+    def _path_name(path: str) -> str:
+        """File name part of a path with either separator."""
+        return re.split(r'[\\/]', path)[-1]
+
+    @staticmethod
+    def _escape_like(text: str) -> str:
+        """Escape LIKE wildcards (with backslash as the escape character)."""
+        return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    def _build_keyword_index(self, files: List[Dict[str, Any]]) -> None:
+        """Build keyword search index in the database."""
+        content_hashes = {}
+        if self.settings['store_content_hash']:
+            # Hash before opening the transaction; unchanged files are cache hits
+            on_disk = [file_info['file_path'] for file_info in files
+                       if file_info.get('file_path') and os.path.isfile(file_info['file_path'])]
+            content_hashes = dict(zip(on_disk, self.hasher.full_hashes(on_disk)))
+
+        with self.pool.transaction() as conn:
+            cursor = conn.cursor()
+            indexed_time = time.time()
+            new_paths = []
+
+            for file_info in files:
+                file_path = file_info.get('file_path')
+                if not file_path:
+                    continue
+
+                cursor.execute('SELECT 1 FROM files WHERE path = ?', (file_path,))
+                is_new = cursor.fetchone() is None
+
+                record = self._file_record(file_info)
+                cursor.execute('''
+                    INSERT INTO files (path, filename, extension, size, created_time,
+                                       modified_time, indexed_time, category, file_type,
+                                       content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(path) DO UPDATE SET
+                        filename = excluded.filename,
+                        extension = excluded.extension,
+                        size = excluded.size,
+                        created_time = excluded.created_time,
+                        modified_time = excluded.modified_time,
+                        indexed_time = excluded.indexed_time,
+                        category = excluded.category,
+                        file_type = excluded.file_type,
+                        content_hash = excluded.content_hash
+                ''', (file_path, record['filename'], record['extension'], record['size'],
+                      record['created_time'], record['modified_time'], indexed_time,
+                      record['category'], record['file_type'], content_hashes.get(file_path)))
+
+                cursor.execute('SELECT id FROM files WHERE path = ?', (file_path,))
+                file_id = cursor.fetchone()[0]
+                if is_new:
+                    new_paths.append((file_id, file_path))
+
+                # Replace any previously indexed data for this file
+                for table in ('terms', 'content', 'metadata', 'tags'):
+                    cursor.execute(f'DELETE FROM {table} WHERE file_id = ?', (file_id,))
+
+                cursor.executemany(
+                    'INSERT OR IGNORE INTO terms (term, file_id) VALUES (?, ?)',
+                    [(term, file_id) for term in self._extract_search_terms(file_info)])
+
+                if file_info.get('content'):
+                    cursor.execute(
+                        'INSERT INTO content (file_id, content) VALUES (?, ?)',
+                        (file_id, file_info['content']))
+
+                cursor.executemany(
+                    'INSERT INTO metadata (file_id, key, value) VALUES (?, ?, ?)',
+                    [(file_id, key, json.dumps(value, default=str))
+                     for key, value in file_info.get('metadata', {}).items()])
+
+                tags = [tag['name'] if isinstance(tag, dict) else tag
+                        for tag in file_info.get('tags', [])]
+                cursor.executemany(
+                    'INSERT INTO tags (file_id, tag) VALUES (?, ?)',
+                    [(file_id, tag) for tag in tags if tag])
+
+            if self._trigram_index and new_paths:
+                self._add_trigram_rows(cursor, new_paths)
+        self._suggest_cache.clear()
+
+    def _add_trigram_rows(self, cursor, rows: List[Tuple[int, str]]) -> None:
+        """Add (file id, path) rows to the trigram index and its frequencies."""
+        cursor.executemany('INSERT INTO file_paths (rowid, path) VALUES (?, ?)', rows)
+
+        counts = Counter()
+        for _, path in rows:
+            counts.update(self._ngrams(path.lower()))
+        cursor.executemany('''
+            INSERT INTO path_trigrams (trigram, doc_count) VALUES (?, ?)
+            ON CONFLICT(trigram) DO UPDATE SET doc_count = doc_count + excluded.doc_count
+        ''', counts.items())
+
+    def _remove_trigram_rows(self, cursor, rows: List[Tuple[int, str]]) -> None:
+        """Remove (file id, path) rows from the trigram index and its frequencies."""
+        cursor.executemany('DELETE FROM file_paths WHERE rowid = ?', [(file_id,) for file_id, _ in rows])
+
+        counts = Counter()
+        for _, path in rows:
+            counts.update(self._ngrams(path.lower()))
+        cursor.executemany('UPDATE path_trigrams SET doc_count = doc_count - ? WHERE trigram = ?',
+                           [(count, trigram) for trigram, count in counts.items()])
+
+    @staticmethod
+    def _ngrams(text: str, n: int = 3) -> set:
+        """Distinct character n-grams of a (lowercased) string."""
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def _refresh_stale_embeddings(self) -> int:
+        """
+        Re-index documents whose embeddings predate the current embedding model.
+
+        The documents are rebuilt from the content and metadata stored in the
+        keyword index.
+
+        Returns:
+            Number of documents re-indexed
+        """
+        stale_paths = self.vector_search.stale_documents()
+        if not stale_paths:
+            return 0
+
+        cursor = self.pool.connection().cursor()
+        documents = []
+        for start in range(0, len(stale_paths), 500):
+            chunk = stale_paths[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f'SELECT id FROM files WHERE path IN ({placeholders})', chunk)
+            file_ids = [row[0] for row in cursor.fetchall()]
+            if not file_ids:
+                continue
+
+            records = self._fetch_file_records(cursor, file_ids)
+            placeholders = ', '.join('?' * len(file_ids))
+            cursor.execute(
+                f'SELECT file_id, content FROM content WHERE file_id IN ({placeholders})', file_ids)
+            for file_id, content in cursor.fetchall():
+                records[file_id]['content'] = content
+
+            documents.extend(records.values())
+
+        if documents:
+            self.vector_search.index_documents(documents, update_model=False)
+        return len(documents)
+
+    def _file_record(self, file_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the indexed columns of the files table from a file dictionary."""
+        file_path = file_info['file_path']
+        metadata = file_info.get('metadata', {})
+        category = (file_info.get('category') or
+                    file_info.get('ai_analysis', {}).get('category') or
+                    metadata.get('category'))
+        extension = file_info.get('file_ext') or os.path.splitext(file_path)[1]
+
+        return {
+            'filename': file_info.get('file_name') or os.path.basename(file_path),
+            'extension': extension.lower(),
+            'size': file_info.get('file_size', file_info.get('size')),
+            'created_time': file_info.get('created_time', metadata.get('created_time')),
+            'modified_time': file_info.get('modified_time', metadata.get('modified_time')),
+            'category': category,
+            'file_type': file_info.get('file_type')
+        }
+
+    def _keyword_search(self, query_terms: List[str], where: List[str], params: List[Any],
+                        top_k: int, after: Optional[Tuple[float, int]] = None,
+                        with_facets: bool = True) -> Dict[str, Any]:
+        """
+        Perform keyword-based search with the compiled filter plan.
+
+        Matching, filtering, ranking and facet counting run as one SQL statement
+        over the terms/files tables, so the file indexes are used for filtering
+        and only the records of the top_k hits are loaded. Every match is still
+        grouped and sorted in SQL to rank it. Hits are ordered by
+        (rank value DESC, file id), which makes the order stable for keyset
+        pagination.
+
+        Args:
+            query_terms: Normalized query terms
+            where: Compiled filter clauses (see _compile_filters)
+            params: Parameters for the filter clauses
+            top_k: Maximum number of hits to return
+            after: Optional (rank value, file id) of the last hit of the previous page
+            with_facets: Whether to compute facet counts and the total
+
+        Returns:
+            Dictionary with 'results', 'facets' and 'total'
+        """
+        if not query_terms and not where:
+            return {'results': [], 'facets': self._empty_facets(), 'total': 0}
+
+        filter_sql = ' AND '.join(where)
+        if query_terms:
+            placeholders = ', '.join('?' * len(query_terms))
+            matched_sql = f'''
+                SELECT f.id AS id, f.extension AS extension, f.category AS category,
+                       f.modified_time AS modified_time, COUNT(*) AS hits,
+                       COUNT(*) AS rank_value
+                FROM terms t JOIN files f ON f.id = t.file_id
+                WHERE t.term IN ({placeholders}){' AND ' + filter_sql if filter_sql else ''}
+                GROUP BY f.id
+            '''
+            matched_params = list(query_terms) + list(params)
+        else:
+            # Filter-only query: list matching files, most recently modified first
+            matched_sql = f'''
+                SELECT f.id AS id, f.extension AS extension, f.category AS category,
+                       f.modified_time AS modified_time, 0 AS hits,
+                       COALESCE(f.modified_time, 0) AS rank_value
+                FROM files f
+                WHERE {filter_sql}
+            '''
+            matched_params = list(params)
+
+        seek_sql = ''
+        seek_params = []
+        if after is not None:
+            seek_sql = 'WHERE rank_value < ? OR (rank_value = ? AND id > ?)'
+            seek_params = [after[0], after[0], after[1]]
+
+        sql = f'''
+            WITH matched AS ({matched_sql}),
+            ranked AS (
+                SELECT id, hits, rank_value,
+                       ROW_NUMBER() OVER (ORDER BY rank_value DESC, id) AS position
+                FROM matched {seek_sql}
+                ORDER BY rank_value DESC, id LIMIT ?
+            )
+            SELECT 'hit', id, hits, rank_value, position FROM ranked
+        '''
+        if with_facets:
+            sql += '''
+                UNION ALL
+                SELECT 'file_type', extension, COUNT(*), NULL, NULL FROM matched GROUP BY extension
+                UNION ALL
+                SELECT 'category', category, COUNT(*), NULL, NULL FROM matched GROUP BY category
+                UNION ALL
+                SELECT 'date', strftime('%Y-%m', modified_time, 'unixepoch', 'localtime') AS bucket,
+                       COUNT(*), NULL, NULL
+                FROM matched GROUP BY bucket
+                UNION ALL
+                SELECT 'total', NULL, COUNT(*), NULL, NULL FROM matched
+            '''
+
+        cursor = self.pool.connection().cursor()
+        cursor.execute(sql, matched_params + seek_params + [top_k])
+
+        hits = []
+        facets = self._empty_facets()
+        total = 0
+        for kind, key, value, rank_value, position in cursor.fetchall():
+            if kind == 'hit':
+                hits.append((position, key, value, rank_value))
+            elif kind == 'total':
+                total = value
+            elif key is not None:
+                facets[kind][key] = value
+
+        hits.sort()
+        records = self._fetch_file_records(cursor, [hit[1] for hit in hits])
+
         results = []
-        for file_path, match_info in matches.items():
-            score = match_info['matches'] / len(query_terms)
-            results.append({
-                'file_path': file_path,
-                'file_name': match_info['doc']['file_name'],
-                'file_type': match_info['doc']['file_type'],
-                'metadata': match_info['doc'].get('metadata', {}),
-                'score': score
-            })
-
-        # Sort by score
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:top_k]
+        for _, file_id, matches, rank_value in hits:
+            record = records.get(file_id)
+            if not record:
+                continue
+            record['score'] = matches / len(query_terms) if query_terms else 0.0
+            record['sort_key'] = (rank_value, file_id)
+            results.append(record)
+
+        return {'results': results, 'facets': facets, 'total': total}
+
+    def _fetch_file_records(self, cursor, file_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Load result records (with metadata) for the given file ids."""
+        if not file_ids:
+            return {}
+
+        placeholders = ', '.join('?' * len(file_ids))
+        cursor.execute(f'''
+            SELECT id, path, filename, extension, file_type, category, size, modified_time
+            FROM files WHERE id IN ({placeholders})
+        ''', file_ids)
+
+        records = {}
+        for file_id, path, filename, extension, file_type, category, size, modified_time in cursor.fetchall():
+            records[file_id] = {
+                'id': file_id,
+                'file_path': path,
+                'file_name': filename,
+                'file_type': file_type or extension,
+                'extension': extension,
+                'category': category,
+                'size': size,
+                'modified_time': modified_time,
+                'metadata': {}
+            }
+
+        cursor.execute(
+            f'SELECT file_id, key, value FROM metadata WHERE file_id IN ({placeholders})', file_ids)
+        for file_id, key, value in cursor.fetchall():
+            try:
+                records[file_id]['metadata'][key] = json.loads(value)
+            except (ValueError, TypeError, KeyError):
+                continue
+
+        return records
+
+    def _filtered_paths(self, where: List[str], params: List[Any]) -> set:
+        """Return the set of indexed paths passing the compiled filters."""
+        cursor = self.pool.connection().cursor()
+        cursor.execute(
+            f"SELECT f.path FROM files f WHERE {' AND '.join(where)}", params)
+        return {row[0] for row in cursor.fetchall()}
+
+    def _empty_facets(self) -> Dict[str, Dict[str, int]]:
+        """Return an empty facet structure."""
+        return {'file_type': {}, 'category': {}, 'date': {}}
+
+    def _query_terms(self, parsed: Dict[str, Any]) -> List[str]:
+        """Normalize the free-text terms of a parsed query for the keyword index."""
+        terms = []
+        for term in parsed['terms']:
+            for word in re.findall(r'\w+', term.lower()):
+                if word not in terms:
+                    terms.append(word)
+        return terms
 
     def _extract_search_terms(self, doc: Dict[str, Any]) -> List[str]:
         """Extract search terms from document."""
@@ -372,43 +1345,89 @@ class SearchEngine:
 
         return list(terms)
 
-    def _apply_filters(self, results: List[Dict[str, Any]], filters: Dict) -> List[Dict[str, Any]]:
-        """Apply filters to search results."""
-        filtered = results.copy()
-
-        # File type filter
-        if 'file_type' in filters:
-            filtered = [r for r in filtered if r['file_type']
-                        == filters['file_type']]
+    def _compile_filters(self, parsed: Dict[str, Any], filters: Optional[Dict]) -> Tuple[List[str], List[Any]]:
+        """
+        Compile query operators and explicit filters into SQL clauses on the files table.
 
-        # Category filter
-        if 'category' in filters:
-            filtered = [r for r in filtered if r['metadata'].get(
-                'category') == filters['category']]
+        Args:
+            parsed: Parsed query from _parse_query
+            filters: Optional filters ('file_type', 'category', 'date_range')
 
-        # Date range filter
+        Returns:
+            Tuple of (list of WHERE clauses over alias "f", list of parameters)
+        """
+        where = []
+        params = []
+        filters = filters or {}
+
+        # type: operators match on extension (idx_files_extension)
+        if parsed['file_types']:
+            extensions = sorted({'.' + t.lstrip('.') for t in parsed['file_types']})
+            where.append(f"f.extension IN ({', '.join('?' * len(extensions))})")
+            params.extend(extensions)
+
+        # File type filter: an extension ('.pdf') or a file type name ('PDF')
+        file_type = filters.get('file_type')
+        if file_type:
+            if file_type.startswith('.'):
+                where.append('f.extension = ?')
+                params.append(file_type.lower())
+            else:
+                where.append('f.file_type = ?')
+                params.append(file_type)
+
+        # Category filter (idx_files_category)
+        if filters.get('category'):
+            where.append('f.category = ?')
+            params.append(filters['category'])
+
+        # Date ranges are converted to timestamps once; the end date is inclusive
+        date_ranges = []
+        if parsed['date_range']:
+            date_ranges.append(parsed['date_range'])
         if 'date_range' in filters:
             date_range = filters['date_range']
-
-            if 'start' in date_range:
-                start_date = datetime.strptime(date_range['start'], '%Y-%m-%d')
-                filtered = [r for r in filtered if datetime.fromtimestamp(
-                    r['metadata'].get('modified_time', 0)) >= start_date]
-
-            if 'end' in date_range:
-                end_date = datetime.strptime(date_range['end'], '%Y-%m-%d')
-                filtered = [r for r in filtered if datetime.fromtimestamp(
-                    r['metadata'].get('modified_time', 0)) <= end_date]
-
-        return filtered
+            date_ranges.append((date_range.get('start'), date_range.get('end')))
+        for start, end in date_ranges:
+            if start:
+                where.append('f.modified_time >= ?')
+                params.append(self._date_to_timestamp(start))
+            if end:
+                where.append('f.modified_time < ?')
+                params.append(self._date_to_timestamp(end) + 24 * 60 * 60)
+
+        # Size range
+        if parsed['size_range']:
+            min_size, max_size = parsed['size_range']
+            if min_size is not None:
+                where.append('f.size >= ?')
+                params.append(min_size)
+            if max_size is not None:
+                where.append('f.size <= ?')
+                params.append(max_size)
+
+        # Tags
+        for tag in parsed['tags']:
+            where.append('EXISTS (SELECT 1 FROM tags tg WHERE tg.file_id = f.id AND tg.tag = ?)')
+            params.append(tag)
+        for tag in parsed['exclude_tags']:
+            where.append('NOT EXISTS (SELECT 1 FROM tags tg WHERE tg.file_id = f.id AND tg.tag = ?)')
+            params.append(tag)
+
+        # Exact phrases must appear in the indexed content
+        for phrase in parsed['exact_phrases']:
+            escaped = phrase.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where.append(
+                "EXISTS (SELECT 1 FROM content c WHERE c.file_id = f.id AND c.content LIKE ? ESCAPE '\\')")
+            params.append(f'%{escaped}%')
+
+        return where, params
 
     def clear_cache(self) -> bool:
         """Clear search cache."""
         try:
-            success = self.vector_search.clear_cache()
-            if hasattr(self, 'keyword_index'):
-                delattr(self, 'keyword_index')
-            return success
+            self._suggest_cache.clear()
+            return self.vector_search.clear_cache()
         except Exception as e:
             self.logger.error(f"Error clearing cache: {e}")
             return False
@@ -423,28 +1442,32 @@ class SearchEngine:
         Returns:
             Number of files removed from the index
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.pool.transaction() as conn:
+            cursor = conn.cursor()
 
-        # Get all indexed file paths
-        cursor.execute('SELECT id, path FROM files')
-        indexed_files = cursor.fetchall()
+            # Get all indexed file paths
+            cursor.execute('SELECT id, path FROM files')
+            indexed_files = cursor.fetchall()
 
-        # Convert existing_paths to a set for faster lookups
-        existing_paths_set = set(existing_paths)
+            # Convert existing_paths to a set for faster lookups
+            existing_paths_set = set(existing_paths)
 
-        removed_count = 0
+            removed = []
 
-        for file_id, file_path in indexed_files:
-            if file_path not in existing_paths_set:
-                # File no longer exists, remove from index
-                cursor.execute('DELETE FROM files WHERE id = ?', (file_id,))
-                removed_count += 1
+            for file_id, file_path in indexed_files:
+                if file_path not in existing_paths_set:
+                    # File no longer exists, remove from index (foreign keys are
+                    # not enforced, so dependent rows are removed explicitly)
+                    cursor.execute('DELETE FROM files WHERE id = ?', (file_id,))
+                    for table in ('terms', 'content', 'metadata', 'tags'):
+                        cursor.execute(f'DELETE FROM {table} WHERE file_id = ?', (file_id,))
+                    removed.append((file_id, file_path))
 
-        conn.commit()
-        conn.close()
+            if self._trigram_index and removed:
+                self._remove_trigram_rows(cursor, removed)
+        self._suggest_cache.clear()
 
-        return removed_count
+        return len(removed)
 
     def _parse_query(self, query):
         """
@@ -0,0 +1,392 @@
+"""
+Sharded Search Module for Smart File Organizer.
+Splits the search index into independent shards, each a complete SearchEngine
+with its own SQLite database and vector store.
+
+Files are assigned to shards by root directory or by a hash of their path.
+Shards are built in parallel by worker processes, so indexing is no longer
+limited to one thread and one SQLite writer, and a shard can be rebuilt on its
+own. Queries fan out to all shards concurrently and the per-shard top-k lists
+are merged.
+
+Each shard fits its own embedding model, so semantic hits of different
+shards are merged by their rank within the shard, never by similarity (see
+SearchEngine.merge_results), and find_similar() only searches the shard that
+holds the document.
+"""
+
+import os
+import json
+import time
+import shutil
+import zlib
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Any
+
+from .search_engine import SearchEngine
+
+MANIFEST_FILE = 'shards.json'
+
+# Order of suggestion match kinds when merging shards (see SearchEngine.suggest)
+SUGGEST_MATCH_ORDER = {'prefix': 0, 'word': 1, 'name': 2, 'path': 3, 'fuzzy': 4}
+
+
+def _index_shard(shard_config: Dict, files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Index files into one shard (runs in a worker process)."""
+    start_time = time.time()
+    result = SearchEngine(shard_config).index_files(files)
+    result['seconds'] = time.time() - start_time
+    return result
+
+
+class ShardedSearchEngine:
+    """
+    Search index partitioned into shards that are built and queried in parallel
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        Initialize the sharded search engine
+
+        Args:
+            config: Configuration dictionary. 'partition' is 'hash' (with
+                'num_shards') or 'root' (with 'roots', one shard per root plus
+                one for files outside them). 'search' and 'vector_search' are
+                passed to every shard.
+        """
+        self.config = config or {}
+        self.logger = logging.getLogger(__name__)
+
+        if os.name == 'nt':  # Windows
+            default_dir = os.path.join(os.path.expanduser("~"), "AppData", "Local", "AIDocumentOrganizer", "shards")
+        else:  # macOS/Linux
+            default_dir = os.path.join(os.path.expanduser("~"), ".config", "AIDocumentOrganizer", "shards")
+
+        self.settings = {
+            'shard_dir': default_dir,
+            'partition': 'hash',     # 'hash' or 'root'
+            'num_shards': 8,         # Shards for hash partitioning
+            'roots': [],             # Root directories for root partitioning
+            'workers': None          # Index build processes (defaults to the CPU count)
+        }
+        self.settings.update({k: v for k, v in self.config.items()
+                              if k in self.settings and v is not None})
+
+        self.shard_dir = self.settings['shard_dir']
+        self.partition = self.settings['partition']
+        if self.partition == 'root':
+            if not self.settings['roots']:
+                raise ValueError("Root partitioning needs at least one root directory")
+            self.roots = [self._normalize(root) for root in self.settings['roots']]
+            self.num_shards = len(self.roots) + 1   # Last shard holds files outside the roots
+        elif self.partition == 'hash':
+            self.roots = []
+            self.num_shards = max(1, int(self.settings['num_shards']))
+        else:
+            raise ValueError(f"Unknown partition method: {self.partition}")
+
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self._check_manifest()
+
+        self.shards = [SearchEngine(self._shard_config(i)) for i in range(self.num_shards)]
+        self._executor = None
+
+    def shard_for(self, file_path: str) -> int:
+        """
+        Get the shard a file belongs to.
+
+        Args:
+            file_path: Path of the file
+
+        Returns:
+            Shard number
+        """
+        if self.partition == 'root':
+            path = self._normalize(file_path)
+            best, best_length = self.num_shards - 1, -1
+            for i, root in enumerate(self.roots):
+                if (path == root or path.startswith(root.rstrip(os.sep) + os.sep)) and len(root) > best_length:
+                    best, best_length = i, len(root)
+            return best
+
+        return zlib.crc32(file_path.encode('utf-8')) % self.num_shards
+
+    def index_files(self, files: List[Dict[str, Any]], callback=None) -> Dict[str, Any]:
+        """
+        Index files, building the affected shards in parallel worker processes.
+
+        Args:
+            files: List of file dictionaries with content and metadata
+            callback: Optional progress callback function, called as each shard finishes
+
+        Returns:
+            Dictionary with indexing results, including the result of each shard
+        """
+        groups = {}
+        for file_info in files:
+            if file_info.get('file_path'):
+                groups.setdefault(self.shard_for(file_info['file_path']), []).append(file_info)
+
+        total_files = sum(len(group) for group in groups.values())
+        if callback:
+            callback(0, total_files, f"Indexing {len(groups)} shards...")
+
+        results = self._build_shards(groups, callback, total_files)
+
+        return {
+            'success': all(result.get('success') for result in results.values()),
+            'indexed_files': sum(result.get('indexed_files', 0) for result in results.values()),
+            'shards': results
+        }
+
+    def rebuild_shard(self, shard_id: int, files: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Delete one shard and index it again from scratch.
+
+        Args:
+            shard_id: Shard to rebuild
+            files: Files of the shard (files belonging to other shards are skipped)
+
+        Returns:
+            Dictionary with indexing results
+        """
+        if not 0 <= shard_id < self.num_shards:
+            raise ValueError(f"No shard {shard_id}")
+
+        shard_files = [f for f in files if f.get('file_path') and self.shard_for(f['file_path']) == shard_id]
+        if len(shard_files) < len(files):
+            self.logger.warning(f"Skipping {len(files) - len(shard_files)} files that belong to other shards")
+
+        self._close_shard(shard_id)
+        shutil.rmtree(self._shard_path(shard_id), ignore_errors=True)
+
+        return self._build_shards({shard_id: shard_files}).get(
+            shard_id, {'success': True, 'indexed_files': 0})
+
+    def advanced_search(self, query: str, filters: Optional[Dict] = None, top_k: int = 10) -> Dict[str, Any]:
+        """
+        Search all shards concurrently and merge their results.
+
+        Args:
+            query: Search query text (may contain type:, size:, date: and tag: operators)
+            filters: Optional filters ('file_type', 'category', 'date_range')
+            top_k: Maximum number of results to return
+
+        Returns:
+            Dictionary with 'results' (each with the 'shard' it came from),
+            'facets' and 'total' summed over the shards, and 'timings'
+        """
+        start_time = time.perf_counter()
+        responses = self._fan_out('advanced_search', query, filters, top_k)
+
+        result_lists = []
+        facets = {}
+        total = 0
+        for shard_id, response in enumerate(responses):
+            for result in response['results']:
+                result['shard'] = shard_id
+            result_lists.append(response['results'])
+            total += response.get('total', 0)
+            for facet, counts in response.get('facets', {}).items():
+                merged = facets.setdefault(facet, {})
+                for value, count in counts.items():
+                    merged[value] = merged.get(value, 0) + count
+
+        results = self._merge_ranked(result_lists, top_k)
+
+        return {
+            'results': results,
+            'facets': facets,
+            'total': total,
+            'timings': {
+                'slowest_shard_ms': max((r.get('timings', {}).get('total_ms', 0.0) for r in responses),
+                                        default=0.0),
+                'total_ms': (time.perf_counter() - start_time) * 1000
+            }
+        }
+
+    def search(self, query: str, filters: Optional[Dict] = None, top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Search all shards and return the merged results.
+
+        Args:
+            query: Search query text
+            filters: Optional filters
+            top_k: Maximum number of results to return
+
+        Returns:
+            List of search results
+        """
+        return self.advanced_search(query, filters, top_k)['results']
+
+    def search_batch(self, queries: List[str], filters: Optional[Dict] = None,
+                     top_k: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Run several searches on all shards and merge the results of each query.
+
+        Args:
+            queries: Search query texts
+            filters: Optional filters applied to every query
+            top_k: Maximum number of results per query
+
+        Returns:
+            One result list per query, in query order
+        """
+        responses = self._fan_out('search_batch', queries, filters, top_k)
+
+        merged = []
+        for i in range(len(queries)):
+            for shard_id, shard_results in enumerate(responses):
+                for result in shard_results[i]:
+                    result['shard'] = shard_id
+            merged.append(self._merge_ranked([shard_results[i] for shard_results in responses], top_k))
+        return merged
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Suggest files from all shards for typed text.
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of suggestions ordered as by SearchEngine.suggest()
+        """
+        suggestions = []
+        for shard_id, shard_suggestions in enumerate(self._fan_out('suggest', prefix, limit)):
+            for suggestion in shard_suggestions:
+                suggestion['shard'] = shard_id
+                suggestions.append(suggestion)
+
+        suggestions.sort(key=lambda s: (SUGGEST_MATCH_ORDER.get(s['match'], len(SUGGEST_MATCH_ORDER)),
+                                        -s['score'], len(s['file_name']), s['file_name']))
+        return suggestions[:limit]
+
+    def find_similar(self, file_path: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find documents similar to a document, within the shard that holds it.
+
+        Args:
+            file_path: Path to the document to compare against
+            top_k: Number of similar documents to return
+
+        Returns:
+            List of similar documents with scores
+        """
+        return self.shards[self.shard_for(file_path)].find_similar(file_path, top_k)
+
+    def remove_missing_files(self, existing_paths) -> int:
+        """
+        Remove files that no longer exist from all shards.
+
+        Args:
+            existing_paths: List of existing file paths
+
+        Returns:
+            Number of files removed from the index
+        """
+        existing_paths = set(existing_paths)
+        return sum(self._fan_out('remove_missing_files', existing_paths))
+
+    def clear_cache(self) -> bool:
+        """Clear the search cache of every shard."""
+        return all(self._fan_out('clear_cache'))
+
+    def _build_shards(self, groups: Dict[int, List[Dict[str, Any]]], callback=None,
+                      total_files: int = 0) -> Dict[int, Dict[str, Any]]:
+        """Index groups of files into their shards, one worker process per shard."""
+        results = {}
+        done = 0
+        workers = min(self.settings['workers'] or os.cpu_count() or 1, len(groups))
+
+        # Release the shard files (memory-mapped vectors) while workers rewrite them
+        for shard_id in groups:
+            self._close_shard(shard_id)
+
+        try:
+            if workers <= 1:
+                for shard_id, files in groups.items():
+                    results[shard_id] = _index_shard(self._shard_config(shard_id), files)
+                    done += len(files)
+                    if callback:
+                        callback(done, total_files, f"Indexed shard {shard_id}")
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = {executor.submit(_index_shard, self._shard_config(shard_id), files): shard_id
+                               for shard_id, files in groups.items()}
+                    for future in as_completed(futures):
+                        shard_id = futures[future]
+                        try:
+                            results[shard_id] = future.result()
+                        except Exception as e:
+                            self.logger.error(f"Error indexing shard {shard_id}: {e}")
+                            results[shard_id] = {'success': False, 'error': str(e)}
+                        done += len(groups[shard_id])
+                        if callback:
+                            callback(done, total_files, f"Indexed shard {shard_id}")
+        finally:
+            # The shards were written by other engine instances; reopen them to
+            # pick up the new embedding model and vectors
+            for shard_id in groups:
+                self.shards[shard_id] = SearchEngine(self._shard_config(shard_id))
+
+        return results
+
+    def _close_shard(self, shard_id: int) -> None:
+        """Close a shard engine and drop it until it is reopened."""
+        if self.shards[shard_id] is not None:
+            self.shards[shard_id].close()
+            self.shards[shard_id] = None
+
+    def _fan_out(self, method: str, *args) -> List[Any]:
+        """Call a method on every shard concurrently and return the results in shard order."""
+        if self.num_shards == 1:
+            return [getattr(self.shards[0], method)(*args)]
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.num_shards, thread_name_prefix='shard')
+        futures = [self._executor.submit(getattr(shard, method), *args) for shard in self.shards]
+        return [future.result() for future in futures]
+
+    def _merge_ranked(self, result_lists: List[List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+        """Fuse per-shard result lists into one ranking (see SearchEngine.merge_results)."""
+        engine = next(shard for shard in self.shards if shard is not None)
+        return engine.merge_results(result_lists, top_k)
+
+    def _shard_path(self, shard_id: int) -> str:
+        """Directory of a shard."""
+        return os.path.join(self.shard_dir, f"shard_{shard_id:03d}")
+
+    def _shard_config(self, shard_id: int) -> Dict[str, Any]:
+        """SearchEngine configuration of a shard."""
+        shard_path = self._shard_path(shard_id)
+        return {
+            'db_path': os.path.join(shard_path, 'document_index.db'),
+            'search': dict(self.config.get('search', {})),
+            'hash_cache': dict(self.config.get('hash_cache', {})),
+            'vector_search': {**self.config.get('vector_search', {}),
+                              'cache_dir': os.path.join(shard_path, 'embeddings')}
+        }
+
+    def _check_manifest(self) -> None:
+        """Record the partitioning, or check that it matches the existing shards."""
+        manifest = {'partition': self.partition, 'num_shards': self.num_shards, 'roots': self.roots}
+        path = os.path.join(self.shard_dir, MANIFEST_FILE)
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            if existing != manifest:
+                raise ValueError(f"Shards in {self.shard_dir} were built with a different partitioning; "
+                                 f"clear the directory to re-partition")
+            return
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        """Normalize a path for root matching."""
+        return os.path.normcase(os.path.normpath(path))
@@ -1,11 +1,96 @@
 import os
+import re
 import json
 import sqlite3
 import logging
+import time
 from collections import defaultdict
 
+from .db_pool import get_pool
+
 logger = logging.getLogger("AIDocumentOrganizer")
 
+# Words and single punctuation characters; tag names and texts are split alike
+TAG_TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+
+class TagMatcher:
+    """
+    Aho-Corasick automaton over the words of all tag names
+
+    Tag names and texts are lowercased and split into words, so a tag only
+    matches whole words ("tax" does not match "taxonomy") and the words of
+    a multi-word tag may be separated by any whitespace. One pass over a
+    text counts the occurrences of every tag.
+    """
+
+    def __init__(self, tags):
+        """
+        Build the automaton
+
+        Args:
+            tags: List of tag dictionaries with at least 'name'
+        """
+        self.tags = tags
+        self.names = {tag['name'].lower() for tag in tags}
+
+        goto = [{}]       # State -> {word: next state}
+        output = [[]]     # State -> indexes of the tags ending there
+        for index, tag in enumerate(tags):
+            words = TAG_TOKEN_PATTERN.findall(tag['name'].lower())
+            if not words:
+                continue
+            state = 0
+            for word in words:
+                if word not in goto[state]:
+                    goto[state][word] = len(goto)
+                    goto.append({})
+                    output.append([])
+                state = goto[state][word]
+            output[state].append(index)
+
+        # Failure links in breadth-first order; a state also reports the tags
+        # of its failure state (the longest suffix of its words in the trie)
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for word, next_state in goto[state].items():
+                fallback = fail[state]
+                while fallback and word not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(word, 0)
+                output[next_state].extend(output[fail[next_state]])
+                queue.append(next_state)
+
+        self._goto = goto
+        self._fail = fail
+        self._output = [tuple(indexes) for indexes in output]
+
+    def count(self, text):
+        """
+        Count the occurrences of every tag in a text
+
+        Args:
+            text: Text to search
+
+        Returns:
+            Dictionary of tag index (into self.tags) -> number of occurrences
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        root = goto[0]
+        counts = {}
+        state = 0
+        for word in TAG_TOKEN_PATTERN.findall(text.lower()):
+            if state:
+                while state and word not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(word, 0)
+            else:
+                state = root.get(word, 0)
+            for index in output[state]:
+                counts[index] = counts.get(index, 0) + 1
+        return counts
+
 
 class TagManager:
     """
@@ -26,55 +111,75 @@ class TagManager:
             db_path = os.path.join(app_dir, "tags.db")
 
         self.db_path = db_path
+        self.pool = get_pool(db_path)
         self._initialize_database()
 
+        # (tag version, TagMatcher) for tag suggestions; rebuilt when tags change
+        self._matcher = None
+
     def _initialize_database(self):
         """
         Initialize the SQLite database schema
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Create tags table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tags (
-                    id INTEGER PRIMARY KEY,
-                    name TEXT UNIQUE,
-                    category TEXT,
-                    color TEXT,
-                    description TEXT,
-                    parent_id INTEGER,
-                    created_time REAL,
-                    FOREIGN KEY (parent_id) REFERENCES tags (id) ON DELETE SET NULL
-                )
-            ''')
+            with self.pool.transaction() as conn:
+                cursor = conn.cursor()
 
-            # Create file_tags table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS file_tags (
-                    file_path TEXT,
-                    tag_id INTEGER,
-                    added_time REAL,
-                    confidence REAL,
-                    is_ai_suggested BOOLEAN,
-                    PRIMARY KEY (file_path, tag_id),
-                    FOREIGN KEY (tag_id) REFERENCES tags (id) ON DELETE CASCADE
-                )
-            ''')
-
-            # Create indexes
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_tags_name ON tags (name)')
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_tags_category ON tags (category)')
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_file_tags_file_path ON file_tags (file_path)')
-            cursor.execute(
-                'CREATE INDEX IF NOT EXISTS idx_file_tags_tag_id ON file_tags (tag_id)')
+                # Create tags table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS tags (
+                        id INTEGER PRIMARY KEY,
+                        name TEXT UNIQUE,
+                        category TEXT,
+                        color TEXT,
+                        description TEXT,
+                        parent_id INTEGER,
+                        created_time REAL,
+                        FOREIGN KEY (parent_id) REFERENCES tags (id) ON DELETE SET NULL
+                    )
+                ''')
+
+                # Create file_tags table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS file_tags (
+                        file_path TEXT,
+                        tag_id INTEGER,
+                        added_time REAL,
+                        confidence REAL,
+                        is_ai_suggested BOOLEAN,
+                        PRIMARY KEY (file_path, tag_id),
+                        FOREIGN KEY (tag_id) REFERENCES tags (id) ON DELETE CASCADE
+                    )
+                ''')
+
+                # Create indexes
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_tags_name ON tags (name)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_tags_category ON tags (category)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_file_tags_file_path ON file_tags (file_path)')
+                cursor.execute(
+                    'CREATE INDEX IF NOT EXISTS idx_file_tags_tag_id ON file_tags (tag_id)')
 
-            conn.commit()
-            conn.close()
+                # Version of the tag names, bumped by triggers on every change from any connection
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS tag_version (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        version INTEGER NOT NULL
+                    )
+                ''')
+                cursor.execute(
+                    'INSERT OR IGNORE INTO tag_version (id, version) VALUES (1, 0)')
+                for trigger, event in (('tags_inserted', 'INSERT'),
+                                       ('tags_renamed', 'UPDATE OF name'),
+                                       ('tags_deleted', 'DELETE')):
+                    cursor.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS {trigger} AFTER {event} ON tags
+                        BEGIN
+                            UPDATE tag_version SET version = version + 1 WHERE id = 1;
+                        END
+                    ''')
         except Exception as e:
             logger.error(f"Error initializing tag database: {str(e)}")
             raise
@@ -94,42 +199,38 @@ class TagManager:
             Tag ID if successful, None otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Check if tag already exists
-            cursor.execute('SELECT id FROM tags WHERE name = ?', (name,))
-            result = cursor.fetchone()
-
-            if result:
-                logger.warning(f"Tag '{name}' already exists")
-                conn.close()
-                return result[0]
-
-            # Get parent ID if specified
-            parent_id = None
-            if parent_name:
-                cursor.execute(
-                    'SELECT id FROM tags WHERE name = ?', (parent_name,))
-                parent_result = cursor.fetchone()
-
-                if parent_result:
-                    parent_id = parent_result[0]
-                else:
-                    logger.warning(f"Parent tag '{parent_name}' not found")
-
-            # Insert new tag
-            import time
-            cursor.execute('''
-                INSERT INTO tags (name, category, color, description, parent_id, created_time)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (name, category, color, description, parent_id, time.time()))
+            with self.pool.transaction() as conn:
+                cursor = conn.cursor()
+
+                # Check if tag already exists
+                cursor.execute('SELECT id FROM tags WHERE name = ?', (name,))
+                result = cursor.fetchone()
+
+                if result:
+                    logger.warning(f"Tag '{name}' already exists")
+                    return result[0]
+
+                # Get parent ID if specified
+                parent_id = None
+                if parent_name:
+                    cursor.execute(
+                        'SELECT id FROM tags WHERE name = ?', (parent_name,))
+                    parent_result = cursor.fetchone()
+
+                    if parent_result:
+                        parent_id = parent_result[0]
+                    else:
+                        logger.warning(f"Parent tag '{parent_name}' not found")
+
+                # Insert new tag
+                cursor.execute('''
+                    INSERT INTO tags (name, category, color, description, parent_id, created_time)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (name, category, color, description, parent_id, time.time()))
 
-            tag_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+                tag_id = cursor.lastrowid
 
-            return tag_id
+                return tag_id
         except Exception as e:
             logger.error(f"Error creating tag '{name}': {str(e)}")
             return None
@@ -150,66 +251,62 @@ class TagManager:
             True if successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Check if tag exists
-            cursor.execute('SELECT id FROM tags WHERE id = ?', (tag_id,))
-            if not cursor.fetchone():
-                logger.warning(f"Tag with ID {tag_id} not found")
-                conn.close()
-                return False
-
-            # Get parent ID if specified
-            parent_id = None
-            if parent_name:
-                cursor.execute(
-                    'SELECT id FROM tags WHERE name = ?', (parent_name,))
-                parent_result = cursor.fetchone()
+            with self.pool.transaction() as conn:
+                cursor = conn.cursor()
 
-                if parent_result:
-                    parent_id = parent_result[0]
-                else:
-                    logger.warning(f"Parent tag '{parent_name}' not found")
+                # Check if tag exists
+                cursor.execute('SELECT id FROM tags WHERE id = ?', (tag_id,))
+                if not cursor.fetchone():
+                    logger.warning(f"Tag with ID {tag_id} not found")
+                    return False
 
-            # Build update query
-            update_fields = []
-            params = []
+                # Get parent ID if specified
+                parent_id = None
+                if parent_name:
+                    cursor.execute(
+                        'SELECT id FROM tags WHERE name = ?', (parent_name,))
+                    parent_result = cursor.fetchone()
 
-            if name is not None:
-                update_fields.append('name = ?')
-                params.append(name)
+                    if parent_result:
+                        parent_id = parent_result[0]
+                    else:
+                        logger.warning(f"Parent tag '{parent_name}' not found")
 
-            if category is not None:
-                update_fields.append('category = ?')
-                params.append(category)
+                # Build update query
+                update_fields = []
+                params = []
 
-            if color is not None:
-                update_fields.append('color = ?')
-                params.append(color)
+                if name is not None:
+                    update_fields.append('name = ?')
+                    params.append(name)
 
-            if description is not None:
-                update_fields.append('description = ?')
-                params.append(description)
+                if category is not None:
+                    update_fields.append('category = ?')
+                    params.append(category)
 
-            if parent_name is not None:
-                update_fields.append('parent_id = ?')
-                params.append(parent_id)
+                if color is not None:
+                    update_fields.append('color = ?')
+                    params.append(color)
 
-            if not update_fields:
-                logger.warning("No fields to update")
-                conn.close()
-                return False
+                if description is not None:
+                    update_fields.append('description = ?')
+                    params.append(description)
 
-            # Execute update
-            query = f"UPDATE tags SET {', '.join(update_fields)} WHERE id = ?"
-            params.append(tag_id)
+                if parent_name is not None:
+                    update_fields.append('parent_id = ?')
+                    params.append(parent_id)
 
-            cursor.execute(query, params)
-            conn.commit()
-            conn.close()
+                if not update_fields:
+                    logger.warning("No fields to update")
+                    return False
 
-            return True
+                # Execute update
+                query = f"UPDATE tags SET {', '.join(update_fields)} WHERE id = ?"
+                params.append(tag_id)
+
+                cursor.execute(query, params)
+
+                return True
         except Exception as e:
             logger.error(f"Error updating tag {tag_id}: {str(e)}")
             return False
@@ -225,26 +322,22 @@ class TagManager:
             True if successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.pool.transaction() as conn:
+                cursor = conn.cursor()
 
-            # Check if tag exists
-            cursor.execute('SELECT id FROM tags WHERE id = ?', (tag_id,))
-            if not cursor.fetchone():
-                logger.warning(f"Tag with ID {tag_id} not found")
-                conn.close()
-                return False
-
-            # Delete tag
-            cursor.execute('DELETE FROM tags WHERE id = ?', (tag_id,))
+                # Check if tag exists
+                cursor.execute('SELECT id FROM tags WHERE id = ?', (tag_id,))
+                if not cursor.fetchone():
+                    logger.warning(f"Tag with ID {tag_id} not found")
+                    return False
 
-            # Delete file-tag associations
-            cursor.execute('DELETE FROM file_tags WHERE tag_id = ?', (tag_id,))
+                # Delete tag
+                cursor.execute('DELETE FROM tags WHERE id = ?', (tag_id,))
 
-            conn.commit()
-            conn.close()
+                # Delete file-tag associations
+                cursor.execute('DELETE FROM file_tags WHERE tag_id = ?', (tag_id,))
 
-            return True
+                return True
         except Exception as e:
             logger.error(f"Error deleting tag {tag_id}: {str(e)}")
             return False
@@ -257,9 +350,8 @@ class TagManager:
             List of tag dictionaries
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self.pool.connection().cursor()
+            cursor.row_factory = sqlite3.Row
 
             cursor.execute('''
                 SELECT t.id, t.name, t.category, t.color, t.description, t.parent_id, p.name as parent_name,
@@ -270,7 +362,6 @@ class TagManager:
             ''')
 
             tags = [dict(row) for row in cursor.fetchall()]
-            conn.close()
 
             return tags
         except Exception as e:
@@ -288,9 +379,8 @@ class TagManager:
             Tag dictionary if found, None otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self.pool.connection().cursor()
+            cursor.row_factory = sqlite3.Row
 
             cursor.execute('''
                 SELECT t.id, t.name, t.category, t.color, t.description, t.parent_id, p.name as parent_name,
@@ -301,7 +391,6 @@ class TagManager:
             ''', (tag_id,))
 
             result = cursor.fetchone()
-            conn.close()
 
             return dict(result) if result else None
         except Exception as e:
@@ -319,9 +408,8 @@ class TagManager:
             Tag dictionary if found, None otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self.pool.connection().cursor()
+            cursor.row_factory = sqlite3.Row
 
             cursor.execute('''
                 SELECT t.id, t.name, t.category, t.color, t.description, t.parent_id, p.name as parent_name,
@@ -332,7 +420,6 @@ class TagManager:
             ''', (tag_name,))
 
             result = cursor.fetchone()
-            conn.close()
 
             return dict(result) if result else None
         except Exception as e:
@@ -350,9 +437,8 @@ class TagManager:
             List of tag dictionaries
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self.pool.connection().cursor()
+            cursor.row_factory = sqlite3.Row
 
             cursor.execute('''
                 SELECT t.id, t.name, t.category, t.color, t.description, t.parent_id, p.name as parent_name,
@@ -364,7 +450,6 @@ class TagManager:
             ''', (category,))
 
             tags = [dict(row) for row in cursor.fetchall()]
-            conn.close()
 
             return tags
         except Exception as e:
@@ -423,47 +508,87 @@ class TagManager:
             True if successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Get tag ID
-            cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
-            result = cursor.fetchone()
-
-            if not result:
-                # Create tag if it doesn't exist
-                tag_id = self.create_tag(tag_name)
-                if not tag_id:
-                    conn.close()
-                    return False
-            else:
-                tag_id = result[0]
-
-            # Check if file-tag association already exists
-            cursor.execute(
-                'SELECT 1 FROM file_tags WHERE file_path = ? AND tag_id = ?', (file_path, tag_id))
-            if cursor.fetchone():
-                # Update existing association
-                cursor.execute('''
-                    UPDATE file_tags SET confidence = ?, is_ai_suggested = ?, added_time = ?
-                    WHERE file_path = ? AND tag_id = ?
-                ''', (confidence, is_ai_suggested, time.time(), file_path, tag_id))
-            else:
-                # Add new association
-                cursor.execute('''
-                    INSERT INTO file_tags (file_path, tag_id, added_time, confidence, is_ai_suggested)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (file_path, tag_id, time.time(), confidence, is_ai_suggested))
+            with self.pool.transaction() as conn:
+                cursor = conn.cursor()
+
+                # Get tag ID
+                cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
+                result = cursor.fetchone()
+
+                if not result:
+                    # Create tag if it doesn't exist
+                    tag_id = self.create_tag(tag_name)
+                    if not tag_id:
+                        return False
+                else:
+                    tag_id = result[0]
 
-            conn.commit()
-            conn.close()
+                # Check if file-tag association already exists
+                cursor.execute(
+                    'SELECT 1 FROM file_tags WHERE file_path = ? AND tag_id = ?', (file_path, tag_id))
+                if cursor.fetchone():
+                    # Update existing association
+                    cursor.execute('''
+                        UPDATE file_tags SET confidence = ?, is_ai_suggested = ?, added_time = ?
+                        WHERE file_path = ? AND tag_id = ?
+                    ''', (confidence, is_ai_suggested, time.time(), file_path, tag_id))
+                else:
+                    # Add new association
+                    cursor.execute('''
+                        INSERT INTO file_tags (file_path, tag_id, added_time, confidence, is_ai_suggested)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (file_path, tag_id, time.time(), confidence, is_ai_suggested))
 
-            return True
+                return True
         except Exception as e:
             logger.error(
                 f"Error adding tag '{tag_name}' to file '{file_path}': {str(e)}")
             return False
 
+    def add_tags_to_files(self, entries):
+        """
+        Add many tags to many files in one transaction
+
+        Missing tags are created; existing associations are updated.
+
+        Args:
+            entries: Iterable of (file_path, tag_name, confidence) tuples
+
+        Returns:
+            Number of file-tag associations written, 0 on error
+        """
+        entries = [(file_path, tag_name, confidence)
+                   for file_path, tag_name, confidence in entries if tag_name]
+        if not entries:
+            return 0
+
+        try:
+            with self.pool.transaction() as conn:
+                cursor = conn.cursor()
+                now = time.time()
+
+                names = sorted({tag_name for _, tag_name, _ in entries})
+                cursor.executemany('INSERT OR IGNORE INTO tags (name, created_time) VALUES (?, ?)',
+                                   [(name, now) for name in names])
+
+                tag_ids = {}
+                for start in range(0, len(names), 500):
+                    chunk = names[start:start + 500]
+                    cursor.execute(
+                        f"SELECT id, name FROM tags WHERE name IN ({', '.join('?' * len(chunk))})", chunk)
+                    tag_ids.update({name: tag_id for tag_id, name in cursor.fetchall()})
+
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO file_tags (file_path, tag_id, added_time, confidence, is_ai_suggested)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', [(file_path, tag_ids[tag_name], now, confidence, False)
+                      for file_path, tag_name, confidence in entries])
+
+            return len(entries)
+        except Exception as e:
+            logger.error(f"Error adding tags to {len(entries)} files: {str(e)}")
+            return 0
+
     def remove_tag_from_file(self, file_path, tag_name):
         """
         Remove a tag from a file
@@ -476,33 +601,55 @@ class TagManager:
             True if successful, False otherwise
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.pool.transaction() as conn:
+                cursor = conn.cursor()
 
-            # Get tag ID
-            cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
-            result = cursor.fetchone()
+                # Get tag ID
+                cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
+                result = cursor.fetchone()
 
-            if not result:
-                logger.warning(f"Tag '{tag_name}' not found")
-                conn.close()
-                return False
-
-            tag_id = result[0]
+                if not result:
+                    logger.warning(f"Tag '{tag_name}' not found")
+                    return False
 
-            # Remove file-tag association
-            cursor.execute(
-                'DELETE FROM file_tags WHERE file_path = ? AND tag_id = ?', (file_path, tag_id))
+                tag_id = result[0]
 
-            conn.commit()
-            conn.close()
+                # Remove file-tag association
+                cursor.execute(
+                    'DELETE FROM file_tags WHERE file_path = ? AND tag_id = ?', (file_path, tag_id))
 
-            return True
+                return True
         except Exception as e:
             logger.error(
                 f"Error removing tag '{tag_name}' from file '{file_path}': {str(e)}")
             return False
 
+    def clear_file_tags(self, file_paths):
+        """
+        Remove all tags from many files in one transaction
+
+        Args:
+            file_paths: Paths of the files
+
+        Returns:
+            Number of file-tag associations removed, 0 on error
+        """
+        file_paths = list(file_paths)
+        if not file_paths:
+            return 0
+
+        try:
+            with self.pool.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.executemany('DELETE FROM file_tags WHERE file_path = ?',
+                                   [(file_path,) for file_path in file_paths])
+                removed = cursor.rowcount
+
+            return removed
+        except Exception as e:
+            logger.error(f"Error removing tags from {len(file_paths)} files: {str(e)}")
+            return 0
+
     def get_file_tags(self, file_path):
         """
         Get tags for a file
@@ -514,9 +661,8 @@ class TagManager:
             List of tag dictionaries
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self.pool.connection().cursor()
+            cursor.row_factory = sqlite3.Row
 
             cursor.execute('''
                 SELECT t.id, t.name, t.category, t.color, t.description, ft.confidence, ft.is_ai_suggested
@@ -527,7 +673,6 @@ class TagManager:
             ''', (file_path,))
 
             tags = [dict(row) for row in cursor.fetchall()]
-            conn.close()
 
             return tags
         except Exception as e:
@@ -535,6 +680,45 @@ class TagManager:
                 f"Error getting tags for file '{file_path}': {str(e)}")
             return []
 
+    def get_tags_for_files(self, file_paths):
+        """
+        Get the tags of many files in one transaction
+
+        Args:
+            file_paths: Paths of the files
+
+        Returns:
+            Dictionary mapping every path to its list of tag dictionaries
+            (as returned by get_file_tags)
+        """
+        file_paths = list(dict.fromkeys(file_paths))
+        tags = {file_path: [] for file_path in file_paths}
+        if not file_paths:
+            return tags
+
+        try:
+            with self.pool.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
+                for start in range(0, len(file_paths), 500):
+                    chunk = file_paths[start:start + 500]
+                    cursor.execute(f'''
+                        SELECT ft.file_path, t.id, t.name, t.category, t.color, t.description,
+                               ft.confidence, ft.is_ai_suggested
+                        FROM file_tags ft
+                        JOIN tags t ON ft.tag_id = t.id
+                        WHERE ft.file_path IN ({', '.join('?' * len(chunk))})
+                        ORDER BY t.category, t.name
+                    ''', chunk)
+                    for row in cursor.fetchall():
+                        tag = dict(row)
+                        tags[tag.pop('file_path')].append(tag)
+
+            return tags
+        except Exception as e:
+            logger.error(f"Error getting tags for {len(file_paths)} files: {str(e)}")
+            return {file_path: [] for file_path in file_paths}
+
     def get_files_by_tag(self, tag_name):
         """
         Get files with a specific tag
@@ -546,8 +730,7 @@ class TagManager:
             List of file paths
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self.pool.connection().cursor()
 
             # Get tag ID
             cursor.execute('SELECT id FROM tags WHERE name = ?', (tag_name,))
@@ -555,7 +738,6 @@ class TagManager:
 
             if not result:
                 logger.warning(f"Tag '{tag_name}' not found")
-                conn.close()
                 return []
 
             tag_id = result[0]
@@ -565,17 +747,39 @@ class TagManager:
                 'SELECT file_path FROM file_tags WHERE tag_id = ?', (tag_id,))
             files = [row[0] for row in cursor.fetchall()]
 
-            conn.close()
-
             return files
         except Exception as e:
             logger.error(f"Error getting files for tag '{tag_name}': {str(e)}")
             return []
 
+    def get_tag_matcher(self):
+        """
+        Get the tag name matcher
+
+        The matcher is cached and rebuilt after a tag is created, renamed or
+        deleted (by this or any other connection to the database).
+
+        Returns:
+            TagMatcher instance
+        """
+        try:
+            version = self.pool.connection().execute(
+                'SELECT version FROM tag_version WHERE id = 1').fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error reading tag version: {str(e)}")
+            version = None
+
+        if self._matcher is None or version is None or self._matcher[0] != version:
+            self._matcher = (version, TagMatcher(self.get_all_tags()))
+        return self._matcher[1]
+
     def get_tag_suggestions(self, file_info):
         """
         Get tag suggestions for a file based on its content and metadata
 
+        Existing tags are found as whole words, all at once, with one pass
+        over the summary and one over the content.
+
         Args:
             file_info: File information dictionary
 
@@ -583,55 +787,55 @@ class TagManager:
             List of tag dictionaries with confidence scores
         """
         suggestions = []
+        suggested = set()   # Lowercased names of the suggestions
 
-        # Get all existing tags for reference
-        all_tags = self.get_all_tags()
-        tag_names = [tag['name'].lower() for tag in all_tags]
+        # Matcher over all existing tags
+        matcher = self.get_tag_matcher()
+        all_tags = matcher.tags
+        tag_names = matcher.names
 
         # Extract potential tags from summary if available
         if 'summary' in file_info and file_info['summary']:
-            summary = file_info['summary'].lower()
-
-            # Check if any existing tag appears in the summary
-            for tag in all_tags:
-                tag_name = tag['name'].lower()
-                if tag_name in summary:
-                    # Calculate a confidence score based on frequency and prominence
-                    count = summary.count(tag_name)
-                    # Higher confidence for summary matches (max 0.95)
-                    confidence = min(0.7 + (count * 0.05), 0.95)
-
-                    suggestions.append({
-                        'id': tag['id'],
-                        'name': tag['name'],
-                        'confidence': confidence,
-                        'reason': f"Keyword appears {count} times in document summary"
-                    })
+            counts = matcher.count(file_info['summary'])
+
+            # Existing tags appearing in the summary
+            for index in sorted(counts):
+                tag = all_tags[index]
+                count = counts[index]
+                # Higher confidence for summary matches (max 0.95)
+                confidence = min(0.7 + (count * 0.05), 0.95)
+
+                suggestions.append({
+                    'id': tag['id'],
+                    'name': tag['name'],
+                    'confidence': confidence,
+                    'reason': f"Keyword appears {count} times in document summary"
+                })
+                suggested.add(tag['name'].lower())
 
         # Extract potential tags from content
         if 'content' in file_info and file_info['content']:
-            content = file_info['content'].lower()
+            counts = matcher.count(file_info['content'])
 
-            # Check if any existing tag appears in the content
-            for tag in all_tags:
-                tag_name = tag['name'].lower()
+            # Existing tags appearing in the content
+            for index in sorted(counts):
+                tag = all_tags[index]
 
                 # Skip tags already found in summary
-                if any(s['name'].lower() == tag_name for s in suggestions):
+                if tag['name'].lower() in suggested:
                     continue
 
-                if tag_name in content:
-                    # Calculate a confidence score based on frequency
-                    count = content.count(tag_name)
-                    # Max 0.9 for keyword matches
-                    confidence = min(0.5 + (count * 0.1), 0.9)
+                count = counts[index]
+                # Max 0.9 for keyword matches
+                confidence = min(0.5 + (count * 0.1), 0.9)
 
-                    suggestions.append({
-                        'id': tag['id'],
-                        'name': tag['name'],
-                        'confidence': confidence,
-                        'reason': f"Keyword appears {count} times in content"
-                    })
+                suggestions.append({
+                    'id': tag['id'],
+                    'name': tag['name'],
+                    'confidence': confidence,
+                    'reason': f"Keyword appears {count} times in content"
+                })
+                suggested.add(tag['name'].lower())
 
             # Extract potential new tags from AI analysis
             if 'keywords' in file_info and file_info['keywords']:
@@ -639,7 +843,7 @@ class TagManager:
                     keyword = keyword.lower()
 
                     # Skip if already in suggestions
-                    if any(s['name'].lower() == keyword for s in suggestions):
+                    if keyword in suggested:
                         continue
 
                     # Skip very short keywords
@@ -653,13 +857,14 @@ class TagManager:
                             'confidence': 0.85,
                             'reason': "Extracted from AI keyword analysis"
                         })
+                        suggested.add(keyword)
 
             # Extract potential tags from categories
             if 'category' in file_info and file_info['category']:
                 category = file_info['category'].lower()
 
                 # Skip if already in suggestions
-                if not any(s['name'].lower() == category for s in suggestions):
+                if category not in suggested:
                     # Check if this is a new tag
                     if category not in tag_names:
                         suggestions.append({
@@ -667,6 +872,7 @@ class TagManager:
                             'confidence': 0.9,
                             'reason': "Based on document category"
                         })
+                        suggested.add(category)
 
         # Extract potential tags from metadata
         if 'metadata' in file_info and file_info['metadata']:
@@ -679,7 +885,7 @@ class TagManager:
                         continue
 
                     # Skip if already in suggestions
-                    if any(s['name'].lower() == value for s in suggestions):
+                    if value in suggested:
                         continue
 
                     # Check if this is a new tag
@@ -693,6 +899,7 @@ class TagManager:
                             'confidence': confidence,
                             'reason': f"Extracted from metadata field '{key}'"
                         })
+                        suggested.add(value)
 
         # Sort suggestions by confidence (highest first)
         suggestions.sort(key=lambda x: x['confidence'], reverse=True)
@@ -0,0 +1,258 @@
+"""
+Vector Quantization Module for Smart File Organizer.
+Provides compressed codes for the embeddings kept by VectorSearch, so queries
+can be scored without reading the float32 matrix.
+
+Two quantizers are available:
+    int8  8-bit scalar quantization with a trained range per dimension
+          (1 byte per dimension, 4x smaller than float32)
+    pq    product quantization: the vector is split into sub-vectors, and each
+          one is replaced by the id of the nearest of 256 trained centroids
+          (1 byte per sub-vector); queries are scored with per-sub-vector
+          lookup tables (asymmetric distance computation)
+
+Scores computed from codes are approximate; VectorSearch re-ranks the best
+candidates with the exact float32 vectors.
+"""
+
+import os
+from typing import Dict, Optional
+
+# Handle imports with graceful fallbacks
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Rows scored per chunk; small chunks keep the decoded block in CPU cache
+SCORE_CHUNK_SIZE = 2048
+
+
+class ScalarQuantizer:
+    """8-bit scalar quantizer with a per-dimension range."""
+
+    kind = 'int8'
+
+    def __init__(self, dim: int, config: Optional[Dict] = None):
+        """Initialize the quantizer for vectors of the given dimension."""
+        self.dim = dim
+        self.config = config or {}
+        self.offset = None
+        self.scale = None
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether the quantization range is available."""
+        return self.scale is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.dim
+
+    def train(self, sample: 'np.ndarray') -> None:
+        """Learn the range of each dimension from sample vectors."""
+        low = sample.min(axis=0)
+        high = sample.max(axis=0)
+        scale = (high - low) / 255.0
+        scale[scale == 0] = 1e-8
+
+        self.offset = low.astype(np.float32)
+        self.scale = scale.astype(np.float32)
+
+    def encode(self, vectors: 'np.ndarray') -> 'np.ndarray':
+        """Encode vectors as uint8 codes (n x dim)."""
+        codes = np.rint((vectors - self.offset) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: 'np.ndarray') -> 'np.ndarray':
+        """Reconstruct approximate vectors from codes."""
+        return codes.astype(np.float32) * self.scale + self.offset
+
+    def score(self, query: 'np.ndarray', codes: 'np.ndarray') -> 'np.ndarray':
+        """
+        Approximate dot products of a query with encoded vectors.
+
+        Uses q . (c * scale + offset) = (q * scale) . c + q . offset, so the
+        codes are never decoded into a full float matrix.
+        """
+        weights = (query * self.scale).astype(np.float32)
+        bias = float(query @ self.offset)
+
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_CHUNK_SIZE):
+            chunk = codes[start:start + SCORE_CHUNK_SIZE]
+            scores[start:start + len(chunk)] = chunk.astype(np.float32) @ weights + bias
+        return scores
+
+    def state(self) -> Dict[str, 'np.ndarray']:
+        """Arrays needed to restore the quantizer."""
+        return {'offset': self.offset, 'scale': self.scale}
+
+    def restore(self, state: Dict[str, 'np.ndarray']) -> None:
+        """Restore the quantizer from saved arrays."""
+        self.offset = state['offset']
+        self.scale = state['scale']
+
+
+class ProductQuantizer:
+    """Product quantizer with 256 centroids per sub-vector."""
+
+    kind = 'pq'
+
+    def __init__(self, dim: int, config: Optional[Dict] = None):
+        """Initialize the quantizer for vectors of the given dimension."""
+        self.dim = dim
+        self.config = config or {}
+        self.n_subvectors = self.config.get('pq_subvectors', 48)
+        self.kmeans_iterations = self.config.get('pq_iterations', 12)
+        self.seed = self.config.get('seed', 42)
+
+        if dim % self.n_subvectors:
+            raise ValueError(f"Embedding dimension {dim} is not divisible by "
+                             f"{self.n_subvectors} sub-vectors")
+        self.sub_dim = dim // self.n_subvectors
+        self.centroids = None   # (n_subvectors x 256 x sub_dim)
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether the codebooks are available."""
+        return self.centroids is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.n_subvectors
+
+    def train(self, sample: 'np.ndarray') -> None:
+        """Learn one codebook per sub-vector with k-means."""
+        rng = np.random.default_rng(self.seed)
+        n_centroids = min(256, len(sample))
+
+        centroids = np.zeros((self.n_subvectors, 256, self.sub_dim), dtype=np.float32)
+        for j in range(self.n_subvectors):
+            points = np.ascontiguousarray(sample[:, j * self.sub_dim:(j + 1) * self.sub_dim])
+            centroids[j, :n_centroids] = _kmeans(points, n_centroids, self.kmeans_iterations, rng)
+        self.centroids = centroids
+
+    def encode(self, vectors: 'np.ndarray') -> 'np.ndarray':
+        """Encode vectors as uint8 codes (n x n_subvectors)."""
+        codes = np.empty((len(vectors), self.n_subvectors), dtype=np.uint8)
+        for j in range(self.n_subvectors):
+            points = vectors[:, j * self.sub_dim:(j + 1) * self.sub_dim]
+            codes[:, j] = _nearest_centroid(points, self.centroids[j])
+        return codes
+
+    def decode(self, codes: 'np.ndarray') -> 'np.ndarray':
+        """Reconstruct approximate vectors from codes."""
+        parts = [self.centroids[j][codes[:, j]] for j in range(self.n_subvectors)]
+        return np.concatenate(parts, axis=1)
+
+    def score(self, query: 'np.ndarray', codes: 'np.ndarray') -> 'np.ndarray':
+        """
+        Approximate dot products of a query with encoded vectors.
+
+        A lookup table of sub-vector dot products (n_subvectors x 256) is built
+        once per query; each score is then a sum of table lookups.
+        """
+        table = np.einsum('mkd,md->mk', self.centroids,
+                          query.reshape(self.n_subvectors, self.sub_dim)).astype(np.float32)
+        flat_table = table.ravel()
+        table_offsets = (np.arange(self.n_subvectors) * 256).astype(np.int32)
+
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_CHUNK_SIZE):
+            chunk = codes[start:start + SCORE_CHUNK_SIZE]
+            scores[start:start + len(chunk)] = flat_table[chunk + table_offsets].sum(axis=1)
+        return scores
+
+    def state(self) -> Dict[str, 'np.ndarray']:
+        """Arrays needed to restore the quantizer."""
+        return {'centroids': self.centroids}
+
+    def restore(self, state: Dict[str, 'np.ndarray']) -> None:
+        """Restore the quantizer from saved arrays."""
+        self.centroids = state['centroids']
+
+
+QUANTIZERS = {
+    ScalarQuantizer.kind: ScalarQuantizer,
+    ProductQuantizer.kind: ProductQuantizer,
+}
+
+
+def create_quantizer(kind: str, dim: int, config: Optional[Dict] = None):
+    """
+    Create a quantizer by name.
+
+    Args:
+        kind: 'int8' or 'pq'
+        dim: Embedding dimension
+        config: Quantizer options (pq_subvectors, pq_iterations, seed)
+
+    Returns:
+        Untrained quantizer
+    """
+    if kind not in QUANTIZERS:
+        raise ValueError(f"Unknown quantization type: {kind}")
+    return QUANTIZERS[kind](dim, config)
+
+
+def save_quantizer(quantizer, path: str, **extra) -> None:
+    """Save a trained quantizer (and extra values) to an .npz file atomically."""
+    temp_path = path + '.tmp.npz'
+    np.savez(temp_path, kind=quantizer.kind, dim=quantizer.dim, **quantizer.state(), **extra)
+    os.replace(temp_path, path)
+
+
+def load_quantizer(path: str, kind: str, dim: int, config: Optional[Dict] = None):
+    """
+    Load a quantizer saved with save_quantizer().
+
+    Returns:
+        Tuple of (quantizer, saved arrays), or (None, None) if the file is
+        missing or was saved for another quantization type or dimension
+    """
+    if not os.path.exists(path):
+        return None, None
+
+    with np.load(path) as data:
+        saved = {key: data[key] for key in data.files}
+
+    if str(saved['kind']) != kind or int(saved['dim']) != dim:
+        return None, None
+
+    quantizer = create_quantizer(kind, dim, config)
+    quantizer.restore(saved)
+    return quantizer, saved
+
+
+def _nearest_centroid(points: 'np.ndarray', centroids: 'np.ndarray') -> 'np.ndarray':
+    """Index of the nearest centroid (Euclidean) for each point."""
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    labels = np.empty(len(points), dtype=np.int64)
+    for start in range(0, len(points), SCORE_CHUNK_SIZE):
+        chunk = points[start:start + SCORE_CHUNK_SIZE]
+        labels[start:start + len(chunk)] = np.argmin(centroid_norms - 2.0 * chunk @ centroids.T, axis=1)
+    return labels
+
+
+def _kmeans(points: 'np.ndarray', k: int, iterations: int, rng) -> 'np.ndarray':
+    """Euclidean k-means returning k centroids."""
+    centroids = points[rng.choice(len(points), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _nearest_centroid(points, centroids)
+        counts = np.bincount(labels, minlength=k)
+
+        order = np.argsort(labels, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        filled = counts > 0
+        sums = np.add.reduceat(points[order], starts[filled], axis=0)
+        centroids[filled] = sums / counts[filled, None]
+
+        # Re-seed empty clusters with random points
+        empty = ~filled
+        if empty.any():
+            centroids[empty] = points[rng.choice(len(points), size=int(empty.sum()))]
+    return centroids
@@ -1,362 +1,1127 @@
 """
 Vector Search Module for Smart File Organizer.
-Provides semantic search capabilities using sentence transformers and FAISS.
-(MOCK IMPLEMENTATION FOR TESTING)
+Provides semantic search over document embeddings held in a float32 matrix
+that is persisted as a memory-mapped .npy file.
+
+Index layout (inside the cache directory):
+    vectors.npy     float32 matrix (capacity x embedding_dim), memory-mapped
+    tombstones.npy  boolean vector marking deleted rows
+    versions.npy    embedding model version of each row
+    documents.db    SQLite table mapping rows to paths and result metadata,
+                    plus the index header (model name, dimension, row count)
+    embedder/       versioned artifacts of the local embedding model
+    ivf_index.npz   approximate nearest-neighbour index (see ann_index.py), used
+                    once the collection reaches ann.min_documents
+    codes.npy       optional quantized codes (see vector_quantization.py), used
+                    to score queries without reading the float32 matrix
+    quantizer.npz   trained quantizer for codes.npy
+
+Rows embedded with an older model version than the current one are stale:
+they are skipped by queries until they are re-indexed (see stale_documents()).
 """
 
 import os
-import logging
+import re
 import json
+import hashlib
+import sqlite3
+import logging
 from typing import Dict, List, Optional, Tuple, Any
-from pathlib import Path
-import time
-import random
+
+# Handle imports with graceful fallbacks
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .local_embedder import LocalEmbedder
+from .ann_index import IVFIndex, measure_recall
+from .vector_quantization import create_quantizer, save_quantizer, load_quantizer
 
 
 class VectorSearch:
     """Handles vector-based semantic search operations."""
 
+    VECTORS_FILE = 'vectors.npy'
+    TOMBSTONES_FILE = 'tombstones.npy'
+    VERSIONS_FILE = 'versions.npy'
+    COPY_CHUNK_SIZE = 65536
+    CODES_FILE = 'codes.npy'
+    QUANTIZER_FILE = 'quantizer.npz'
+    DOCUMENTS_DB = 'documents.db'
+
     def __init__(self, config: Optional[Dict] = None):
         """Initialize vector search with configuration."""
         self.config = config or {}
         self.logger = logging.getLogger(__name__)
-        self.logger.warning("Using mock VectorSearch implementation for testing")
-
-        # Mock embedding dimensions
-        self.model_name = self.config.get('model_name', 'mock-model')
-        self.embedding_dim = 384  # Standard dimension for mock purposes
-        
-        # Document storage for mock implementation
-        self.document_lookup = {}  # Maps document paths to their info
-        
+
+        if not NUMPY_AVAILABLE:
+            self.logger.warning("NumPy not available - semantic search is disabled")
+
+        # Embedding settings
+        self.model_name = self.config.get('model_name', LocalEmbedder.MODEL_NAME)
+        self.embedding_dim = self.config.get('embedding_dim', 384)
+        self.initial_capacity = self.config.get('initial_capacity', 1024)
+
+        # Index state (loaded lazily)
+        self._vectors = None      # Memory-mapped float32 matrix
+        self._tombstones = None   # Boolean deleted-row markers
+        self._versions = None     # Embedding model version per row
+        self._count = 0           # Number of rows in use (including deleted rows)
+        self._row_index = None    # Maps document paths to rows
+        self._loaded = False
+
         # Cache settings
-        self.cache_dir = os.path.join('src', 'cache', 'embeddings')
+        self.cache_dir = self.config.get('cache_dir', os.path.join('src', 'cache', 'embeddings'))
         os.makedirs(self.cache_dir, exist_ok=True)
 
-    def index_documents(self, documents: List[Dict[str, Any]], batch_size: int = 32) -> bool:
+        # Local embedding model, stored next to the index
+        self.embedder = None
+        if NUMPY_AVAILABLE:
+            embedder_config = {
+                'embedding_dim': self.embedding_dim,
+                'model_dir': os.path.join(self.cache_dir, 'embedder')
+            }
+            embedder_config.update(self.config.get('embedder', {}))
+            self.embedder = LocalEmbedder(embedder_config)
+
+        # Approximate nearest-neighbour index for large collections
+        ann_config = {'index_dir': self.cache_dir}
+        ann_config.update(self.config.get('ann', {}))
+        self.ann_enabled = ann_config.pop('enabled', True)
+        self.ann_min_documents = ann_config.pop('min_documents', 20000)
+        self.ann_index = IVFIndex(ann_config) if NUMPY_AVAILABLE else None
+
+        # Optional quantized codes: None, 'int8' or 'pq'
+        self._quantization_config = dict(self.config.get('quantization', {}))
+        self.quantization = self._quantization_config.pop('type', None)
+        self.rerank_factor = self._quantization_config.pop('rerank_factor', 4)
+        self.quantization_min_documents = self._quantization_config.pop('min_documents', 1000)
+        self.quantization_sample_size = self._quantization_config.pop('sample_size', 20000)
+        self.quantization_retrain_growth = self._quantization_config.pop('retrain_growth', 4.0)
+        self.quantizer = None
+        self._codes = None            # Memory-mapped uint8 codes (capacity x code size)
+        self._quantized_version = None
+        self._quantized_count = 0
+
+    def index_documents(self, documents: List[Dict[str, Any]], batch_size: int = 32,
+                        update_model: bool = True) -> bool:
         """
-        Index a list of documents for semantic search.
-        Mock implementation using simple dictionary storage.
+        Add or update documents in the semantic index.
+
+        Documents already in the index (by file path) are re-embedded in place,
+        new documents are appended. New documents and documents whose text
+        changed also update the embedding model (re-indexing unchanged
+        documents leaves its corpus statistics alone); if that fits a new
+        model version, previously indexed documents become stale.
 
         Args:
             documents: List of document dictionaries with 'content' and metadata
             batch_size: Number of documents to process in each batch
+            update_model: Whether the documents update the embedding model
 
         Returns:
             True if indexing was successful
         """
+        if not NUMPY_AVAILABLE:
+            return False
+
         try:
-            # Reset document lookup for mock implementation
-            self.document_lookup = {}
-            
-            # Store documents directly with mock "embedding" info
-            for i, doc in enumerate(documents):
-                # Extract document text for keyword-based search
-                text_parts = []
-                
-                # Add main content
-                if 'content' in doc:
-                    text_parts.append(doc['content'])
-                
-                # Add OCR text if available
-                if 'ocr_data' in doc and doc['ocr_data'].get('success'):
-                    if doc['ocr_data']['type'] == 'pdf':
-                        for page in doc['ocr_data']['page_results']:
-                            text_parts.append(page['text'])
-                    else:
-                        text_parts.append(doc['ocr_data']['text'])
-                
-                # Add transcription if available
-                if 'transcription' in doc and 'text' in doc['transcription']:
-                    text_parts.append(doc['transcription']['text'])
-                
-                # Add AI analysis if available
-                if 'ai_analysis' in doc:
-                    if 'summary' in doc['ai_analysis']:
-                        text_parts.append(doc['ai_analysis']['summary'])
-                    if 'keywords' in doc['ai_analysis']:
-                        text_parts.append(' '.join(doc['ai_analysis']['keywords']))
-                
-                # Combine all text parts
-                combined_text = ' '.join(text_parts)
-                
-                # Store document with keywords for simple text matching
-                keywords = set()
-                if combined_text:
-                    words = combined_text.lower().split()
-                    # Take up to 20 keywords for each document
-                    keywords = set(words[:20])
-                
-                self.document_lookup[i] = {
-                    'file_path': doc.get('file_path'),
-                    'file_name': doc.get('file_name'),
-                    'file_type': doc.get('file_type'),
-                    'metadata': doc.get('metadata', {}),
-                    'keywords': keywords,
-                    'text': combined_text[:500]  # Store truncated text for matching
-                }
-            
-            # Save lookup to cache file
+            self._ensure_loaded()
+
+            documents = [doc for doc in documents if doc.get('file_path')]
+            texts = [self._document_text(doc) for doc in documents]
+            hashes = [hashlib.sha1(text.encode('utf-8')).hexdigest() for text in texts]
+
+            indexed_rows = []
+            conn = sqlite3.connect(self._documents_db_path())
+            try:
+                cursor = conn.cursor()
+
+                if update_model:
+                    # Only new and changed documents count towards the corpus statistics
+                    known = self._get_content_hashes(cursor, [doc['file_path'] for doc in documents])
+                    new_texts = []
+                    for doc, text, content_hash in zip(documents, texts, hashes):
+                        if known.get(doc['file_path']) != content_hash:
+                            known[doc['file_path']] = content_hash
+                            new_texts.append(text)
+                    if new_texts and self.embedder.partial_fit(new_texts):
+                        self.logger.info(f"Embedding model updated to {self.embedder.model_id}")
+                    self.embedder.save()
+
+                for start in range(0, len(documents), batch_size):
+                    batch = documents[start:start + batch_size]
+                    embeddings = self._encode(texts[start:start + batch_size])
+                    rows = self._assign_rows(cursor, [doc['file_path'] for doc in batch])
+
+                    self._vectors[rows] = embeddings
+                    self._tombstones[rows] = False
+                    self._versions[rows] = self.embedder.version
+                    indexed_rows.append(rows)
+
+                    cursor.executemany('''
+                        INSERT OR REPLACE INTO documents (row, file_path, file_name, file_type, metadata,
+                                                          content_hash)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', [(int(row), doc['file_path'], doc.get('file_name'), doc.get('file_type'),
+                           json.dumps(doc.get('metadata', {}), default=str), content_hash)
+                          for row, doc, content_hash in zip(rows, batch, hashes[start:start + batch_size])])
+
+                self._write_header(cursor)
+                conn.commit()
+            finally:
+                conn.close()
+
             self._save_index()
-            
-            self.logger.info(f"Successfully indexed {len(documents)} documents using mock implementation")
+            indexed_rows = np.concatenate(indexed_rows) if indexed_rows else np.empty(0, dtype=np.int64)
+            self._update_ann_index(indexed_rows)
+            self._update_quantizer(indexed_rows)
+
+            self.logger.info(f"Successfully indexed {len(documents)} documents")
             return True
-            
+
         except Exception as e:
             self.logger.error(f"Error indexing documents: {e}")
             return False
 
-    def search(self, query: str, top_k: int = 10, threshold: float = 0.7) -> List[Dict[str, Any]]:
+    def remove_documents(self, paths: List[str]) -> int:
+        """
+        Remove documents from the index.
+
+        Rows are tombstoned rather than moved, so removal does not rewrite the
+        embedding matrix; use compact() to reclaim the space.
+
+        Args:
+            paths: Paths of the documents to remove
+
+        Returns:
+            Number of documents removed
+        """
+        if not NUMPY_AVAILABLE or not self._ensure_loaded():
+            return 0
+
+        try:
+            row_index = self._get_row_index()
+            rows = [row_index.pop(path) for path in paths if path in row_index]
+            if not rows:
+                return 0
+
+            self._tombstones[rows] = True
+            if self.ann_index.is_trained:
+                self.ann_index.remove(rows)
+                self.ann_index.save()
+
+            conn = sqlite3.connect(self._documents_db_path())
+            try:
+                conn.executemany('DELETE FROM documents WHERE row = ?', [(int(row),) for row in rows])
+                conn.commit()
+            finally:
+                conn.close()
+
+            self._save_index()
+            return len(rows)
+
+        except Exception as e:
+            self.logger.error(f"Error removing documents: {e}")
+            return 0
+
+    def stale_documents(self) -> List[str]:
+        """
+        List documents embedded with an older model version.
+
+        Returns:
+            Paths of the documents that need to be re-indexed
+        """
+        if not NUMPY_AVAILABLE or not self._ensure_loaded() or self._count == 0:
+            return []
+
+        stale = (self._versions[:self._count] != self.embedder.version) & \
+            ~self._tombstones[:self._count]
+        rows = {int(row) for row in np.flatnonzero(stale)}
+        if not rows:
+            return []
+
+        return [path for path, row in self._get_row_index().items() if row in rows]
+
+    def search(self, query: str, top_k: int = 10, threshold: float = 0.7,
+               candidate_paths: Optional[set] = None) -> List[Dict[str, Any]]:
         """
         Perform semantic search for documents similar to the query.
-        Mock implementation using simple keyword matching.
 
         Args:
             query: Search query text
             top_k: Number of results to return
             threshold: Similarity threshold (0-1)
+            candidate_paths: Optional set of paths to restrict the search to
 
         Returns:
             List of dictionaries with search results and scores
         """
+        if not NUMPY_AVAILABLE:
+            return []
+
         try:
-            if not self.document_lookup:
-                if not self._load_index():
-                    self.logger.warning("No document index available for search")
-                    return []
-            
-            # Prepare query terms
-            query_terms = set(query.lower().split())
-            if not query_terms:
+            if not self._ensure_loaded() or self._count == 0:
+                self.logger.warning("No document index available for search")
                 return []
-            
-            # Calculate simple similarity scores based on term overlap
-            scored_docs = []
-            for idx, doc_info in self.document_lookup.items():
-                # Skip documents without keywords
-                if not doc_info.get('keywords'):
-                    continue
-                
-                # Calculate overlap between query terms and document keywords
-                overlap = len(query_terms.intersection(doc_info['keywords']))
-                
-                # If no direct keyword match, try partial matching in text
-                if overlap == 0 and 'text' in doc_info:
-                    # Check if any query term is contained in the document text
-                    for term in query_terms:
-                        if term in doc_info['text'].lower():
-                            overlap += 0.5
-                
-                # Calculate mock similarity score
-                if overlap > 0:
-                    # Simple formula to generate a score between 0 and 1
-                    similarity = min(0.5 + (overlap / len(query_terms)) * 0.5, 1.0)
-                    
-                    # Apply threshold
-                    if similarity >= threshold:
-                        scored_docs.append((idx, similarity))
-            
-            # Sort by similarity score (descending)
-            scored_docs.sort(key=lambda x: x[1], reverse=True)
-            
-            # Take top-k results
-            results = []
-            for i, (idx, similarity) in enumerate(scored_docs[:top_k]):
-                doc_info = self.document_lookup[idx]
-                results.append({
-                    'file_path': doc_info['file_path'],
-                    'file_name': doc_info['file_name'],
-                    'file_type': doc_info['file_type'],
-                    'metadata': doc_info['metadata'],
-                    'similarity': similarity,
-                    'rank': i + 1
-                })
-            
-            return results
+
+            query_vector = self._encode([query])[0]
+            if not query_vector.any():
+                return []
+
+            rows = None
+            if candidate_paths is not None:
+                row_index = self._get_row_index()
+                rows = [row_index[path] for path in candidate_paths if path in row_index]
+
+            return self._build_results(*self._rank(query_vector, top_k, threshold, rows=rows))
 
         except Exception as e:
             self.logger.error(f"Error performing search: {e}")
             return []
 
-    def find_similar_documents(self, doc_path: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def search_batch(self, queries: List[str], top_k: int = 10,
+                     threshold: float = 0.7) -> List[List[Dict[str, Any]]]:
+        """
+        Perform semantic search for many queries at once.
+
+        All queries are embedded together and scored against the matrix with
+        one matrix multiplication per block of rows, keeping a running top_k
+        per query; result metadata is fetched with a single lookup. When the
+        nearest-neighbour index is active, each query probes it instead.
+
+        Args:
+            queries: Search query texts
+            top_k: Number of results per query
+            threshold: Similarity threshold (0-1)
+
+        Returns:
+            One result list per query, in the order of the queries
+        """
+        if not NUMPY_AVAILABLE or not queries:
+            return [[] for _ in queries]
+
+        try:
+            if not self._ensure_loaded() or self._count == 0:
+                self.logger.warning("No document index available for search")
+                return [[] for _ in queries]
+
+            return self._batch_results(self._encode(queries), top_k, threshold)
+
+        except Exception as e:
+            self.logger.error(f"Error performing batch search: {e}")
+            return [[] for _ in queries]
+
+    def find_similar_batch(self, doc_paths: List[str], top_k: int = 5,
+                           threshold: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find similar documents for many indexed documents at once.
+
+        Args:
+            doc_paths: Paths of the documents to compare against
+            top_k: Number of similar documents per document
+            threshold: Optional minimum similarity (0-1)
+
+        Returns:
+            Dictionary mapping each path to its similar documents (an empty list
+            for paths that are not indexed or are stale)
+        """
+        if not NUMPY_AVAILABLE or not doc_paths:
+            return {path: [] for path in doc_paths}
+
+        try:
+            if not self._ensure_loaded() or self._count == 0:
+                return {path: [] for path in doc_paths}
+
+            row_index = self._get_row_index()
+            found = [(path, row_index[path]) for path in doc_paths
+                     if path in row_index and self._versions[row_index[path]] == self.embedder.version]
+
+            results = {path: [] for path in doc_paths}
+            if found:
+                rows = np.array([row for _, row in found], dtype=np.int64)
+                batch = self._batch_results(np.asarray(self._vectors[rows]), top_k,
+                                            threshold if threshold is not None else 0.0,
+                                            exclude_rows=rows)
+                for (path, _), similar in zip(found, batch):
+                    results[path] = similar
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error finding similar documents in batch: {e}")
+            return {path: [] for path in doc_paths}
+
+    def score_documents(self, query: str, paths: List[str]) -> Dict[str, float]:
+        """
+        Compute the exact similarity of a query to specific documents.
+
+        Args:
+            query: Query text
+            paths: Paths of indexed documents
+
+        Returns:
+            Dictionary mapping each indexed, current document path to its similarity
+        """
+        if not NUMPY_AVAILABLE or not paths:
+            return {}
+
+        try:
+            if not self._ensure_loaded() or self._count == 0:
+                return {}
+
+            query_vector = self._encode([query])[0]
+            row_index = self._get_row_index()
+            rows = [row_index[path] for path in paths if path in row_index]
+            if not query_vector.any() or not rows:
+                return {}
+
+            rows, scores = self._rank(query_vector, len(rows), -np.finfo(np.float32).max, rows=rows)
+            paths_by_row = {row_index[path]: path for path in paths if path in row_index}
+            return {paths_by_row[int(row)]: float(score) for row, score in zip(rows, scores)}
+
+        except Exception as e:
+            self.logger.error(f"Error scoring documents: {e}")
+            return {}
+
+    def find_similar_documents(self, doc_path: str, top_k: int = 5,
+                               threshold: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Find documents similar to a given document.
-        Mock implementation using simple keyword comparison.
 
         Args:
             doc_path: Path to the document to compare against
             top_k: Number of similar documents to return
+            threshold: Optional minimum similarity (0-1)
 
         Returns:
             List of dictionaries with similar documents and scores
         """
+        if not NUMPY_AVAILABLE:
+            return []
+
         try:
-            if not self.document_lookup:
-                if not self._load_index():
-                    self.logger.warning("No document index available for search")
-                    return []
-
-            # Find target document in lookup
-            target_doc = None
-            target_idx = None
-            
-            for idx, info in self.document_lookup.items():
-                if info.get('file_path') == doc_path:
-                    target_doc = info
-                    target_idx = idx
-                    break
-            
-            if target_doc is None:
+            if not self._ensure_loaded() or self._count == 0:
+                self.logger.warning("No document index available for search")
+                return []
+
+            row = self._lookup_row(doc_path)
+            if row is None:
                 self.logger.warning(f"Document not found in index: {doc_path}")
                 return []
-            
-            # Calculate similarity with other documents based on keyword overlap
-            scored_docs = []
-            
-            # Get target document keywords
-            target_keywords = target_doc.get('keywords', set())
-            target_text = target_doc.get('text', '').lower()
-            
-            if not target_keywords and not target_text:
+
+            if self._versions[row] != self.embedder.version:
+                self.logger.warning(f"Document embedding is stale, re-index it first: {doc_path}")
                 return []
-            
-            # Compare with other documents
-            for idx, doc_info in self.document_lookup.items():
-                # Skip self
-                if idx == target_idx:
-                    continue
-                
-                # Skip documents without keywords
-                if not doc_info.get('keywords') and not doc_info.get('text'):
-                    continue
-                
-                similarity = 0.0
-                
-                # Calculate keyword overlap
-                if target_keywords and doc_info.get('keywords'):
-                    overlap = len(target_keywords.intersection(doc_info['keywords']))
-                    if overlap > 0:
-                        # Base similarity on keyword overlap
-                        similarity = 0.5 + (overlap / len(target_keywords)) * 0.5
-                
-                # If no keyword similarity, try text comparison
-                if similarity == 0 and target_text and doc_info.get('text'):
-                    # Simple text similarity using random scoring for demo
-                    # In a real implementation, this would use text similarity algorithms
-                    doc_text = doc_info['text'].lower()
-                    
-                    # Check if they share any words of 5+ characters (to avoid common words)
-                    important_words = [w for w in target_text.split() if len(w) >= 5]
-                    for word in important_words:
-                        if word in doc_text:
-                            similarity = max(similarity, 0.5 + (random.random() * 0.3))
-                            break
-                
-                # Add document if it has some similarity
-                if similarity > 0:
-                    scored_docs.append((idx, similarity))
-            
-            # Sort by similarity score (descending)
-            scored_docs.sort(key=lambda x: x[1], reverse=True)
-            
-            # Take top-k results
-            results = []
-            for i, (idx, similarity) in enumerate(scored_docs[:top_k]):
-                doc_info = self.document_lookup[idx]
-                results.append({
-                    'file_path': doc_info['file_path'],
-                    'file_name': doc_info['file_name'],
-                    'file_type': doc_info['file_type'],
-                    'metadata': doc_info['metadata'],
-                    'similarity': similarity,
-                    'rank': i + 1
-                })
-            
-            return results
+
+            target = np.array(self._vectors[row])
+            if not target.any():
+                return []
+
+            min_score = threshold if threshold is not None else 0.0
+            return self._build_results(*self._rank(target, top_k, min_score, exclude_row=row))
 
         except Exception as e:
             self.logger.error(f"Error finding similar documents: {e}")
             return []
 
+    def compact(self) -> bool:
+        """
+        Rewrite the index without deleted rows.
+
+        Returns:
+            True if successful
+        """
+        if not NUMPY_AVAILABLE or not self._ensure_loaded():
+            return False
+
+        try:
+            live_rows = np.flatnonzero(~self._tombstones[:self._count])
+
+            conn = sqlite3.connect(self._documents_db_path())
+            try:
+                cursor = conn.cursor()
+                cursor.execute('SELECT row, file_path, file_name, file_type, metadata, content_hash FROM documents')
+                old_rows = {row[0]: row[1:] for row in cursor.fetchall()}
+
+                cursor.execute('DELETE FROM documents')
+                cursor.executemany('''
+                    INSERT INTO documents (row, file_path, file_name, file_type, metadata, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [(new_row,) + old_rows[int(old_row)]
+                      for new_row, old_row in enumerate(live_rows) if int(old_row) in old_rows])
+
+                # Move live rows down in place; every row moves to a lower or equal
+                # position, so copying in ascending chunks never overwrites a source
+                for start in range(0, len(live_rows), self.COPY_CHUNK_SIZE):
+                    chunk = live_rows[start:start + self.COPY_CHUNK_SIZE]
+                    self._vectors[start:start + len(chunk)] = self._vectors[chunk]
+                    self._versions[start:start + len(chunk)] = self._versions[chunk]
+                self._tombstones[:] = False
+                self._count = len(live_rows)
+                self._row_index = None
+
+                self._write_header(cursor)
+                conn.commit()
+            finally:
+                conn.close()
+
+            self._save_index()
+
+            # Row numbers changed, so the nearest-neighbour index and codes are rebuilt
+            self.ann_index.clear()
+            self._update_ann_index(np.empty(0, dtype=np.int64))
+            self._clear_quantizer()
+            self._update_quantizer(np.empty(0, dtype=np.int64))
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error compacting index: {e}")
+            return False
+
+    def benchmark_ann(self, n_queries: int = 100, top_k: int = 10,
+                      nprobe_values: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Measure recall and latency of the nearest-neighbour index against exact search.
+
+        Indexed documents are used as queries, as in find_similar_documents().
+
+        Args:
+            n_queries: Number of sampled query documents
+            top_k: Number of neighbours compared
+            nprobe_values: nprobe settings to measure
+
+        Returns:
+            One dictionary per nprobe value with recall, mean_ms and exact_mean_ms,
+            or an empty list if the index has not been built
+        """
+        if not NUMPY_AVAILABLE or not self._ensure_loaded() or not self._ann_ready():
+            return []
+
+        live_rows = self._live_rows()
+        rng = np.random.default_rng(0)
+        query_rows = np.sort(rng.choice(live_rows, size=min(n_queries, len(live_rows)), replace=False))
+        queries = np.asarray(self._vectors[query_rows])
+
+        return measure_recall(self.ann_index, self._vectors, live_rows, queries, top_k, nprobe_values)
+
+    def get_index_stats(self, n_queries: int = 50, top_k: int = 10) -> Dict[str, Any]:
+        """
+        Get statistics about the vector index.
+
+        Reports document counts, memory per vector for the float32 matrix and
+        the quantized codes, and the recall of the configured search pipeline
+        (nearest-neighbour index and quantized scoring) measured against exact
+        search on a sample of indexed documents.
+
+        Args:
+            n_queries: Number of sampled query documents for the recall measurement
+            top_k: Number of neighbours compared
+
+        Returns:
+            Dictionary with index statistics
+        """
+        if not NUMPY_AVAILABLE or not self._ensure_loaded():
+            return {}
+
+        live_rows = self._live_rows()
+        float_bytes = self.embedding_dim * np.dtype(np.float32).itemsize
+        stats = {
+            'documents': len(live_rows),
+            'deleted': int(self._tombstones[:self._count].sum()),
+            'stale': int(self._count - len(live_rows) - self._tombstones[:self._count].sum()),
+            'model': self.embedder.model_id,
+            'embedding_dim': self.embedding_dim,
+            'float_bytes_per_vector': float_bytes,
+            'ann_index': {
+                'enabled': self.ann_enabled,
+                'active': self._ann_ready(),
+                'n_lists': len(self.ann_index.centroids) if self.ann_index.is_trained else 0,
+                'nprobe': self.ann_index.nprobe
+            },
+            'quantization': {
+                'type': self.quantization,
+                'active': self._quantizer_ready(),
+                'bytes_per_vector': self.quantizer.code_size if self.quantizer else float_bytes,
+                'compression': float_bytes / self.quantizer.code_size if self.quantizer else 1.0,
+                'rerank_factor': self.rerank_factor
+            }
+        }
+
+        if len(live_rows) and n_queries:
+            rng = np.random.default_rng(0)
+            query_rows = rng.choice(live_rows, size=min(n_queries, len(live_rows)), replace=False)
+
+            recall = 0.0
+            for row in query_rows:
+                query = np.array(self._vectors[row])
+                exact, _ = self._rank(query, top_k, -np.inf, rows=live_rows)
+                found, _ = self._rank(query, top_k, -np.inf)
+                recall += len(set(found.tolist()) & set(exact.tolist())) / max(len(exact), 1)
+
+            stats['recall'] = recall / len(query_rows)
+            stats['recall_loss'] = 1.0 - stats['recall']
+
+        return stats
+
+    def _document_text(self, doc: Dict[str, Any]) -> str:
+        """Collect the searchable text of a document."""
+        text_parts = []
+
+        # Add main content
+        if doc.get('content'):
+            text_parts.append(doc['content'])
+
+        # Add OCR text if available
+        if 'ocr_data' in doc and doc['ocr_data'].get('success'):
+            if doc['ocr_data']['type'] == 'pdf':
+                for page in doc['ocr_data']['page_results']:
+                    text_parts.append(page['text'])
+            else:
+                text_parts.append(doc['ocr_data']['text'])
+        if doc.get('ocr_text'):
+            text_parts.append(doc['ocr_text'])
+
+        # Add transcription if available
+        if 'transcription' in doc and 'text' in doc['transcription']:
+            text_parts.append(doc['transcription']['text'])
+
+        # Add AI analysis if available
+        if 'ai_analysis' in doc:
+            if 'summary' in doc['ai_analysis']:
+                text_parts.append(doc['ai_analysis']['summary'])
+            if 'keywords' in doc['ai_analysis']:
+                text_parts.append(' '.join(doc['ai_analysis']['keywords']))
+
+        return ' '.join(text_parts)
+
+    def _encode(self, texts: List[str]) -> 'np.ndarray':
+        """
+        Embed texts with the local embedding model.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            L2-normalized float32 matrix (len(texts) x embedding_dim)
+        """
+        return self.embedder.transform(texts)
+
+    def _rank(self, query_vector: 'np.ndarray', top_k: int, threshold: float,
+              rows: Optional[List[int]] = None,
+              exclude_row: Optional[int] = None) -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Find the rows most similar to a normalized query vector.
+
+        Restricted searches score the given rows exactly. Otherwise candidates
+        come from the nearest-neighbour index when it is built, or from all
+        rows. When quantized codes are available, candidates are scored from
+        the codes and only the best top_k * rerank_factor are re-scored with
+        the float32 vectors.
+
+        Returns:
+            Tuple of (rows, scores) sorted by descending score
+        """
+        if rows is not None:
+            rows = np.unique(np.asarray(rows, dtype=np.int64))
+            scores = np.asarray(self._vectors[rows] @ query_vector, dtype=np.float32)
+        else:
+            rows = self.ann_index.candidates(query_vector) if self._ann_ready() else None
+
+            if self._quantizer_ready():
+                if rows is None:
+                    rows = np.arange(self._count)
+                    approximate = self.quantizer.score(query_vector, self._codes[:self._count])
+                else:
+                    approximate = self.quantizer.score(query_vector, self._codes[rows])
+                approximate[self._invalid_rows(rows, exclude_row)] = -np.inf
+
+                positions, _ = self._top_k(approximate, top_k * self.rerank_factor, -np.finfo(np.float32).max)
+                rows = np.sort(rows[positions])
+
+            if rows is None:
+                rows = np.arange(self._count)
+                scores = np.asarray(self._vectors[:self._count] @ query_vector, dtype=np.float32)
+            else:
+                scores = np.asarray(self._vectors[rows] @ query_vector, dtype=np.float32)
+
+        scores[self._invalid_rows(rows, exclude_row)] = -np.inf
+
+        positions, top_scores = self._top_k(scores, top_k, threshold)
+        return rows[positions], top_scores
+
+    def _batch_results(self, query_vectors: 'np.ndarray', top_k: int, threshold: float,
+                       exclude_rows: Optional['np.ndarray'] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Rank rows for many query vectors and build the result lists.
+
+        Uses one batched exact scan, or per-query lookups in the nearest-neighbour
+        index when it is active; result metadata is fetched once for all queries.
+        """
+        if self._ann_ready():
+            ranked = [self._rank(query_vector, top_k, threshold,
+                                 exclude_row=int(exclude_rows[i]) if exclude_rows is not None else None)
+                      for i, query_vector in enumerate(query_vectors)]
+        else:
+            rows, scores = self._top_k_batch(query_vectors, top_k, exclude_rows)
+            keep = (rows >= 0) & (scores >= threshold)
+            ranked = [(rows[i][keep[i]], scores[i][keep[i]]) for i in range(len(rows))]
+
+        documents = self._fetch_documents(
+            np.unique(np.concatenate([rows for rows, _ in ranked])).tolist() if ranked else [])
+        return [self._build_results(rows, scores, documents) for rows, scores in ranked]
+
+    def _top_k_batch(self, query_vectors: 'np.ndarray', top_k: int,
+                     exclude_rows: Optional['np.ndarray'] = None) -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Exact top_k rows for each query vector.
+
+        The matrix is scored in blocks (queries x block rows), and each block's
+        per-query top_k is merged into the running top_k.
+
+        Args:
+            query_vectors: Normalized query matrix (queries x dim)
+            top_k: Number of rows per query
+            exclude_rows: Optional row to exclude for each query
+
+        Returns:
+            Tuple of (rows, scores), each (queries x top_k) sorted by descending
+            score; missing entries have row -1 and score -inf
+        """
+        n_queries = len(query_vectors)
+        top_k = max(1, min(top_k, self._count))
+        best_rows = np.full((n_queries, 0), -1, dtype=np.int64)
+        best_scores = np.full((n_queries, 0), -np.inf, dtype=np.float32)
+        query_vectors = np.ascontiguousarray(query_vectors, dtype=np.float32)
+
+        # Keep each (queries x block) score matrix around 16M floats
+        block_size = max(1024, (1 << 24) // max(n_queries, 1))
+        for start in range(0, self._count, block_size):
+            end = min(start + block_size, self._count)
+            scores = query_vectors @ np.asarray(self._vectors[start:end]).T
+
+            scores[:, self._invalid_rows(np.arange(start, end))] = -np.inf
+            if exclude_rows is not None:
+                inside = (exclude_rows >= start) & (exclude_rows < end)
+                scores[np.flatnonzero(inside), exclude_rows[inside] - start] = -np.inf
+
+            k = min(top_k, end - start)
+            if k < end - start:
+                positions = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                positions = np.broadcast_to(np.arange(end - start), (n_queries, end - start))
+
+            best_rows = np.concatenate([best_rows, positions + start], axis=1)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, positions, axis=1)], axis=1)
+            if best_rows.shape[1] > top_k:
+                keep = np.argpartition(-best_scores, top_k - 1, axis=1)[:, :top_k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        # Sort each query's rows by descending score, breaking ties by row
+        order = np.lexsort((best_rows, -best_scores), axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows[np.isneginf(best_scores)] = -1
+        return best_rows, best_scores
+
+    def _invalid_rows(self, rows: 'np.ndarray', exclude_row: Optional[int] = None) -> 'np.ndarray':
+        """Mask of deleted rows, rows embedded with another model version and the excluded row."""
+        invalid = self._tombstones[rows] | (self._versions[rows] != self.embedder.version)
+        if exclude_row is not None:
+            invalid |= rows == exclude_row
+        return invalid
+
+    def _live_rows(self) -> 'np.ndarray':
+        """Rows that are not deleted and are embedded with the current model version."""
+        return np.flatnonzero(~self._tombstones[:self._count] &
+                              (self._versions[:self._count] == self.embedder.version))
+
+    def _ann_ready(self) -> bool:
+        """Whether the nearest-neighbour index can answer queries."""
+        return self.ann_enabled and self.ann_index.is_trained and \
+            self.ann_index.trained_version == self.embedder.version
+
+    def _update_ann_index(self, rows: 'np.ndarray') -> None:
+        """Assign newly indexed rows, training the index when the collection is large enough."""
+        if not self.ann_enabled:
+            return
+
+        live_rows = self._live_rows()
+        if len(live_rows) < self.ann_min_documents:
+            return
+
+        if self.ann_index.needs_training(len(live_rows), self.embedder.version):
+            self.ann_index.train(self._vectors, live_rows, self.embedder.version)
+        else:
+            self.ann_index.add(rows, self._vectors)
+        self.ann_index.save()
+
+    def _quantizer_ready(self) -> bool:
+        """Whether quantized codes can be used to score queries."""
+        return self.quantizer is not None and self._codes is not None and \
+            self._quantized_version == self.embedder.version
+
+    def _update_quantizer(self, rows: 'np.ndarray') -> None:
+        """Encode newly indexed rows, training the quantizer when due."""
+        if not self.quantization:
+            return
+
+        live_rows = self._live_rows()
+        if len(live_rows) < self.quantization_min_documents:
+            return
+
+        retrain = not self._quantizer_ready() or \
+            len(live_rows) >= self._quantized_count * self.quantization_retrain_growth
+        if retrain:
+            rng = np.random.default_rng(0)
+            sample_size = min(len(live_rows), self.quantization_sample_size)
+            sample = np.asarray(self._vectors[np.sort(rng.choice(live_rows, size=sample_size, replace=False))])
+
+            self.quantizer = create_quantizer(self.quantization, self.embedding_dim, self._quantization_config)
+            self.quantizer.train(sample)
+            self._quantized_version = self.embedder.version
+            self._quantized_count = len(live_rows)
+
+            self._resize_memmap('_codes', self.CODES_FILE, self._vectors.shape[0],
+                                self.quantizer.code_size, np.uint8, keep_rows=False)
+            rows = live_rows
+
+        for start in range(0, len(rows), self.COPY_CHUNK_SIZE):
+            chunk = rows[start:start + self.COPY_CHUNK_SIZE]
+            self._codes[chunk] = self.quantizer.encode(np.asarray(self._vectors[chunk]))
+        self._codes.flush()
+
+        if retrain:
+            save_quantizer(self.quantizer, os.path.join(self.cache_dir, self.QUANTIZER_FILE),
+                           model_version=self._quantized_version, trained_count=self._quantized_count)
+
+    def _clear_quantizer(self) -> None:
+        """Drop the quantizer and its codes."""
+        self.quantizer = None
+        self._codes = None
+        self._quantized_version = None
+        self._quantized_count = 0
+        for file in (self.CODES_FILE, self.QUANTIZER_FILE):
+            path = os.path.join(self.cache_dir, file)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load_quantizer(self) -> None:
+        """Open the quantizer and codes saved with the index, if they match the configuration."""
+        codes_path = os.path.join(self.cache_dir, self.CODES_FILE)
+        if not self.quantization or not os.path.exists(codes_path):
+            return
+
+        quantizer, saved = load_quantizer(os.path.join(self.cache_dir, self.QUANTIZER_FILE),
+                                          self.quantization, self.embedding_dim, self._quantization_config)
+        if quantizer is None:
+            return
+
+        self.quantizer = quantizer
+        self._quantized_version = int(saved['model_version'])
+        self._quantized_count = int(saved['trained_count'])
+        self._codes = np.load(codes_path, mmap_mode='r+')
+
+    def _top_k(self, scores: 'np.ndarray', top_k: int, threshold: float) -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Select the top_k positions by score with argpartition.
+
+        Ties are broken by position so results are deterministic.
+
+        Returns:
+            Tuple of (positions, scores) sorted by descending score
+        """
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+
+        order = np.lexsort((candidates, -scores[candidates]))
+        positions = candidates[order]
+        top_scores = scores[positions]
+
+        keep = top_scores >= threshold
+        return positions[keep], top_scores[keep]
+
+    def _build_results(self, rows: 'np.ndarray', scores: 'np.ndarray',
+                       documents: Optional[Dict[int, Tuple]] = None) -> List[Dict[str, Any]]:
+        """Build result dictionaries for the given rows."""
+        if len(rows) == 0:
+            return []
+
+        row_list = [int(row) for row in rows]
+        if documents is None:
+            documents = self._fetch_documents(row_list)
+
+        results = []
+        for row, score in zip(row_list, scores):
+            if row not in documents:
+                continue
+            file_path, file_name, file_type, metadata = documents[row]
+            results.append({
+                'file_path': file_path,
+                'file_name': file_name,
+                'file_type': file_type,
+                'metadata': json.loads(metadata) if metadata else {},
+                'similarity': float(score),
+                'rank': len(results) + 1
+            })
+
+        return results
+
+    def _fetch_documents(self, rows: List[int]) -> Dict[int, Tuple]:
+        """Load (file_path, file_name, file_type, metadata) for the given rows."""
+        documents = {}
+        conn = sqlite3.connect(self._documents_db_path())
+        try:
+            cursor = conn.cursor()
+            for start in range(0, len(rows), 10000):
+                chunk = rows[start:start + 10000]
+                placeholders = ', '.join('?' * len(chunk))
+                cursor.execute(f'''
+                    SELECT row, file_path, file_name, file_type, metadata
+                    FROM documents WHERE row IN ({placeholders})
+                ''', chunk)
+                documents.update((row[0], row[1:]) for row in cursor.fetchall())
+        finally:
+            conn.close()
+        return documents
+
+    def _assign_rows(self, cursor, paths: List[str]) -> 'np.ndarray':
+        """Return rows for the given paths, appending rows for new documents."""
+        row_index = self._get_row_index(cursor)
+
+        rows = []
+        new_paths = {}
+        for path in paths:
+            if path in row_index:
+                rows.append(row_index[path])
+            elif path in new_paths:
+                rows.append(new_paths[path])
+            else:
+                new_paths[path] = self._count + len(new_paths)
+                rows.append(new_paths[path])
+
+        if new_paths:
+            self._ensure_capacity(self._count + len(new_paths))
+            self._count += len(new_paths)
+            row_index.update(new_paths)
+
+        return np.array(rows, dtype=np.int64)
+
+    def _get_content_hashes(self, cursor, paths: List[str]) -> Dict[str, Optional[str]]:
+        """Return the stored text hashes of the indexed documents among the given paths."""
+        hashes = {}
+        unique_paths = list(dict.fromkeys(paths))
+        for start in range(0, len(unique_paths), 500):
+            chunk = unique_paths[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f'SELECT file_path, content_hash FROM documents WHERE file_path IN ({placeholders})',
+                           chunk)
+            hashes.update(cursor.fetchall())
+        return hashes
+
+    def _lookup_row(self, path: str) -> Optional[int]:
+        """Find the row of a document without loading the full path index."""
+        if self._row_index is not None:
+            return self._row_index.get(path)
+
+        conn = sqlite3.connect(self._documents_db_path())
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT row FROM documents WHERE file_path = ?', (path,))
+            result = cursor.fetchone()
+            return result[0] if result else None
+        finally:
+            conn.close()
+
+    def _get_row_index(self, cursor=None) -> Dict[str, int]:
+        """Return the path to row mapping, loading it from the database on first use."""
+        if self._row_index is None:
+            if cursor is not None:
+                cursor.execute('SELECT file_path, row FROM documents')
+                self._row_index = dict(cursor.fetchall())
+            else:
+                conn = sqlite3.connect(self._documents_db_path())
+                try:
+                    self._row_index = dict(conn.execute('SELECT file_path, row FROM documents').fetchall())
+                finally:
+                    conn.close()
+        return self._row_index
+
+    def _ensure_loaded(self) -> bool:
+        """Load the index from disk once, creating empty storage if none exists."""
+        if self._loaded:
+            return True
+
+        if not self._load_index():
+            self._create_storage(self.initial_capacity)
+            self._count = 0
+            self._row_index = {}
+            self._initialize_documents_db(reset=True)
+
+        self._loaded = True
+        return True
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """Grow the memory-mapped matrix (doubling) to hold at least the given rows."""
+        capacity = self._vectors.shape[0]
+        if rows <= capacity:
+            return
+
+        new_capacity = max(rows, capacity * 2)
+        self._resize_memmap('_vectors', self.VECTORS_FILE, new_capacity, self.embedding_dim, np.float32)
+        if self._codes is not None:
+            self._resize_memmap('_codes', self.CODES_FILE, new_capacity, self._codes.shape[1], np.uint8)
+
+        for name in ('_tombstones', '_versions'):
+            old = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    def _create_storage(self, capacity: int) -> None:
+        """Create an empty memory-mapped matrix with tombstone and version vectors."""
+        self._resize_memmap('_vectors', self.VECTORS_FILE, capacity, self.embedding_dim,
+                            np.float32, keep_rows=False)
+        self._tombstones = np.zeros(capacity, dtype=bool)
+        self._versions = np.zeros(capacity, dtype=np.int32)
+
+    def _resize_memmap(self, attribute: str, file_name: str, capacity: int, width: int,
+                       dtype, keep_rows: bool = True) -> None:
+        """
+        Replace a memory-mapped .npy attribute with a new file of the given capacity.
+
+        The rows in use are copied in chunks into a temporary file which then
+        replaces the original, so growing never holds the whole matrix in memory.
+        """
+        path = os.path.join(self.cache_dir, file_name)
+        temp_path = path + '.tmp.npy'
+
+        # Release the attribute's mapping so the file can be replaced
+        current = getattr(self, attribute) if keep_rows else None
+        setattr(self, attribute, None)
+
+        resized = np.lib.format.open_memmap(temp_path, mode='w+', dtype=dtype, shape=(capacity, width))
+        if current is not None:
+            for start in range(0, self._count, self.COPY_CHUNK_SIZE):
+                end = min(start + self.COPY_CHUNK_SIZE, self._count)
+                resized[start:end] = current[start:end]
+        resized.flush()
+
+        # Release both mappings before replacing the file
+        del resized, current
+        os.replace(temp_path, path)
+        setattr(self, attribute, np.load(path, mmap_mode='r+'))
+
+    def _documents_db_path(self) -> str:
+        """Path of the SQLite database holding document rows and the index header."""
+        return os.path.join(self.cache_dir, self.DOCUMENTS_DB)
+
+    def _initialize_documents_db(self, reset: bool = False) -> None:
+        """Create the document and header tables."""
+        conn = sqlite3.connect(self._documents_db_path())
+        try:
+            cursor = conn.cursor()
+            if reset:
+                cursor.execute('DROP TABLE IF EXISTS documents')
+                cursor.execute('DROP TABLE IF EXISTS info')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS documents (
+                    row INTEGER PRIMARY KEY,
+                    file_path TEXT UNIQUE,
+                    file_name TEXT,
+                    file_type TEXT,
+                    metadata TEXT,
+                    content_hash TEXT
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS info (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
+            self._write_header(cursor)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _write_header(self, cursor) -> None:
+        """Store the index header (model, dimension, row count)."""
+        cursor.executemany('INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)', [
+            ('model_name', self.model_name),
+            ('embedding_dim', str(self.embedding_dim)),
+            ('count', str(self._count))
+        ])
+
     def _save_index(self) -> bool:
         """
-        Save the document lookup to cache.
-        Mock implementation using JSON for simplicity.
+        Flush the embedding matrix and save the tombstones and row versions.
         """
         try:
-            if not self.document_lookup:
+            if self._vectors is None:
                 return False
-            
-            # Create cache directory if it doesn't exist
-            os.makedirs(self.cache_dir, exist_ok=True)
-            
-            # Save document lookup directly as a JSON file for mock implementation
-            # Convert set objects to lists for JSON serialization
-            serializable_lookup = {}
-            for idx, doc_info in self.document_lookup.items():
-                doc_copy = doc_info.copy()
-                if 'keywords' in doc_copy and isinstance(doc_copy['keywords'], set):
-                    doc_copy['keywords'] = list(doc_copy['keywords'])
-                serializable_lookup[str(idx)] = doc_copy
-            
-            # Save document lookup
-            lookup_path = os.path.join(self.cache_dir, 'document_lookup.json')
-            with open(lookup_path, 'w') as f:
-                json.dump(serializable_lookup, f)
-            
-            # Save metadata
-            metadata_path = os.path.join(self.cache_dir, 'index_metadata.json')
-            metadata = {
-                'model_name': self.model_name,
-                'num_documents': len(self.document_lookup),
-                'last_updated': time.time()
-            }
-            with open(metadata_path, 'w') as f:
-                json.dump(metadata, f)
-            
-            self.logger.info(f"Saved {len(self.document_lookup)} documents to cache")
+
+            self._vectors.flush()
+            if self._codes is not None:
+                self._codes.flush()
+            np.save(os.path.join(self.cache_dir, self.TOMBSTONES_FILE), self._tombstones)
+            np.save(os.path.join(self.cache_dir, self.VERSIONS_FILE), self._versions)
             return True
-            
+
         except Exception as e:
             self.logger.error(f"Error saving index: {e}")
             return False
-    
+
     def _load_index(self) -> bool:
         """
-        Load the document lookup from cache.
-        Mock implementation using JSON for simplicity.
+        Open the memory-mapped index from the cache directory.
         """
         try:
-            lookup_path = os.path.join(self.cache_dir, 'document_lookup.json')
-            metadata_path = os.path.join(self.cache_dir, 'index_metadata.json')
-            
-            if not all(os.path.exists(p) for p in [lookup_path, metadata_path]):
-                self.logger.warning("Cache files not found")
+            vectors_path = os.path.join(self.cache_dir, self.VECTORS_FILE)
+            tombstones_path = os.path.join(self.cache_dir, self.TOMBSTONES_FILE)
+            versions_path = os.path.join(self.cache_dir, self.VERSIONS_FILE)
+            db_path = self._documents_db_path()
+
+            if not all(os.path.exists(p) for p in [vectors_path, tombstones_path, versions_path, db_path]):
+                self.logger.info("No cached vector index found")
                 return False
-            
-            # Load metadata and verify compatibility
-            with open(metadata_path, 'r') as f:
-                metadata = json.load(f)
-            
-            if metadata['model_name'] != self.model_name:
+
+            # Load header and verify compatibility
+            conn = sqlite3.connect(db_path)
+            try:
+                header = dict(conn.execute('SELECT key, value FROM info').fetchall())
+
+                # Older databases were created without the content_hash column
+                columns = {row[1] for row in conn.execute('PRAGMA table_info(documents)').fetchall()}
+                if 'content_hash' not in columns:
+                    conn.execute('ALTER TABLE documents ADD COLUMN content_hash TEXT')
+                    conn.commit()
+            finally:
+                conn.close()
+
+            if header.get('model_name') != self.model_name or \
+                    int(header.get('embedding_dim', 0)) != self.embedding_dim:
                 self.logger.warning("Model mismatch in cached index")
                 return False
-            
-            # Load document lookup from JSON
-            with open(lookup_path, 'r') as f:
-                lookup_data = json.load(f)
-            
-            # Convert string keys back to integers and list keywords back to sets
-            self.document_lookup = {}
-            for idx_str, doc_info in lookup_data.items():
-                idx = int(idx_str)
-                if 'keywords' in doc_info and isinstance(doc_info['keywords'], list):
-                    doc_info['keywords'] = set(doc_info['keywords'])
-                self.document_lookup[idx] = doc_info
-            
-            self.logger.info(f"Loaded {len(self.document_lookup)} documents from cache")
+
+            self._vectors = np.load(vectors_path, mmap_mode='r+')
+            self._tombstones = np.load(tombstones_path)
+            self._versions = np.load(versions_path)
+            self._count = int(header.get('count', 0))
+            self._row_index = None
+            self._load_quantizer()
+
+            self.logger.info(f"Loaded vector index with {self._count} rows from cache")
             return True
-            
+
         except Exception as e:
             self.logger.error(f"Error loading index: {e}")
             return False
@@ -364,6 +1129,21 @@ class VectorSearch:
     def clear_cache(self) -> bool:
         """Clear the vector search cache."""
         try:
+            # Release the memory map before deleting its file
+            self._vectors = None
+            self._tombstones = None
+            self._versions = None
+            self._codes = None
+            self.quantizer = None
+            self._quantized_version = None
+            self._row_index = None
+            self._count = 0
+            self._loaded = False
+
+            if self.embedder is not None:
+                self.embedder.clear()
+                self.ann_index.reset()
+
             for file in os.listdir(self.cache_dir):
                 file_path = os.path.join(self.cache_dir, file)
                 if os.path.isfile(file_path):
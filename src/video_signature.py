@@ -0,0 +1,335 @@
+"""
+Video Signature Module for Smart File Organizer.
+Finds transcoded and resized copies of the same video by comparing compact
+keyframe signatures.
+
+A signature is the video's duration plus the perceptual hashes (64-bit DCT
+hashes, see perceptual_hash.py) of a fixed number of frames sampled at fixed
+fractions of the duration, in the middle of equal intervals. The frames come
+from a single sequential decode: ffmpeg scales them to 32 x 32 grayscale in
+the decoding pipeline and only the sampled frames are piped out; without
+ffmpeg, OpenCV grabs frames in order and converts only the sampled ones.
+Sampling at fractions of the duration rather than at scene boundaries keeps
+the sample points identical across frame rates and encoders.
+
+Copies have durations within a small tolerance and frame hashes a few bits
+apart. Candidates are found through the duration (a sorted window, or an
+indexed column in the duplicate index) and verified with the median Hamming
+distance of their frame hashes, which only needs the stored signatures and
+ignores the odd frame that falls on a scene cut. Signatures are stored per
+file in the shared HashCache.
+"""
+
+import bisect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+from .hash_cache import HashCache, stat_key
+from .perceptual_hash import ImageHasher
+
+# Handle imports with graceful fallbacks
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import ffmpeg
+    FFMPEG_AVAILABLE = True
+except ImportError:
+    FFMPEG_AVAILABLE = False
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+# Frame hashes are FRAME_HASH_SIZE x FRAME_HASH_SIZE bits (one uint64) of a 4x larger thumbnail
+FRAME_HASH_SIZE = 8
+FRAME_BITS = FRAME_HASH_SIZE * FRAME_HASH_SIZE
+FRAME_PIXELS = 4 * FRAME_HASH_SIZE
+
+
+def frame_distances(hashes, others):
+    """
+    Hamming distances between frame hashes.
+
+    Args:
+        hashes: uint64 array of frame hashes, shape (frames,)
+        others: uint64 array of frame hashes, shape (..., frames)
+
+    Returns:
+        Array of bit counts shaped like others
+    """
+    differing = np.ascontiguousarray(np.bitwise_xor(others, hashes))
+    return np.unpackbits(differing.view(np.uint8)).reshape(differing.shape + (64,)).sum(axis=-1)
+
+
+class VideoHasher:
+    """Keyframe signatures of videos with per-file caching and near-duplicate grouping."""
+
+    def __init__(self, config: Optional[Dict] = None, cache: Optional[HashCache] = None):
+        """
+        Initialize the hasher with configuration.
+
+        Args:
+            config: Signature settings
+            cache: Optional persistent hash cache
+        """
+        self.config = config or {}
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+        self.settings = {
+            'frames': 16,                   # Frames sampled per video
+            'duration_tolerance': 0.02,     # Relative duration difference allowed between copies
+            'min_duration_tolerance': 1.0,  # Seconds allowed for short videos
+            'io_workers': 2                 # Videos decoded concurrently
+        }
+        self.settings.update({k: v for k, v in self.config.items() if v is not None})
+
+        self.frames = self.settings['frames']
+        self.kind = f"video/{self.frames}/phash{FRAME_HASH_SIZE}"
+        self.image_hasher = ImageHasher({'hash_size': FRAME_HASH_SIZE, 'method': 'phash'})
+
+    @staticmethod
+    def available() -> bool:
+        """Check that videos can be decoded."""
+        return NUMPY_AVAILABLE and (FFMPEG_AVAILABLE or CV2_AVAILABLE)
+
+    def signature(self, file_path: str) -> Tuple[float, Any]:
+        """
+        Compute the signature of a video.
+
+        Returns:
+            (duration in seconds, uint64 array of frame hashes)
+        """
+        if FFMPEG_AVAILABLE:
+            try:
+                duration, frames = self._frames_ffmpeg(file_path)
+            except Exception as e:
+                if not CV2_AVAILABLE:
+                    raise
+                self.logger.debug(f"ffmpeg could not sample {file_path} ({e}) - trying OpenCV")
+                duration, frames = self._frames_cv2(file_path)
+        elif CV2_AVAILABLE:
+            duration, frames = self._frames_cv2(file_path)
+        else:
+            raise RuntimeError("ffmpeg-python or OpenCV is required to decode videos")
+
+        hashes = np.array([self.image_hasher.phash_pixels(frame) for frame in frames], dtype=np.uint64)
+        return duration, hashes
+
+    def signatures(self, paths: List[str]) -> List[Optional[Tuple[float, Any]]]:
+        """
+        Get the signatures of many videos, using the cache where possible.
+
+        Returns:
+            Signatures in path order (None for undecodable videos)
+        """
+        keys = {}
+        cached = {}
+        if self.cache is not None:
+            keys = {path: stat_key(path) for path in paths}
+            cached = self.cache.get_signatures(paths, self.kind, keys)
+
+        signatures = [self.from_bytes(cached[path]) if path in cached else None for path in paths]
+        missing = [i for i, value in enumerate(signatures) if value is None]
+        computed = self._sign_all([paths[i] for i in missing])
+        for i, value in zip(missing, computed):
+            signatures[i] = value
+
+        if self.cache is not None:
+            self.cache.put_signatures(
+                [(paths[i], keys[paths[i]], self.to_bytes(signatures[i]))
+                 for i in missing if signatures[i] is not None], self.kind)
+        return signatures
+
+    def duration_window(self, duration: float) -> Tuple[float, float]:
+        """Range of durations a copy of a video of this duration may have."""
+        relative = self.settings['duration_tolerance']
+        absolute = self.settings['min_duration_tolerance']
+        return (min(duration - absolute, duration * (1 - relative)),
+                max(duration + absolute, duration / (1 - relative)))
+
+    def similarity(self, a: Tuple[float, Any], b: Tuple[float, Any]) -> float:
+        """
+        Similarity (0-1) of two signatures: one minus the median fraction of
+        differing bits over the frames both have, or 0 if the durations differ.
+        """
+        low, high = self.duration_window(a[0])
+        frames = min(len(a[1]), len(b[1]))
+        if not low <= b[0] <= high or not frames:
+            return 0.0
+        return 1.0 - float(np.median(frame_distances(a[1][:frames], b[1][:frames]))) / FRAME_BITS
+
+    def group_similar(self, items: List[Any], threshold: float,
+                      path_of: Callable[[Any], str] = lambda item: item['file_path']) -> List[List[Any]]:
+        """
+        Group videos whose signature similarity reaches a threshold.
+
+        Videos are sorted by duration; each one is compared (vectorized) with
+        the longer videos inside its duration window. Groups are the connected
+        components of the matching pairs.
+
+        Args:
+            items: File dictionaries (or other items)
+            threshold: Minimum signature similarity
+            path_of: Function returning the file path of an item
+
+        Returns:
+            Groups of two or more similar items, in input order
+        """
+        signatures = self.signatures([path_of(item) for item in items])
+        order = sorted((i for i, signature in enumerate(signatures) if signature is not None and len(signature[1])),
+                       key=lambda i: signatures[i][0])
+        durations = [signatures[i][0] for i in order]
+
+        parent = list(range(len(items)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        hashes, valid = self._frame_matrix([signatures[i] for i in order])
+        for position, i in enumerate(order):
+            end = bisect.bisect_right(durations, self.duration_window(durations[position])[1])
+            if end <= position + 1:
+                continue
+            scores = self._similarities(hashes[position], valid[position],
+                                        hashes[position + 1:end], valid[position + 1:end])
+            for offset in np.nonzero(scores >= threshold)[0]:
+                root_i, root_j = find(i), find(order[position + 1 + offset])
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        groups = {}
+        for i, signature in enumerate(signatures):
+            if signature is not None:
+                groups.setdefault(find(i), []).append(items[i])
+        return [group for group in groups.values() if len(group) > 1]
+
+    def find_similar(self, file_path: str, candidates: List[Any], threshold: float,
+                     path_of: Callable[[Any], str] = lambda item: item['file_path']) -> List[Tuple[Any, float]]:
+        """
+        Find the candidates that are copies of one video.
+
+        Args:
+            file_path: Path to the video to check
+            candidates: File dictionaries (or other items) to compare against
+            threshold: Minimum signature similarity
+            path_of: Function returning the file path of an item
+
+        Returns:
+            (candidate, similarity) pairs, most similar first
+        """
+        target, *signatures = self.signatures([file_path] + [path_of(item) for item in candidates])
+        if target is None or not len(target[1]):
+            return []
+
+        matches = []
+        for item, signature in zip(candidates, signatures):
+            if signature is not None:
+                similarity = self.similarity(target, signature)
+                if similarity >= threshold:
+                    matches.append((item, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    @staticmethod
+    def to_bytes(signature: Tuple[float, Any]) -> bytes:
+        """Serialize a signature: little-endian float64 duration, then uint64 frame hashes."""
+        duration, hashes = signature
+        return np.array([duration], dtype='<f8').tobytes() + np.asarray(hashes, dtype='<u8').tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> Tuple[float, Any]:
+        """Deserialize a signature stored with to_bytes()."""
+        duration = float(np.frombuffer(data[:8], dtype='<f8')[0])
+        return duration, np.frombuffer(data[8:], dtype='<u8').astype(np.uint64)
+
+    def _frame_matrix(self, signatures: List[Tuple[float, Any]]):
+        """Frame hashes padded to (videos, frames), with a mask of the frames present."""
+        hashes = np.zeros((len(signatures), self.frames), dtype=np.uint64)
+        valid = np.zeros((len(signatures), self.frames), dtype=bool)
+        for row, (_, frame_hashes) in enumerate(signatures):
+            count = min(len(frame_hashes), self.frames)
+            hashes[row, :count] = frame_hashes[:count]
+            valid[row, :count] = True
+        return hashes, valid
+
+    def _similarities(self, hashes, valid, other_hashes, other_valid):
+        """Similarities of one padded signature to many (durations already matched)."""
+        distances = frame_distances(hashes, other_hashes).astype(np.float64)
+        distances[~(other_valid & valid)] = np.nan
+        usable = (other_valid & valid).any(axis=1)
+        scores = np.zeros(len(other_hashes))
+        if usable.any():
+            scores[usable] = 1.0 - np.nanmedian(distances[usable], axis=1) / FRAME_BITS
+        return scores
+
+    def _frames_ffmpeg(self, file_path: str):
+        """Sample frames in one ffmpeg decode: (duration, uint8 array of FRAME_PIXELS squares)."""
+        duration = float(ffmpeg.probe(file_path)['format']['duration'])
+        interval = duration / self.frames
+
+        # Start half an interval in, then one frame per interval, scaled while decoding
+        output, _ = (ffmpeg
+                     .input(file_path, ss=interval / 2)
+                     .filter('fps', fps=1.0 / interval)
+                     .filter('scale', FRAME_PIXELS, FRAME_PIXELS, flags='area')
+                     .output('pipe:', format='rawvideo', pix_fmt='gray', vframes=self.frames, an=None)
+                     .run(capture_stdout=True, capture_stderr=True))
+
+        frame_size = FRAME_PIXELS * FRAME_PIXELS
+        count = min(len(output) // frame_size, self.frames)
+        frames = np.frombuffer(output[:count * frame_size], dtype=np.uint8)
+        return duration, frames.reshape(count, FRAME_PIXELS, FRAME_PIXELS)
+
+    def _frames_cv2(self, file_path: str):
+        """Sample frames reading the video once in order: (duration, uint8 array of FRAME_PIXELS squares)."""
+        cap = cv2.VideoCapture(file_path)
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Could not open video file: {file_path}")
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if fps <= 0 or frame_count <= 0:
+                raise ValueError(f"Unknown frame rate or length: {file_path}")
+
+            frames = []
+            position = 0
+            for target in ((np.arange(self.frames) + 0.5) * frame_count / self.frames).astype(int):
+                # grab() advances without converting the skipped frames
+                while position < target and cap.grab():
+                    position += 1
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                position += 1
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                frames.append(cv2.resize(gray, (FRAME_PIXELS, FRAME_PIXELS), interpolation=cv2.INTER_AREA))
+
+            frames = np.array(frames, dtype=np.uint8).reshape(-1, FRAME_PIXELS, FRAME_PIXELS)
+            return frame_count / fps, frames
+        finally:
+            cap.release()
+
+    def _sign_all(self, paths: List[str]) -> List[Optional[Tuple[float, Any]]]:
+        """Sign videos on a thread pool; undecodable videos give None."""
+        def safe_signature(path):
+            try:
+                return self.signature(path)
+            except Exception as e:
+                self.logger.warning(f"Error computing video signature for {path}: {e}")
+                return None
+
+        if len(paths) < 2 or self.settings['io_workers'] <= 1:
+            return [safe_signature(path) for path in paths]
+
+        with ThreadPoolExecutor(max_workers=self.settings['io_workers'], thread_name_prefix='videosig') as executor:
+            return list(executor.map(safe_signature, paths))
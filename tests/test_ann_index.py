@@ -0,0 +1,98 @@
+"""
+Tests for the IVF nearest-neighbour index and its use by VectorSearch.
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.ann_index import IVFIndex, measure_recall  # noqa: E402
+from src.vector_search import VectorSearch  # noqa: E402
+
+
+def clustered_vectors(n=4000, dim=32, clusters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.3 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def trained(tmp_path):
+    vectors = clustered_vectors()
+    index = IVFIndex({'index_dir': str(tmp_path)})
+    index.train(vectors, np.arange(len(vectors)), model_version=1)
+    return index, vectors
+
+
+def test_recall_improves_with_nprobe(trained):
+    index, vectors = trained
+    queries = vectors[::200]
+
+    report = measure_recall(index, vectors, np.arange(len(vectors)), queries,
+                            top_k=10, nprobe_values=[1, 8, len(index.centroids)])
+
+    assert [entry['nprobe'] for entry in report] == [1, 8, len(index.centroids)]
+    assert report[1]['recall'] >= 0.9
+    assert report[-1]['recall'] == pytest.approx(1.0)
+    assert report[0]['recall'] <= report[-1]['recall']
+
+
+def test_add_remove_and_persistence(trained, tmp_path):
+    index, vectors = trained
+    query = vectors[5]
+
+    rows, _ = index.search(query, vectors, nprobe=len(index.centroids))
+    assert 5 in rows
+
+    index.remove([5])
+    rows, _ = index.search(query, vectors, nprobe=len(index.centroids))
+    assert 5 not in rows
+
+    index.add(np.array([5]), vectors)
+    assert index.save()
+
+    reloaded = IVFIndex({'index_dir': str(tmp_path)})
+    assert reloaded.is_trained and reloaded.trained_version == 1
+    rows, scores = reloaded.search(query, vectors, nprobe=4)
+    assert 5 in rows
+    assert scores[list(rows).index(5)] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_needs_training():
+    index = IVFIndex({'index_dir': 'unused', 'retrain_growth': 2.0})
+    index.reset()
+    assert index.needs_training(100, 1)
+
+    vectors = clustered_vectors(n=200)
+    index.train(vectors, np.arange(200), model_version=1)
+    assert not index.needs_training(300, 1)
+    assert index.needs_training(400, 1)
+    assert index.needs_training(200, 2)
+
+
+def test_vector_search_uses_ann_index_when_large(tmp_path):
+    words = ['alpha', 'beta', 'gamma', 'delta', 'omega', 'sigma', 'kappa', 'theta']
+    documents = [{
+        'file_path': f'/docs/{i}.txt',
+        'file_name': f'{i}.txt',
+        'content': ' '.join(words[(i + j) % len(words)] for j in range(3)) + f' doc{i}'
+    } for i in range(300)]
+
+    vs = VectorSearch({'cache_dir': str(tmp_path / 'embeddings'), 'embedding_dim': 32,
+                       'embedder': {'n_features': 1024},
+                       'ann': {'min_documents': 200, 'nprobe': 64}})
+    assert vs.index_documents(documents)
+    assert vs._ann_ready()
+
+    approximate = vs.find_similar_documents('/docs/0.txt', top_k=5)
+    vs.ann_enabled = False
+    exact = vs.find_similar_documents('/docs/0.txt', top_k=5)
+    assert [r['file_path'] for r in approximate] == [r['file_path'] for r in exact]
+    vs.ann_enabled = True
+
+    report = vs.benchmark_ann(n_queries=20, top_k=5, nprobe_values=[1, 64])
+    assert report[-1]['recall'] == pytest.approx(1.0)
+
+    assert vs.remove_documents(['/docs/1.txt']) == 1
+    assert '/docs/1.txt' not in [r['file_path'] for r in vs.find_similar_documents('/docs/0.txt', top_k=20)]
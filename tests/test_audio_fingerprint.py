@@ -0,0 +1,100 @@
+"""
+Tests for spectral-peak landmark fingerprints of audio.
+"""
+
+import wave
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.audio_fingerprint import AudioFingerprinter, LandmarkIndex  # noqa: E402
+
+SAMPLE_RATE = 8000
+
+
+def make_recording(seed, seconds=30):
+    """Sequence of random chords, a quarter second each."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(SAMPLE_RATE // 4) / SAMPLE_RATE
+    notes = []
+    for _ in range(seconds * 4):
+        chord = sum(amp * np.sin(2 * np.pi * freq * t)
+                    for freq, amp in zip(rng.uniform(100, 3500, 3), rng.uniform(0.2, 1.0, 3)))
+        notes.append(chord * np.hanning(len(t)))
+    return np.concatenate(notes)
+
+
+def write_wav(path, samples):
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((samples / np.abs(samples).max() * 20000).astype('<i2').tobytes())
+    return {'file_path': str(path)}
+
+
+@pytest.fixture
+def fingerprinter():
+    return AudioFingerprinter()
+
+
+def test_copies_align_and_unrelated_recordings_do_not(fingerprinter):
+    original = make_recording(1)
+    rng = np.random.default_rng(0)
+    fingerprint = fingerprinter.landmarks(original)
+
+    quieter_noisy = fingerprinter.landmarks(0.5 * original + rng.normal(0, 0.05, len(original)))
+    trimmed = fingerprinter.landmarks(original[int(3.37 * SAMPLE_RATE):])
+    unrelated = fingerprinter.landmarks(make_recording(2))
+
+    assert len(fingerprint[0]) > 500
+    assert fingerprinter.similarity(fingerprint, quieter_noisy) > 0.8
+    assert fingerprinter.similarity(fingerprint, trimmed) > 0.3
+    assert fingerprinter.similarity(fingerprint, unrelated) < 0.02
+
+    silence = fingerprinter.landmarks(np.zeros(10 * SAMPLE_RATE))
+    assert len(silence[0]) == 0 and fingerprinter.similarity(fingerprint, silence) == 0.0
+
+
+def test_landmark_index_votes_for_aligned_recording(fingerprinter):
+    fingerprints = {seed: fingerprinter.landmarks(make_recording(seed, seconds=15)) for seed in range(5)}
+    index = fingerprinter.new_index()
+    for seed, fingerprint in fingerprints.items():
+        index.add(seed, fingerprint)
+
+    query = fingerprinter.landmarks(make_recording(3, seconds=15)[SAMPLE_RATE:])
+    (best, votes), *others = index.query(query)
+    assert best == 3 and votes >= fingerprinter.settings['min_votes']
+    assert all(count < fingerprinter.settings['min_votes'] for _, count in others)
+
+    # Sampling keeps the same hashes in every copy
+    assert all(value % 4 == 0 for value in index.sample(query)[0])
+    assert LandmarkIndex().query(query) == []
+
+
+def test_fingerprint_round_trip(fingerprinter):
+    fingerprint = fingerprinter.landmarks(make_recording(4, seconds=5))
+    hashes, offsets = fingerprinter.from_bytes(fingerprinter.to_bytes(fingerprint))
+    assert np.array_equal(hashes, fingerprint[0]) and np.array_equal(offsets, fingerprint[1])
+
+
+def test_duplicate_detector_groups_audio_copies(tmp_path):
+    pytest.importorskip('librosa')
+    from src.duplicate_detector import DuplicateDetector
+
+    original = make_recording(5)
+    files = [write_wav(tmp_path / 'song.wav', original),
+             write_wav(tmp_path / 'song (trimmed).wav', original[2 * SAMPLE_RATE:]),
+             write_wav(tmp_path / 'other.wav', make_recording(6))]
+
+    detector = DuplicateDetector({'duplicate_detection': {'cache_dir': str(tmp_path / 'cache')},
+                                  'hash_cache': {'db_path': str(tmp_path / 'hashes.db')},
+                                  'duplicate_index': {'db_path': str(tmp_path / 'index.db')}})
+    result = detector.find_duplicates(files)
+
+    assert result['duplicate_groups'] == [files[:2]]
+    assert detector.check_duplicates(files[1]['file_path'], [files[0], files[2]])['duplicate_files'] == files[:1]
+
+    detector.index.add_many([files[0], files[2]])
+    assert detector.check_duplicate(files[1]['file_path'], include_similar=True)['duplicate_path'] == files[0]['file_path']
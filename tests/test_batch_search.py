@@ -0,0 +1,105 @@
+"""
+Tests for the batch query APIs of VectorSearch and SearchEngine.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from src.vector_search import VectorSearch  # noqa: E402
+from src.search_engine import SearchEngine  # noqa: E402
+
+WORDS = ['alpha', 'beta', 'gamma', 'delta', 'omega', 'sigma', 'kappa', 'theta',
+         'budget', 'report', 'travel', 'recipe', 'invoice', 'contract', 'photo', 'music']
+
+
+def make_documents(n):
+    return [{
+        'file_path': f'/docs/{i}.txt',
+        'file_name': f'{i}.txt',
+        'content': ' '.join(WORDS[(i * 7 + j * 3) % len(WORDS)] for j in range(6)) + f' doc{i}'
+    } for i in range(n)]
+
+
+@pytest.fixture
+def vector_search(tmp_path):
+    vs = VectorSearch({'cache_dir': str(tmp_path / 'embeddings'), 'embedding_dim': 32,
+                       'embedder': {'n_features': 1024}, 'ann': {'enabled': False}})
+    assert vs.index_documents(make_documents(2000))
+    return vs
+
+
+def paths(results):
+    return [(r['file_path'], r['similarity']) for r in results]
+
+
+def test_search_batch_matches_single_queries(vector_search):
+    queries = ['alpha budget', 'travel photo music', 'contract invoice', 'no known terms zzz']
+
+    batch = vector_search.search_batch(queries, top_k=5, threshold=0.1)
+
+    assert len(batch) == len(queries)
+    for query, results in zip(queries, batch):
+        single = vector_search.search(query, top_k=5, threshold=0.1)
+        assert {p for p, _ in paths(results)} == {p for p, _ in paths(single)}
+        assert [s for _, s in paths(results)] == pytest.approx([s for _, s in paths(single)], abs=1e-5)
+
+
+def test_find_similar_batch_excludes_self_and_unknown_paths(vector_search):
+    targets = ['/docs/0.txt', '/docs/1.txt', '/docs/missing.txt']
+
+    batch = vector_search.find_similar_batch(targets, top_k=3)
+
+    assert set(batch) == set(targets)
+    assert batch['/docs/missing.txt'] == []
+    for path in targets[:2]:
+        assert batch[path] and path not in [r['file_path'] for r in batch[path]]
+        single = vector_search.find_similar_documents(path, top_k=3)
+        assert [s for _, s in paths(batch[path])] == pytest.approx([s for _, s in paths(single)], abs=1e-5)
+
+
+def test_search_batch_is_faster_than_a_loop(vector_search):
+    queries = [' '.join(WORDS[(i + j) % len(WORDS)] for j in range(3)) for i in range(64)]
+    vector_search.search_batch(queries[:2], top_k=10, threshold=0.0)   # warm up
+
+    start = time.perf_counter()
+    for query in queries:
+        vector_search.search(query, top_k=10, threshold=0.0)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vector_search.search_batch(queries, top_k=10, threshold=0.0)
+    batch_time = time.perf_counter() - start
+
+    assert batch_time < loop_time
+
+
+def test_search_engine_batch(tmp_path):
+    engine = SearchEngine({
+        'db_path': str(tmp_path / 'index.db'),
+        'vector_search': {'cache_dir': str(tmp_path / 'embeddings'), 'embedding_dim': 64,
+                          'embedder': {'n_features': 4096}},
+        'search': {'min_similarity': 0.0}
+    })
+    engine.index_files([{
+        'file_path': path, 'file_name': path.rsplit('/', 1)[-1], 'file_ext': '.txt',
+        'category': category, 'content': content, 'metadata': {}
+    } for path, content, category in [
+        ('/docs/budget.txt', 'annual budget forecast revenue expenses', 'Docs'),
+        ('/docs/recipe.txt', 'chocolate cake recipe with sugar', 'Docs'),
+        ('/docs/travel.txt', 'travel budget for the lisbon trip', 'Travel'),
+    ]])
+
+    queries = ['budget forecast', 'cake recipe', 'budget type:document']
+    batch = engine.search_batch(queries, top_k=2)
+
+    assert len(batch) == 3
+    for query, results in zip(queries, batch):
+        assert [r['file_path'] for r in results] == [r['file_path'] for r in engine.search(query, top_k=2)]
+        assert [r['rank'] for r in results] == list(range(1, len(results) + 1))
+
+    similar = engine.find_similar_batch(['/docs/budget.txt', '/docs/none.txt'], top_k=2)
+    assert similar['/docs/none.txt'] == []
+    assert '/docs/budget.txt' not in [r['file_path'] for r in similar['/docs/budget.txt']]
@@ -0,0 +1,72 @@
+"""
+Tests for the pooled SQLite access layer.
+"""
+
+import threading
+
+import pytest
+
+from src.db_pool import ConnectionPool, close_pool, get_pool
+
+
+def test_connections_are_per_thread_and_tuned(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'a.db'))
+    conn = pool.connection()
+    assert pool.connection() is conn
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1   # NORMAL
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(pool.connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+    # The finished thread's connection is dropped when another thread connects
+    thread = threading.Thread(target=pool.connection)
+    thread.start()
+    thread.join()
+    assert pool.stats()['connections'] == 2
+
+    pool.close()
+    assert pool.stats()['connections'] == 0
+    assert pool.connection() is not conn
+    assert get_pool(str(tmp_path / 'b.db')) is get_pool(str(tmp_path / '.' / 'b.db'))
+
+
+def test_nested_transactions_commit_or_roll_back_together(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'a.db'))
+    with pool.transaction() as conn:
+        conn.execute('CREATE TABLE t (x INTEGER)')
+
+    with pool.transaction() as conn:
+        conn.execute('INSERT INTO t VALUES (1)')
+        with pool.transaction():
+            conn.execute('INSERT INTO t VALUES (2)')
+        assert conn.in_transaction   # Inner block joined the outer transaction
+
+    with pytest.raises(ValueError):
+        with pool.transaction() as conn:
+            conn.execute('INSERT INTO t VALUES (3)')
+            with pool.transaction():
+                conn.execute('INSERT INTO t VALUES (4)')
+            raise ValueError
+
+    reader = ConnectionPool(str(tmp_path / 'a.db')).connection()
+    assert [row[0] for row in reader.execute('SELECT x FROM t ORDER BY x')] == [1, 2]
+    assert not pool.connection().in_transaction
+
+
+def test_shared_pools_are_closed_and_not_inherited(tmp_path):
+    path = str(tmp_path / 'a.db')
+    pool = get_pool(path)
+    conn = pool.connection()
+    close_pool(path)
+    assert pool.stats()['connections'] == 0
+    assert get_pool(path) is not pool
+
+    # A pool created by another process (before a fork) is replaced, not reused
+    inherited = get_pool(path)
+    inherited._pid = -1
+    assert get_pool(path) is not inherited
+    assert inherited.connection() is not conn and inherited._pid > 0
@@ -0,0 +1,119 @@
+"""
+Tests for the persistent duplicate index.
+"""
+
+import os
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from src.duplicate_detector import DuplicateDetector  # noqa: E402
+
+
+@pytest.fixture
+def detector(tmp_path):
+    return DuplicateDetector({
+        'duplicate_detection': {'cache_dir': str(tmp_path / 'cache')},
+        'hash_cache': {'db_path': str(tmp_path / 'hashes.db')},
+        'duplicate_index': {'db_path': str(tmp_path / 'duplicates.db')}
+    })
+
+
+def test_exact_lookup_reads_only_the_new_file(tmp_path, detector):
+    library = tmp_path / 'library'
+    library.mkdir()
+    for i in range(20):
+        (library / f'{i}.bin').write_bytes(os.urandom(4096))
+    (tmp_path / 'incoming.bin').write_bytes((library / '7.bin').read_bytes())
+    (tmp_path / 'new.bin').write_bytes(os.urandom(4096))
+
+    assert detector.index.add_directory(str(library)) == 20
+    assert detector.index.add_directory(str(library)) == 0   # Unchanged files are skipped
+
+    detector.hasher.reset_stats()
+    result = detector.check_duplicate(str(tmp_path / 'incoming.bin'), str(library))
+    assert result['duplicate_type'] == 'exact'
+    assert result['duplicate_path'] == str(library / '7.bin')
+    assert detector.hasher.bytes_read == 4096
+
+    assert not detector.check_duplicates(str(tmp_path / 'new.bin'))['is_duplicate']
+    assert not detector.check_duplicate(str(tmp_path / 'incoming.bin'), str(tmp_path / 'elsewhere'))['is_duplicate']
+
+
+def test_large_files_confirm_with_full_hash_and_track_changes(tmp_path, detector):
+    data = os.urandom(200 * 1024)
+    changed = bytearray(data)
+    changed[100 * 1024] ^= 0xFF
+    (tmp_path / 'a.dat').write_bytes(data)
+    (tmp_path / 'b.dat').write_bytes(bytes(changed))   # Same size and sample, other content
+    (tmp_path / 'copy.dat').write_bytes(data)
+    detector.index.add_many([str(tmp_path / 'a.dat'), str(tmp_path / 'b.dat')])
+
+    result = detector.check_duplicates(str(tmp_path / 'copy.dat'))
+    assert [f['file_path'] for f in result['duplicate_files']] == [str(tmp_path / 'a.dat')]
+
+    # A modified or removed file drops out of the index
+    (tmp_path / 'a.dat').write_bytes(os.urandom(200 * 1024))
+    assert not detector.check_duplicates(str(tmp_path / 'copy.dat'))['is_duplicate']
+
+    detector.index.remove([str(tmp_path / 'b.dat')])
+    assert detector.index.count() == 0
+
+
+def test_similar_images_and_text(tmp_path, detector):
+    Image = pytest.importorskip('PIL.Image')
+    rng = random.Random(2)
+    blocks = [[tuple(rng.randrange(256) for _ in range(3)) for _ in range(8)] for _ in range(8)]
+    img = Image.new('RGB', (256, 256))
+    for y in range(256):
+        for x in range(256):
+            img.putpixel((x, y), blocks[y // 32][x // 32])
+    img.save(tmp_path / 'photo.png')
+    img.resize((128, 128)).save(tmp_path / 'thumb.png')
+
+    words = [f'w{rng.randrange(3000)}' for _ in range(300)]
+    (tmp_path / 'notes.txt').write_text(' '.join(words))
+    words[10] = 'changed'
+    (tmp_path / 'notes_v2.txt').write_text(' '.join(words))
+
+    detector.index.add_many([str(tmp_path / 'photo.png'), str(tmp_path / 'notes.txt')])
+
+    image = detector.check_duplicates(str(tmp_path / 'thumb.png'))
+    assert image['duplicate_type'] == 'similar'
+    assert image['duplicate_files'][0]['file_path'] == str(tmp_path / 'photo.png')
+
+    text = detector.check_duplicates(str(tmp_path / 'notes_v2.txt'))
+    assert text['duplicate_type'] == 'similar'
+    assert text['similarity_score'] >= 0.85
+
+    # check_duplicate reports exact matches only unless asked
+    assert not detector.check_duplicate(str(tmp_path / 'notes_v2.txt'))['is_duplicate']
+    assert detector.check_duplicate(str(tmp_path / 'notes_v2.txt'), include_similar=True)['is_duplicate']
+
+
+def test_relocate_carries_entries_without_rereading(tmp_path, detector):
+    words = ' '.join(f'w{i}' for i in range(300))
+    (tmp_path / 'notes.txt').write_text(words)
+    (tmp_path / 'data.bin').write_bytes(os.urandom(4096))
+    (tmp_path / 'plain.bin').write_bytes(os.urandom(4096))
+    detector.index.add_many([str(tmp_path / 'notes.txt'), str(tmp_path / 'data.bin')])
+
+    placed = tmp_path / 'placed'
+    placed.mkdir()
+    os.replace(tmp_path / 'notes.txt', placed / 'notes.txt')
+    (placed / 'data.bin').write_bytes((tmp_path / 'data.bin').read_bytes())
+    (placed / 'plain.bin').write_bytes((tmp_path / 'plain.bin').read_bytes())
+
+    detector.hasher.reset_stats()
+    assert detector.index.relocate([(str(tmp_path / 'notes.txt'), str(placed / 'notes.txt'))]) == 1
+    assert detector.index.relocate([(str(tmp_path / 'data.bin'), str(placed / 'data.bin')),
+                                    (str(tmp_path / 'plain.bin'), str(placed / 'plain.bin'))], copy=True) == 2
+    assert detector.hasher.bytes_read == 4096   # Only the file without an entry was read
+    assert detector.index.count() == 4
+
+    (tmp_path / 'notes_copy.txt').write_text(words)
+    result = detector.check_duplicate(str(tmp_path / 'notes_copy.txt'), include_similar=True)
+    assert result['duplicate_path'] == str(placed / 'notes.txt')
+    assert detector.check_duplicate(str(tmp_path / 'data.bin'), str(placed))['duplicate_path'] == str(placed / 'data.bin')
@@ -0,0 +1,80 @@
+"""
+Tests for staged duplicate hashing.
+"""
+
+import os
+import hashlib
+
+import pytest
+
+from src.file_hashing import FileHasher
+from src.duplicate_detector import DuplicateDetector
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return {'file_path': str(path)}
+
+
+@pytest.fixture
+def hasher():
+    return FileHasher({'sample_size': 1024, 'chunk_size': 4096, 'io_workers': 4})
+
+
+def test_groups_identical_files_in_stages(tmp_path, hasher):
+    big = os.urandom(64 * 1024)
+    middle_changed = bytearray(big)
+    middle_changed[32 * 1024] ^= 0xFF
+
+    files = [
+        write(tmp_path / 'a.bin', big),
+        write(tmp_path / 'b.bin', big),
+        write(tmp_path / 'c.bin', bytes(middle_changed)),   # Same size, head and tail
+        write(tmp_path / 'd.bin', os.urandom(64 * 1024)),   # Same size, different head
+        write(tmp_path / 'e.bin', b'small' * 10),
+        write(tmp_path / 'f.bin', b'small' * 10),
+        write(tmp_path / 'g.bin', b'other'),
+    ]
+
+    groups = hasher.group_identical(files)
+
+    names = sorted(sorted(os.path.basename(f['file_path']) for f in group) for group in groups)
+    assert names == [['a.bin', 'b.bin'], ['e.bin', 'f.bin']]
+
+    # d is rejected by its sample; only a, b and c are read in full
+    assert hasher.bytes_read == 4 * 2 * 1024 + 2 * 50 + 3 * 64 * 1024
+
+
+def test_full_hash_streams_in_chunks(tmp_path, hasher):
+    data = os.urandom(10 * 4096 + 7)
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+
+    assert hasher.full_hash(str(path)) == hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def test_find_matches_and_unreadable_files(tmp_path, hasher):
+    data = os.urandom(8 * 1024)
+    target = write(tmp_path / 'target.bin', data)
+    candidates = [write(tmp_path / 'copy.bin', data),
+                  write(tmp_path / 'other.bin', os.urandom(8 * 1024)),
+                  {'file_path': str(tmp_path / 'missing.bin')}]
+
+    assert hasher.find_matches(target['file_path'], candidates) == candidates[:1]
+    assert hasher.group_identical(candidates + [target]) == [[candidates[0], target]]
+
+
+def test_duplicate_detector_reports_bytes_read(tmp_path):
+    pytest.importorskip('numpy')
+    payload = os.urandom(256 * 1024)
+    files = [write(tmp_path / 'one.dat', payload), write(tmp_path / 'two.dat', payload),
+             write(tmp_path / 'three.dat', os.urandom(256 * 1024))]
+
+    detector = DuplicateDetector({'duplicate_detection': {'cache_dir': str(tmp_path / 'cache')},
+                                  'hash_cache': {'db_path': str(tmp_path / 'hashes.db')}})
+    result = detector.find_duplicates(files)
+
+    assert result['stats']['duplicate_groups'] == 1
+    assert result['stats']['total_bytes'] == 3 * 256 * 1024
+    assert result['stats']['bytes_read'] < result['stats']['total_bytes']
+    assert detector.check_duplicates(files[0]['file_path'], files[1:])['duplicate_type'] == 'exact'
@@ -0,0 +1,72 @@
+"""
+Tests for hardlink / reflink duplicate resolution.
+"""
+
+import os
+
+import pytest
+
+from src.file_linking import files_identical, replace_with_hardlink, replace_with_reflink
+from src.duplicate_detector import DuplicateDetector
+
+
+def test_replace_with_hardlink_is_verified(tmp_path):
+    keep, dup, other = tmp_path / 'keep.bin', tmp_path / 'dup.bin', tmp_path / 'other.bin'
+    data = os.urandom(50000)
+    keep.write_bytes(data)
+    dup.write_bytes(data)
+    other.write_bytes(os.urandom(50000))
+
+    assert files_identical(str(keep), str(dup)) and not files_identical(str(keep), str(other))
+
+    replace_with_hardlink(str(keep), str(dup))
+    assert os.path.samefile(keep, dup)
+    assert dup.read_bytes() == data
+
+    with pytest.raises(ValueError):
+        replace_with_hardlink(str(keep), str(other))
+    assert not os.path.samefile(keep, other)
+    assert sorted(os.listdir(tmp_path)) == ['dup.bin', 'keep.bin', 'other.bin']   # No temp files left
+
+
+def test_reflink_failure_leaves_duplicate_untouched(tmp_path):
+    keep, dup = tmp_path / 'keep.bin', tmp_path / 'dup.bin'
+    keep.write_bytes(b'x' * 10000)
+    dup.write_bytes(b'x' * 10000)
+
+    try:
+        replace_with_reflink(str(keep), str(dup))
+    except OSError:
+        pass   # File system without copy-on-write support
+    assert dup.read_bytes() == b'x' * 10000
+    assert sorted(os.listdir(tmp_path)) == ['dup.bin', 'keep.bin']
+
+
+def test_handle_duplicates_hardlink_dry_run_and_apply(tmp_path):
+    pytest.importorskip('numpy')
+    data = os.urandom(64 * 1024)
+    paths = []
+    for name in ('a.bin', 'b.bin', 'c.bin'):
+        (tmp_path / name).write_bytes(data)
+        paths.append(str(tmp_path / name))
+    os.link(paths[2], tmp_path / 'c_link.bin')   # c has a second name outside the group
+    group = [{'file_path': path} for path in paths]
+
+    detector = DuplicateDetector({'duplicate_detection': {'cache_dir': str(tmp_path / 'cache')},
+                                  'hash_cache': {'db_path': str(tmp_path / 'hashes.db')},
+                                  'duplicate_index': {'db_path': str(tmp_path / 'index.db')}})
+
+    preview = detector.handle_duplicates([group], action='hardlink', keep_strategy='oldest', dry_run=True)
+    keep_path = preview['results'][0]['keep_file']
+    expected = sum(os.stat(p).st_blocks * 512 for p in paths if p != keep_path and os.stat(p).st_nlink == 1)
+    assert preview['bytes_reclaimed'] == expected
+    assert preview['files_affected'] == 2
+    assert not any(os.path.samefile(keep_path, p) for p in paths if p != keep_path)
+
+    applied = detector.handle_duplicates([group], action='hardlink', keep_strategy='oldest')
+    assert applied['bytes_reclaimed'] == expected
+    assert all(os.path.samefile(keep_path, p) for p in paths)
+
+    again = detector.handle_duplicates([group], action='hardlink', keep_strategy='oldest')
+    assert [r['action'] for r in again['results']] == ['already_linked', 'already_linked']
+    assert again['bytes_reclaimed'] == 0
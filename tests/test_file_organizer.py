@@ -0,0 +1,161 @@
+"""
+Tests for the plan-then-apply organize engine.
+"""
+
+import logging
+import os
+
+import pytest
+
+pytest.importorskip('google.generativeai')
+pytest.importorskip('requests')
+pytest.importorskip('numpy')
+
+from src.duplicate_detector import DuplicateDetector  # noqa: E402
+from src.file_organizer import FileOrganizer  # noqa: E402
+from src.file_transfer import FileTransfer  # noqa: E402
+from src.organize_journal import OrganizeJournal  # noqa: E402
+from src.organization_rules import OrganizationRule, OrganizationRuleManager  # noqa: E402
+from src.tag_manager import TagManager  # noqa: E402
+
+
+@pytest.fixture
+def organizer(tmp_path):
+    # Skip the AI and image analyzers, which need API access
+    organizer = FileOrganizer.__new__(FileOrganizer)
+    organizer.logger = logging.getLogger(__name__)
+    organizer.duplicate_detector = DuplicateDetector({
+        'duplicate_detection': {'cache_dir': str(tmp_path / 'cache')},
+        'hash_cache': {'db_path': str(tmp_path / 'hashes.db')},
+        'duplicate_index': {'db_path': str(tmp_path / 'duplicates.db')}
+    })
+    organizer.tag_manager = TagManager(str(tmp_path / 'tags.db'))
+    organizer.rule_manager = OrganizationRuleManager()
+    organizer.file_transfer = FileTransfer()
+    organizer.rules_file = str(tmp_path / 'rules.json')
+    organizer.journal_dir = str(tmp_path / 'journals')
+    return organizer
+
+
+def make_files(directory, contents):
+    directory.mkdir(exist_ok=True)
+    files = []
+    for name, data in contents:
+        path = directory / name
+        path.write_bytes(data)
+        files.append({'file_path': str(path), 'file_name': name, 'file_type': 'Data',
+                      'ai_analysis': {'category': 'Reports', 'summary': f'About {name}'}})
+    return files
+
+
+def test_plan_then_apply(tmp_path, organizer):
+    files = make_files(tmp_path / 'a', [('report.bin', os.urandom(2048)), ('notes.bin', os.urandom(2048))])
+    files += make_files(tmp_path / 'b', [('report.bin', os.urandom(2048)), ('copy.bin', b'')])
+    (tmp_path / 'b' / 'copy.bin').write_bytes((tmp_path / 'a' / 'notes.bin').read_bytes())
+    files.append({'file_path': str(tmp_path / 'missing.bin'), 'file_name': 'missing.bin'})
+    target = tmp_path / 'organized'
+
+    progress = []
+    results = organizer.organize_files(files, str(target), lambda *args: progress.append(args), {
+        'detect_duplicates': True, 'duplicate_action': 'move', 'apply_tags': True,
+        'copy_instead_of_move': False, 'io_workers': 3})
+
+    reports = target / 'Reports'
+    assert sorted(os.listdir(reports)) == sorted([
+        'report.bin', 'report_summary.md', 'report_metadata.json',
+        'report_1.bin', 'report_1_summary.md', 'report_1_metadata.json',
+        'notes.bin', 'notes_summary.md', 'notes_metadata.json'])
+    assert os.listdir(target / '_Duplicates') == ['copy.bin']
+    assert results['organized_files'] == 3 and results['duplicate_files'] == 1
+    assert results['skipped_file_paths'] == [str(tmp_path / 'missing.bin')]
+    assert not any((tmp_path / 'a').iterdir())
+    assert set(results['timings']) >= {'plan', 'directories', 'transfer', 'tags', 'index', 'total'}
+    assert progress[-1][:2] == (5, 5)
+    assert results['transfer_stats']['methods']['rename'] == 4   # Same file system
+
+    assert {t['name'] for t in organizer.tag_manager.get_file_tags(str(reports / 'report_1.bin'))} == {'Data', 'Reports'}
+
+    # The index follows the placed files, so a second run finds the copies there
+    again = make_files(tmp_path / 'c', [('notes again.bin', (reports / 'notes.bin').read_bytes())])
+    results = organizer.organize_files(again, str(target), options={'detect_duplicates': True})
+    assert results['duplicate_file_paths'] == [again[0]['file_path']]
+    # Only files in the target directory stay indexed
+    placed = sum(len(names) for _, _, names in os.walk(target))
+    assert organizer.duplicate_detector.index.count() == placed
+
+
+def test_keep_newest_within_one_run(tmp_path, organizer):
+    data = os.urandom(1024)
+    files = make_files(tmp_path / 'in', [('old.bin', data), ('new.bin', data)])
+    os.utime(files[0]['file_path'], (1, 1))
+    target = tmp_path / 'organized'
+
+    results = organizer.organize_files(files, str(target), options={
+        'detect_duplicates': True, 'duplicate_action': 'keep_newest',
+        'generate_summaries': False, 'include_metadata': False})
+
+    assert os.listdir(target / 'Reports') == ['old.bin']
+    assert os.path.getmtime(target / 'Reports' / 'old.bin') > 1
+    assert results['duplicate_file_paths'] == [files[0]['file_path']]
+    assert os.path.exists(files[0]['file_path'])   # Copied, not moved
+
+
+def test_resume_skips_finished_operations_and_undo_reverses_run(tmp_path, organizer):
+    files = make_files(tmp_path / 'in', [(f'{i}.bin', os.urandom(512)) for i in range(6)])
+    target = tmp_path / 'organized'
+    options = {'copy_instead_of_move': False, 'apply_tags': True, 'detect_duplicates': True}
+
+    # A crash after two journaled moves and one unjournaled one
+    transfer = organizer.file_transfer.move
+    calls = []
+
+    def crashing_move(source, destination):
+        calls.append(source)
+        if len(calls) > 3:
+            raise OSError('disk went away')
+        return transfer(source, destination)
+
+    organizer.file_transfer.move = crashing_move
+    results = organizer.organize_files(files, str(target), options=dict(options, io_workers=1))
+    organizer.file_transfer.move = transfer
+    journal_path = results['journal_path']
+    assert results['organized_files'] == 3 and results['error_files'] == 3
+    assert OrganizeJournal.list_journals(organizer.journal_dir, unfinished_only=True) == [journal_path]
+
+    with open(journal_path) as f:
+        lines = f.readlines()
+    done = [line for line in lines if line.startswith('{"done"')]
+    with open(journal_path, 'w') as f:
+        f.writelines(line for line in lines if line != done[-1])
+
+    results = organizer.resume_organization(journal_path)
+    assert results['organized_files'] == 4 and results['error_files'] == 0
+    assert results['transfer_stats']['files'] == 3   # The unjournaled move is not repeated
+    assert sorted(os.listdir(target / 'Reports')) == sorted(
+        f'{i}{suffix}' for i in range(6) for suffix in ('.bin', '_summary.md', '_metadata.json'))
+    assert len(organizer.tag_manager.get_files_by_tag('Reports')) == 6
+    assert OrganizeJournal.list_journals(organizer.journal_dir, unfinished_only=True) == []
+    assert organizer.resume_organization(journal_path)['organized_files'] == 0
+
+    results = organizer.undo_organization(journal_path, io_workers=4)
+    assert results['undone_files'] == 6 and results['error_files'] == 0
+    assert sorted(os.listdir(tmp_path / 'in')) == [f'{i}.bin' for i in range(6)]
+    assert os.listdir(target) == []   # Created directories are removed
+    assert organizer.tag_manager.get_files_by_tag('Reports') == []
+    assert organizer.duplicate_detector.index.count() == 0
+
+
+def test_rule_statistics_count_only_organized_files(tmp_path, organizer):
+    data = os.urandom(1024)
+    files = make_files(tmp_path / 'in', [('a.bin', data), ('b.bin', data), ('c.bin', os.urandom(1024))])
+    files.append({'file_path': str(tmp_path / 'missing.bin'), 'file_name': 'missing.bin'})
+    rule = organizer.rule_manager.add_rule(
+        OrganizationRule(name='by name').set_name_pattern_condition(r'\.bin$').set_target_path('Rules/{file_name}'))
+
+    results = organizer.organize_files(files, str(tmp_path / 'organized'), options={
+        'use_custom_rules': True, 'detect_duplicates': True, 'duplicate_action': 'report',
+        'generate_summaries': False, 'include_metadata': False})
+
+    assert results['organized_files'] == 2 and results['duplicate_files'] == 1
+    assert (rule.application_count, rule.success_count) == (2, 2)
+    assert results['rules_applied'][rule.rule_id]['count'] == 2
@@ -0,0 +1,61 @@
+"""
+Tests for copies and moves with zero-copy fast paths.
+"""
+
+import errno
+import os
+
+import pytest
+
+from src.file_transfer import FileTransfer
+
+FALLBACKS = ['reflink', 'copy_file_range', 'sendfile']
+
+
+@pytest.mark.parametrize('method', FALLBACKS + ['buffered'])
+def test_copy_keeps_content_and_metadata(tmp_path, method):
+    source = tmp_path / 'source.bin'
+    data = os.urandom(300 * 1024 + 17)
+    source.write_bytes(data)
+    os.chmod(source, 0o640)
+    os.utime(source, ns=(1_000_000_000, 1_234_567_890_123))
+
+    # Enable one fast path at a time (buffered: none); unsupported ones fall back
+    transfer = FileTransfer({**{m: m == method for m in FALLBACKS}, 'block_size': 64 * 1024})
+    (tmp_path / 'copy.bin').write_bytes(b'old, longer content' * 100000)
+    used = transfer.copy(str(source), str(tmp_path / 'copy.bin'))
+
+    copy = tmp_path / 'copy.bin'
+    assert copy.read_bytes() == data
+    assert os.stat(copy).st_mtime_ns == 1_234_567_890_123
+    assert os.stat(copy).st_mode & 0o777 == 0o640
+    assert used == method or (method != 'buffered' and used == 'buffered')
+
+    stats = transfer.stats()
+    assert stats['files'] == 1 and stats['bytes'] == len(data)
+    assert stats['methods'][used] == 1 and stats['bytes_per_second'] > 0
+
+
+def test_move_renames_on_same_device_and_copies_across(tmp_path, monkeypatch):
+    transfer = FileTransfer()
+    (tmp_path / 'a.bin').write_bytes(b'a' * 1000)
+    inode = os.stat(tmp_path / 'a.bin').st_ino
+
+    assert transfer.move(str(tmp_path / 'a.bin'), str(tmp_path / 'b.bin')) == 'rename'
+    assert os.stat(tmp_path / 'b.bin').st_ino == inode
+    assert transfer.stats()['bytes_copied'] == 0
+
+    def cross_device(source, target):
+        raise OSError(errno.EXDEV, 'Invalid cross-device link')
+
+    monkeypatch.setattr(os, 'replace', cross_device)
+    assert transfer.move(str(tmp_path / 'b.bin'), str(tmp_path / 'c.bin')) != 'rename'
+    assert not (tmp_path / 'b.bin').exists()
+    assert (tmp_path / 'c.bin').read_bytes() == b'a' * 1000
+    assert transfer.stats()['files'] == 2 and transfer.stats()['bytes_copied'] == 1000
+
+
+def test_failed_copy_leaves_no_partial_file(tmp_path):
+    with pytest.raises(OSError):
+        FileTransfer().copy(str(tmp_path / 'missing.bin'), str(tmp_path / 'copy.bin'))
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,100 @@
+"""
+Tests for the persistent file-hash cache.
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from src.file_hashing import FileHasher
+from src.hash_cache import HashCache, stat_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HashCache({'db_path': str(tmp_path / 'hashes.db')})
+
+
+def touch_later(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+def test_entries_validate_against_stat(tmp_path, cache):
+    path = tmp_path / 'a.txt'
+    path.write_bytes(b'hello')
+    cache.put_many([(str(path), stat_key(str(path)), 'full', 'abc')], 'blake2b/1024')
+
+    assert cache.get(str(path), 'blake2b/1024') == 'abc'
+    assert cache.get(str(path), 'xxh3/1024') is None   # Other scheme is a miss
+
+    # A rename keeps the entry
+    renamed = tmp_path / 'b.txt'
+    os.rename(path, renamed)
+    assert cache.get(str(renamed), 'blake2b/1024') == 'abc'
+
+    # A new modification time invalidates it
+    touch_later(renamed)
+    assert cache.get(str(renamed), 'blake2b/1024') is None
+    assert cache.prune() == 1
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_new_version_drops_the_other_digest(tmp_path, cache):
+    path = str(tmp_path / 'a.txt')
+    with open(path, 'wb') as f:
+        f.write(b'hello')
+    key = stat_key(path)
+    cache.put_many([(path, key, 'quick', 'q1'), (path, key, 'full', 'f1')], 's')
+    assert cache.get_many([path], 's') == {path: {'quick': 'q1', 'full': 'f1'}}
+
+    touch_later(path)
+    cache.put_many([(path, stat_key(path), 'quick', 'q2')], 's')
+    assert cache.get_many([path], 's') == {path: {'quick': 'q2', 'full': None}}
+
+
+def test_hasher_reads_unchanged_files_once(tmp_path, cache):
+    data = os.urandom(64 * 1024)
+    files = []
+    for name in ('a.bin', 'b.bin', 'c.bin'):
+        (tmp_path / name).write_bytes(data)
+        files.append({'file_path': str(tmp_path / name)})
+
+    hasher = FileHasher({'sample_size': 1024}, cache=cache)
+    assert len(hasher.group_identical(files)) == 1
+    assert hasher.bytes_read > 0
+
+    hasher.reset_stats()
+    assert len(hasher.group_identical(files)) == 1
+    assert hasher.bytes_read == 0
+
+    # A changed file is hashed again
+    (tmp_path / 'c.bin').write_bytes(os.urandom(64 * 1024))
+    touch_later(tmp_path / 'c.bin')
+    assert [len(group) for group in hasher.group_identical(files)] == [2]
+    assert hasher.bytes_read == 2 * 1024   # Only the sample of c; a and b come from the cache
+
+
+def test_search_engine_stores_content_hash(tmp_path):
+    pytest.importorskip('numpy')
+    from src.search_engine import SearchEngine
+
+    path = tmp_path / 'notes.txt'
+    path.write_text('meeting notes')
+    engine = SearchEngine({
+        'db_path': str(tmp_path / 'index.db'),
+        'hash_cache': {'db_path': str(tmp_path / 'hashes.db')},
+        'vector_search': {'cache_dir': str(tmp_path / 'embeddings'), 'embedding_dim': 32}
+    })
+    engine.index_files([
+        {'file_path': str(path), 'file_name': 'notes.txt', 'content': 'meeting notes', 'metadata': {}},
+        {'file_path': '/virtual/missing.txt', 'file_name': 'missing.txt', 'content': 'x', 'metadata': {}}
+    ])
+
+    conn = sqlite3.connect(engine.db_path)
+    hashes = dict(conn.execute('SELECT path, content_hash FROM files').fetchall())
+    conn.close()
+
+    assert hashes[str(path)] == engine.hasher.full_hash(str(path))
+    assert hashes['/virtual/missing.txt'] is None
@@ -0,0 +1,131 @@
+"""
+Tests for hybrid keyword + semantic retrieval in SearchEngine.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from src.search_engine import SearchEngine  # noqa: E402
+
+
+def make_file(path, content, category='Docs'):
+    return {
+        'file_path': path,
+        'file_name': path.rsplit('/', 1)[-1],
+        'file_ext': '.txt',
+        'category': category,
+        'content': content,
+        'metadata': {}
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = SearchEngine({
+        'db_path': str(tmp_path / 'index.db'),
+        'vector_search': {'cache_dir': str(tmp_path / 'embeddings'), 'embedding_dim': 64,
+                          'embedder': {'n_features': 4096}},
+        'search': {'min_similarity': 0.0}
+    })
+    engine.index_files([
+        make_file('/docs/budget.txt', 'annual budget forecast revenue expenses'),
+        make_file('/docs/forecast.txt', 'revenue forecast for next quarter'),
+        make_file('/docs/recipe.txt', 'chocolate cake recipe with sugar'),
+        make_file('/docs/travel.txt', 'travel budget for the lisbon trip', category='Travel'),
+    ])
+    return engine
+
+
+def result(path, **scores):
+    return {'file_path': path, 'file_name': path, 'file_type': 'text', 'metadata': {}, **scores}
+
+
+def test_reciprocal_rank_fusion(engine):
+    semantic = [result('/a', similarity=0.9), result('/b', similarity=0.8)]
+    keyword = [result('/b', score=1.0), result('/c', score=0.5)]
+
+    fused = engine._fuse_results(semantic, keyword)
+
+    assert [r['file_path'] for r in fused] == ['/b', '/a', '/c']
+    assert fused[0]['score'] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[0]['semantic_rank'] == 2 and fused[0]['keyword_rank'] == 1
+    assert fused[2]['semantic_rank'] is None
+
+
+def test_normalized_score_fusion(engine):
+    engine.settings['combine_method'] = 'normalized'
+    semantic = [result('/a', similarity=0.9), result('/b', similarity=0.3)]
+    keyword = [result('/b', score=1.0), result('/c', score=0.5)]
+
+    fused = {r['file_path']: r['score'] for r in engine._fuse_results(semantic, keyword)}
+
+    assert fused['/a'] == pytest.approx(0.6)
+    assert fused['/b'] == pytest.approx(0.4)
+    assert fused['/c'] == pytest.approx(0.0)
+
+
+def test_hybrid_search_ranks_documents_found_by_both(engine):
+    response = engine.advanced_search('revenue forecast', top_k=3)
+
+    paths = [r['file_path'] for r in response['results']]
+    assert set(paths[:2]) == {'/docs/budget.txt', '/docs/forecast.txt'}
+    assert [r['rank'] for r in response['results']] == list(range(1, len(paths) + 1))
+    assert response['total'] == 2
+    assert set(response['timings']) == {'keyword_ms', 'semantic_ms', 'total_ms'}
+
+    # Filters still restrict both retrievers
+    filtered = engine.search('budget', filters={'category': 'Travel'})
+    assert [r['file_path'] for r in filtered] == ['/docs/travel.txt']
+
+
+def test_rerank_fills_missing_scores(engine):
+    engine.settings['rerank_top_n'] = 10
+    engine.settings['min_similarity'] = 0.99  # semantic retriever returns nothing on its own
+
+    results = engine.search('budget forecast', top_k=5)
+
+    assert results and all(r['semantic_rank'] is None for r in results)
+    assert results[0]['file_path'] == '/docs/budget.txt'
+    assert results[0]['semantic_score'] > 0.0
+    assert results[0]['keyword_score'] == pytest.approx(1.0)
+
+
+def test_retrievers_run_concurrently(engine, monkeypatch):
+    keyword_search = engine._keyword_search
+    semantic_search = engine._semantic_search
+
+    def slow_keyword(*args, **kwargs):
+        time.sleep(0.2)
+        return keyword_search(*args, **kwargs)
+
+    def slow_semantic(*args, **kwargs):
+        time.sleep(0.2)
+        return semantic_search(*args, **kwargs)
+
+    monkeypatch.setattr(engine, '_keyword_search', slow_keyword)
+    monkeypatch.setattr(engine, '_semantic_search', slow_semantic)
+
+    response = engine.advanced_search('budget', top_k=5)
+
+    assert response['results']
+    assert response['timings']['keyword_ms'] >= 200
+    assert response['timings']['semantic_ms'] >= 200
+    assert response['timings']['total_ms'] < 380
+
+
+def test_search_pages_start_with_the_hybrid_ranking(engine):
+    first = engine.search_page('revenue forecast', page_size=3)
+
+    expected = engine.search('revenue forecast', top_k=3)
+    assert [r['file_path'] for r in first['results']] == [r['file_path'] for r in expected]
+    assert any(r['keyword_rank'] is None for r in first['results'])   # A semantic-only hit
+    assert all(r['id'] and r['category'] for r in first['results'])
+    assert first['total'] == 2 and first['next_cursor'] is None
+
+    first = engine.search_page('budget', page_size=1)
+    rest = engine.search_page('budget', page_size=1, cursor=first['next_cursor'])
+    assert rest['results'][0]['rank'] == 2 and rest['next_cursor'] is None
+    assert {r['file_path'] for r in first['results'] + rest['results']} == {'/docs/budget.txt', '/docs/travel.txt'}
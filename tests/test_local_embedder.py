@@ -0,0 +1,135 @@
+"""
+Tests for the offline LocalEmbedder and its use by VectorSearch and SearchEngine.
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.local_embedder import LocalEmbedder  # noqa: E402
+from src.vector_search import VectorSearch  # noqa: E402
+from src.search_engine import SearchEngine  # noqa: E402
+
+TOPICS = {
+    'finance': 'budget invoice revenue expense forecast account tax payment ledger audit',
+    'cooking': 'recipe flour sugar oven bake butter eggs dough chocolate cake',
+    'travel': 'flight hotel passport itinerary airport luggage beach museum tour visa',
+}
+
+
+def make_corpus(n, seed=0):
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        topic = list(TOPICS)[i % len(TOPICS)]
+        words = TOPICS[topic].split()
+        docs.append((topic, ' '.join(rng.choice(words) for _ in range(30))))
+    return docs
+
+
+def small_config(tmp_path, **overrides):
+    config = {'n_features': 1024, 'embedding_dim': 16, 'min_fit_documents': 40,
+              'sample_size': 64, 'model_dir': str(tmp_path / 'embedder')}
+    config.update(overrides)
+    return config
+
+
+def test_transform_before_fit_is_normalized_and_deterministic(tmp_path):
+    embedder = LocalEmbedder(small_config(tmp_path))
+    first = embedder.transform(['budget forecast', 'budget forecast', ''])
+    second = LocalEmbedder(small_config(tmp_path)).transform(['budget forecast'])
+
+    assert embedder.version == 0
+    assert first.shape == (3, 16) and first.dtype == np.float32
+    assert np.allclose(np.linalg.norm(first[:2], axis=1), 1.0)
+    assert not first[2].any()
+    assert np.allclose(first[0], second[0])
+
+
+def test_partial_fit_fits_and_separates_topics(tmp_path):
+    embedder = LocalEmbedder(small_config(tmp_path))
+    corpus = make_corpus(60)
+
+    assert not embedder.partial_fit([text for _, text in corpus[:30]])
+    assert embedder.partial_fit([text for _, text in corpus[30:]])
+    assert embedder.version == 1
+    assert embedder.model_id == 'local-tfidf-svd-v1'
+
+    vectors = embedder.transform([text for _, text in corpus])
+    similarity = vectors @ vectors.T
+    same = similarity[0, 3]      # both finance
+    different = similarity[0, 1]  # finance vs cooking
+    assert same > different
+
+
+def test_refit_on_growth_and_persisted_versions(tmp_path):
+    embedder = LocalEmbedder(small_config(tmp_path))
+    corpus = [text for _, text in make_corpus(200)]
+
+    embedder.partial_fit(corpus[:50])
+    assert embedder.version == 1
+    embedder.partial_fit(corpus[50:80])
+    assert embedder.version == 1
+    embedder.partial_fit(corpus[80:])
+    assert embedder.version == 2
+
+    reloaded = LocalEmbedder(small_config(tmp_path))
+    assert reloaded.version == 2
+    assert reloaded.doc_count == 200
+    assert np.allclose(reloaded.transform(corpus[:5]), embedder.transform(corpus[:5]), atol=1e-5)
+
+    # Different settings start a fresh model instead of loading incompatible artifacts
+    assert LocalEmbedder(small_config(tmp_path, embedding_dim=8)).version == 0
+
+
+def test_search_engine_reembeds_stale_documents(tmp_path):
+    engine = SearchEngine({
+        'db_path': str(tmp_path / 'index.db'),
+        'vector_search': {
+            'cache_dir': str(tmp_path / 'embeddings'),
+            'embedding_dim': 16,
+            'embedder': {'n_features': 1024, 'min_fit_documents': 40, 'sample_size': 64}
+        }
+    })
+    engine.settings['min_similarity'] = 0.0
+
+    corpus = make_corpus(60)
+    files = [{'file_path': f'/docs/{topic}{i}.txt', 'file_name': f'{topic}{i}.txt',
+              'file_type': 'text', 'content': text}
+             for i, (topic, text) in enumerate(corpus)]
+
+    assert engine.index_files(files[:20])['success']
+    assert engine.vector_search.embedder.version == 0
+
+    assert engine.index_files(files[20:])['success']
+    assert engine.vector_search.embedder.version == 1
+    assert engine.vector_search.stale_documents() == []
+
+    similar = engine.find_similar('/docs/finance0.txt', top_k=3)
+    assert len(similar) == 3
+    assert all('finance' in result['file_path'] for result in similar)
+
+
+def test_vector_search_uses_local_embedder(tmp_path):
+    vs = VectorSearch({'cache_dir': str(tmp_path / 'embeddings'), 'embedding_dim': 16,
+                       'embedder': {'n_features': 1024}})
+    assert vs.model_name == LocalEmbedder.MODEL_NAME
+    assert vs.embedder.model_dir == str(tmp_path / 'embeddings' / 'embedder')
+
+
+def test_reindexing_unchanged_documents_keeps_corpus_statistics(tmp_path):
+    vs = VectorSearch({'cache_dir': str(tmp_path / 'embeddings'), 'embedding_dim': 16,
+                       'embedder': {'n_features': 1024, 'min_fit_documents': 40, 'sample_size': 64}})
+    docs = [{'file_path': f'/docs/{topic}{i}.txt', 'content': text}
+            for i, (topic, text) in enumerate(make_corpus(40))]
+
+    for _ in range(4):
+        assert vs.index_documents(docs)
+    assert vs.embedder.doc_count == 40
+    assert vs.embedder.version == 1
+
+    docs[0] = dict(docs[0], content='passport visa itinerary')
+    assert vs.index_documents(docs)
+    assert vs.embedder.doc_count == 41
@@ -0,0 +1,115 @@
+"""
+Tests for MinHash signatures and LSH near-duplicate grouping.
+"""
+
+import os
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from src.hash_cache import HashCache  # noqa: E402
+from src.minhash import MinHasher, MinHashLSH  # noqa: E402
+from src.duplicate_detector import DuplicateDetector  # noqa: E402
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+
+def random_text(rng, length=200):
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(length))
+
+
+def edit(rng, text, changes):
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return ' '.join(words)
+
+
+def test_signature_estimates_jaccard():
+    rng = random.Random(3)
+    hasher = MinHasher({'num_perm': 256})
+    a = random_text(rng)
+    b = edit(rng, a, 10)
+
+    shingles_a, shingles_b = set(hasher.shingles(a).tolist()), set(hasher.shingles(b).tolist())
+    exact = len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+    assert hasher.jaccard(hasher.signature(a), hasher.signature(b)) == pytest.approx(exact, abs=0.08)
+    assert hasher.signature('') is None
+    assert hasher.jaccard(hasher.signature('Same words, same case.'),
+                          hasher.signature('same WORDS same case')) == 1.0
+
+
+def test_lsh_groups_near_duplicates_without_pairwise_comparison():
+    rng = random.Random(5)
+    items = [{'file_path': f'/docs/{i}.txt', 'content': random_text(rng)} for i in range(300)]
+    variants = [{'file_path': f'/docs/{i}_copy.txt', 'content': edit(rng, items[i]['content'], 2)}
+                for i in range(0, 300, 30)]
+    items += variants
+
+    hasher = MinHasher()
+    groups = hasher.group_similar(items, 0.8, lambda item: item['content'])
+
+    assert sorted(sorted(f['file_path'] for f in group) for group in groups) == \
+        sorted(sorted([f'/docs/{i}.txt', f'/docs/{i}_copy.txt']) for i in range(0, 300, 30))
+
+    lsh = MinHashLSH(0.8, hasher.num_perm)
+    for i, signature in enumerate(hasher.signatures(items, lambda item: item['content'])):
+        lsh.insert(i, signature)
+    assert len(lsh.candidate_pairs()) < len(items)
+
+
+def test_signatures_are_cached_per_file(tmp_path):
+    cache = HashCache({'db_path': str(tmp_path / 'hashes.db')})
+    hasher = MinHasher(cache=cache)
+    path = tmp_path / 'notes.txt'
+    path.write_text('minutes of the planning meeting with action items')
+    items = [{'file_path': str(path)}]
+
+    first = hasher.signatures(items, lambda item: path.read_text())
+    second = hasher.signatures(items, lambda item: pytest.fail("text read again"))
+    assert (first[0] == second[0]).all()
+
+    # OCR text is cached separately from the extracted text
+    assert hasher.signatures(items, lambda item: 'ocr output', source='ocr')[0] is not None
+
+
+def test_detector_checks_new_text_against_existing_files(tmp_path):
+    rng = random.Random(9)
+    text = random_text(rng, 300)
+    existing = []
+    for name, content in (('report.txt', text), ('other.txt', random_text(rng, 300))):
+        (tmp_path / name).write_text(content)
+        existing.append({'file_path': str(tmp_path / name)})
+    (tmp_path / 'report_v2.txt').write_text(edit(rng, text, 3) + ' appendix')
+
+    detector = DuplicateDetector({'duplicate_detection': {'cache_dir': str(tmp_path / 'cache')},
+                                  'hash_cache': {'db_path': str(tmp_path / 'hashes.db')}})
+    result = detector.check_duplicates(str(tmp_path / 'report_v2.txt'), existing)
+
+    assert result['duplicate_type'] == 'similar'
+    assert result['duplicate_files'] == existing[:1]
+    assert result['similarity_score'] >= 0.85
+
+
+def test_find_duplicates_groups_near_duplicates_of_different_sizes(tmp_path):
+    rng = random.Random(13)
+    text = random_text(rng, 300)
+    contents = {'report.txt': text, 'report_copy.txt': text, 'report_v2.txt': text + ' extra',
+                'report_v3.txt': edit(rng, text, 2) + ' final appendix', 'other.txt': random_text(rng, 300)}
+    files = []
+    for name, content in contents.items():
+        (tmp_path / name).write_text(content)
+        files.append({'file_path': str(tmp_path / name)})
+
+    detector = DuplicateDetector({'duplicate_detection': {'cache_dir': str(tmp_path / 'cache')},
+                                  'hash_cache': {'db_path': str(tmp_path / 'hashes.db')}})
+    groups = detector.find_duplicates(files)['duplicate_groups']
+    names = sorted(sorted(os.path.basename(f['file_path']) for f in group) for group in groups)
+
+    # Exact copies are grouped by hashing; the edited versions join by similarity
+    assert ['report.txt', 'report_copy.txt'] in names
+    assert sorted(name for group in names for name in group) == \
+        ['report.txt', 'report_copy.txt', 'report_v2.txt', 'report_v3.txt']
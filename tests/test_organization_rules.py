@@ -0,0 +1,163 @@
+"""
+Tests for compiled organization rule matching.
+"""
+
+import os
+import random
+
+from src.organization_rules import OrganizationRule, OrganizationRuleManager
+
+CATEGORIES = ['Finance', 'Legal', 'Travel', 'Recipes', 'Medical']
+TYPES = ['PDF', 'Word', 'Image', 'Text', 'Spreadsheet']
+
+
+def make_file(rng, i):
+    file_info = {
+        'file_name': f"{rng.choice(['Invoice', 'notes', 'IMG', 'contract'])}_{i}.{rng.choice(['pdf', 'txt', 'jpg'])}",
+        'file_type': rng.choice(TYPES),
+        'file_size': rng.randrange(10 ** 7),
+        'modified_time': rng.randrange(10 ** 9, 2 * 10 ** 9),
+        'tags': rng.sample(CATEGORIES, 2),
+        'text_content': ' '.join(rng.choice(['Paid', 'DUE', 'flight', 'tax', 'recipe', 'the']) for _ in range(20))
+    }
+    if rng.random() < 0.8:
+        file_info['ai_analysis'] = {'category': rng.choice(CATEGORIES), 'summary': 'A document'}
+    if rng.random() < 0.3:
+        file_info['image_analysis'] = {'format': rng.choice(['JPEG', 'PNG']), 'labels': ['cat']}
+    return file_info
+
+
+def make_rules(rng, count):
+    rules = []
+    for i in range(count):
+        rule = OrganizationRule(name=f'rule {i}')
+        kind = rng.randrange(9)
+        if kind == 0:
+            rule.set_name_pattern_condition(rng.choice([r'^invoice_\d+', r'\.jpg$', r'contract', '[']),
+                                            case_sensitive=rng.random() < 0.5)
+        elif kind == 1:
+            rule.set_content_condition(rng.choice(['due', 'Paid', 'flight tax']), case_sensitive=rng.random() < 0.5)
+        elif kind == 2:
+            rule.set_metadata_condition('file_type', rng.choice(TYPES))
+        elif kind == 3:
+            rule.set_metadata_condition('file_size', rng.randrange(10 ** 7),
+                                        rng.choice([OrganizationRule.OP_GREATER, OrganizationRule.OP_LESS]))
+        elif kind == 4:
+            rule.set_date_condition('modified_time', (rng.randrange(10 ** 9, 2 * 10 ** 9), 2 * 10 ** 9))
+        elif kind == 5:
+            rule.set_tag_condition(rng.choice(CATEGORIES), OrganizationRule.OP_CONTAINS)
+        elif kind == 6:
+            rule.set_ai_analysis_condition('category', rng.choice(CATEGORIES),
+                                           rng.choice([OrganizationRule.OP_EQUALS, OrganizationRule.OP_CONTAINS]))
+        elif kind == 7:
+            rule.set_image_condition(rng.choice(['format', 'labels']), '', OrganizationRule.OP_EXISTS)
+        else:
+            rule.set_metadata_condition('tags', rng.sample(CATEGORIES, 2))   # Unhashable equality
+        rule.set_target_path('{category}/{year}/{file_name}')
+        rule.set_priority(rng.randrange(1, 50))
+        rule.enabled = rng.random() < 0.9
+        rules.append(rule)
+    return rules
+
+
+def test_compiled_rules_match_like_each_rule(tmp_path):
+    rng = random.Random(7)
+    manager = OrganizationRuleManager()
+    for rule in make_rules(rng, 120):
+        manager.add_rule(rule)
+    # A start date string cannot be compared with timestamps; such rules never match
+    manager.add_rule(OrganizationRule().set_date_condition('modified_time', ('2020-01-01', '2021-01-01')))
+
+    for i in range(300):
+        file_info = make_file(rng, i)
+        expected = [rule for rule in manager.get_sorted_rules() if rule.matches(file_info)]
+        assert manager.compile_rules().match(file_info) == expected
+
+    file_info = make_file(rng, 0)
+    target, rule = manager.apply_rules(file_info, str(tmp_path))
+    first = next(rule for rule in manager.get_sorted_rules() if rule.matches(file_info))
+    assert rule is first and rule.application_count == 1 and rule.success_count == 1
+    assert target == first.generate_target_path(file_info, str(tmp_path))
+
+
+def test_compiled_rules_follow_rule_changes():
+    manager = OrganizationRuleManager()
+    finance = manager.add_rule(OrganizationRule(name='finance').set_ai_analysis_condition(
+        'category', 'Finance', OrganizationRule.OP_EQUALS).set_target_path('Finance/{file_name}'))
+    pdf = manager.add_rule(OrganizationRule(name='pdf').set_name_pattern_condition(r'\.pdf$').set_target_path(
+        'PDF/{file_name}').set_priority(200))
+    file_info = {'file_name': 'q3.pdf', 'ai_analysis': {'category': 'Finance'}}
+
+    assert manager.apply_rules(file_info, 'out')[1] is finance
+    pdf.set_priority(10)
+    assert manager.apply_rules(file_info, 'out') == (os.path.join('out', 'PDF', 'q3.pdf'), pdf)
+    pdf.enabled = False
+    assert manager.apply_rules(file_info, 'out')[1] is finance
+    finance.set_ai_analysis_condition('category', 'Legal', OrganizationRule.OP_EQUALS)
+    assert manager.apply_rules(file_info, 'out') == (None, None)
+    manager.delete_rule(finance.rule_id)
+    assert manager.compile_rules().rules == []
+
+
+def test_cached_path_templates():
+    rule = OrganizationRule().set_target_path('{category}/{year}-{month}/{ai_analysis.summary}/{labels[0]}/{file_name}')
+    file_info = {'file_name': 'a.txt', 'modified_time': 1700000000,
+                 'ai_analysis': {'category': 'Finance', 'summary': 'Q3: "draft"'}}
+    year_month = __import__('datetime').datetime.fromtimestamp(1700000000).strftime('%Y-%m')
+
+    expected = os.path.normpath(os.path.join('base', 'Finance', year_month, 'Q3_ _draft_', 'Unknown', 'a.txt'))
+    assert rule.generate_target_path(file_info, 'base') == expected
+    assert rule.generate_target_path({'file_name': 'b.txt'}, 'base').startswith(
+        os.path.join('base', 'Uncategorized'))
+
+    rule.set_target_path('{file_type}/{file_name}')   # Re-parsed after a change
+    assert rule.generate_target_path({'file_name': 'c.txt', 'file_type': 'Text'}, 'base') == \
+        os.path.join('base', 'Text', 'c.txt')
+    assert rule.generate_target_path({'file_name': 'c.txt', 'file_type': 7}, 'base') is None
+
+
+def test_benchmark_compares_with_reference():
+    rng = random.Random(3)
+    manager = OrganizationRuleManager()
+    for rule in make_rules(rng, 300):
+        manager.add_rule(rule)
+    result = manager.benchmark([make_file(rng, i) for i in range(200)], repeat=1)
+    assert result['agree'] and result['files'] == 200 and result['rules'] > 200
+
+
+def test_plan_matches_apply_rules_and_saves_once(tmp_path, monkeypatch):
+    rng = random.Random(11)
+    rules = make_rules(rng, 80)
+    files = [make_file(rng, i) for i in range(400)]
+    files.append({'file_name': 'odd.bin', 'file_type': 7, 'tags': ['Legal']})   # Unrenderable {file_type}
+
+    rules_file = str(tmp_path / 'rules.json')
+    batch = OrganizationRuleManager(rules_file)
+    single = OrganizationRuleManager()
+    for rule in rules:
+        batch.add_rule(rule)
+    typed = batch.add_rule(OrganizationRule(name='typed').set_tag_condition('Legal', OrganizationRule.OP_CONTAINS)
+                           .set_target_path('{file_type}/{file_name}').set_priority(0))
+    batch.save_rules()
+    single.load_rules(rules_file)
+
+    saves = []
+    monkeypatch.setattr(batch, 'save_rules', lambda file_path=None: saves.append(file_path) or True)
+    plan = batch.plan(files, 'out')
+    expected = [single.apply_rules(file_info, 'out') for file_info in files]
+
+    assert [(path, rule and rule.rule_id) for path, rule in plan['targets']] == \
+        [(path, rule and rule.rule_id) for path, rule in expected]
+    assert plan['targets'][-1][1] is not typed and plan['stats'][typed.rule_id]['applied'] < \
+        plan['stats'][typed.rule_id]['matched']
+    assert plan['matched_files'] + plan['unmatched_files'] == len(files)
+    assert saves == [None]
+    for rule in single.rules:
+        counted = batch.get_rule(rule.rule_id)
+        assert (counted.application_count, counted.success_count) == (rule.application_count, rule.success_count)
+        stats = plan['stats'].get(rule.rule_id, {'matched': 0, 'applied': 0})
+        assert (stats['matched'], stats['applied']) == (rule.application_count, rule.success_count)
+
+    preview = batch.plan(files[:10], 'out', update_stats=False)
+    assert preview['targets'] == plan['targets'][:10]
+    assert saves == [None] and typed.application_count == plan['stats'][typed.rule_id]['matched']
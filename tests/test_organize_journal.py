@@ -0,0 +1,67 @@
+"""
+Tests for the organize operation journal.
+"""
+
+import pytest
+
+from src.organize_journal import OrganizeJournal
+
+
+def make_journal(directory, count=4):
+    operations = [{'kind': 'organize', 'source': f'/in/{i}.txt', 'target': f'/out/{i}.txt',
+                   'sidecars': [(f'/out/{i}_summary.md', f'# {i}')], 'tags': [('Text', 1.0)],
+                   'file_info': {'not': 'journaled'}}
+                  for i in range(count)]
+    return OrganizeJournal.create(str(directory), operations, '/out', move=True)
+
+
+def test_progress_survives_reload(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.mark_directories(['/out'])
+    journal.mark_done(0, 'rename')
+    journal.mark_failed(2, 'disk full')
+    journal.mark_done(3, 'copy_file_range')
+    journal.mark_tags()
+    journal.close()
+
+    loaded = OrganizeJournal.load(journal.path)
+    assert loaded.pending() == [1, 2] and loaded.completed() == [0, 3]
+    assert loaded.done[3] == 'copy_file_range' and loaded.failed == {2: 'disk full'}
+    assert loaded.operations[1] == {'kind': 'organize', 'source': '/in/1.txt', 'target': '/out/1.txt',
+                                    'sidecars': [['/out/1_summary.md', '# 1']], 'tags': [['Text', 1.0]]}
+    assert loaded.directories == ['/out'] and loaded.tags_done and not loaded.index_done
+    assert OrganizeJournal.list_journals(str(tmp_path), unfinished_only=True) == [journal.path]
+
+    # A retried operation is no longer failed; completion closes the journal
+    loaded.mark_done(1, 'rename')
+    loaded.mark_done(2, 'rename')
+    loaded.mark_complete()
+    loaded.close()
+    assert OrganizeJournal.load(journal.path).failed == {}
+    assert OrganizeJournal.list_journals(str(tmp_path), unfinished_only=True) == []
+    assert OrganizeJournal.list_journals(str(tmp_path)) == [journal.path]
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.mark_done(1, 'rename')
+    journal.close()
+    with open(journal.path, 'a') as f:
+        f.write('{"done": 2, "meth')   # Crash while appending
+
+    assert OrganizeJournal.load(journal.path).pending() == [0, 2, 3]
+
+    # Records of the resumed run start on a new line, so they are not lost
+    runs = []
+    for _ in range(2):
+        resumed = OrganizeJournal.load(journal.path)
+        for index in resumed.pending():
+            runs.append(index)
+            resumed.mark_done(index, 'rename')
+        resumed.close()
+    assert runs == [0, 2, 3]
+    assert OrganizeJournal.load(journal.path).pending() == []
+
+    (tmp_path / 'other.jsonl').write_text('{"something": "else"}\n')
+    with pytest.raises(ValueError):
+        OrganizeJournal.load(str(tmp_path / 'other.jsonl'))
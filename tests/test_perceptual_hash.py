@@ -0,0 +1,86 @@
+"""
+Tests for perceptual image hashing and BK-tree lookups.
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+from src.hash_cache import HashCache  # noqa: E402
+from src.perceptual_hash import BKTree, ImageHasher, hamming_distance  # noqa: E402
+from src.duplicate_detector import DuplicateDetector  # noqa: E402
+
+
+def make_image(path, seed, size=256, fmt=None):
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+    pixels = np.kron(blocks, np.ones((size // 8, size // 8, 1), dtype=np.uint8))
+    pixels = np.clip(pixels + rng.integers(-10, 10, pixels.shape), 0, 255).astype(np.uint8)
+    Image.fromarray(pixels).save(path, format=fmt)
+    return {'file_path': str(path)}
+
+
+def test_bktree_matches_brute_force():
+    rng = random.Random(7)
+    keys = [rng.getrandbits(64) for _ in range(2000)]
+    keys += [key ^ (1 << rng.randrange(64)) for key in keys[:200]]   # Near neighbours
+
+    tree = BKTree()
+    for i, key in enumerate(keys):
+        tree.add(key, i)
+    assert len(tree) == len(keys)
+
+    for query in keys[:50]:
+        expected = sorted(i for i, key in enumerate(keys) if hamming_distance(query, key) <= 4)
+        assert sorted(i for _, i in tree.search(query, 4)) == expected
+
+
+def test_resized_and_reencoded_copies_are_grouped(tmp_path):
+    cache = HashCache({'db_path': str(tmp_path / 'hashes.db')})
+    hasher = ImageHasher({'hash_size': 8}, cache=cache)
+
+    original = make_image(tmp_path / 'photo.png', seed=1)
+    Image.open(original['file_path']).resize((120, 120)).convert('RGB').save(tmp_path / 'small.jpg', quality=70)
+    files = [original, {'file_path': str(tmp_path / 'small.jpg')}, make_image(tmp_path / 'other.png', seed=2)]
+
+    groups = hasher.group_similar(files, hasher.radius_for(0.85))
+    assert groups == [files[:2]]
+
+    # Hashes are served from the cache on the next run
+    assert cache.get_stats()['signatures'] == 3
+    hasher.image_hash = lambda path: pytest.fail(f"re-hashed {path}")
+    assert hasher.group_similar(files, hasher.radius_for(0.85)) == groups
+
+
+def test_dhash_and_phash_agree_on_similarity(tmp_path):
+    a = make_image(tmp_path / 'a.png', seed=3)['file_path']
+    Image.open(a).resize((200, 200)).save(tmp_path / 'b.png')
+    c = make_image(tmp_path / 'c.png', seed=4)['file_path']
+
+    for method in ('dhash', 'phash'):
+        hasher = ImageHasher({'hash_size': 8, 'method': method})
+        ha, hb, hc = hasher.hash_many([a, str(tmp_path / 'b.png'), c])
+        assert hamming_distance(ha, hb) < hamming_distance(ha, hc)
+
+
+def test_detector_finds_near_duplicate_images(tmp_path):
+    original = make_image(tmp_path / 'beach.png', seed=5)
+    Image.open(original['file_path']).resize((192, 192)).save(tmp_path / 'beach_small.png')
+    files = [original, {'file_path': str(tmp_path / 'beach_small.png')},
+             make_image(tmp_path / 'forest.png', seed=6)]
+
+    detector = DuplicateDetector({'duplicate_detection': {'cache_dir': str(tmp_path / 'cache'),
+                                                          'image_similarity_threshold': 0.85},
+                                  'hash_cache': {'db_path': str(tmp_path / 'hashes.db')}})
+    result = detector.find_duplicates(files)
+
+    assert [sorted(f['file_path'] for f in group) for group in result['duplicate_groups']] == \
+        [sorted(f['file_path'] for f in files[:2])]
+
+    check = detector.check_duplicates(files[1]['file_path'], [files[0], files[2]])
+    assert check['duplicate_type'] == 'similar'
+    assert check['duplicate_files'] == [files[0]]
+    assert check['similarity_score'] >= 0.85
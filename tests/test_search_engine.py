@@ -0,0 +1,109 @@
+"""
+Tests for the SQL-backed keyword search in SearchEngine.
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+
+from src.search_engine import SearchEngine
+
+
+def make_file(path, content, ext, category, modified, size=1000, tags=None):
+    return {
+        'file_path': path,
+        'file_name': path.rsplit('/', 1)[-1],
+        'file_ext': ext,
+        'file_type': ext.lstrip('.').upper(),
+        'file_size': size,
+        'created_time': modified,
+        'modified_time': modified,
+        'content': content,
+        'metadata': {'author': 'Jane'},
+        'ai_analysis': {'category': category},
+        'tags': tags or []
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = SearchEngine({
+        'db_path': str(tmp_path / 'index.db'),
+        'search': {'use_semantic_search': False},
+        'vector_search': {'cache_dir': str(tmp_path / 'embeddings')}
+    })
+    jan = datetime(2024, 1, 15).timestamp()
+    mar = datetime(2024, 3, 10).timestamp()
+    files = [
+        make_file('/docs/budget.pdf', 'annual budget report', '.pdf', 'Finance', jan, 5000, ['work']),
+        make_file('/docs/notes.txt', 'budget meeting notes', '.txt', 'Finance', mar, 200),
+        make_file('/docs/trip.txt', 'holiday trip report', '.txt', 'Travel', mar, 300, ['personal']),
+    ]
+    # Many unrelated reports ranked above the PDF would have crowded it out
+    # when filtering happened after top_k truncation.
+    for i in range(20):
+        files.append(make_file(f'/docs/report{i}.txt', 'budget report summary', '.txt',
+                               'Finance', mar))
+    engine.index_files(files)
+    return engine
+
+
+def test_filters_applied_before_ranking(engine):
+    results = engine.search('budget report', filters={'file_type': '.pdf'}, top_k=1)
+    assert [r['file_path'] for r in results] == ['/docs/budget.pdf']
+
+
+def test_query_operators_and_facets(engine):
+    response = engine.advanced_search('report type:txt', top_k=5)
+    assert response['total'] == 21
+    assert len(response['results']) == 5
+    assert response['facets']['file_type'] == {'.txt': 21}
+    assert response['facets']['category'] == {'Finance': 20, 'Travel': 1}
+    assert response['facets']['date'] == {'2024-03': 21}
+
+
+def test_date_size_and_tag_operators(engine):
+    assert [r['file_path'] for r in engine.search('budget date:2024-01-15')] == ['/docs/budget.pdf']
+    assert [r['file_path'] for r in engine.search('size:>4kb')] == ['/docs/budget.pdf']
+    assert [r['file_path'] for r in engine.search('report tag:personal')] == ['/docs/trip.txt']
+    paths = {r['file_path'] for r in engine.search('budget tag:-work', top_k=50)}
+    assert '/docs/budget.pdf' not in paths and '/docs/notes.txt' in paths
+
+
+def test_reindex_replaces_terms_and_remove_missing(engine):
+    engine.index_files([make_file('/docs/notes.txt', 'completely different', '.txt',
+                                  'Misc', time.time())])
+    assert '/docs/notes.txt' not in {r['file_path'] for r in engine.search('meeting')}
+    assert engine.search('different')[0]['metadata'] == {'author': 'Jane'}
+
+    removed = engine.remove_missing_files(['/docs/budget.pdf'])
+    assert removed == 22
+    assert engine.advanced_search('report')['total'] == 1
+
+
+def test_cursor_pagination_is_stable_and_complete(engine):
+    first = engine.search_page('budget report', page_size=7)
+    assert first['total'] == 23 and first['next_cursor']
+
+    seen = [r['file_path'] for r in first['results']]
+    cursor = first['next_cursor']
+    while cursor:
+        page = engine.search_page('budget report', page_size=7, cursor=cursor)
+        assert 'facets' not in page
+        seen.extend(r['file_path'] for r in page['results'])
+        cursor = page['next_cursor']
+
+    assert len(seen) == len(set(seen)) == 23
+    ranked = engine.search('budget report', top_k=50)
+    assert seen == [r['file_path'] for r in ranked]
+
+
+def test_iter_search_and_cursor_validation(engine):
+    pages = list(engine.iter_search('type:txt', page_size=10))
+    assert [len(p) for p in pages] == [10, 10, 2]
+    assert [r['rank'] for r in pages[1]][:2] == [11, 12]
+
+    cursor = engine.search_page('type:txt', page_size=10)['next_cursor']
+    with pytest.raises(ValueError):
+        engine.search_page('type:pdf', page_size=10, cursor=cursor)
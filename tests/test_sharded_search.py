@@ -0,0 +1,120 @@
+"""
+Tests for the sharded search index.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from src.sharded_search import ShardedSearchEngine  # noqa: E402
+from src.search_engine import SearchEngine  # noqa: E402
+
+TOPICS = ['budget revenue forecast', 'holiday travel photos', 'chocolate cake recipe',
+          'invoice payment receipt', 'project meeting notes']
+
+
+def make_files(n, roots=('/data/a', '/data/b')):
+    return [{
+        'file_path': f'{roots[i % len(roots)]}/doc_{i}.txt',
+        'file_name': f'doc_{i}.txt',
+        'file_ext': '.txt',
+        'category': 'Docs',
+        'content': f'{TOPICS[i % len(TOPICS)]} item{i}',
+        'metadata': {}
+    } for i in range(n)]
+
+
+def engine_config(tmp_path, **settings):
+    return {
+        'shard_dir': str(tmp_path / 'shards'),
+        'search': {'min_similarity': 0.0},
+        'vector_search': {'embedding_dim': 32, 'embedder': {'n_features': 1024}},
+        **settings
+    }
+
+
+def test_hash_shards_match_a_single_index(tmp_path):
+    files = make_files(60)
+    sharded = ShardedSearchEngine(engine_config(tmp_path, num_shards=3, workers=2))
+    result = sharded.index_files(files)
+
+    assert result['success'] and result['indexed_files'] == 60
+    assert len(result['shards']) == 3
+
+    single = SearchEngine({'db_path': str(tmp_path / 'single.db'), 'search': {'use_semantic_search': False},
+                           'vector_search': {'cache_dir': str(tmp_path / 'single'), 'embedding_dim': 32}})
+    single.index_files(files)
+
+    sharded_results = sharded.advanced_search('invoice receipt', top_k=20)
+    single_results = single.advanced_search('invoice receipt', top_k=20)
+    assert sharded_results['total'] == single_results['total'] == 12
+    assert {r['file_path'] for r in sharded_results['results']} >= \
+        {r['file_path'] for r in single_results['results'] if r['keyword_rank']}
+    assert [r['rank'] for r in sharded_results['results']] == list(range(1, 21))
+    assert {r['shard'] for r in sharded_results['results']} == {0, 1, 2}
+
+    batch = sharded.search_batch(['invoice receipt', 'cake'], top_k=5)
+    assert [r['file_path'] for r in batch[0]] == [r['file_path'] for r in sharded.search('invoice receipt', top_k=5)]
+
+    assert sharded.suggest('doc_1', limit=3)[0]['file_name'] == 'doc_1.txt'
+    assert sharded.remove_missing_files([f['file_path'] for f in files[:50]]) == 10
+
+
+def test_root_partitioning_and_rebuild(tmp_path):
+    files = make_files(20, roots=('/data/a', '/data/b', '/other'))
+    sharded = ShardedSearchEngine(engine_config(tmp_path, partition='root', roots=['/data/a', '/data/b'], workers=1))
+
+    assert sharded.num_shards == 3
+    assert sharded.shard_for('/data/a/x.txt') == 0
+    assert sharded.shard_for('/data/ab/x.txt') == 2
+    assert sharded.shard_for(os.path.join('/data/b', 'sub', 'x.txt')) == 1
+
+    sharded.index_files(files)
+    assert len(sharded.search('item3', top_k=50)) >= 1
+
+    b_files = [f for f in files if f['file_path'].startswith('/data/b/')]
+    result = sharded.rebuild_shard(1, b_files[:2] + files[:1])
+    assert result['success'] and result['indexed_files'] == 2
+
+    paths = {r['file_path'] for f in b_files[:2]
+             for r in sharded.shards[1].search(f['content'].split()[-1], top_k=50)}
+    assert paths == {f['file_path'] for f in b_files[:2]}
+    assert sharded.find_similar(b_files[0]['file_path'], top_k=5) is not None
+
+    with pytest.raises(ValueError):
+        ShardedSearchEngine(engine_config(tmp_path, num_shards=4))
+
+
+def test_merge_ranks_by_relevance_across_shards(tmp_path):
+    # Document k contains the first k of twelve query terms
+    terms = [f'term{i}' for i in range(12)]
+    files = [{
+        'file_path': f'/data/doc_{k}.txt', 'file_name': f'doc_{k}.txt', 'file_ext': '.txt',
+        'category': 'Docs', 'content': ' '.join(terms[:k]), 'metadata': {}
+    } for k in range(1, 13)]
+    query = ' '.join(terms)
+    config = engine_config(tmp_path, num_shards=3, workers=1)
+    config['search']['use_semantic_search'] = False
+    sharded = ShardedSearchEngine(config)
+    sharded.index_files(files)
+
+    expected = [f'/data/doc_{k}.txt' for k in range(12, 6, -1)]
+    assert [r['file_path'] for r in sharded.search(query, top_k=6)] == expected
+    assert [r['file_path'] for r in sharded.search_batch([query], top_k=6)[0]] == expected
+
+
+def test_semantic_hits_merge_by_shard_rank(tmp_path):
+    engine = SearchEngine({'db_path': str(tmp_path / 'merge.db'),
+                           'vector_search': {'cache_dir': str(tmp_path / 'merge'), 'embedding_dim': 32}})
+
+    def hit(path, similarity, rank):
+        return {'file_path': path, 'file_name': path, 'file_type': 'text', 'metadata': {},
+                'semantic_score': similarity, 'semantic_rank': rank, 'keyword_score': 0.0, 'keyword_rank': None}
+
+    # Similarities of the second shard come from another model and are all lower
+    merged = engine.merge_results([[hit('/a1', 0.9, 1), hit('/a2', 0.8, 2), hit('/a3', 0.7, 3)],
+                                   [hit('/b1', 0.3, 1), hit('/b2', 0.2, 2)]], top_k=4)
+    assert [r['file_path'] for r in merged] == ['/a1', '/b1', '/a2', '/b2']
+    assert [r['rank'] for r in merged] == [1, 2, 3, 4]
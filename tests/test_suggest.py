@@ -0,0 +1,85 @@
+"""
+Tests for filename suggestions (search-as-you-type) in SearchEngine.
+"""
+
+import sqlite3
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from src.search_engine import SearchEngine  # noqa: E402
+
+PATHS = [
+    '/home/user/Documents/report_2023.pdf',
+    '/home/user/Documents/annual_report.docx',
+    '/home/user/Documents/reporting/notes.txt',
+    '/home/user/Downloads/invoice_march.pdf',
+    '/home/user/Pictures/holiday_photo.jpg',
+    '/home/user/Documents/100%_done.txt',
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = SearchEngine({
+        'db_path': str(tmp_path / 'index.db'),
+        'vector_search': {'cache_dir': str(tmp_path / 'embeddings'), 'embedding_dim': 32},
+        'search': {'use_semantic_search': False}
+    })
+    engine.index_files([{'file_path': path, 'file_name': path.rsplit('/', 1)[-1]} for path in PATHS])
+    return engine
+
+
+def names(suggestions):
+    return [s['file_name'] for s in suggestions]
+
+
+def test_suggestions_are_ranked_by_match_position(engine):
+    suggestions = engine.suggest('report')
+
+    assert names(suggestions) == ['report_2023.pdf', 'annual_report.docx', 'notes.txt']
+    assert [s['match'] for s in suggestions] == ['prefix', 'word', 'path']
+    assert all(s['score'] == 1.0 for s in suggestions)
+    assert names(engine.suggest('RE', limit=1)) == ['report_2023.pdf']
+
+
+def test_suggestions_tolerate_typos(engine):
+    suggestions = engine.suggest('invioce')
+
+    assert names(suggestions)[:1] == ['invoice_march.pdf']
+    assert suggestions[0]['match'] == 'fuzzy'
+    assert 0.5 <= suggestions[0]['score'] < 1.0
+    assert engine.suggest('qqqq') == []
+
+
+def test_like_wildcards_are_literal(engine):
+    assert names(engine.suggest('100%')) == ['100%_done.txt']
+    assert engine.suggest('%_') == []
+
+
+def test_narrowing_cache_and_index_updates(engine):
+    assert engine.suggest('hol')
+    assert engine._suggest_cache['hol'][1]   # Complete lookup
+
+    engine._suggest_cache['hol'][0].append((999, '/cached/holiday_only.txt'))
+    assert 'holiday_only.txt' in names(engine.suggest('holi'))   # Narrowed from the cached rows
+
+    engine.index_files([{'file_path': '/home/user/holiday_plan.txt', 'file_name': 'holiday_plan.txt'}])
+    assert engine._suggest_cache == {}
+    assert 'holiday_plan.txt' in names(engine.suggest('holi'))
+
+    assert engine.remove_missing_files(PATHS[:4]) == 3
+    assert names(engine.suggest('holi')) == []
+
+
+def test_trigram_index_backfills_existing_database(tmp_path, engine):
+    conn = sqlite3.connect(engine.db_path)
+    conn.execute('DROP TABLE file_paths')
+    conn.execute('DROP TABLE path_trigrams')
+    conn.commit()
+    conn.close()
+
+    reopened = SearchEngine({'db_path': engine.db_path,
+                             'vector_search': {'cache_dir': str(tmp_path / 'embeddings'), 'embedding_dim': 32}})
+    assert names(reopened.suggest('march')) == ['invoice_march.pdf']
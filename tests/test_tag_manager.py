@@ -0,0 +1,66 @@
+"""
+Tests for the tag database.
+"""
+
+from src.tag_manager import TagManager, TagMatcher
+
+
+def test_add_tags_to_files_in_bulk(tmp_path):
+    tags = TagManager(str(tmp_path / 'tags.db'))
+    tags.create_tag('Finance', category='Topic')
+
+    written = tags.add_tags_to_files([('/docs/a.pdf', 'Finance', 1.0),
+                                      ('/docs/a.pdf', 'Invoice', 0.8),
+                                      ('/docs/b.pdf', 'Finance', 0.9),
+                                      ('/docs/b.pdf', '', 1.0)])
+    assert written == 3
+    assert [t['name'] for t in tags.get_file_tags('/docs/a.pdf')] == ['Invoice', 'Finance']
+    assert sorted(tags.get_files_by_tag('Finance')) == ['/docs/a.pdf', '/docs/b.pdf']
+
+    # Existing associations are updated, tags are not duplicated
+    assert tags.add_tags_to_files([('/docs/b.pdf', 'Finance', 0.5)]) == 1
+    assert [t['confidence'] for t in tags.get_file_tags('/docs/b.pdf')] == [0.5]
+    assert len(tags.get_all_tags()) == 2
+    assert tags.add_tags_to_files([]) == 0
+
+
+def test_tag_matcher_counts_whole_words():
+    matcher = TagMatcher([{'name': 'Tax'}, {'name': 'Tax Return'}, {'name': 'Return'},
+                          {'name': 'C++'}, {'name': 'New York City'}, {'name': 'York'}, {'name': '  '}])
+    text = 'TAX return filed; taxonomy of tax\nreturns. C++ and c+ in New York, new york city!'
+    assert matcher.count(text) == {0: 2, 1: 1, 2: 1, 3: 1, 4: 1, 5: 2}
+    assert matcher.count('') == {}
+
+
+def test_tag_suggestions_follow_tag_changes(tmp_path):
+    tags = TagManager(str(tmp_path / 'tags.db'))
+    other = TagManager(str(tmp_path / 'tags.db'))   # Second connection, e.g. the GUI
+    tags.create_tag('Invoice')
+    tags.create_tag('Tax')
+
+    file_info = {'summary': 'An invoice for tax services', 'content': 'Invoice, invoice, taxes and travel'}
+    suggestions = tags.get_tag_suggestions(file_info)
+    assert [(s['name'], s['reason']) for s in suggestions] == [
+        ('Invoice', 'Keyword appears 1 times in document summary'),
+        ('Tax', 'Keyword appears 1 times in document summary')]
+    assert tags.get_tag_matcher() is tags.get_tag_matcher()
+
+    other.create_tag('Travel')
+    assert 'Travel' in [s['name'] for s in tags.get_tag_suggestions(file_info)]
+    other.update_tag(other.get_tag_by_name('Travel')['id'], name='Trip')
+    assert 'Travel' not in [s['name'] for s in tags.get_tag_suggestions(file_info)]
+
+
+def test_get_tags_for_files(tmp_path):
+    tags = TagManager(str(tmp_path / 'tags.db'))
+    tags.create_tag('Finance', category='Topic')
+    entries = [(f'/docs/{i}.pdf', 'Finance', 1.0) for i in range(1200)]
+    entries.append(('/docs/0.pdf', 'Invoice', 0.7))
+    assert tags.add_tags_to_files(entries) == 1201
+
+    found = tags.get_tags_for_files(['/docs/0.pdf', '/docs/1199.pdf', '/docs/missing.pdf', '/docs/0.pdf'])
+    assert list(found) == ['/docs/0.pdf', '/docs/1199.pdf', '/docs/missing.pdf']
+    assert found['/docs/0.pdf'] == tags.get_file_tags('/docs/0.pdf')
+    assert [t['name'] for t in found['/docs/1199.pdf']] == ['Finance']
+    assert found['/docs/missing.pdf'] == []
+    assert len(tags.get_tags_for_files(f'/docs/{i}.pdf' for i in range(1200))) == 1200
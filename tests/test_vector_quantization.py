@@ -0,0 +1,92 @@
+"""
+Tests for quantized vector storage and re-ranking in VectorSearch.
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.vector_quantization import create_quantizer, save_quantizer, load_quantizer  # noqa: E402
+from src.vector_search import VectorSearch  # noqa: E402
+
+
+def unit_vectors(n=2000, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((20, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, 20, n)] + 0.4 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize('kind, code_size', [('int8', 32), ('pq', 8)])
+def test_quantizer_scores_approximate_dot_products(kind, code_size):
+    vectors = unit_vectors()
+    quantizer = create_quantizer(kind, 32, {'pq_subvectors': 8})
+    quantizer.train(vectors)
+
+    codes = quantizer.encode(vectors)
+    assert codes.dtype == np.uint8 and codes.shape == (len(vectors), code_size)
+
+    query = vectors[0]
+    exact = vectors @ query
+    approximate = quantizer.score(query, codes)
+    assert np.allclose(approximate, quantizer.decode(codes) @ query, atol=1e-4)
+    assert np.corrcoef(exact, approximate)[0, 1] > 0.9
+
+
+def test_quantizer_round_trip(tmp_path):
+    vectors = unit_vectors()
+    quantizer = create_quantizer('pq', 32, {'pq_subvectors': 8})
+    quantizer.train(vectors)
+    path = str(tmp_path / 'quantizer.npz')
+    save_quantizer(quantizer, path, model_version=3)
+
+    restored, saved = load_quantizer(path, 'pq', 32, {'pq_subvectors': 8})
+    assert int(saved['model_version']) == 3
+    assert np.array_equal(restored.encode(vectors[:10]), quantizer.encode(vectors[:10]))
+    assert load_quantizer(path, 'int8', 32) == (None, None)
+
+    with pytest.raises(ValueError):
+        create_quantizer('pq', 30, {'pq_subvectors': 8})
+
+
+@pytest.mark.parametrize('kind', ['int8', 'pq'])
+def test_vector_search_quantized_pipeline(tmp_path, kind):
+    words = ['alpha', 'beta', 'gamma', 'delta', 'omega', 'sigma', 'kappa', 'theta', 'zeta', 'iota']
+    documents = [{
+        'file_path': f'/docs/{i}.txt',
+        'file_name': f'{i}.txt',
+        'content': ' '.join(words[(i * 7 + j) % len(words)] for j in range(4)) + f' doc{i % 37}'
+    } for i in range(400)]
+
+    config = {'cache_dir': str(tmp_path / 'embeddings'), 'embedding_dim': 32, 'initial_capacity': 64,
+              'embedder': {'n_features': 1024},
+              'quantization': {'type': kind, 'min_documents': 100, 'pq_subvectors': 8, 'rerank_factor': 8}}
+    vs = VectorSearch(config)
+    assert vs.index_documents(documents)
+    assert vs._quantizer_ready()
+
+    stats = vs.get_index_stats(n_queries=30, top_k=5)
+    assert stats['documents'] == 400
+    assert stats['quantization']['active']
+    assert stats['quantization']['bytes_per_vector'] == (32 if kind == 'int8' else 8)
+    assert stats['float_bytes_per_vector'] == 128
+    assert stats['recall'] >= 0.8
+    assert stats['recall_loss'] == pytest.approx(1.0 - stats['recall'])
+
+    # Scores returned after re-ranking are the exact cosine similarities
+    results = vs.find_similar_documents('/docs/0.txt', top_k=3)
+    vectors = np.asarray(vs._vectors)
+    target = vectors[0]
+    for result in results:
+        row = vs._get_row_index()[result['file_path']]
+        assert result['similarity'] == pytest.approx(float(vectors[row] @ target), abs=1e-5)
+
+    # Codes survive a reload and follow compaction
+    reopened = VectorSearch(config)
+    assert reopened.find_similar_documents('/docs/0.txt', top_k=3) == results
+    assert reopened._quantizer_ready()
+
+    reopened.remove_documents([f'/docs/{i}.txt' for i in range(1, 50)])
+    assert reopened.compact()
+    assert reopened._quantizer_ready()
+    assert reopened.get_index_stats(n_queries=0)['documents'] == 351
@@ -0,0 +1,87 @@
+"""
+Tests for the NumPy-backed VectorSearch store.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from src.vector_search import VectorSearch  # noqa: E402
+
+
+def make_doc(path, content):
+    return {
+        'file_path': path,
+        'file_name': os.path.basename(path),
+        'file_type': 'text',
+        'content': content,
+        'metadata': {'source': 'test'}
+    }
+
+
+DOCS = [
+    make_doc('/docs/budget.txt', 'quarterly budget forecast and expense report'),
+    make_doc('/docs/budget_copy.txt', 'quarterly budget forecast and expense report draft'),
+    make_doc('/docs/recipe.txt', 'chocolate cake recipe with flour sugar and eggs'),
+    make_doc('/docs/travel.txt', 'travel itinerary for the trip to lisbon'),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    vs = VectorSearch({'cache_dir': str(tmp_path / 'embeddings'), 'initial_capacity': 2})
+    assert vs.index_documents(DOCS)
+    return vs
+
+
+def test_search_is_deterministic_and_ranked(index):
+    first = index.search('budget forecast', top_k=3, threshold=0.1)
+    second = index.search('budget forecast', top_k=3, threshold=0.1)
+
+    assert [r['file_path'] for r in first] == [r['file_path'] for r in second]
+    assert {r['file_path'] for r in first[:2]} == {'/docs/budget.txt', '/docs/budget_copy.txt'}
+    assert [r['rank'] for r in first] == list(range(1, len(first) + 1))
+    assert first[0]['metadata'] == {'source': 'test'}
+    assert all(a['similarity'] >= b['similarity'] for a, b in zip(first, first[1:]))
+
+
+def test_candidate_paths_restrict_results(index):
+    results = index.search('budget forecast', top_k=5, threshold=0.0,
+                           candidate_paths={'/docs/budget_copy.txt'})
+    assert [r['file_path'] for r in results] == ['/docs/budget_copy.txt']
+
+
+def test_find_similar_excludes_self_and_applies_threshold(index):
+    results = index.find_similar_documents('/docs/budget.txt', top_k=3, threshold=0.8)
+    assert [r['file_path'] for r in results] == ['/docs/budget_copy.txt']
+    assert index.find_similar_documents('/docs/missing.txt') == []
+
+
+def test_index_persists_and_upserts(tmp_path, index):
+    index.index_documents([make_doc('/docs/recipe.txt', 'budget forecast spreadsheet')])
+
+    reopened = VectorSearch({'cache_dir': index.cache_dir})
+    results = reopened.search('budget forecast', top_k=10, threshold=0.1)
+    paths = [r['file_path'] for r in results]
+
+    assert '/docs/recipe.txt' in paths
+    assert len(paths) == len(set(paths))
+    assert reopened._count == len(DOCS)
+
+
+def test_remove_and_compact(index):
+    assert index.remove_documents(['/docs/budget_copy.txt', '/docs/unknown.txt']) == 1
+    paths = [r['file_path'] for r in index.search('budget forecast', top_k=5, threshold=0.0)]
+    assert '/docs/budget_copy.txt' not in paths
+
+    assert index.compact()
+    assert index._count == len(DOCS) - 1
+    results = index.search('chocolate cake', top_k=1, threshold=0.1)
+    assert results[0]['file_path'] == '/docs/recipe.txt'
+
+
+def test_clear_cache_resets_index(index):
+    assert index.clear_cache()
+    assert index.search('budget', top_k=5, threshold=0.0) == []
@@ -0,0 +1,83 @@
+"""
+Tests for keyframe signatures of videos.
+"""
+
+import shutil
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.hash_cache import HashCache, stat_key  # noqa: E402
+from src.video_signature import VideoHasher, FRAME_PIXELS, frame_distances  # noqa: E402
+
+
+def make_frames(seed, count=16, noise=0):
+    """Frames of distinct blocky scenes, optionally with encoding noise."""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (count, 8, 8))
+    frames = np.kron(blocks, np.ones((1, FRAME_PIXELS // 8, FRAME_PIXELS // 8)))
+    if noise:
+        frames = frames + np.random.default_rng(seed + 1000).normal(0, noise, frames.shape)
+    return np.clip(frames, 0, 255).astype(np.uint8)
+
+
+def sign(hasher, cache, path, duration, frames):
+    """Store the signature of synthetic frames for a file, as if it had been decoded."""
+    path.write_bytes(path.name.encode())
+    hashes = np.array([hasher.image_hasher.phash_pixels(frame) for frame in frames], dtype=np.uint64)
+    cache.put_signatures([(str(path), stat_key(str(path)), hasher.to_bytes((duration, hashes)))], hasher.kind)
+    return {'file_path': str(path)}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HashCache({'db_path': str(tmp_path / 'hashes.db')})
+
+
+def test_groups_copies_by_duration_and_frame_hashes(tmp_path, cache):
+    hasher = VideoHasher(cache=cache)
+    files = [sign(hasher, cache, tmp_path / 'movie.mp4', 120.0, make_frames(1)),
+             sign(hasher, cache, tmp_path / 'movie (small).mkv', 120.5, make_frames(1, noise=12)),
+             sign(hasher, cache, tmp_path / 'other.mp4', 120.0, make_frames(2)),
+             sign(hasher, cache, tmp_path / 'movie (cut).mp4', 60.0, make_frames(1))]
+
+    assert hasher.group_similar(files, 0.85) == [files[:2]]
+
+    signatures = hasher.signatures([f['file_path'] for f in files])
+    assert hasher.similarity(signatures[0], signatures[1]) > 0.9
+    assert hasher.similarity(signatures[0], signatures[2]) < 0.7
+    assert hasher.similarity(signatures[0], signatures[3]) == 0.0   # Durations differ
+
+    matches = hasher.find_similar(files[1]['file_path'], [files[0], files[2], files[3]], 0.85)
+    assert [match for match, _ in matches] == [files[0]]
+
+
+def test_signature_round_trip_and_distances():
+    hasher = VideoHasher()
+    hashes = np.array([0, 2 ** 64 - 1, 0b1011], dtype=np.uint64)
+    duration, restored = hasher.from_bytes(hasher.to_bytes((12.5, hashes)))
+    assert duration == 12.5 and np.array_equal(restored, hashes)
+
+    assert frame_distances(hashes, hashes[::-1]).tolist() == [3, 0, 3]
+    assert frame_distances(hashes, np.zeros(3, dtype=np.uint64)).tolist() == [0, 64, 3]
+    assert hasher.duration_window(10.0) == (9.0, 11.0)
+    assert hasher.duration_window(1000.0)[0] == pytest.approx(980.0)
+
+
+def test_transcoded_video_matches(tmp_path):
+    pytest.importorskip('ffmpeg')
+    if shutil.which('ffmpeg') is None:
+        pytest.skip('ffmpeg binary not available')
+    import ffmpeg
+
+    original = str(tmp_path / 'clip.mp4')
+    smaller = str(tmp_path / 'clip (small).mkv')
+    other = str(tmp_path / 'other.mp4')
+    ffmpeg.input('testsrc=duration=8:size=320x240:rate=25', f='lavfi').output(original).run(quiet=True)
+    ffmpeg.input(original).filter('scale', 160, 120).output(smaller, r=30).run(quiet=True)
+    ffmpeg.input('mandelbrot=size=320x240:rate=25', f='lavfi', t=8).output(other).run(quiet=True)
+
+    hasher = VideoHasher(cache=HashCache({'db_path': str(tmp_path / 'hashes.db')}))
+    files = [{'file_path': path} for path in (original, smaller, other)]
+    assert hasher.group_similar(files, 0.85) == [files[:2]]